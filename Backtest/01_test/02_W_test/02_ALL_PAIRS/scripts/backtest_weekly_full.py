@@ -36,6 +36,8 @@ from scripts.backtesting.backtest_model3 import (
     price_per_pip,
     should_use_wick_diff_entry,
 )
+from scripts.backtesting.sizing import position_sizes
+from scripts.backtesting.trade_store import naive_utc
 
 # ============================================================================
 # OPTIMIZED FUNCTIONS (vectorized versions - NO LOOPS!)
@@ -270,6 +272,7 @@ END_DATE = "2025-12-31"
 # Risk Settings
 STARTING_CAPITAL = 100000  # $100k
 RISK_PER_TRADE = 0.01  # 1% per trade
+SIZING_MODE = "fixed"  # Lots column: "fixed" (% of starting capital) or "compounding"
 
 # Strategy Settings
 DOJI_FILTER = 5.0  # Min body % for pivots
@@ -1048,7 +1051,7 @@ def main():
     print("GENERATING REPORT")
     print("="*80)
 
-    from report_helpers import calc_stats, format_report
+    from scripts.backtesting.stats import calc_stats, format_report
 
     # Config for reports
     report_config = {
@@ -1061,20 +1064,7 @@ def main():
     }
 
     # Add lots column (for reference in CSV)
-    trades_df['lots'] = 0.0
-    for idx, row in trades_df.iterrows():
-        pip_val = price_per_pip(row['pair'])
-        risk_pips = abs(row['entry_price'] - row['sl_price']) / pip_val
-        position_dollars = STARTING_CAPITAL * RISK_PER_TRADE
-        dollars_per_pip = position_dollars / risk_pips if risk_pips > 0 else 0
-
-        if 'JPY' in row['pair']:
-            standard_lot_pip_value = 1000
-        else:
-            standard_lot_pip_value = 10
-
-        lots = dollars_per_pip / standard_lot_pip_value
-        trades_df.at[idx, 'lots'] = lots
+    trades_df['lots'] = position_sizes(trades_df, STARTING_CAPITAL, RISK_PER_TRADE, SIZING_MODE)
 
     # Generate report
     print("\nGenerating report...")
@@ -1089,11 +1079,8 @@ def main():
     # Save CSV
     print("\nGenerating CSV...")
 
-    # Fix timezone issue: Remove timezone from datetime columns
-    datetime_cols = ['entry_time', 'exit_time', 'pivot_time', 'valid_time', 'gap_touch_time']
-    for col in datetime_cols:
-        if col in trades_df.columns:
-            trades_df[col] = pd.to_datetime(trades_df[col]).dt.tz_localize(None)
+    # Datetime columns as naive UTC (CSV format)
+    naive_utc(trades_df, ['entry_time', 'exit_time', 'pivot_time', 'valid_time', 'gap_touch_time'])
 
     # Save trades CSV
     trades_csv = OUTPUT_DIR / f"trades_{ts}.csv"
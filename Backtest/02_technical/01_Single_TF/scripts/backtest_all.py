@@ -28,31 +28,50 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 from collections import defaultdict
-from multiprocessing import Pool, cpu_count, Manager
+from contextlib import contextmanager
 
 # Go up to "05_Model 3" directory
 # Path: scripts -> 01_Single_TF -> 02_technical -> Backtest -> 05_Model 3
 model3_root = Path(__file__).parent.parent.parent.parent.parent
 sys.path.insert(0, str(model3_root))
 
+from scripts.backtesting import backtest_model3
 from scripts.backtesting.backtest_model3 import (
+    ALL_TIMEFRAMES,
     load_tf_data,
-    detect_htf_pivots,
     compute_sl_tp,
     price_per_pip,
     should_use_wick_diff_entry,
+    tf_path,
 )
+from scripts.backtesting import kernels
+from scripts.backtesting.executors import default_workers, make_executor
+from scripts.backtesting.scheduling import plan_tasks
+from scripts.backtesting.checkpoint import CheckpointStore, files_stamp, fingerprint
+from scripts.backtesting.sizing import position_sizes
+from scripts.backtesting.trade_store import TradeStore, naive_utc, pyarrow_available
+from scripts.backtesting.ledger import TradeLedger
 
 # Global cache (filled once at start, used by all processes)
 DATA_CACHE = {}
+TRADE_STORE = None  # Set per worker when trades are streamed to Parquet
 
-def init_worker(shared_cache):
-    """Initialize worker process with shared cache"""
-    global DATA_CACHE
+def init_worker(shared_cache, trade_store=None, params=None):
+    """
+    Initialize worker process with shared cache (and optional Parquet trade store).
+
+    params: Optional strategy settings {name: value} (see STRATEGY_PARAMS) - set in every
+            worker, so parameter searches also work with spawned processes
+    """
+    global DATA_CACHE, TRADE_STORE
     DATA_CACHE = shared_cache
+    TRADE_STORE = trade_store
+    if params:
+        set_strategy_params(params)
+    kernels.set_backend(KERNEL_BACKEND)
 
 # ============================================================================
-# OPTIMIZED FUNCTIONS (vectorized versions)
+# OPTIMIZED FUNCTIONS (array kernels, see scripts/backtesting/kernels.py)
 # ============================================================================
 
 def body_pct_vectorized(df):
@@ -62,164 +81,167 @@ def body_pct_vectorized(df):
     return (body / rng * 100).fillna(0)
 
 
-def detect_refinements_fast(df, htf_pivot, timeframe, max_size_frac=0.2, min_body_pct=5.0):
+def detect_htf_pivots_fast(df, min_body_pct=5.0, arrays=None, pivot_level="open_k2"):
+    """
+    OPTIMIZED: Pivot detection via kernel (same Pivots as detect_htf_pivots)
+
+    pivot_level: "open_k2" (standard) or "close_k1" (Pivot = Close K1, STRATEGIE_VARIABLES.md)
+    """
+    from scripts.backtesting.backtest_model3 import Pivot
+
+    arr = arrays if arrays is not None else kernels.candle_arrays(df)
+    directions = kernels.pivot_directions(arr, min_body_pct)
+    if pivot_level not in PIVOT_LEVELS:
+        raise ValueError(f"Unknown pivot_level: {pivot_level} (allowed: {', '.join(PIVOT_LEVELS)})")
+    pivot_level_k2 = pivot_level == "open_k2"
+
+    pivots = []
+    for i in np.flatnonzero(directions):
+        k1_low, k2_low = float(arr.low[i - 1]), float(arr.low[i])
+        k1_high, k2_high = float(arr.high[i - 1]), float(arr.high[i])
+
+        if directions[i] == 1:
+            direction = "bullish"
+            extreme = round(min(k1_low, k2_low), 5)
+            near = round(max(k1_low, k2_low), 5)
+        else:
+            direction = "bearish"
+            extreme = round(max(k1_high, k2_high), 5)
+            near = round(min(k1_high, k2_high), 5)
+
+        pivot_price = round(float(arr.open[i] if pivot_level_k2 else arr.close[i - 1]), 5)
+        gap_size = round(abs(pivot_price - extreme), 5)
+        valid_time = arr.stamps[i + 1] if i + 1 < len(arr) else arr.stamps[i]
+
+        pivots.append(
+            Pivot(
+                index=int(i),
+                time=arr.stamps[i],
+                k1_time=arr.stamps[i - 1],
+                direction=direction,
+                pivot=pivot_price,
+                extreme=extreme,
+                near=near,
+                gap_size=gap_size,
+                valid_time=valid_time,
+            )
+        )
+    return pivots
+
+
+def detect_refinements_fast(df, htf_pivot, timeframe, max_size_frac=0.2, min_body_pct=5.0, arrays=None):
     """
     OPTIMIZED: Vectorized refinement detection (NO LOOPS!)
     """
     from scripts.backtesting.backtest_model3 import Refinement
 
-    # Filter time window FIRST
-    df_window = df[(df["time"] >= htf_pivot.k1_time) & (df["time"] < htf_pivot.valid_time)].copy()
+    arr = arrays if arrays is not None else kernels.candle_arrays(df)
 
-    if len(df_window) < 2:
-        return []
+    # Filter time window FIRST (index range, times are sorted)
+    lo = arr.index_of(htf_pivot.k1_time, "left")
+    hi = arr.index_of(htf_pivot.valid_time, "left")
 
-    # Calculate body % for all candles at once
-    df_window['body_pct'] = body_pct_vectorized(df_window)
+    if hi - lo < 2:
+        return []
 
-    # Create k1/k2 pairs (shifted dataframe)
-    df_k1 = df_window.iloc[:-1].reset_index(drop=True)
-    df_k2 = df_window.iloc[1:].reset_index(drop=True)
+    w_open = arr.open[lo:hi]
+    w_high = arr.high[lo:hi]
+    w_low = arr.low[lo:hi]
+    w_close = arr.close[lo:hi]
+    w_body = arr.body_pct[lo:hi]
 
-    # Vectorized body filter
-    valid_body = (df_k1['body_pct'].values >= min_body_pct) & (df_k2['body_pct'].values >= min_body_pct)
+    # Vectorized body filter (k1 = [:-1], k2 = [1:])
+    valid_body = (w_body[:-1] >= min_body_pct) & (w_body[1:] >= min_body_pct)
 
     # Vectorized color detection
-    k1_red = (df_k1['close'].values < df_k1['open'].values)
-    k1_green = (df_k1['close'].values > df_k1['open'].values)
-    k2_green = (df_k2['close'].values > df_k2['open'].values)
-    k2_red = (df_k2['close'].values < df_k2['open'].values)
-
-    # Vectorized pattern detection
-    is_bullish = k1_red & k2_green
-    is_bearish = k1_green & k2_red
+    k1_red = w_close[:-1] < w_open[:-1]
+    k1_green = w_close[:-1] > w_open[:-1]
+    k2_green = w_close[1:] > w_open[1:]
+    k2_red = w_close[1:] < w_open[1:]
 
     # Filter by direction match
     if htf_pivot.direction == "bullish":
-        valid_direction = is_bullish
+        valid_direction = k1_red & k2_green
         direction = "bullish"
     else:
-        valid_direction = is_bearish
+        valid_direction = k1_green & k2_red
         direction = "bearish"
 
-    # Combine filters
-    valid_mask = valid_body & valid_direction
+    # Position of K2 inside the window
+    k2_pos = np.flatnonzero(valid_body & valid_direction) + 1
 
-    if not valid_mask.any():
+    if len(k2_pos) == 0:
         return []
 
-    # Filter dataframes
-    df_k1_valid = df_k1[valid_mask].reset_index(drop=True)
-    df_k2_valid = df_k2[valid_mask].reset_index(drop=True)
-
     # Calculate refinement levels (vectorized)
     if direction == "bullish":
-        extremes = np.minimum(df_k1_valid['low'].values, df_k2_valid['low'].values)
-        nears = np.maximum(df_k1_valid['low'].values, df_k2_valid['low'].values)
+        extremes = np.minimum(w_low[k2_pos - 1], w_low[k2_pos])
+        nears = np.maximum(w_low[k2_pos - 1], w_low[k2_pos])
         extremes = np.maximum(extremes, htf_pivot.extreme)
     else:
-        extremes = np.maximum(df_k1_valid['high'].values, df_k2_valid['high'].values)
-        nears = np.minimum(df_k1_valid['high'].values, df_k2_valid['high'].values)
+        extremes = np.maximum(w_high[k2_pos - 1], w_high[k2_pos])
+        nears = np.minimum(w_high[k2_pos - 1], w_high[k2_pos])
         extremes = np.minimum(extremes, htf_pivot.extreme)
 
-    pivot_levels = df_k2_valid['open'].values
+    pivot_levels = w_open[k2_pos]
     sizes = np.abs(extremes - nears)
 
-    # Size filter (vectorized)
+    # Size filter + position check (vectorized)
     max_size = htf_pivot.gap_size * max_size_frac
     valid_size = (sizes > 0) & (sizes <= max_size)
 
-    if not valid_size.any():
-        return []
-
-    # Apply size filter
-    df_k2_final = df_k2_valid[valid_size].reset_index(drop=True)
-    extremes_final = extremes[valid_size]
-    nears_final = nears[valid_size]
-    pivot_levels_final = pivot_levels[valid_size]
-    sizes_final = sizes[valid_size]
-
-    # Position check (vectorized)
     if direction == "bullish":
-        wick_low = htf_pivot.extreme
-        wick_high = htf_pivot.near
-        in_range = (extremes_final >= wick_low) & (nears_final <= wick_high)
-        touches_near = np.abs(extremes_final - htf_pivot.near) < 0.00001
+        in_range = (extremes >= htf_pivot.extreme) & (nears <= htf_pivot.near)
     else:
-        wick_low = htf_pivot.near
-        wick_high = htf_pivot.extreme
-        in_range = (nears_final >= wick_low) & (extremes_final <= wick_high)
-        touches_near = np.abs(extremes_final - htf_pivot.near) < 0.00001
+        in_range = (nears >= htf_pivot.near) & (extremes <= htf_pivot.extreme)
+    touches_near = np.abs(extremes - htf_pivot.near) < 0.00001
 
-    valid_position = in_range | touches_near
+    keep = valid_size & (in_range | touches_near)
 
-    if not valid_position.any():
+    if not keep.any():
         return []
 
-    # Final filter
-    df_k2_result = df_k2_final[valid_position].reset_index(drop=True)
-    extremes_result = extremes_final[valid_position]
-    nears_result = nears_final[valid_position]
-    pivot_levels_result = pivot_levels_final[valid_position]
-    sizes_result = sizes_final[valid_position]
-
     # "Unberührt" check: NEAR must not be touched between creation and HTF valid_time
+    untouched = kernels.untouched_after(
+        w_low if direction == "bullish" else w_high,
+        k2_pos[keep],
+        nears[keep],
+        below=(direction == "bullish"),
+    )
+
     refinements = []
-    for i in range(len(df_k2_result)):
-        refinement_created = df_k2_result.iloc[i]['time']
-        near_level = nears_result[i]
-
-        # Check if NEAR was touched after refinement creation
-        touch_window = df_window[
-            (df_window["time"] > refinement_created) &
-            (df_window["time"] <= htf_pivot.valid_time)
-        ]
-
-        if len(touch_window) == 0:
-            was_touched = False
-        else:
-            # Vectorized touch check
-            if direction == "bullish":
-                was_touched = (touch_window["low"] <= near_level).any()
-            else:
-                was_touched = (touch_window["high"] >= near_level).any()
-
-        if was_touched:
-            continue  # NEAR was touched -> refinement invalid
-
-        # Valid refinement
-        ref = Refinement(
-            timeframe=timeframe,
-            time=refinement_created,
-            direction=direction,
-            pivot_level=round(pivot_levels_result[i], 5),
-            extreme=round(extremes_result[i], 5),
-            near=round(nears_result[i], 5),
-            size=round(sizes_result[i], 5),
+    for pos, pivot_level, extreme, near, size in zip(
+        k2_pos[keep][untouched],
+        pivot_levels[keep][untouched],
+        extremes[keep][untouched],
+        nears[keep][untouched],
+        sizes[keep][untouched],
+    ):
+        refinements.append(
+            Refinement(
+                timeframe=timeframe,
+                time=arr.stamps[lo + pos],
+                direction=direction,
+                pivot_level=round(pivot_level, 5),
+                extreme=round(extreme, 5),
+                near=round(near, 5),
+                size=round(size, 5),
+            )
         )
-        refinements.append(ref)
 
     return refinements
 
 
 def find_gap_touch_on_daily_fast(df_daily, pivot, start_time):
     """Vectorized version of gap touch detection on Daily"""
-    df_after = df_daily[df_daily["time"] >= start_time].copy()
-
-    if len(df_after) == 0:
-        return None
+    arr = kernels.as_candle_arrays(df_daily)
 
     gap_low = min(pivot.pivot, pivot.extreme)
     gap_high = max(pivot.pivot, pivot.extreme)
 
-    # Vectorized check: candle overlaps with gap range
-    if pivot.direction == "bullish":
-        mask = (df_after["low"] <= gap_high) & (df_after["high"] >= gap_low)
-    else:
-        mask = (df_after["high"] >= gap_low) & (df_after["low"] <= gap_high)
-
-    hits = df_after[mask]
-    return hits.iloc[0]["time"] if len(hits) > 0 else None
+    # Candle overlaps with gap range (same check for both directions)
+    idx = kernels.first_overlap(arr.high, arr.low, arr.index_of(start_time), gap_low, gap_high)
+    return arr.stamps[idx] if idx >= 0 else None
 
 
 def find_gap_touch_on_h1_fast(df_h1, pivot, daily_gap_touch_time):
@@ -227,36 +249,28 @@ def find_gap_touch_on_h1_fast(df_h1, pivot, daily_gap_touch_time):
     if daily_gap_touch_time is None:
         return None
 
-    # Search H1 candles starting from the daily gap touch date
-    df_after = df_h1[df_h1["time"] >= daily_gap_touch_time].copy()
-    if len(df_after) == 0:
-        return None
+    arr = kernels.as_candle_arrays(df_h1)
 
     gap_low = min(pivot.pivot, pivot.extreme)
     gap_high = max(pivot.pivot, pivot.extreme)
 
-    # Vectorized check: H1 candle touches gap
-    if pivot.direction == "bullish":
-        mask = (df_after["low"] <= gap_high) & (df_after["high"] >= gap_low)
-    else:
-        mask = (df_after["high"] >= gap_low) & (df_after["low"] <= gap_high)
-
-    hits = df_after[mask]
-    return hits.iloc[0]["time"] if len(hits) > 0 else None
+    # Search H1 candles starting from the daily gap touch date
+    idx = kernels.first_overlap(arr.high, arr.low, arr.index_of(daily_gap_touch_time), gap_low, gap_high)
+    return arr.stamps[idx] if idx >= 0 else None
 
 
 def check_tp_touched_before_entry_fast(df, pivot, gap_touch_time, entry_time, tp):
     """Vectorized version of TP touch check"""
-    # TP check starts after gap touch (gap_touch_time is always >= valid_time)
-    df_check_window = df[(df["time"] >= gap_touch_time) & (df["time"] < entry_time)].copy()
+    arr = kernels.as_candle_arrays(df)
 
-    if len(df_check_window) == 0:
-        return False
+    # TP check starts after gap touch (gap_touch_time is always >= valid_time)
+    start = arr.index_of(gap_touch_time, "left")
+    stop = arr.index_of(entry_time, "left")
 
     if pivot.direction == "bullish":
-        return (df_check_window["high"] >= tp).any()
+        return kernels.any_touch(arr.high, start, stop, tp, below=False)
     else:
-        return (df_check_window["low"] <= tp).any()
+        return kernels.any_touch(arr.low, start, stop, tp, below=True)
 
 # ============================================================================
 # CONFIGURATION
@@ -277,18 +291,78 @@ END_DATE = "2025-12-31"
 # Risk Settings
 STARTING_CAPITAL = 100000  # $100k
 RISK_PER_TRADE = 0.01  # 1% per trade
+SIZING_MODE = "fixed"  # Lots column: "fixed" (% of starting capital) or "compounding"
 
 # Strategy Settings
 DOJI_FILTER = 5.0  # Min body % for pivots
 REFINEMENT_MAX_SIZE = 0.20  # Max 20% of HTF gap
+MIN_SL_PIPS = 60  # Min SL distance from entry (pips)
+PIVOT_LEVEL = "open_k2"  # "open_k2" (Pivot = Open K2) or "close_k1" (Pivot = Close K1)
+PIVOT_LEVELS = ("open_k2", "close_k1")
+
+# Settings a parameter search may override per run (run_backtest_for_timeframe(params=...))
+STRATEGY_PARAMS = ("DOJI_FILTER", "REFINEMENT_MAX_SIZE", "MIN_SL_PIPS", "PIVOT_LEVEL")
+
+# Engine Settings
+KERNEL_BACKEND = "auto"  # "numba" (compiled), "numpy" (fallback) or "auto"
+EXECUTOR = "process"  # "process" (Pool), "thread" (shared cache, no pickling) or "serial"
+# benchmark_executors.py on 1 core: W ties (~0.37s), 3D / M thread or serial ahead of process (Pool startup);
+# "process" is kept for multi-core machines - re-run the benchmark there before changing it
+EXECUTOR_WORKERS = None  # None = all CPU cores
+SCHEDULING = "pivot_chunks"  # "pivot_chunks" (cost-balanced pair/pivot-range tasks) or "pair" (one task per pair)
+TASKS_PER_WORKER = 4  # Target tasks per worker for "pivot_chunks" (keeps cores busy at the end of the run)
 
 # Output
 RESULTS_DIR = Path(__file__).parent.parent / "results"
 TRADES_DIR = RESULTS_DIR / "Trades"
 
+# Checkpoints: every (HTF, pair) result is saved as it completes, keyed by run_fingerprint()
+# (settings, engine code, chart data) and cleared once all HTFs are done
+RESUME = True  # True = skip finished pairs from a previous (aborted) run, False = start fresh
+CHECKPOINT_DIR = RESULTS_DIR / "checkpoints" / f"{ENTRY_CONFIRMATION}_{START_DATE}_{END_DATE}"  # per run config
+
+# Trade output: workers stream trades into a partitioned Parquet dataset (htf=/pair=)
+STREAM_TRADES = True  # False = return trade dicts through the pool (no pyarrow needed)
+TRADE_STORE_DIR = TRADES_DIR / "dataset"
+
 # Create directories
 TRADES_DIR.mkdir(parents=True, exist_ok=True)
 
+
+def strategy_params():
+    """Current strategy settings {name: value} (STRATEGY_PARAMS)"""
+    return {name: globals()[name] for name in STRATEGY_PARAMS}
+
+
+def run_fingerprint(start_date, end_date):
+    """Checkpoint key part: strategy settings + engine code + chart data stamp (any change → recompute)"""
+    return fingerprint(
+        ENTRY_CONFIRMATION, start_date, end_date, sorted(strategy_params().items()),
+        Path(__file__), Path(backtest_model3.__file__), Path(kernels.__file__),
+        files_stamp(tf_path(tf) for tf in ALL_TIMEFRAMES),
+    )
+
+
+def set_strategy_params(params):
+    """Override strategy settings of this process (unknown names raise KeyError)"""
+    unknown = set(params) - set(STRATEGY_PARAMS)
+    if unknown:
+        raise KeyError(f"Unknown strategy params: {', '.join(sorted(unknown))} (allowed: {', '.join(STRATEGY_PARAMS)})")
+    if params.get("PIVOT_LEVEL", PIVOT_LEVEL) not in PIVOT_LEVELS:
+        raise ValueError(f"Unknown PIVOT_LEVEL: {params['PIVOT_LEVEL']} (allowed: {', '.join(PIVOT_LEVELS)})")
+    globals().update(params)
+
+
+@contextmanager
+def strategy_params_override(params=None):
+    """Temporarily override strategy settings (restored afterwards, also on errors)"""
+    previous = strategy_params()
+    set_strategy_params(params or {})
+    try:
+        yield
+    finally:
+        set_strategy_params(previous)
+
 # ============================================================================
 # TRADE SIMULATION
 # ============================================================================
@@ -300,28 +374,23 @@ def find_near_touch_time(near_level, start_time, h1_df, direction):
     Args:
         near_level: Preis-Level (refinement near oder wick_diff entry)
         start_time: Startzeit (gap_touch_time)
-        h1_df: H1 DataFrame
+        h1_df: H1 DataFrame oder CandleArrays
         direction: "bullish" oder "bearish"
 
     Returns: Timestamp oder None
     """
-    window = h1_df[h1_df["time"] >= start_time].copy()
-
-    if len(window) == 0:
-        return None
+    arr = kernels.as_candle_arrays(h1_df)
+    start = arr.index_of(start_time, "left")
 
     if direction == "bullish":
-        touch_mask = window["low"] <= near_level
+        idx = kernels.first_touch(arr.low, start, near_level, below=True)
     else:
-        touch_mask = window["high"] >= near_level
+        idx = kernels.first_touch(arr.high, start, near_level, below=False)
 
-    hits = window[touch_mask]
-    if len(hits) > 0:
-        return hits.iloc[0]["time"]
-    return None
+    return arr.stamps[idx] if idx >= 0 else None
 
 
-def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe):
+def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, ltf_arrays=None):
     """
     Simuliert einen Trade für ein Pivot mit chronologischer Verfeinerungs-Logik.
 
@@ -334,11 +403,14 @@ def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe):
 
     Args:
         htf_timeframe: 'W', '3D', or 'M'
+        ltf_arrays: {tf: CandleArrays} (optional, wird sonst aus ltf_cache gebaut)
 
     Returns: dict mit Trade-Details oder None
     """
-    h1_df = ltf_cache["H1"]
-    d_df = ltf_cache["D"]
+    if ltf_arrays is None:
+        ltf_arrays = {tf: kernels.candle_arrays(ltf_cache[tf]) for tf in ("H1", "D")}
+    h1_df = ltf_arrays["H1"]
+    d_df = ltf_arrays["D"]
 
     # 1. Gap Touch auf Daily (OPTIMIZED) - dann exact H1 time
     daily_gap_touch = find_gap_touch_on_daily_fast(d_df, pivot, pivot.valid_time)
@@ -407,7 +479,7 @@ def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe):
         if is_highest_prio:
             # Höchste Prio berührt → Entry Check mit RR >= 1.0
             entry_price = touched_ref.near
-            sl_tp_result = compute_sl_tp(pivot.direction, entry_price, pivot, pair)
+            sl_tp_result = compute_sl_tp(pivot.direction, entry_price, pivot, pair, min_sl_pips=MIN_SL_PIPS)
 
             if sl_tp_result is not None and sl_tp_result[2] >= 1.0:
                 # ENTRY! RR >= 1.0 erfüllt
@@ -445,53 +517,38 @@ def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe):
     # R-based only
     pip_value = price_per_pip(pair)
 
-    # 7. Exit simulieren (OPTIMIZED: vectorized)
-    exit_window = h1_df[h1_df["time"] > entry_time].copy()
+    # 7. Exit simulieren (OPTIMIZED: kernel scan)
+    exit_start = h1_df.index_of(entry_time, "right")
 
-    if len(exit_window) == 0:
+    if exit_start >= len(h1_df):
         return None
 
-    exit_time = None
-    exit_price = None
-    exit_reason = None
+    exit_idx, exit_code = kernels.scan_exit(
+        h1_df.high, h1_df.low, exit_start, sl_price, tp_price, pivot.direction == "bullish"
+    )
 
-    # Find SL and TP hits
-    if pivot.direction == "bullish":
-        sl_hits = exit_window[exit_window["low"] <= sl_price]
-        tp_hits = exit_window[exit_window["high"] >= tp_price]
-    else:
-        sl_hits = exit_window[exit_window["high"] >= sl_price]
-        tp_hits = exit_window[exit_window["low"] <= tp_price]
-
-    # Determine which came first
-    sl_time = sl_hits.iloc[0]["time"] if len(sl_hits) > 0 else None
-    tp_time = tp_hits.iloc[0]["time"] if len(tp_hits) > 0 else None
-
-    if sl_time is None and tp_time is None:
+    if exit_code == 0:
         return None  # Trade still open
 
-    if sl_time is not None and (tp_time is None or sl_time <= tp_time):
-        exit_time = sl_time
+    exit_time = h1_df.stamps[exit_idx]
+    if exit_code == 1:
         exit_price = sl_price
         exit_reason = "sl"
     else:
-        exit_time = tp_time
         exit_price = tp_price
         exit_reason = "tp"
 
-    # Calculate MFE/MAE up to exit (OPTIMIZED: vectorized)
-    trade_window = h1_df[(h1_df["time"] >= entry_time) & (h1_df["time"] <= exit_time)].copy()
+    # Calculate MFE/MAE up to exit (entry candle bis exit candle inklusive)
+    trade_start = h1_df.index_of(entry_time, "left")
+    trade_high = h1_df.high[trade_start:exit_idx + 1].max()
+    trade_low = h1_df.low[trade_start:exit_idx + 1].min()
 
-    if len(trade_window) == 0:
-        mfe_pips = 0
-        mae_pips = 0
+    if pivot.direction == "bullish":
+        mfe_pips = ((trade_high - entry_price) / pip_value)
+        mae_pips = ((entry_price - trade_low) / pip_value)
     else:
-        if pivot.direction == "bullish":
-            mfe_pips = ((trade_window["high"].max() - entry_price) / pip_value)
-            mae_pips = ((entry_price - trade_window["low"].min()) / pip_value)
-        else:
-            mfe_pips = ((entry_price - trade_window["low"].min()) / pip_value)
-            mae_pips = ((trade_window["high"].max() - entry_price) / pip_value)
+        mfe_pips = ((entry_price - trade_low) / pip_value)
+        mae_pips = ((trade_high - entry_price) / pip_value)
 
     # PnL berechnen (R-based - no costs!)
     if pivot.direction == "bullish":
@@ -650,10 +707,12 @@ def process_single_pair(args):
     Worker function for multiprocessing - processes one pair
     Uses pre-loaded data from DATA_CACHE (faster!)
 
-    Args: tuple (pair, htf_timeframe, start_date, end_date)
-    Returns: tuple (pair, list of trades)
+    Args: tuple (pair, htf_timeframe, start_date, end_date[, pivot_start, pivot_stop])
+          Optional pivot range → only pivots[pivot_start:pivot_stop] are processed
+    Returns: tuple (pair, TradeLedger)
     """
-    pair, htf_timeframe, start_date, end_date = args
+    pair, htf_timeframe, start_date, end_date = args[:4]
+    pivot_range = slice(*args[4:6]) if len(args) > 4 else slice(None)
 
     start_ts = pd.Timestamp(start_date, tz="UTC")
     end_ts = pd.Timestamp(end_date, tz="UTC")
@@ -663,20 +722,21 @@ def process_single_pair(args):
     htf_df = pair_data.get(htf_timeframe)
 
     if htf_df is None or len(htf_df) == 0:
-        return (pair, [])
+        return (pair, TradeLedger())
 
     # Detect pivots
-    pivots = detect_htf_pivots(htf_df, min_body_pct=DOJI_FILTER)
+    pivots = detect_htf_pivots_fast(htf_df, min_body_pct=DOJI_FILTER, pivot_level=PIVOT_LEVEL)[pivot_range]
 
     if len(pivots) == 0:
-        return (pair, [])
+        return (pair, TradeLedger())
 
-    # Get LTF data from cache
+    # Get LTF data from cache (+ array views for the kernels, built once per pair)
     all_tfs = ["M", "W", "3D", "D", "H4", "H1"]
     htf_idx = all_tfs.index(htf_timeframe)
     ltf_list = all_tfs[htf_idx + 1:]
 
     ltf_cache = {tf: pair_data.get(tf) for tf in ltf_list}
+    ltf_arrays = {tf: kernels.candle_arrays(df) for tf, df in ltf_cache.items() if df is not None}
 
     # Detect ALL refinements at once (vectorized)
     all_refinements = {}
@@ -690,73 +750,204 @@ def process_single_pair(args):
                     pivot,
                     tf,
                     max_size_frac=REFINEMENT_MAX_SIZE,
-                    min_body_pct=DOJI_FILTER
+                    min_body_pct=DOJI_FILTER,
+                    arrays=ltf_arrays[tf],
                 )
                 refinements.extend(ref_list)
         all_refinements[pivot_id] = refinements
 
-    # Simulate trades
-    pair_trades = []
+    # Simulate trades (columnar ledger instead of a list of dicts)
+    pair_trades = TradeLedger(capacity=len(pivots))
     for pivot in pivots:
         pivot_id = f"{pivot.time}"
         refinements = all_refinements.get(pivot_id, [])
-        trade = simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe)
+        trade = simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, ltf_arrays)
         if trade:
             pair_trades.append(trade)
 
     return (pair, pair_trades)
 
 
-def run_backtest_for_timeframe(htf_timeframe):
+def _process_task(args):
+    """
+    Executor wrapper: returns the task args along with the result.
+
+    With a trade store the worker writes its trades to Parquet itself and
+    only the trade count travels back through the pool.
+    """
+    pair, pair_trades = process_single_pair(args)
+    if TRADE_STORE is not None:
+        TRADE_STORE.write(args[1], pair, pair_trades, part=args[4] if len(args) > 4 else 0)
+        return args, (pair, len(pair_trades))
+    return args, (pair, pair_trades)
+
+
+def estimate_pair_stats(cache, htf_timeframe):
+    """
+    Cost inputs for the scheduler: {pair: (pivot count, LTF candles per HTF candle)}
+    """
+    all_tfs = ["M", "W", "3D", "D", "H4", "H1"]
+    ltf_list = all_tfs[all_tfs.index(htf_timeframe) + 1:]
+
+    stats = {}
+    for pair, pair_data in cache.items():
+        htf_df = pair_data.get(htf_timeframe)
+        if htf_df is None or len(htf_df) == 0:
+            stats[pair] = (0, 1.0)
+            continue
+        n_pivots = int(np.count_nonzero(kernels.pivot_directions(kernels.candle_arrays(htf_df), DOJI_FILTER)))
+        n_ltf = sum(len(pair_data[tf]) for tf in ltf_list if pair_data.get(tf) is not None)
+        stats[pair] = (n_pivots, n_ltf / len(htf_df))
+    return stats
+
+
+def run_backtest_for_timeframe(
+    htf_timeframe,
+    executor=None,
+    workers=None,
+    cache=None,
+    checkpoints=None,
+    trade_store=None,
+    params=None,
+    pairs=None,
+    start_date=None,
+    end_date=None,
+):
     """
     Führt Backtest für einen HTF-Timeframe durch (W, 3D, oder M).
 
     MAXIMUM SPEED OPTIMIZED:
     - Parallel data loading (all CPU cores)
     - Pre-loads ALL data into RAM cache
-    - Parallel backtest processing (all CPU cores)
+    - Parallel backtest processing (process / thread / serial executor)
     - Live progress display
     - Cache only exists during script runtime
 
-    Returns: list of trade dicts
+    Args:
+        executor: "process", "thread" or "serial" (default: EXECUTOR)
+        workers: Number of workers (default: EXECUTOR_WORKERS, None = all cores)
+        cache: Pre-loaded data cache (default: loaded here)
+        checkpoints: Optional CheckpointStore - finished pairs are loaded from disk,
+                     new pair results are saved atomically once all their tasks completed
+        trade_store: Optional TradeStore - workers stream trades to Parquet (htf=/pair=),
+                     the result is read back from the dataset
+        params: Optional strategy settings for this run {name: value} (STRATEGY_PARAMS),
+                passed to every worker; module settings are restored afterwards
+        pairs, start_date, end_date: Optional subset (default: PAIRS, START_DATE, END_DATE)
+
+    Returns: DataFrame of all trades (read back from the trade store when streaming)
     """
-    print(f"\n{'='*80}")
-    print(f"BACKTEST: {htf_timeframe}")
-    print(f"{'='*80}")
-
-    # STEP 1: Pre-load all data into cache (PARALLEL LOADING!)
-    cache = load_all_data_for_timeframe(htf_timeframe, PAIRS, START_DATE, END_DATE)
-
-    # STEP 2: Prepare arguments for each pair
-    pair_args = [(pair, htf_timeframe, START_DATE, END_DATE) for pair in PAIRS]
-
-    # Determine number of processes (use all available cores)
-    num_processes = cpu_count()
-    print(f"\n[PROCESSING] Running backtest with {num_processes} CPU cores...")
-    print(f"{'='*80}")
-
-    # STEP 3: Process pairs in parallel with LIVE progress
-    all_trades = []
-    completed = 0
-
-    with Pool(processes=num_processes, initializer=init_worker, initargs=(cache,)) as pool:
-        # imap_unordered with chunksize for better performance
-        for pair, pair_trades in pool.imap_unordered(process_single_pair, pair_args, chunksize=1):
-            completed += 1
-            if pair_trades:
-                all_trades.extend(pair_trades)
-                print(f"  [{completed:2d}/{len(PAIRS)}] {pair}: {len(pair_trades)} trades")
+    pairs = list(pairs or PAIRS)
+    start_date = start_date or START_DATE
+    end_date = end_date or END_DATE
+
+    # Parent process needs the settings too (scheduling, thread/serial workers)
+    with strategy_params_override(params):
+        print(f"\n{'='*80}")
+        print(f"BACKTEST: {htf_timeframe}")
+        print(f"{'='*80}")
+
+        executor = executor or EXECUTOR
+        workers = workers or EXECUTOR_WORKERS
+
+        # Finished pairs from a previous run with the same settings, code and data
+        # Streaming: checkpoints only mark pairs whose Parquet parts are complete
+        run_key = run_fingerprint(start_date, end_date)
+
+        def checkpoint_key(pair):
+            return (htf_timeframe, pair, "parquet" if trade_store is not None else "ledger", run_key)
+
+        pair_results = {}
+        if checkpoints is not None:
+            for pair in pairs:
+                if checkpoints.has(checkpoint_key(pair)):
+                    pair_results[pair] = checkpoints.load(checkpoint_key(pair))
+            if pair_results:
+                print(f"\n[RESUME] {len(pair_results)}/{len(pairs)} pairs loaded from checkpoints")
+
+        pending = [pair for pair in pairs if pair not in pair_results]
+
+        if trade_store is not None:
+            # Drop partial parts of unfinished pairs (aborted run, other chunking)
+            for pair in pending:
+                trade_store.clear_partition(htf_timeframe, pair)
+
+        if pending:
+            # STEP 1: Pre-load all data into cache (PARALLEL LOADING!)
+            if cache is None:
+                cache = load_all_data_for_timeframe(htf_timeframe, pending, start_date, end_date)
+
+            # STEP 2: Prepare tasks (one per pair, or cost-balanced pivot ranges, longest first)
+            if SCHEDULING == "pivot_chunks":
+                pair_stats = estimate_pair_stats(cache, htf_timeframe)
+                tasks = plan_tasks(
+                    {pair: pair_stats[pair] for pair in pending if pair in pair_stats},
+                    htf_timeframe,
+                    workers or default_workers(),
+                    tasks_per_worker=TASKS_PER_WORKER,
+                )
+                task_args = [(t.pair, htf_timeframe, start_date, end_date, t.pivot_start, t.pivot_stop) for t in tasks]
             else:
-                print(f"  [{completed:2d}/{len(PAIRS)}] {pair}: 0 trades")
-
-    # Sort chronologically (stable sort for consistent ordering)
-    all_trades.sort(key=lambda t: (t["entry_time"], t["pair"]))
-
-    print(f"\n{'='*80}")
-    print(f"TOTAL TRADES ({htf_timeframe}): {len(all_trades)}")
-    print(f"{'='*80}\n")
-
-    return all_trades
+                task_args = [(pair, htf_timeframe, start_date, end_date) for pair in pending]
+
+            # Open tasks per pair (a pair is finished once all its pivot ranges are back)
+            open_tasks = defaultdict(int)
+            for args in task_args:
+                open_tasks[args[0]] += 1
+            for pair in pending:
+                if open_tasks[pair] == 0:  # no pivots → nothing to schedule
+                    pair_results[pair] = 0 if trade_store is not None else TradeLedger()
+                    if checkpoints is not None:
+                        checkpoints.save(checkpoint_key(pair), pair_results[pair])
+
+            # STEP 3: Process tasks in parallel with LIVE progress
+            chunk_trades = defaultdict(dict)
+            completed = 0
+
+            initargs = (cache, trade_store, strategy_params())
+            with make_executor(executor, workers, initializer=init_worker, initargs=initargs) as pool:
+                print(f"\n[PROCESSING] Running backtest with {pool.workers} {executor} worker(s), {len(task_args)} tasks...")
+                print(f"{'='*80}")
+
+                # "thread"/"serial" share the cache in-process, "process" pickles it once per worker
+                for args, (pair, pair_trades) in pool.imap_unordered(_process_task, task_args):
+                    completed += 1
+                    chunk_trades[pair][args[4] if len(args) > 4 else 0] = pair_trades
+                    n_trades = pair_trades if trade_store is not None else len(pair_trades)
+                    label = pair if len(args) <= 4 else f"{pair} pivots {args[4]}-{args[5]}"
+                    print(f"  [{completed:3d}/{len(task_args)}] {label}: {n_trades} trades")
+
+                    open_tasks[pair] -= 1
+                    if open_tasks[pair] == 0:
+                        chunks = chunk_trades.pop(pair)
+                        if trade_store is not None:
+                            pair_results[pair] = sum(chunks.values())
+                        else:
+                            # Re-assemble in pivot order so the result does not depend on completion order
+                            pair_results[pair] = TradeLedger.concat(chunks[start] for start in sorted(chunks))
+                        if checkpoints is not None:
+                            checkpoints.save(checkpoint_key(pair), pair_results[pair])
+
+        if trade_store is not None:
+            # Parts are read in (pair, pivot range) order, then sorted chronologically (stable)
+            trades_df = trade_store.read(htf_timeframe, pairs=pairs, categorical=False)
+
+            print(f"\n{'='*80}")
+            print(f"TOTAL TRADES ({htf_timeframe}): {len(trades_df)}  [Parquet: {trade_store.root}]")
+            print(f"{'='*80}\n")
+
+            return trades_df
+
+        all_trades = TradeLedger.concat(pair_results.get(pair) for pair in pairs)
+
+        # Sort chronologically (stable sort for consistent ordering)
+        all_trades = all_trades.sorted(["entry_time", "pair"])
+
+        print(f"\n{'='*80}")
+        print(f"TOTAL TRADES ({htf_timeframe}): {len(all_trades)}")
+        print(f"{'='*80}\n")
+
+        return all_trades.to_pandas(categorical=False)
 
 
 # ============================================================================
@@ -775,7 +966,7 @@ def generate_report_for_timeframe(htf_timeframe, trades_df):
     print(f"GENERATING REPORT: {htf_timeframe}")
     print(f"{'='*80}")
 
-    from report_helpers import calc_stats, format_report
+    from scripts.backtesting.stats import calc_stats, format_report
 
     # Config for reports
     report_config = {
@@ -788,20 +979,7 @@ def generate_report_for_timeframe(htf_timeframe, trades_df):
     }
 
     # Add lots column (for reference in CSV)
-    trades_df['lots'] = 0.0
-    for idx, row in trades_df.iterrows():
-        pip_val = price_per_pip(row['pair'])
-        risk_pips = abs(row['entry_price'] - row['sl_price']) / pip_val
-        position_dollars = STARTING_CAPITAL * RISK_PER_TRADE
-        dollars_per_pip = position_dollars / risk_pips if risk_pips > 0 else 0
-
-        if 'JPY' in row['pair']:
-            standard_lot_pip_value = 1000
-        else:
-            standard_lot_pip_value = 10
-
-        lots = dollars_per_pip / standard_lot_pip_value
-        trades_df.at[idx, 'lots'] = lots
+    trades_df['lots'] = position_sizes(trades_df, STARTING_CAPITAL, RISK_PER_TRADE, SIZING_MODE)
 
     # Generate report
     stats = calc_stats(trades_df, STARTING_CAPITAL, RISK_PER_TRADE)
@@ -813,11 +991,8 @@ def generate_report_for_timeframe(htf_timeframe, trades_df):
     print(f"  [OK] Report: {report_file.name}")
 
     # Save CSV
-    # Fix timezone issue: Remove timezone from datetime columns
-    datetime_cols = ['entry_time', 'exit_time', 'pivot_time', 'valid_time', 'gap_touch_time']
-    for col in datetime_cols:
-        if col in trades_df.columns:
-            trades_df[col] = pd.to_datetime(trades_df[col]).dt.tz_localize(None)
+    # Datetime columns as naive UTC (CSV format)
+    naive_utc(trades_df, ['entry_time', 'exit_time', 'pivot_time', 'valid_time', 'gap_touch_time'])
 
     trades_csv = TRADES_DIR / f"{htf_timeframe}_trades.csv"
     trades_df.to_csv(trades_csv, index=False)
@@ -854,15 +1029,29 @@ def main():
     # Run backtests for all 3 timeframes
     timeframes = ['W', '3D', 'M']
 
-    for htf_tf in timeframes:
-        # Run backtest
-        trades = run_backtest_for_timeframe(htf_tf)
+    # Finished (HTF, pair) units survive crashes / Ctrl-C
+    checkpoints = CheckpointStore(CHECKPOINT_DIR)
+    if not RESUME:
+        checkpoints.clear()
 
-        # Convert to DataFrame
-        trades_df = pd.DataFrame(trades)
+    # Workers stream trades to Parquet (downstream readers load the dataset instead of the CSVs)
+    trade_store = TradeStore(TRADE_STORE_DIR) if STREAM_TRADES and pyarrow_available() else None
+    if trade_store is not None and not RESUME:
+        trade_store.clear()
+    elif trade_store is None:
+        # CSV-only run: drop older dataset partitions, otherwise readers would prefer them over the new CSVs
+        for htf_tf in timeframes:
+            TradeStore(TRADE_STORE_DIR).clear_partition(htf_tf)
+
+    for htf_tf in timeframes:
+        # Run backtest (only pairs without checkpoint)
+        trades = run_backtest_for_timeframe(htf_tf, checkpoints=checkpoints, trade_store=trade_store)
 
         # Generate report
-        generate_report_for_timeframe(htf_tf, trades_df)
+        generate_report_for_timeframe(htf_tf, trades)
+
+    # All HTFs complete → checkpoints are only needed to resume an aborted run
+    checkpoints.clear()
 
     # Final summary
     total_time = time.time() - start_time
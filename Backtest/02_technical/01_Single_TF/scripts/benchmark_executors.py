@@ -0,0 +1,122 @@
+"""
+Model 3 - Executor Benchmark (process vs. thread vs. serial)
+
+Runs the combined backtest (backtest_all.py) for W, 3D and M with every
+executor mode and reports wall-clock times.
+
+- Data is pre-loaded ONCE per timeframe (not part of the timings)
+- Process mode includes Pool startup + pickling of the cache to every worker
+- Each mode gets one untimed warm-up run (numba compilation), then best of REPEATS
+- Thread / serial mode share the in-memory cache (no pickling)
+- Trade counts are cross-checked between modes
+
+Output: results/executor_benchmark.txt
+"""
+
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+import backtest_all as bt
+
+
+# ============================================================================
+# CONFIG
+# ============================================================================
+
+TIMEFRAMES = ["W", "3D", "M"]
+MODES = ["process", "thread", "serial"]
+WORKERS = None  # None = all CPU cores
+REPEATS = 3  # Best of N runs per mode
+WARMUP = True  # One untimed run per mode first (numba compilation, file caches)
+
+OUTPUT_FILE = bt.RESULTS_DIR / "executor_benchmark.txt"
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def time_mode(htf_timeframe, mode, cache):
+    """Best-of-REPEATS wall time for one executor mode. Returns (seconds, trades)"""
+    best = None
+    trades = None
+    if WARMUP:
+        bt.run_backtest_for_timeframe(htf_timeframe, executor=mode, workers=WORKERS, cache=cache)
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        trades = bt.run_backtest_for_timeframe(htf_timeframe, executor=mode, workers=WORKERS, cache=cache)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, trades
+
+
+def trade_keys(trades_df):
+    """Sorted (pair, entry_time, exit_time, r) tuples for cross-checking modes"""
+    return sorted(
+        (pair, str(entry), str(exit_), round(r, 6))
+        for pair, entry, exit_, r in zip(trades_df["pair"], trades_df["entry_time"], trades_df["exit_time"], trades_df["pnl_r"])
+    ) if len(trades_df) > 0 else []
+
+
+def main():
+    rows = []
+
+    for htf_tf in TIMEFRAMES:
+        t0 = time.perf_counter()
+        cache = bt.load_all_data_for_timeframe(htf_tf, bt.PAIRS, bt.START_DATE, bt.END_DATE)
+        load_time = time.perf_counter() - t0
+
+        reference = None
+        for mode in MODES:
+            seconds, trades = time_mode(htf_tf, mode, cache)
+            keys = trade_keys(trades)
+            if reference is None:
+                reference = keys
+            rows.append({
+                "htf": htf_tf,
+                "mode": mode,
+                "seconds": seconds,
+                "load_seconds": load_time,
+                "trades": len(trades),
+                "identical": keys == reference,
+            })
+
+    df = pd.DataFrame(rows)
+
+    lines = []
+    lines.append("=" * 80)
+    lines.append("MODEL 3 - EXECUTOR BENCHMARK")
+    lines.append("=" * 80)
+    lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append(f"Pairs: {len(bt.PAIRS)} | Period: {bt.START_DATE} to {bt.END_DATE}")
+    lines.append(f"Workers: {WORKERS or 'all cores'} | Kernel backend: {bt.KERNEL_BACKEND} | Best of {REPEATS}"
+                 f"{' after 1 untimed warm-up run' if WARMUP else ''}")
+    lines.append("")
+
+    for htf_tf in TIMEFRAMES:
+        sub = df[df["htf"] == htf_tf]
+        fastest = sub.loc[sub["seconds"].idxmin(), "mode"]
+        lines.append("-" * 80)
+        lines.append(f"{htf_tf} (data load: {sub['load_seconds'].iloc[0]:.1f}s, not included)")
+        lines.append("-" * 80)
+        for _, row in sub.iterrows():
+            marker = "  <- fastest" if row["mode"] == fastest else ""
+            check = "OK" if row["identical"] else "MISMATCH"
+            lines.append(f"  {row['mode']:<8} {row['seconds']:>8.2f}s  {row['trades']:>6} trades  [{check}]{marker}")
+        lines.append("")
+
+    report = "\n".join(lines)
+    print("\n" + report)
+
+    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    OUTPUT_FILE.write_text(report, encoding="utf-8")
+    print(f"\n[OK] Saved: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
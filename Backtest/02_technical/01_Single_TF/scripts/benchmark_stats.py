@@ -1,34 +1,54 @@
 """
-Report Helpers - REPORT1 Format (Optimization-Focused)
---------------------------------------------------------
+Model 3 - Stats Benchmark (columnar calc_stats vs. former pandas version)
 
-Statistics & Report Generation for Model 3 Backtest
-Implements REPORT1 format - simpler, focused on optimization metrics
+Times scripts/backtesting/stats.calc_stats against the former
+report_helpers.calc_stats (kept below as reference_calc_stats) on the Phase 2
+trade ledgers and on a stacked ledger (all timeframes x STACK) for scaling.
+
+- Data is loaded ONCE per ledger (not part of the timings)
+- Every stats key is cross-checked (floats: rel. 1e-9, pair tables, open-trades series)
+- The reference counts the first win/loss streak (the former copies dropped it)
+
+Output: results/stats_benchmark.txt
 """
 
-import pandas as pd
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
 import numpy as np
+import pandas as pd
+
+# Go up to "05_Model 3" directory
+# Path: scripts -> 01_Single_TF -> 02_technical -> Backtest -> 05_Model 3
+model3_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(model3_root))
+
+from scripts.backtesting.stats import calc_stats, concurrency_series, concurrent_counts
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+
+# ============================================================================
+# CONFIG
+# ============================================================================
+
+TIMEFRAMES = ["W", "3D", "M"]
+STACK = 4          # Stacked ledger: all timeframes repeated STACK times
+REPEATS = 5        # Best of N runs
+STARTING_CAPITAL = 100000
+RISK_PER_TRADE = 0.01
 
+TRADES_DIR = Path(__file__).parent.parent / "results" / "Trades"
+OUTPUT_FILE = Path(__file__).parent.parent / "results" / "stats_benchmark.txt"
 
-def calc_stats(trades_df, start_cap=100000, risk=0.01):
-    """
-    Calculate comprehensive statistics from trades DataFrame (REPORT1 style)
-
-    Args:
-        trades_df: DataFrame with trade data
-        start_cap: Starting capital
-        risk: Risk per trade (as decimal, e.g. 0.01 = 1%)
-
-    Returns:
-        Dictionary with all statistics including:
-        - Basic stats (win rate, expectancy, etc.)
-        - SQN (System Quality Number)
-        - Win Rate by RR Target (cumulative)
-        - Pair Breakdown (Top 5 + Bottom 5 by Expectancy)
-        - Long/Short breakdown
-        - Drawdown & Streaks
-        - Time-based performance (monthly/yearly)
-    """
+
+# ============================================================================
+# REFERENCE
+# ============================================================================
+
+def reference_calc_stats(trades_df, start_cap=100000, risk=0.01):
+    """Former report_helpers.calc_stats (pandas copy/groupby + Python loops)"""
     if len(trades_df) == 0:
         return None
 
@@ -119,20 +139,11 @@ def calc_stats(trades_df, start_cap=100000, risk=0.01):
     trades_per_month = total_trades / total_months if total_months > 0 else 0
     trades_per_week = trades_per_year / 52 if trades_per_year > 0 else 0
 
-    # Concurrent trades (optimized)
-    concurrent_counts = []
-    for idx, trade in tdf.iterrows():
-        entry_t = trade['entry_dt']
-        exit_t = trade['exit_dt']
-
-        # Count overlapping trades
-        overlaps = (
-            (tdf['entry_dt'] <= entry_t) & (tdf['exit_dt'] >= entry_t) & (tdf.index != idx)
-        ).sum()
-        concurrent_counts.append(overlaps)
-
-    avg_concurrent = np.mean(concurrent_counts) if len(concurrent_counts) > 0 else 0
-    max_concurrent = max(concurrent_counts) if len(concurrent_counts) > 0 else 0
+    # Concurrent trades (sweep line over sorted entry/exit times)
+    concurrent = concurrent_counts(tdf['entry_dt'], tdf['exit_dt'])
+    avg_concurrent = concurrent.mean() if len(concurrent) > 0 else 0
+    max_concurrent = concurrent.max() if len(concurrent) > 0 else 0
+    open_trades = concurrency_series(tdf['entry_dt'], tdf['exit_dt'])
 
     # ========== DRAWDOWN & STREAKS (VECTORIZED) ==========
     equity = start_cap
@@ -192,7 +203,7 @@ def calc_stats(trades_df, start_cap=100000, risk=0.01):
     is_winner = (tdf['pnl_r'] > 0).astype(int)
 
     # Find streaks
-    streak_changes = np.diff(is_winner, prepend=is_winner.iloc[0])
+    streak_changes = np.diff(is_winner, prepend=1 - is_winner.iloc[0])  # first streak counts (was dropped before)
     streak_starts = np.where(streak_changes != 0)[0]
     streak_lengths = np.diff(streak_starts, append=len(is_winner))
 
@@ -339,6 +350,7 @@ def calc_stats(trades_df, start_cap=100000, risk=0.01):
         'trades_per_week': trades_per_week,
         'avg_concurrent': avg_concurrent,
         'max_concurrent': int(max_concurrent),
+        'concurrency_series': open_trades,
 
         # Risk metrics
         'sharpe': sharpe,
@@ -350,201 +362,91 @@ def calc_stats(trades_df, start_cap=100000, risk=0.01):
     }
 
 
-def format_report(stats, htf_timeframe, config):
-    """
-    Format statistics into REPORT1 style text report
-
-    Args:
-        stats: Statistics dictionary from calc_stats()
-        htf_timeframe: Higher timeframe (e.g., "Weekly", "3-Day", "Monthly")
-        config: Dict with START_DATE, END_DATE, PAIRS, etc.
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def best_time(func, trades_df):
+    """Best-of-REPEATS wall time. Returns (seconds, stats)"""
+    best = None
+    stats = None
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        stats = func(trades_df, STARTING_CAPITAL, RISK_PER_TRADE)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, stats
+
+
+def mismatches(new, ref):
+    """Keys whose values differ between the two stats dicts"""
+    bad = []
+    for key, expected in ref.items():
+        value = new[key]
+        if key == 'concurrency_series':
+            same = value.equals(expected)
+        elif key in ('top_5_pairs', 'bottom_5_pairs'):
+            same = len(value) == len(expected) and all(
+                p['pair'] == q['pair'] and np.allclose(
+                    [p[f] for f in p if f != 'pair'], [q[f] for f in q if f != 'pair'], rtol=1e-9, equal_nan=True)
+                for p, q in zip(value, expected)
+            )
+        elif isinstance(expected, pd.Timestamp):
+            same = value == expected
+        else:
+            same = np.isclose(float(value), float(expected), rtol=1e-9, atol=1e-9, equal_nan=True)
+        if not same:
+            bad.append(key)
+    return bad
+
+
+def main():
+    ledgers = {}
+    for htf_tf in TIMEFRAMES:
+        if trades_source_exists(TRADES_DIR, htf_tf):
+            ledgers[htf_tf], _ = load_trades(TRADES_DIR, htf_tf)
+    if not ledgers:
+        print(f"ERROR: no trade ledgers in {TRADES_DIR}")
+        return
+    ledgers[f"ALL x{STACK}"] = pd.concat(list(ledgers.values()) * STACK, ignore_index=True)
+
+    rows = []
+    for name, trades_df in ledgers.items():
+        ref_seconds, ref_stats = best_time(reference_calc_stats, trades_df)
+        new_seconds, new_stats = best_time(calc_stats, trades_df)
+        rows.append({
+            "ledger": name,
+            "trades": len(trades_df),
+            "reference": ref_seconds,
+            "columnar": new_seconds,
+            "mismatches": mismatches(new_stats, ref_stats),
+        })
+        print(f"  {name:<8} {len(trades_df):>6} trades  {ref_seconds * 1000:>8.1f}ms -> {new_seconds * 1000:>7.1f}ms")
 
-    Returns:
-        Formatted report string
-    """
     lines = []
-
-    # ========== HEADER ==========
-    lines.append("=" * 80)
-    lines.append("MODEL 3 BACKTEST REPORT")
-    lines.append("=" * 80)
-    lines.append(f"HTF: {htf_timeframe} | Entry: {config.get('ENTRY_CONFIRMATION', 'Direct Touch')} | Pairs: {', '.join(config['PAIRS'][:2])}")
-    lines.append("")
-
-    # ========== QUICK OVERVIEW ==========
-    lines.append("=" * 80)
-    lines.append("QUICK OVERVIEW")
-    lines.append("=" * 80)
-
-    start_year = stats['start_date'].year
-    end_year = stats['end_date'].year
-    lines.append(f"Total Trades: {stats['total_trades']} (over {int(stats['years'])} years: {start_year}-{end_year})")
-    lines.append("")
-    lines.append(f"Win Rate: {stats['win_rate']:.1f}%")
-    lines.append(f"Expectancy: {stats['expectancy']:+.2f}R")
-    lines.append(f"Cumulative R: {stats['cumulative_r']:+.1f}R")
-    lines.append(f"R per Year: {stats['avg_r_per_year']:+.1f}R")
-    lines.append(f"Max Drawdown: {stats['max_dd']:.1f}R")
-    lines.append(f"Profit Factor: {stats['profit_factor']:.2f}")
-    lines.append(f"SQN: {stats['sqn']:.2f}")
-
-    # Verdict
-    viable = (
-        stats['total_trades'] >= 200 and
-        stats['expectancy'] > 0 and
-        abs(stats['max_dd']) < 10 and
-        stats['sqn'] > 1.6 and
-        stats['win_rate'] > 35 and
-        stats['profit_factor'] > 1.3
-    )
-    verdict = "VIABLE" if viable else "NOT VIABLE"
-    lines.append(f"\n→ VERDICT: {verdict}")
-    lines.append("=" * 80)
-    lines.append("")
-
-    # ========== R-PERFORMANCE ==========
-    lines.append("=" * 80)
-    lines.append("R-PERFORMANCE")
-    lines.append("=" * 80)
-    lines.append(f"Cumulative R: {stats['cumulative_r']:+.1f}R")
-    lines.append(f"Expectancy: {stats['expectancy']:+.2f}R per trade")
-    lines.append(f"  • Average Winner: +{stats['avg_winner']:.2f}R")
-    lines.append(f"  • Average Loser: {stats['avg_loser']:.2f}R")
-    lines.append(f"  • Median R: {stats['median_r']:+.2f}R")
-    lines.append("")
-
-    # SQN with bracket
-    sqn_val = stats['sqn']
-    if sqn_val < 1.6:
-        sqn_label = "Below Average"
-    elif sqn_val < 2.0:
-        sqn_label = "Average"
-    elif sqn_val < 2.5:
-        sqn_label = "Good"
-    elif sqn_val < 3.0:
-        sqn_label = "Very Good"
-    else:
-        sqn_label = "Excellent"
-
-    lines.append(f"System Quality Number: {sqn_val:.2f} [{sqn_label}]")
-    lines.append(f"Profit Factor: {stats['profit_factor']:.2f}")
-    lines.append(f"Payoff Ratio: {stats['payoff_ratio']:.2f}")
-    lines.append("")
-    lines.append(f"Sharpe Ratio: {stats['sharpe']:.2f}")
-    lines.append(f"Sortino Ratio: {stats['sortino']:.2f}")
-    lines.append("")
-
-    # ========== TRADE STATISTICS ==========
-    lines.append("=" * 80)
-    lines.append("TRADE STATISTICS")
-    lines.append("=" * 80)
-    lines.append(f"Win Rate: {stats['win_rate']:.1f}%")
-    lines.append(f"Long/Short: {stats['long_short_ratio']:.2f}:1 ({stats['long_trades']}L / {stats['short_trades']}S)")
-    lines.append(f"  • Long WR: {stats['long_win_rate']:.1f}%")
-    lines.append(f"  • Short WR: {stats['short_win_rate']:.1f}%")
-    lines.append("")
-    lines.append(f"Winners: {stats['winning_trades']} | Losers: {stats['losing_trades']}")
-    lines.append("")
-
-    # ========== DRAWDOWN & STREAKS ==========
     lines.append("=" * 80)
-    lines.append("DRAWDOWN & STREAKS")
+    lines.append("MODEL 3 - STATS BENCHMARK (calc_stats)")
     lines.append("=" * 80)
-    lines.append(f"Maximum Drawdown: {stats['max_dd']:.1f}R")
-    lines.append(f"  • Duration: {stats['max_dd_duration_trades']} trades ({stats['max_dd_duration_days']} days / {stats['max_dd_duration_days']/30:.1f} months)")
-
-    recovery_status = "Recovered" if stats['recovered'] else "Not recovered"
-    lines.append(f"  • Recovery: {recovery_status}")
-    lines.append("")
-    lines.append(f"Average Drawdown: {stats['avg_dd']:.1f}R")
-    lines.append("")
-    lines.append(f"Consecutive Wins: Max {stats['max_consec_wins']} | Avg {stats['avg_consec_wins']:.1f} | Median {stats['median_consec_wins']}")
-    lines.append(f"Consecutive Losses: Max {stats['max_consec_losses']} | Avg {stats['avg_consec_losses']:.1f} | Median {stats['median_consec_losses']}")
+    lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append(f"Best of {REPEATS} | Reference: former report_helpers.calc_stats (pandas)")
     lines.append("")
-
-    # ========== TIME-BASED PERFORMANCE ==========
-    lines.append("=" * 80)
-    lines.append("TIME-BASED PERFORMANCE")
-    lines.append("=" * 80)
-    lines.append(f"R per Month: {stats['avg_r_per_month']:+.1f}R avg")
-    lines.append(f"R per Year: {stats['avg_r_per_year']:+.1f}R avg")
-    lines.append("")
-    lines.append("Monthly:")
-    lines.append(f"  • Best: {stats['best_month']:+.1f}R | Worst: {stats['worst_month']:+.1f}R")
-    lines.append(f"  • Profitable: {stats['profitable_months_pct']:.0f}% ({stats['profitable_months']}/{stats['total_months']} months)")
-    lines.append("")
-    lines.append("Yearly:")
-    lines.append(f"  • Best: {stats['best_year']:+.1f}R | Worst: {stats['worst_year']:+.1f}R")
-    lines.append(f"  • Profitable: {stats['profitable_years_pct']:.0f}% ({stats['profitable_years']}/{stats['total_years']} years)")
-    lines.append("")
-
-    # ========== TRADE CHARACTERISTICS ==========
-    lines.append("=" * 80)
-    lines.append("TRADE CHARACTERISTICS")
-    lines.append("=" * 80)
-    lines.append(f"Duration: Min {stats['min_duration_days']:.1f}d | Avg {stats['avg_duration_days']:.1f}d | Max {stats['max_duration_days']:.0f}d")
-    lines.append(f"Frequency: {stats['trades_per_year']:.1f}/year | {stats['trades_per_month']:.1f}/month | {stats['trades_per_week']:.2f}/week")
-    lines.append(f"Concurrent: Avg {stats['avg_concurrent']:.1f} | Max {stats['max_concurrent']}")
-    lines.append("")
-
-    # ========== FUNDED ACCOUNT VIABILITY ==========
-    lines.append("=" * 80)
-    lines.append("FUNDED ACCOUNT VIABILITY (@ 1% risk)")
-    lines.append("=" * 80)
-
-    chk_trades = stats['total_trades'] >= 200
-    chk_exp = stats['expectancy'] > 0
-    chk_dd = abs(stats['max_dd']) < 10
-    chk_sqn = stats['sqn'] > 1.6
-    chk_wr = stats['win_rate'] > 35
-    chk_pf = stats['profit_factor'] > 1.3
-
-    lines.append(f"[{'✓' if chk_trades else '✗'}] Min 200 Trades: {'PASS' if chk_trades else 'FAIL'} ({stats['total_trades']})")
-    lines.append(f"[{'✓' if chk_exp else '✗'}] Positive Expectancy: {'PASS' if chk_exp else 'FAIL'} ({stats['expectancy']:+.2f}R)")
-    lines.append(f"[{'✓' if chk_dd else '✗'}] Max DD < 10R: {'PASS' if chk_dd else 'FAIL'} ({stats['max_dd']:.1f}R)")
-    lines.append(f"[{'✓' if chk_sqn else '✗'}] SQN > 1.6: {'PASS' if chk_sqn else 'FAIL'} ({stats['sqn']:.2f})")
-    lines.append(f"[{'✓' if chk_wr else '✗'}] Win Rate > 35%: {'PASS' if chk_wr else 'FAIL'} ({stats['win_rate']:.1f}%)")
-    lines.append(f"[{'✓' if chk_pf else '✗'}] Profit Factor > 1.3: {'PASS' if chk_pf else 'FAIL'} ({stats['profit_factor']:.2f})")
-
-    overall = all([chk_trades, chk_exp, chk_dd, chk_sqn, chk_wr, chk_pf])
-    lines.append(f"\n→ {'VIABLE' if overall else 'NOT VIABLE'} FOR FUNDED ACCOUNT")
-    lines.append("=" * 80)
-    lines.append("")
-
-    # ========== PAIR BREAKDOWN ==========
-    lines.append("=" * 80)
-    lines.append("PAIR BREAKDOWN (BY EXPECTANCY)")
-    lines.append("=" * 80)
-    lines.append("")
-    lines.append("TOP 5 BEST PAIRS:")
-    lines.append(f"{'Pair':<8} {'Trades':>7} {'Win%':>7} {'Exp':>7} {'PF':>7} {'AvgW':>7} {'AvgL':>7} {'Total R':>9}")
+    lines.append(f"{'Ledger':<10} {'Trades':>7} {'Reference':>11} {'Columnar':>10} {'Speedup':>8}  Check")
     lines.append("-" * 80)
-
-    for p in stats['top_5_pairs']:
+    for row in rows:
+        check = "OK" if not row["mismatches"] else "MISMATCH: " + ", ".join(row["mismatches"])
         lines.append(
-            f"{p['pair']:<8} {p['trades']:>7} {p['win_pct']:>6.1f}% "
-            f"{p['expectancy']:>+6.2f}R {p['profit_factor']:>6.2f} "
-            f"{p['avg_win']:>+6.2f}R {p['avg_loss']:>+6.2f}R {p['total_r']:>+8.1f}R"
+            f"{row['ledger']:<10} {row['trades']:>7} {row['reference'] * 1000:>9.1f}ms "
+            f"{row['columnar'] * 1000:>8.1f}ms {row['reference'] / row['columnar']:>7.1f}x  {check}"
         )
+    lines.append("")
 
-    if len(stats['bottom_5_pairs']) > 0:
-        lines.append("")
-        lines.append("BOTTOM 5 WORST PAIRS:")
-        lines.append(f"{'Pair':<8} {'Trades':>7} {'Win%':>7} {'Exp':>7} {'PF':>7} {'AvgW':>7} {'AvgL':>7} {'Total R':>9}")
-        lines.append("-" * 80)
-
-        for p in stats['bottom_5_pairs']:
-            lines.append(
-                f"{p['pair']:<8} {p['trades']:>7} {p['win_pct']:>6.1f}% "
-                f"{p['expectancy']:>+6.2f}R {p['profit_factor']:>6.2f} "
-                f"{p['avg_win']:>+6.2f}R {p['avg_loss']:>+6.2f}R {p['total_r']:>+8.1f}R"
-            )
+    report = "\n".join(lines)
+    print("\n" + report)
 
-    lines.append("")
+    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    OUTPUT_FILE.write_text(report, encoding="utf-8")
+    print(f"\n[OK] Saved: {OUTPUT_FILE}")
 
-    # ========== FOOTER ==========
-    lines.append("=" * 80)
-    lines.append("END OF REPORT")
-    lines.append("=" * 80)
 
-    return "\n".join(lines)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Model 3 - Rolling Pair Correlation (D Candles)
+-----------------------------------------------
+
+Builds the rolling correlation history of daily log returns for all pairs in
+All_Pairs_D_UTC.parquet (scripts/backtesting/correlation.py) - one matrix per
+D candle, updated with running sums. The histories are stored memory-mapped
+and used by the correlation filter (STRATEGIE_VARIABLES.md 8.4 A) in
+portfolio_constraints.py.
+
+Output (results/Correlation/):
+- corr_{WINDOW}d.npy (days × pairs × pairs, float32, memory-mapped)
+- corr_{WINDOW}d.json (pairs, candle times, window)
+- correlation_report.txt
+"""
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+# Go up to "05_Model 3" directory
+# Path: scripts -> 02_Combined_TF -> 02_technical -> Backtest -> 05_Model 3
+model3_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(model3_root))
+
+from scripts.backtesting.correlation import compute_history, daily_returns
+
+# ========== CONFIGURATION ==========
+WINDOWS = [20, 60, 120]          # D candles per window
+MIN_PERIODS_PCT = 0.8            # min. shared days per pair pair (share of window)
+TOP_N = 15                       # Most correlated pair pairs in the report
+
+# Paths
+OUTPUT_DIR = Path(__file__).parent.parent / "results" / "Correlation"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def pair_table(history):
+    """Mean / latest correlation per pair pair (upper triangle), sorted by mean |corr|"""
+    n = len(history.pairs)
+    iu, ju = np.triu_indices(n, k=1)
+    matrix = np.asarray(history.matrix[:, iu, ju], dtype=np.float64)
+    valid = ~np.isnan(matrix)
+    counts = valid.sum(axis=0)
+    mean = np.where(counts > 0, np.nansum(matrix, axis=0) / np.maximum(counts, 1), np.nan)
+    mean_abs = np.where(counts > 0, np.nansum(np.abs(matrix), axis=0) / np.maximum(counts, 1), np.nan)
+    last = matrix[-1] if len(matrix) else np.full(len(iu), np.nan)
+    rows = [
+        (history.pairs[i], history.pairs[j], mean[k], mean_abs[k], last[k])
+        for k, (i, j) in enumerate(zip(iu, ju))
+    ]
+    return sorted(rows, key=lambda row: -np.nan_to_num(row[3], nan=-1.0))
+
+
+def write_report(histories, n_days, runtimes):
+    """Summary per window + most correlated pair pairs"""
+    lines = []
+    lines.append("=" * 100)
+    lines.append("ROLLING PAIR CORRELATION - D CANDLES (LOG RETURNS)")
+    lines.append("=" * 100)
+    lines.append("")
+    first = next(iter(histories.values()))
+    lines.append(f"Pairs: {len(first.pairs)} | D candles: {n_days} | Min. shared days: {MIN_PERIODS_PCT:.0%} of window")
+    lines.append("Lookup: matrix of the last D candle closed at query time (no lookahead)")
+    lines.append("")
+
+    for window, history in histories.items():
+        lines.append("-" * 100)
+        lines.append(f"WINDOW {window}D  (corr_{window}d.npy, built in {runtimes[window]:.2f}s)")
+        lines.append("-" * 100)
+        lines.append(f"{'Pair A':<10} {'Pair B':<10} {'Mean':>8} {'Mean |r|':>9} {'Latest':>8}")
+        for pair_a, pair_b, mean, mean_abs, last in pair_table(history)[:TOP_N]:
+            lines.append(f"{pair_a:<10} {pair_b:<10} {mean:>+8.2f} {mean_abs:>9.2f} {last:>+8.2f}")
+        lines.append("")
+
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / "correlation_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    start_time = time.time()
+
+    print("\n" + "=" * 80)
+    print("MODEL 3 - ROLLING PAIR CORRELATION")
+    print("=" * 80)
+    print(f"Windows: {', '.join(f'{w}D' for w in WINDOWS)}")
+    print("=" * 80)
+
+    print("\n[DATA LOADING] D candles...")
+    returns = daily_returns()
+    print(f"  [OK] {returns.shape[1]} pairs, {len(returns)} D candles "
+          f"({returns.index[0]:%Y-%m-%d} .. {returns.index[-1]:%Y-%m-%d})")
+
+    print("\n[CORRELATION]")
+    histories, runtimes = {}, {}
+    for window in WINDOWS:
+        t0 = time.perf_counter()
+        min_periods = max(2, int(round(window * MIN_PERIODS_PCT)))
+        histories[window] = compute_history(returns, window, min_periods, OUTPUT_DIR, f"corr_{window}d")
+        runtimes[window] = time.perf_counter() - t0
+        print(f"  [OK] corr_{window}d.npy in {runtimes[window]:.2f}s")
+
+    write_report(histories, len(returns), runtimes)
+
+    total_time = time.time() - start_time
+    print("\n" + "=" * 80)
+    print("CORRELATION COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {total_time:.1f}s")
+    print(f"Output Directory: {OUTPUT_DIR}")
+    print("=" * 80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Model 3 - Combined HTF Portfolios (3D+W, 3D+M, W+M, 3D+W+M)
+------------------------------------------------------------
+
+Builds the combined runs from the Phase 2 ledgers (scripts/backtesting/portfolio.py)
+instead of re-running the per-HTF backtests:
+- 1 trade per pivot: if several HTFs detect the same pivot (same pair +
+  direction, overlapping gap and pivot lifetime), only the highest HTF trades
+- Priority: M > W > 3D
+
+Output (per combination):
+- TXT Report: results/{COMBO}_report.txt (REPORT1 format)
+- CSV Trades: results/Trades/{COMBO}_trades.csv
+- CSV Duplicates: results/Trades/{COMBO}_duplicates.csv (removed trades + kept HTF)
+- results/dedup_summary.txt
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Go up to "05_Model 3" directory
+# Path: scripts -> 02_Combined_TF -> 02_technical -> Backtest -> 05_Model 3
+model3_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(model3_root))
+
+from scripts.backtesting.portfolio import COMBINATIONS, HTF_PRIORITY, combine_ledgers
+from scripts.backtesting.stats import calc_stats, format_report
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+# ========== CONFIGURATION ==========
+# Combinations to build (name → HTFs), see STRATEGIE_VARIABLES.md 2.2
+PORTFOLIOS = COMBINATIONS
+PRIORITY = HTF_PRIORITY  # Highest priority first
+
+# Same-pivot test: trade lifetime from pivot formation until exit
+LIFETIME_START = "pivot_time"
+LIFETIME_END = "exit_time"
+
+# Report settings (same as backtest_all.py)
+START_DATE = "2010-01-01"
+END_DATE = "2025-12-31"
+ENTRY_CONFIRMATION = "direct_touch"
+RISK_PER_TRADE = 0.01
+STARTING_CAPITAL = 100000
+
+# Paths
+SINGLE_TF_TRADES_DIR = model3_root / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+RESULTS_DIR = Path(__file__).parent.parent / "results"
+TRADES_DIR = RESULTS_DIR / "Trades"
+
+TRADES_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def load_ledgers(htfs):
+    """Phase 2 ledgers {htf: DataFrame} (Parquet dataset or CSV)"""
+    ledgers = {}
+    for htf in htfs:
+        if not trades_source_exists(SINGLE_TF_TRADES_DIR, htf):
+            print(f"  [!] {htf}_trades.csv not found - {htf} skipped")
+            continue
+        ledgers[htf], source = load_trades(SINGLE_TF_TRADES_DIR, htf)
+        print(f"  [OK] {htf}: {len(ledgers[htf])} trades ({source.name})")
+    return ledgers
+
+
+def write_portfolio(name, htfs, combined, dropped):
+    """REPORT1 report + trades / duplicates CSV for one combination"""
+    label = " + ".join(htfs)
+    report_config = {
+        'START_DATE': START_DATE,
+        'END_DATE': END_DATE,
+        'PAIRS': sorted(combined['pair'].unique()),
+        'ENTRY_CONFIRMATION': ENTRY_CONFIRMATION,
+        'RISK_PER_TRADE': RISK_PER_TRADE,
+        'STARTING_CAPITAL': STARTING_CAPITAL,
+    }
+    stats = calc_stats(combined, STARTING_CAPITAL, RISK_PER_TRADE)
+    report_file = RESULTS_DIR / f"{name}_report.txt"
+    report_file.write_text(format_report(stats, label, report_config), encoding='utf-8')
+
+    combined.to_csv(TRADES_DIR / f"{name}_trades.csv", index=False)
+    dropped.to_csv(TRADES_DIR / f"{name}_duplicates.csv", index=False)
+    print(f"  [OK] {name}: {report_file.name}, Trades/{name}_trades.csv")
+    return stats
+
+
+def write_summary(rows):
+    """Trades per HTF before / after dedup for all combinations"""
+    lines = []
+    lines.append("=" * 80)
+    lines.append("COMBINED HTF PORTFOLIOS - DEDUP SUMMARY")
+    lines.append("=" * 80)
+    lines.append("")
+    lines.append(f"Priority: {' > '.join(PRIORITY)} | Same pivot: pair + direction + overlapping gap")
+    lines.append(f"and overlapping lifetime ({LIFETIME_START} .. {LIFETIME_END})")
+    lines.append("")
+    lines.append(f"{'Portfolio':<12} {'Input':>7} {'Removed':>8} {'Trades':>7} {'Per HTF (kept)':<28} {'Exp(R)':>8} {'WR(%)':>7} {'MaxDD':>7}")
+    lines.append("-" * 100)
+    for row in rows:
+        per_htf = ", ".join(f"{tf} {n}" for tf, n in row['per_htf'].items())
+        lines.append(
+            f"{row['name']:<12} {row['input']:>7} {row['removed']:>8} {row['trades']:>7} {per_htf:<28} "
+            f"{row['expectancy']:>+7.3f}R {row['win_rate']:>6.1f}% {row['max_dd']:>+6.1f}%"
+        )
+    lines.append("")
+    lines.append("=" * 80)
+    lines.append("END OF SUMMARY")
+    lines.append("=" * 80)
+
+    summary_file = RESULTS_DIR / "dedup_summary.txt"
+    summary_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"\n  [OK] Summary: {summary_file.name}")
+
+
+def main():
+    """Main execution - builds all combinations from cached Phase 2 ledgers"""
+    start_time = time.time()
+
+    print("\n" + "=" * 80)
+    print("MODEL 3 - COMBINED HTF PORTFOLIOS")
+    print("=" * 80)
+    print(f"Portfolios: {', '.join(PORTFOLIOS)}")
+    print(f"Priority: {' > '.join(PRIORITY)}")
+    print("=" * 80)
+
+    htfs = sorted({tf for combo in PORTFOLIOS.values() for tf in combo}, key=PRIORITY.index)
+    print("\n[DATA LOADING] Phase 2 ledgers...")
+    ledgers = load_ledgers(htfs)
+
+    rows = []
+    for name, combo in PORTFOLIOS.items():
+        available = [tf for tf in combo if tf in ledgers]
+        if len(available) < len(combo):
+            print(f"  [!] {name}: missing ledgers - skipped")
+            continue
+
+        t0 = time.perf_counter()
+        combined, dropped = combine_ledgers(ledgers, combo, PRIORITY, LIFETIME_START, LIFETIME_END)
+        print(f"\n{name}: {len(combined)} trades, {len(dropped)} duplicates removed ({time.perf_counter() - t0:.2f}s)")
+        if combined.empty:
+            continue
+
+        stats = write_portfolio(name, combo, combined, dropped)
+        rows.append({
+            'name': name,
+            'input': sum(len(ledgers[tf]) for tf in combo),
+            'removed': len(dropped),
+            'trades': len(combined),
+            'per_htf': combined['htf_timeframe'].value_counts().reindex(list(combo), fill_value=0).to_dict(),
+            'expectancy': stats['expectancy'],
+            'win_rate': stats['win_rate'],
+            'max_dd': stats['max_dd'],
+        })
+
+    write_summary(rows)
+
+    total_time = time.time() - start_time
+    print("\n" + "=" * 80)
+    print("COMBINED PORTFOLIOS COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {total_time:.1f}s")
+    print(f"Output Directory: {RESULTS_DIR}")
+    print("=" * 80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
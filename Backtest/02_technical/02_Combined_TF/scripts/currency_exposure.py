@@ -0,0 +1,162 @@
+"""
+Model 3 - Currency Exposure (Correlated-Trade Caps)
+----------------------------------------------------
+
+Decomposes every trade of the single-HTF and combined ledgers into base and
+quote currency exposure in R (scripts/backtesting/exposure.py) and sweeps
+exposure caps as an admission rule (STRATEGIE_VARIABLES.md 8.4 B):
+- Net cap: max |net R| in any currency (long EURUSD = +1R EUR / -1R USD)
+- Gross cap: max open legs (R) in any currency, regardless of direction
+
+Trades are admitted in entry order; a trade that would push a currency over
+its cap is skipped (no queue).
+
+Output (results/Exposure/):
+- {PORTFOLIO}_exposure.parquet (one row per cap variant)
+- {PORTFOLIO}_exposure_report.txt (uncapped exposure profile + cap sweep)
+"""
+
+import itertools
+import sys
+import time
+from pathlib import Path
+
+# Go up to "05_Model 3" directory
+# Path: scripts -> 02_Combined_TF -> 02_technical -> Backtest -> 05_Model 3
+model3_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(model3_root))
+
+from scripts.backtesting.exposure import (
+    CurrencyCaps, exposure_profile, exposure_timeline, prepare_exposure, sweep_caps,
+)
+from scripts.backtesting.portfolio import COMBINATIONS, HTF_PRIORITY, combine_ledgers
+from scripts.backtesting.results_store import write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+# ========== CONFIGURATION ==========
+# Portfolios: single HTFs + combinations (name → HTFs)
+PORTFOLIOS = {"W": ("W",), "3D": ("3D",), "M": ("M",), **COMBINATIONS}
+
+MAX_NET = [1, 2, 3, 4, 5, 0]     # R per currency, 0 = unlimited
+MAX_GROSS = [2, 3, 4, 6, 0]      # R per currency, 0 = unlimited
+
+PROFILE_LEVELS = [2, 3, 4]       # Share of time with |net| >= level
+TOP_N = 15
+
+# Paths
+SINGLE_TF_TRADES_DIR = model3_root / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+OUTPUT_DIR = Path(__file__).parent.parent / "results" / "Exposure"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def cap_variants():
+    """All CurrencyCaps combinations of the configured limits"""
+    return [CurrencyCaps(max_net=net, max_gross=gross) for net, gross in itertools.product(MAX_NET, MAX_GROSS)]
+
+
+def run_portfolio(name, htfs, ledgers):
+    """Uncapped profile + cap sweep for one portfolio → (profile, table, trades) or None"""
+    if any(tf not in ledgers for tf in htfs):
+        print(f"  [!] {name}: missing ledgers - skipped")
+        return None
+
+    trades, _ = combine_ledgers(ledgers, htfs, HTF_PRIORITY)
+    if trades.empty:
+        return None
+
+    t0 = time.perf_counter()
+    ex = prepare_exposure(trades)
+    profile = exposure_profile(exposure_timeline(ex), PROFILE_LEVELS)
+    table = sweep_caps(ex, cap_variants())
+    print(f"  {name}: {len(trades)} trades x {len(table)} cap variants in {time.perf_counter() - t0:.2f}s")
+    return profile, table, trades
+
+
+def write_report(name, htfs, profile, table, n_trades):
+    """Exposure profile per currency + best cap variants"""
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"CURRENCY EXPOSURE - {name} ({' + '.join(htfs)})")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"Trades in ledger: {n_trades} | Cap variants: {len(table)} | 1 trade = 1R per currency leg")
+    lines.append("")
+
+    lines.append("UNCAPPED NET EXPOSURE PER CURRENCY (time-weighted)")
+    lines.append("")
+    level_cols = [f"time_ge_{level:g}R" for level in PROFILE_LEVELS]
+    header = f"{'Currency':<10} {'Peak':>6} {'Avg |R|':>8}" + "".join(f" {'>=' + f'{lv:g}R':>8}" for lv in PROFILE_LEVELS)
+    lines.append(header)
+    lines.append("-" * 100)
+    for ccy, row in profile.sort_values('mean_abs', ascending=False).iterrows():
+        lines.append(
+            f"{ccy:<10} {row['peak']:>5.0f}R {row['mean_abs']:>7.2f}R"
+            + "".join(f" {row[col]:>7.1f}%" for col in level_cols)
+        )
+    lines.append("")
+
+    top = table.sort_values(['total_r', 'expectancy'], ascending=[False, False], kind="stable").head(TOP_N)
+    lines.append(f"TOP {len(top)} CAP VARIANTS by Total R")
+    lines.append("")
+    lines.append(f"{'Caps':<28} {'Taken':>6} {'Skipped':>8} {'Exp(R)':>8} {'Total R':>9} {'Peak Net':>9} {'Peak Gross':>11}")
+    lines.append("-" * 100)
+    for row in top.to_dict('records'):
+        lines.append(
+            f"{row['caps']:<28} {row['accepted']:>6} {row['rejected']:>8} {row['expectancy']:>+7.3f}R "
+            f"{row['total_r']:>+8.1f}R {row['peak_net']:>8.0f}R {row['peak_gross']:>10.0f}R"
+        )
+
+    lines.append("")
+    lines.append("Note: Caps are checked at entry only. Closing an offsetting trade can leave")
+    lines.append("a currency above its net cap (Peak Net > cap).")
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / f"{name}_exposure_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    start_time = time.time()
+
+    print("\n" + "=" * 80)
+    print("MODEL 3 - CURRENCY EXPOSURE")
+    print("=" * 80)
+    print(f"Portfolios: {', '.join(PORTFOLIOS)}")
+    print(f"Cap variants per portfolio: {len(cap_variants())}")
+    print("=" * 80)
+
+    print("\n[DATA LOADING] Phase 2 ledgers...")
+    ledgers = {}
+    for htf in HTF_PRIORITY:
+        if trades_source_exists(SINGLE_TF_TRADES_DIR, htf):
+            ledgers[htf], source = load_trades(SINGLE_TF_TRADES_DIR, htf)
+            print(f"  [OK] {htf}: {len(ledgers[htf])} trades ({source.name})")
+
+    print("\n[EXPOSURE]")
+    for name, htfs in PORTFOLIOS.items():
+        result = run_portfolio(name, htfs, ledgers)
+        if result is None:
+            continue
+        profile, table, trades = result
+        meta = {'portfolio': name, 'htfs': list(htfs), 'priority': list(HTF_PRIORITY), 'trades': len(trades),
+                'uncapped_peak_net': profile['peak'].to_dict()}
+        write_results(OUTPUT_DIR, f"{name}_exposure", table, meta)
+        write_report(name, htfs, profile, table, len(trades))
+
+    total_time = time.time() - start_time
+    print("\n" + "=" * 80)
+    print("CURRENCY EXPOSURE COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {total_time:.1f}s")
+    print(f"Output Directory: {OUTPUT_DIR}")
+    print("=" * 80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
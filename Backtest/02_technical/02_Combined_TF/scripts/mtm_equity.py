@@ -0,0 +1,186 @@
+"""
+Model 3 - Mark-to-Market Equity (Open-Trade Valuation)
+-------------------------------------------------------
+
+Values every open trade at each close of the valuation timeframe
+(scripts/backtesting/mtm.py) instead of booking it only at exit, for the
+single-HTF and combined ledgers:
+- MTM Max DD vs. realized-only Max DD (same grid, trades booked at exit)
+- Drawdown duration in time (peak → recovery), time under water
+- Max simultaneously open trades
+
+Output (results/MTM/):
+- {PORTFOLIO}_equity.csv (time, equity, realized, unrealized, open_trades, drawdown_pct)
+- mtm_summary_results.parquet (one row per portfolio)
+- mtm_report.txt
+"""
+
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+
+# Go up to "05_Model 3" directory
+# Path: scripts -> 02_Combined_TF -> 02_technical -> Backtest -> 05_Model 3
+model3_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(model3_root))
+
+from scripts.backtesting.mtm import MTMResult, mtm_equity, price_grid
+from scripts.backtesting.portfolio import COMBINATIONS, HTF_PRIORITY, combine_ledgers
+from scripts.backtesting.results_store import write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+# ========== CONFIGURATION ==========
+# Portfolios: single HTFs + combinations (name → HTFs)
+PORTFOLIOS = {"W": ("W",), "3D": ("3D",), "M": ("M",), **COMBINATIONS}
+
+VALUATION_TF = "D"   # "D" or "H1" (H1 = intraday drawdowns, ~24x more grid points)
+RISK_PER_TRADE = 0.01
+STARTING_CAPITAL = 100000
+TOP_PERIODS = 5      # Deepest drawdown periods per portfolio in the report
+
+# Paths
+SINGLE_TF_TRADES_DIR = model3_root / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+OUTPUT_DIR = Path(__file__).parent.parent / "results" / "MTM"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def realized_only(result):
+    """Same grid, trades booked at exit only (what calc_stats sees)"""
+    return MTMResult(
+        equity=result.realized + result.start_cap,
+        realized=result.realized,
+        unrealized=result.unrealized * 0,
+        open_trades=result.open_trades,
+        start_cap=result.start_cap,
+        unpriced=result.unpriced,
+    )
+
+
+def run_portfolio(name, htfs, ledgers, prices):
+    """MTM equity for one portfolio → (result, realized-only result, trades) or None"""
+    if any(tf not in ledgers for tf in htfs):
+        print(f"  [!] {name}: missing ledgers - skipped")
+        return None
+
+    trades, _ = combine_ledgers(ledgers, htfs, HTF_PRIORITY)
+    if trades.empty:
+        return None
+
+    t0 = time.perf_counter()
+    result = mtm_equity(trades, prices, STARTING_CAPITAL, RISK_PER_TRADE)
+    print(f"  {name}: {len(trades)} trades on {len(prices.time_ns)} {VALUATION_TF} closes in {time.perf_counter() - t0:.2f}s")
+
+    curve = pd.DataFrame({
+        'equity': result.equity,
+        'realized': result.realized,
+        'unrealized': result.unrealized,
+        'open_trades': result.open_trades,
+        'drawdown_pct': result.drawdown,
+    })
+    curve.to_csv(OUTPUT_DIR / f"{name}_equity.csv")
+    return result, realized_only(result), trades
+
+
+def write_report(rows, periods):
+    """MTM vs. realized drawdown per portfolio + deepest drawdown periods"""
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"MARK-TO-MARKET EQUITY - VALUATION AT EVERY {VALUATION_TF} CLOSE")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"Risk per trade: {RISK_PER_TRADE * 100:.1f}% of ${STARTING_CAPITAL:,.0f} (fixed)")
+    lines.append("Realized DD = same grid, trades booked at exit only (calc_stats view)")
+    lines.append("")
+    lines.append(f"{'Portfolio':<10} {'Trades':>7} {'MTM DD':>8} {'Real. DD':>9} {'DD Duration':>12} {'Under Water':>12} {'Max Open':>9} {'Unpriced':>9}")
+    lines.append("-" * 100)
+    for row in rows:
+        lines.append(
+            f"{row['portfolio']:<10} {row['trades']:>7} {row['max_dd']:>+7.1f}% {row['realized_max_dd']:>+8.1f}% "
+            f"{row['max_dd_duration_days']:>9.0f} d {row['time_under_water_pct']:>11.1f}% "
+            f"{row['max_open_trades']:>9} {row['unpriced_trades']:>9}"
+        )
+    lines.append("")
+
+    for name, table in periods.items():
+        lines.append(f"{name} - DEEPEST DRAWDOWN PERIODS")
+        lines.append(f"  {'Peak':<12} {'Trough':<12} {'Recovery':<12} {'Depth':>8} {'Duration':>10}")
+        for row in table.sort_values('depth_pct').head(TOP_PERIODS).to_dict('records'):
+            recovery = f"{row['recovery_time']:%Y-%m-%d}" if not pd.isna(row['recovery_time']) else "open"
+            lines.append(
+                f"  {row['peak_time']:%Y-%m-%d}   {row['trough_time']:%Y-%m-%d}   {recovery:<12} "
+                f"{row['depth_pct']:>+7.1f}% {row['duration'].days:>8} d"
+            )
+        lines.append("")
+
+    lines.append("Note: Trades of pairs without price data are valued at 0R until exit (Unpriced).")
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / "mtm_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"\n  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    start_time = time.time()
+
+    print("\n" + "=" * 80)
+    print("MODEL 3 - MARK-TO-MARKET EQUITY")
+    print("=" * 80)
+    print(f"Portfolios: {', '.join(PORTFOLIOS)}")
+    print(f"Valuation: every {VALUATION_TF} close")
+    print("=" * 80)
+
+    print("\n[DATA LOADING] Phase 2 ledgers...")
+    ledgers = {}
+    for htf in HTF_PRIORITY:
+        if trades_source_exists(SINGLE_TF_TRADES_DIR, htf):
+            ledgers[htf], source = load_trades(SINGLE_TF_TRADES_DIR, htf)
+            print(f"  [OK] {htf}: {len(ledgers[htf])} trades ({source.name})")
+
+    pairs = sorted(set().union(*(set(df['pair']) for df in ledgers.values()))) if ledgers else []
+    prices = price_grid(pairs, VALUATION_TF)
+    print(f"  [OK] {VALUATION_TF} closes: {len(prices.pairs)}/{len(pairs)} pairs, {len(prices.time_ns)} grid points")
+
+    print("\n[VALUATION]")
+    rows, periods = [], {}
+    for name, htfs in PORTFOLIOS.items():
+        out = run_portfolio(name, htfs, ledgers, prices)
+        if out is None:
+            continue
+        result, realized, trades = out
+        summary = result.summary()
+        rows.append({
+            'portfolio': name,
+            'trades': len(trades),
+            'final_equity': summary['final_equity'],
+            'max_dd': summary['max_dd'],
+            'realized_max_dd': realized.summary()['max_dd'],
+            'max_dd_duration_days': summary['max_dd_duration'] / pd.Timedelta(days=1),
+            'time_under_water_pct': summary['time_under_water_pct'],
+            'max_open_trades': summary['max_open_trades'],
+            'unpriced_trades': summary['unpriced_trades'],
+        })
+        periods[name] = result.drawdown_periods()
+
+    if rows:
+        write_results(OUTPUT_DIR, "mtm_summary", rows, {'valuation_tf': VALUATION_TF, 'risk': RISK_PER_TRADE,
+                                                        'starting_capital': STARTING_CAPITAL})
+        write_report(rows, periods)
+
+    total_time = time.time() - start_time
+    print("\n" + "=" * 80)
+    print("MARK-TO-MARKET COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {total_time:.1f}s")
+    print(f"Output Directory: {OUTPUT_DIR}")
+    print("=" * 80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Model 3 - Portfolio Constraints (Max Concurrent / Max per Pair / Risk)
+-----------------------------------------------------------------------
+
+Runs the single-HTF and combined ledgers through the event-driven portfolio
+simulator (scripts/backtesting/portfolio_sim.py) for every rule variant of
+STRATEGIE_VARIABLES.md 8.x:
+- Max Concurrent Trades: 4, 5, 6, 8, 10, unlimited
+- Max per Pair: 1, 2, unlimited
+- Max per Currency: 2, 3, unlimited
+- Max Correlated (8.4 A): 2, 3, unlimited open trades with direction-adjusted
+  correlation >= MIN_CORRELATION (needs results/Correlation from build_correlation.py)
+- Risk per Trade: 0.5%, 1.0%, 2.0% (fixed or compounding)
+
+Trades are admitted in entry order; a rejected trade is skipped (no queue).
+
+Output (results/Constraints/):
+- {PORTFOLIO}_constraints.parquet (one row per variant)
+- {PORTFOLIO}_constraints_report.txt
+"""
+
+import itertools
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+
+# Go up to "05_Model 3" directory
+# Path: scripts -> 02_Combined_TF -> 02_technical -> Backtest -> 05_Model 3
+model3_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(model3_root))
+
+from scripts.backtesting.correlation import history_exists, load_history
+from scripts.backtesting.portfolio import COMBINATIONS, HTF_PRIORITY, combine_ledgers
+from scripts.backtesting.portfolio_sim import Rules, prepare_ledger, sweep
+from scripts.backtesting.results_store import write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+# ========== CONFIGURATION ==========
+# Portfolios: single HTFs + combinations (name → HTFs)
+PORTFOLIOS = {"W": ("W",), "3D": ("3D",), "M": ("M",), **COMBINATIONS}
+
+MAX_CONCURRENT = [4, 5, 6, 8, 10, 0]   # 0 = unlimited
+MAX_PER_PAIR = [1, 2, 0]
+MAX_PER_CURRENCY = [2, 3, 0]
+MAX_CORRELATED = [2, 3, 0]
+MIN_CORRELATION = 0.7
+CORRELATION_NAME = "corr_60d"   # History in results/Correlation (build_correlation.py)
+RISK_LEVELS = [0.005, 0.01, 0.02]
+COMPOUNDING = [False, True]
+
+STARTING_CAPITAL = 100000
+TOP_N = 20
+
+# Paths
+SINGLE_TF_TRADES_DIR = model3_root / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+OUTPUT_DIR = Path(__file__).parent.parent / "results" / "Constraints"
+CORRELATION_DIR = Path(__file__).parent.parent / "results" / "Correlation"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def rule_variants(correlation=None):
+    """All Rules combinations of the configured limits (correlation filter only with a history)"""
+    max_correlated = MAX_CORRELATED if correlation is not None else [0]
+    return [
+        Rules(max_concurrent=c, max_per_pair=p, max_per_currency=q, max_correlated=r, min_correlation=MIN_CORRELATION)
+        for c, p, q, r in itertools.product(MAX_CONCURRENT, MAX_PER_PAIR, MAX_PER_CURRENCY, max_correlated)
+    ]
+
+
+def run_portfolio(name, htfs, ledgers, correlation=None):
+    """All variants × risk levels for one portfolio → results DataFrame or None"""
+    if any(tf not in ledgers for tf in htfs):
+        print(f"  [!] {name}: missing ledgers - skipped")
+        return None
+
+    trades, _ = combine_ledgers(ledgers, htfs, HTF_PRIORITY)
+    if trades.empty:
+        return None
+    ledger = prepare_ledger(trades)
+    variants = rule_variants(correlation)
+
+    t0 = time.perf_counter()
+    tables = [
+        sweep(ledger, variants, STARTING_CAPITAL, risk, compounding, correlation)
+        for risk, compounding in itertools.product(RISK_LEVELS, COMPOUNDING)
+    ]
+    table = pd.concat(tables, ignore_index=True)
+    table['return_dd_ratio'] = table['total_return'] / table['max_dd'].abs().where(table['max_dd'] < 0)
+    print(f"  {name}: {len(trades)} trades x {len(table)} variants in {time.perf_counter() - t0:.2f}s")
+    return table
+
+
+def write_report(name, htfs, table, n_trades):
+    """Top variants by return / drawdown"""
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"PORTFOLIO CONSTRAINTS - {name} ({' + '.join(htfs)})")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"Trades in ledger: {n_trades} | Variants: {len(table)} | Starting capital: ${STARTING_CAPITAL:,.0f}")
+    lines.append("")
+
+    top = table.sort_values(['return_dd_ratio', 'total_return'], ascending=[False, False], kind="stable").head(TOP_N)
+    lines.append(f"TOP {len(top)} by Return / Max DD")
+    lines.append("")
+    lines.append(f"{'Rules':<72} {'Risk':>5} {'Comp':>5} {'Taken':>6} {'Return':>9} {'MaxDD':>8} {'Ret/DD':>7}")
+    lines.append("-" * 120)
+    for row in top.to_dict('records'):
+        lines.append(
+            f"{row['rules'][:72]:<72} {row['risk'] * 100:>4.1f}% {'yes' if row['compounding'] else 'no':>5} "
+            f"{row['accepted']:>6} {row['total_return']:>+8.1f}% {row['max_dd']:>+7.1f}% {row['return_dd_ratio']:>7.2f}"
+        )
+
+    lines.append("")
+    lines.append("Note: Max DD is measured on realized equity (at exits). Tight limits reject")
+    lines.append("trades by entry order only - no ranking of simultaneous setups.")
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / f"{name}_constraints_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    start_time = time.time()
+
+    print("\n" + "=" * 80)
+    print("MODEL 3 - PORTFOLIO CONSTRAINTS")
+    print("=" * 80)
+    print(f"Portfolios: {', '.join(PORTFOLIOS)}")
+    print("=" * 80)
+
+    print("\n[DATA LOADING] Phase 2 ledgers...")
+    ledgers = {}
+    for htf in HTF_PRIORITY:
+        if trades_source_exists(SINGLE_TF_TRADES_DIR, htf):
+            ledgers[htf], source = load_trades(SINGLE_TF_TRADES_DIR, htf)
+            print(f"  [OK] {htf}: {len(ledgers[htf])} trades ({source.name})")
+
+    correlation = None
+    if history_exists(CORRELATION_DIR, CORRELATION_NAME):
+        correlation = load_history(CORRELATION_DIR, CORRELATION_NAME)
+        print(f"  [OK] Correlation: {CORRELATION_NAME} ({len(correlation.pairs)} pairs)")
+    else:
+        print(f"  [!] {CORRELATION_NAME} not found - correlation filter skipped (run build_correlation.py)")
+    print(f"Variants per portfolio: {len(rule_variants(correlation)) * len(RISK_LEVELS) * len(COMPOUNDING)}")
+
+    print("\n[SIMULATION]")
+    for name, htfs in PORTFOLIOS.items():
+        table = run_portfolio(name, htfs, ledgers, correlation)
+        if table is None:
+            continue
+        n_trades = int(table['accepted'].iloc[0] + table['rejected'].iloc[0])
+        meta = {'portfolio': name, 'htfs': list(htfs), 'priority': list(HTF_PRIORITY),
+                'starting_capital': STARTING_CAPITAL, 'trades': n_trades,
+                'correlation': CORRELATION_NAME if correlation is not None else None}
+        write_results(OUTPUT_DIR, f"{name}_constraints", table, meta)
+        write_report(name, htfs, table, n_trades)
+
+    total_time = time.time() - start_time
+    print("\n" + "=" * 80)
+    print("PORTFOLIO CONSTRAINTS COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {total_time:.1f}s")
+    print(f"Output Directory: {OUTPUT_DIR}")
+    print("=" * 80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Distributed Entry Confirmation Sweep
+------------------------------------
+
+Runs the Entry Confirmation campaign (optimize_entry_confirmation.py,
+HTF x Entry Type x Pair) on several machines at once via a TCP task queue
+(scripts/backtesting/task_queue.py).
+
+Roles:
+- server: Queues all (HTF, entry_type, pair) tasks, waits for the workers,
+          merges the partial ledgers deterministically and writes the same
+          reports / CSVs / summary as optimize_entry_confirmation.main()
+          (only if every task succeeded - otherwise exit code 1, no reports)
+- worker: Connects to the server and processes tasks until the queue is empty
+          (--processes N runs N worker processes on this machine)
+- local:  Server + N worker processes on 127.0.0.1 (testing / single box)
+
+Usage:
+    export MODEL3_QUEUE_AUTHKEY=<shared secret>
+    python distributed_sweep.py server --host 192.168.1.10 --port 50071
+    python distributed_sweep.py worker --host 192.168.1.10 --processes 8
+    python distributed_sweep.py local --workers 4
+
+Requirements:
+- Every worker machine needs the repo and the Parquet data at the same
+  relative location (Data/Chartdata/Forex/Parquet)
+- Shared authkey via MODEL3_QUEUE_AUTHKEY: tasks and results are pickles
+  over TCP, anyone who can reach the port with the key can run code on the
+  server and the workers. Workers refuse to start without it; server / local
+  generate a random key for the run if it is not set (printed for workers)
+- The server listens on 127.0.0.1 unless --host is given (LAN address for
+  remote workers - keep the port inside a trusted network)
+- Results are identical regardless of how tasks are spread over workers
+"""
+
+import argparse
+import sys
+import time
+from multiprocessing import Process, cpu_count
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import optimize_entry_confirmation as oe
+from optimize_entry_confirmation import calc_stats
+
+from scripts.backtesting import kernels
+from scripts.backtesting.task_queue import (
+    AUTHKEY_ENV,
+    DEFAULT_PORT,
+    connect,
+    env_authkey,
+    merge_ledgers,
+    new_authkey,
+    put_tasks,
+    run_worker,
+    start_server,
+    wait_for_results,
+    wait_for_workers,
+)
+
+
+# ============================================================================
+# CONFIG
+# ============================================================================
+
+LEASE_SECONDS = 2 * 3600  # Task is re-queued if a worker does not report back in time
+MAX_ATTEMPTS = 3  # Retries per task (worker crash / exception)
+POLL_INTERVAL = 2.0  # Seconds between status checks
+DRAIN_SECONDS = 30  # Max. wait for workers to sign off before the server shuts down
+
+
+# ============================================================================
+# TASKS
+# ============================================================================
+
+def build_tasks():
+    """(task_id, payload) for every (HTF, entry_type, pair) unit"""
+    tasks = []
+    for htf in oe.TIMEFRAMES:
+        for entry_type in oe.ENTRY_TYPES:
+            for pair in oe.PAIRS:
+                payload = {
+                    "htf": htf,
+                    "entry_type": entry_type,
+                    "pair": pair,
+                    "start_date": oe.START_DATE,
+                    "end_date": oe.END_DATE,
+                }
+                tasks.append(((htf, entry_type, pair), payload))
+    return tasks
+
+
+# Per worker process: {(htf, start, end): data cache}
+_WORKER_CACHE = {}
+
+
+def handle_task(payload):
+    """Worker handler: one (HTF, entry_type, pair) unit → TradeLedger"""
+    key = (payload["htf"], payload["start_date"], payload["end_date"])
+    if key not in _WORKER_CACHE:
+        # Load each HTF once per worker process (all pairs, reused for every entry type)
+        _WORKER_CACHE.clear()
+        _WORKER_CACHE[key] = oe.load_all_data_for_timeframe(payload["htf"], oe.PAIRS, payload["start_date"], payload["end_date"])
+        kernels.set_backend(oe.KERNEL_BACKEND)
+    oe.DATA_CACHE = _WORKER_CACHE[key]
+
+    _, trades = oe.process_single_pair(
+        (payload["pair"], payload["htf"], payload["entry_type"], payload["start_date"], payload["end_date"])
+    )
+    return trades
+
+
+# ============================================================================
+# SERVER / WORKER
+# ============================================================================
+
+def print_status(status):
+    print(
+        f"  [QUEUE] done {status['done']}/{status['total']} | "
+        f"leased {status['leased']} | pending {status['pending']} | failed {status['failed']}"
+    )
+
+
+def collect_and_report(results):
+    """Merge partial ledgers per configuration and write reports (same output as oe.main)"""
+    all_results = []
+
+    for htf in oe.TIMEFRAMES:
+        for entry_type in oe.ENTRY_TYPES:
+            parts = {task_id: trades for task_id, trades in results.items() if task_id[:2] == (htf, entry_type)}
+            trades_df = merge_ledgers(parts, sort_by=["entry_time", "pair"])
+
+            stats = calc_stats(trades_df, oe.STARTING_CAPITAL, oe.RISK_PER_TRADE) if len(trades_df) > 0 else None
+            all_results.append({
+                'htf': htf,
+                'entry_type': entry_type,
+                'trades': trades_df,
+                'stats': stats
+            })
+
+            if len(trades_df) > 0:
+                oe.generate_report(htf, entry_type, trades_df)
+
+    oe.generate_comparison_report(all_results)
+    return all_results
+
+
+def server_authkey(announce):
+    """MODEL3_QUEUE_AUTHKEY or a random key for this run (printed for remote workers)"""
+    authkey = env_authkey()
+    if authkey is None:
+        authkey = new_authkey()
+        if announce:
+            print(f"[!] {AUTHKEY_ENV} not set - generated key for this run:")
+            print(f"    {AUTHKEY_ENV}={authkey.decode()}  (set it on every worker machine)")
+    return authkey
+
+
+def run_server(host, port, local_workers=0, announce_key=True):
+    start_time = time.time()
+    tasks = build_tasks()
+
+    print("\n" + "="*80)
+    print("DISTRIBUTED ENTRY CONFIRMATION SWEEP")
+    print("="*80)
+    print(f"Tasks: {len(tasks)} ({len(oe.TIMEFRAMES)} HTF x {len(oe.ENTRY_TYPES)} entry types x {len(oe.PAIRS)} pairs)")
+    print(f"Queue: {host}:{port}")
+    print("="*80)
+
+    authkey = server_authkey(announce_key)
+    manager = start_server(host, port, authkey, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS)
+    workers = []
+    try:
+        board = manager.board()
+        put_tasks(board, tasks)
+
+        worker_host = "127.0.0.1" if host in ("", "0.0.0.0") else host
+        workers = start_local_workers(worker_host, port, authkey, local_workers)
+
+        results = wait_for_results(board, POLL_INTERVAL, progress=print_status)
+        errors = board.errors()
+        stragglers = wait_for_workers(board, DRAIN_SECONDS)
+        if stragglers:
+            print(f"  [QUEUE] {stragglers} worker(s) did not sign off within {DRAIN_SECONDS}s - shutting down anyway")
+    finally:
+        for p in workers:
+            p.join(timeout=30)
+        manager.shutdown()
+
+    if errors:
+        # Reports from a partial ledger would look complete - write nothing
+        print(f"\n[!] {len(errors)} task(s) failed after {MAX_ATTEMPTS} attempts:")
+        for task_id, error in sorted(errors.items()):
+            print(f"  {task_id}: {error.strip().splitlines()[-1]}")
+        incomplete = sorted({task_id[:2] for task_id in errors})
+        print(f"\n[!] Incomplete configurations: {', '.join(f'{htf}/{entry_type}' for htf, entry_type in incomplete)}")
+        print("[!] No reports written - fix the failing tasks and rerun the sweep")
+        return False
+
+    all_results = collect_and_report(results)
+
+    total_time = time.time() - start_time
+    print("\n" + "="*80)
+    print("SWEEP COMPLETE")
+    print("="*80)
+    print(f"\nTotal Runtime: {total_time:.1f}s ({total_time/60:.1f} minutes)")
+    print(f"Configurations: {len(all_results)} | Output Directory: {oe.OUTPUT_DIR}")
+    print("="*80 + "\n")
+    return True
+
+
+def _worker_main(host, port, authkey):
+    run_worker(host, handle_task, port, authkey, poll_interval=POLL_INTERVAL)
+
+
+def start_local_workers(host, port, authkey, n):
+    procs = [Process(target=_worker_main, args=(host, port, authkey), daemon=True) for _ in range(n)]
+    for p in procs:
+        p.start()
+    return procs
+
+
+def run_workers(host, port, n):
+    """Run n worker processes on this machine until the queue is empty"""
+    authkey = env_authkey()
+    if authkey is None:
+        print(f"[!] {AUTHKEY_ENV} not set - use the key of the server (printed at server start)")
+        return False
+    connect(host, port, authkey)  # Fail early if the server is unreachable
+    print(f"[WORKER] {n} process(es) → {host}:{port}")
+    procs = start_local_workers(host, port, authkey, n)
+    for p in procs:
+        p.join()
+    failed = [p.exitcode for p in procs if p.exitcode != 0]
+    if failed:
+        print(f"[!] {len(failed)} of {n} worker process(es) exited with an error (exit codes: {failed})")
+        return False
+    print("[WORKER] Queue empty - done")
+    return True
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed Entry Confirmation Sweep")
+    sub = parser.add_subparsers(dest="role", required=True)
+
+    p_server = sub.add_parser("server", help="Queue tasks, wait for workers, write reports")
+    p_server.add_argument("--host", default="127.0.0.1", help="Listen address (LAN address or 0.0.0.0 for remote workers)")
+    p_server.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p_server.add_argument("--workers", type=int, default=0, help="Additional worker processes on the server machine")
+
+    p_worker = sub.add_parser("worker", help="Process tasks from a server")
+    p_worker.add_argument("--host", required=True)
+    p_worker.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p_worker.add_argument("--processes", type=int, default=cpu_count())
+
+    p_local = sub.add_parser("local", help="Server + workers on localhost")
+    p_local.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p_local.add_argument("--workers", type=int, default=cpu_count())
+
+    args = parser.parse_args()
+
+    if args.role == "server":
+        ok = run_server(args.host, args.port, args.workers)
+    elif args.role == "worker":
+        ok = run_workers(args.host, args.port, args.processes)
+    else:
+        ok = run_server("127.0.0.1", args.port, args.workers, announce_key=False)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
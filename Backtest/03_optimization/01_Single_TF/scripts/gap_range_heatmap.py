@@ -0,0 +1,220 @@
+"""
+Gap Size Heatmap - Full Min x Max Grid
+---------------------------------------
+
+Evaluates every [min, max] gap_pips range in 1-pip steps (~250k ranges per
+timeframe) with prefix sums (scripts/backtesting/range_sweep.py) instead of
+filtering the trades per configuration.
+
+- Grid metrics: Trades, Win Rate, Expectancy, SQN, Profit Factor, Cumulative R
+- Top candidates (by Expectancy, >= MIN_TRADES, distinct trade sets) are
+  re-evaluated with the full stats kernel (Max DD, Sharpe, Duration, Concurrency)
+
+Output (01_Gap_Size/Heatmap/):
+- {TF}_heatmap_expectancy.png / {TF}_heatmap_sqn.png
+- {TF}_grid.npz (all grid metrics, for re-plotting)
+- {TF}_top_ranges_results.parquet + {TF}_top_ranges.txt (report generated from the table)
+"""
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+# Repo root on path for the shared engine modules (scripts/backtesting)
+BASE_DIR = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(BASE_DIR))
+
+from scripts.backtesting.batch_stats import batch_stats, range_masks
+from scripts.backtesting.range_sweep import GRID_METRICS, RangeSweep, top_ranges
+from scripts.backtesting.results_store import read_results, write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except ImportError:  # Plots optional - grid + top ranges are still written
+    plt = None
+
+# ========== CONFIGURATION ==========
+TIMEFRAMES = ["W", "3D", "M"]
+
+# Grid (pips)
+MIN_VALUES = np.arange(0, 301, 1)      # Min: 0-300
+MAX_VALUES = np.arange(100, 1001, 1)   # Max: 100-1000
+MIN_TRADES = 50                        # Same threshold as Phase A/B
+TOP_N = 20                             # Candidates with full stats
+HEATMAP_METRICS = ["expectancy", "sqn"]
+
+# Paths
+TRADES_DIR = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+OUTPUT_DIR = BASE_DIR / "Backtest" / "03_optimization" / "01_Single_TF" / "01_Gap_Size" / "Heatmap"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def run_grid(timeframe):
+    """
+    Grid metrics + full stats of the top candidates for one timeframe.
+
+    Returns:
+        (grid dict, list of top result dicts) or (None, []) if no trades
+    """
+    print(f"\n{'='*80}")
+    print(f"GAP RANGE GRID - TIMEFRAME: {timeframe}")
+    print(f"{'='*80}\n")
+
+    if not trades_source_exists(TRADES_DIR, timeframe):
+        print(f"ERROR: {TRADES_DIR / f'{timeframe}_trades.csv'} not found!")
+        return None, []
+
+    df_full, trades_source = load_trades(TRADES_DIR, timeframe)
+    print(f"Loaded {len(df_full)} baseline trades from {trades_source.name}")
+
+    t0 = time.perf_counter()
+    sweep = RangeSweep(df_full['gap_pips'], df_full['pnl_r'])
+    grid = sweep.grid(MIN_VALUES, MAX_VALUES)
+    grid_time = time.perf_counter() - t0
+    print(f"Grid: {len(MIN_VALUES)} x {len(MAX_VALUES)} = {grid['trades'].size:,} ranges in {grid_time:.3f}s")
+
+    # Full stats only for the best candidates
+    # (ranges selecting the same trades are listed once)
+    candidates = top_ranges(grid, MIN_VALUES, MAX_VALUES, metric="expectancy", k=TOP_N, min_trades=MIN_TRADES, sweep=sweep)
+    if not candidates:
+        print(f"No range with >= {MIN_TRADES} trades")
+        return grid, []
+
+    full = batch_stats(df_full, range_masks(df_full['gap_pips'], candidates))
+    top = []
+    for k, (lo, hi) in enumerate(candidates):
+        top.append({
+            'min': int(lo),
+            'max': int(hi),
+            'trades': int(full['trades'][k]),
+            'filtered_pct': (1 - full['trades'][k] / len(df_full)) * 100,
+            'expectancy': full['expectancy'][k],
+            'win_rate': full['win_rate'][k],
+            'sqn': full['sqn'][k],
+            'sharpe': full['sharpe'][k],
+            'profit_factor': full['profit_factor'][k],
+            'max_dd': full['max_dd'][k],
+            'cumulative_r': full['cumulative_r'][k],
+            'avg_duration': full['avg_duration_days'][k],
+            'avg_concurrent': full['avg_concurrent'][k],
+            'max_concurrent': int(full['max_concurrent'][k]),
+        })
+
+    return grid, top
+
+
+def save_grid(timeframe, grid):
+    """All grid metrics as compressed npz (axes: MIN_VALUES x MAX_VALUES)"""
+    grid_file = OUTPUT_DIR / f"{timeframe}_grid.npz"
+    np.savez_compressed(grid_file, min_values=MIN_VALUES, max_values=MAX_VALUES, **{m: grid[m] for m in GRID_METRICS})
+    print(f"  [OK] Grid: {grid_file.name}")
+
+
+def plot_heatmaps(timeframe, grid):
+    """One heatmap per metric (cells with < MIN_TRADES trades are blank)"""
+    if plt is None:
+        print("  [!] matplotlib not installed - skipping heatmaps")
+        return
+
+    for metric in HEATMAP_METRICS:
+        values = np.where(grid['trades'] >= MIN_TRADES, grid[metric], np.nan)
+        finite = values[np.isfinite(values)]
+        if len(finite) == 0:
+            continue
+        limit = np.nanmax(np.abs(finite))
+
+        fig, ax = plt.subplots(figsize=(12, 6))
+        image = ax.imshow(
+            values,
+            origin="lower",
+            aspect="auto",
+            cmap="RdYlGn",
+            vmin=-limit,
+            vmax=limit,
+            extent=[MAX_VALUES[0], MAX_VALUES[-1], MIN_VALUES[0], MIN_VALUES[-1]],
+        )
+        fig.colorbar(image, ax=ax, label=metric)
+        ax.set_xlabel("Max gap (pips)")
+        ax.set_ylabel("Min gap (pips)")
+        ax.set_title(f"Model 3 - {timeframe} Gap Range {metric} (>= {MIN_TRADES} trades)")
+
+        plot_file = OUTPUT_DIR / f"{timeframe}_heatmap_{metric}.png"
+        fig.savefig(plot_file, dpi=120, bbox_inches="tight")
+        plt.close(fig)
+        print(f"  [OK] Heatmap: {plot_file.name}")
+
+
+def write_top_report(timeframe, top):
+    """Top candidates with full stats (results table + text report from it)"""
+    meta = {'optimizer': 'gap_range_heatmap', 'timeframe': timeframe, 'min_trades': MIN_TRADES}
+    results_file = write_results(OUTPUT_DIR, f"{timeframe}_top_ranges", top, meta)
+    print(f"  [OK] Results: {results_file.name}")
+    top = read_results(OUTPUT_DIR, f"{timeframe}_top_ranges").to_dict('records')
+
+    lines = []
+    lines.append("=" * 80)
+    lines.append(f"GAP RANGE HEATMAP - {timeframe} - TOP {len(top)} RANGES (by Expectancy)")
+    lines.append("=" * 80)
+    lines.append("")
+    lines.append(f"Grid: Min {MIN_VALUES[0]}-{MIN_VALUES[-1]} x Max {MAX_VALUES[0]}-{MAX_VALUES[-1]} pips (1-pip steps)")
+    lines.append(f"Minimum trades per range: {MIN_TRADES}")
+    lines.append("")
+    lines.append(f"{'Range':<12} {'Trades':>7} {'Filt%':>7} {'Exp(R)':>8} {'WR(%)':>7} {'SQN':>6} {'Sharpe':>7} {'PF':>6} {'MaxDD':>7} {'CumR':>7} {'Conc':>5}")
+    lines.append("-" * 80)
+
+    for res in top:
+        range_str = f"{res['min']}-{res['max']}"
+        lines.append(
+            f"{range_str:<12} {res['trades']:>7} {res['filtered_pct']:>6.1f}% "
+            f"{res['expectancy']:>+7.3f}R {res['win_rate']:>6.1f}% {res['sqn']:>6.2f} {res['sharpe']:>7.2f} "
+            f"{res['profit_factor']:>6.2f} {res['max_dd']:>+6.1f}% {res['cumulative_r']:>+6.1f}R {res['max_concurrent']:>5d}"
+        )
+
+    lines.append("")
+    lines.append("Note: Neighbouring ranges usually share most trades - prefer broad")
+    lines.append("plateaus in the heatmap over single peaks (overfitting).")
+    lines.append("")
+    lines.append("=" * 80)
+    lines.append("END OF REPORT")
+    lines.append("=" * 80)
+
+    report_file = OUTPUT_DIR / f"{timeframe}_top_ranges.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    print("=" * 80)
+    print("GAP SIZE HEATMAP - FULL MIN x MAX GRID")
+    print("=" * 80)
+    print(f"\nGrid: {len(MIN_VALUES)} Min x {len(MAX_VALUES)} Max values (1-pip steps)")
+    print(f"Timeframes: {', '.join(TIMEFRAMES)}")
+    print(f"Output: {OUTPUT_DIR}")
+
+    start_time = time.time()
+
+    for tf in TIMEFRAMES:
+        grid, top = run_grid(tf)
+        if grid is None:
+            continue
+
+        save_grid(tf, grid)
+        plot_heatmaps(tf, grid)
+        if top:
+            write_top_report(tf, top)
+
+    print("\n" + "=" * 80)
+    print("HEATMAP COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {time.time() - start_time:.1f}s")
+    print(f"Output saved in: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
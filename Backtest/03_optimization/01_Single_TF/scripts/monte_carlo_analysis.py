@@ -0,0 +1,177 @@
+"""
+Monte Carlo Analysis - Drawdown & Expectancy Distributions
+-----------------------------------------------------------
+
+Distributions instead of single numbers for the baseline trades (after the
+gap filter), using scripts/backtesting/monte_carlo.py:
+
+- permutation: same trades in random order → spread of max drawdown and
+  longest losing streak (how lucky was the historical order?)
+- bootstrap:   trades resampled with replacement → confidence intervals for
+  expectancy, win rate and cumulative R
+
+Output (06_Monte_Carlo/):
+- {TF}_{method}_results.parquet (one row per simulation)
+- {TF}_monte_carlo_report.txt
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Repo root on path for the shared engine modules (scripts/backtesting)
+BASE_DIR = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(BASE_DIR))
+
+from scripts.backtesting.monte_carlo import METHODS, monte_carlo
+from scripts.backtesting.results_store import write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+# ========== CONFIGURATION ==========
+TIMEFRAMES = ["W", "3D", "M"]
+
+# Gap filter from Phase B (applied before the simulation)
+GAP_FILTER = (0, 9999)  # (min_pips, max_pips) - (0, 9999) = no gap filter
+
+SIMULATIONS = 10_000
+SEED = 42            # None = new random paths every run
+CHUNK_SIZE = 1000    # Simulations per block (memory: CHUNK_SIZE x trades x 8 bytes per array)
+
+STARTING_CAPITAL = 100000
+RISK_PER_TRADE = 0.01
+
+CONFIDENCE = 0.95
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+DD_THRESHOLDS = [-20, -30, -50]  # Probability of a max DD at least this deep (%)
+
+# Paths
+TRADES_DIR = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+OUTPUT_DIR = BASE_DIR / "Backtest" / "03_optimization" / "01_Single_TF" / "06_Monte_Carlo"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def run_simulations(timeframe):
+    """Both methods for one timeframe → ({method: MonteCarloResult}, trade count) or (None, 0)"""
+    print(f"\n{'='*80}")
+    print(f"MONTE CARLO - TIMEFRAME: {timeframe}")
+    print(f"{'='*80}\n")
+
+    if not trades_source_exists(TRADES_DIR, timeframe):
+        print(f"ERROR: {TRADES_DIR / f'{timeframe}_trades.csv'} not found!")
+        return None, 0
+
+    df_full, trades_source = load_trades(TRADES_DIR, timeframe)
+    print(f"Loaded {len(df_full)} baseline trades from {trades_source.name}")
+
+    gap_min, gap_max = GAP_FILTER
+    df = df_full[(df_full['gap_pips'] >= gap_min) & (df_full['gap_pips'] <= gap_max)]
+    print(f"Gap filter {gap_min}-{gap_max} pips: {len(df)} trades")
+    if df.empty:
+        return None, 0
+
+    results = {}
+    for method in METHODS:
+        t0 = time.perf_counter()
+        results[method] = monte_carlo(
+            df['pnl_r'], sims=SIMULATIONS, method=method, start_cap=STARTING_CAPITAL,
+            risk=RISK_PER_TRADE, seed=SEED, chunk_size=CHUNK_SIZE,
+        )
+        print(f"  {method:<12} {SIMULATIONS:,} simulations in {time.perf_counter() - t0:.2f}s")
+
+        meta = {'timeframe': timeframe, 'method': method, 'simulations': SIMULATIONS, 'seed': SEED,
+                'gap_filter': GAP_FILTER, 'trades': len(df), 'actual': results[method].actual}
+        write_results(OUTPUT_DIR, f"{timeframe}_{method}", results[method].sims, meta)
+
+    return results, len(df)
+
+
+def format_distribution(result, metrics):
+    """Actual value, mean and quantiles per metric"""
+    header = " ".join(f"{f'P{round(q * 100)}':>9}" for q in QUANTILES)
+    lines = [f"{'Metric':<18} {'Actual':>9} {'Mean':>9} {header}", "-" * 100]
+    summary = result.summary(QUANTILES)
+    for metric in metrics:
+        row = summary.loc[metric]
+        values = " ".join(f"{v:>9.3f}" for v in row.iloc[2:])
+        lines.append(f"{metric:<18} {row['actual']:>9.3f} {row['mean']:>9.3f} {values}")
+    return lines
+
+
+def write_report(timeframe, results, n_trades):
+    """Permutation + bootstrap distributions for one timeframe"""
+    perm, boot = results["permutation"], results["bootstrap"]
+    pct = round(CONFIDENCE * 100)
+
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"MONTE CARLO ANALYSIS - {timeframe}")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"Trades: {n_trades} (gap filter {GAP_FILTER[0]}-{GAP_FILTER[1]} pips)")
+    lines.append(f"Simulations: {SIMULATIONS:,} per method | Seed: {SEED} | Risk: {RISK_PER_TRADE * 100:.1f}% of {STARTING_CAPITAL:,}")
+    lines.append("")
+
+    lines.append("=" * 100)
+    lines.append("PERMUTATION (trade order shuffled)")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.extend(format_distribution(perm, ["max_dd", "max_dd_r", "max_loss_streak"]))
+    lines.append("")
+    lines.append(f"Historical max DD is worse than {perm.prob('max_dd', '>', perm.actual['max_dd']) * 100:.1f}% of shuffled paths")
+    lines.append(f"Historical losing streak is longer than {perm.prob('max_loss_streak', '<', perm.actual['max_loss_streak']) * 100:.1f}% of shuffled paths")
+    for threshold in DD_THRESHOLDS:
+        lines.append(f"  P(max DD <= {threshold}%): {perm.prob('max_dd', '<=', threshold) * 100:5.1f}%")
+    lines.append("")
+
+    lines.append("=" * 100)
+    lines.append("BOOTSTRAP (trades resampled with replacement)")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.extend(format_distribution(boot, ["expectancy", "win_rate", "cumulative_r", "max_dd", "max_loss_streak"]))
+    lines.append("")
+    for metric, fmt in [("expectancy", "{:+.3f}R"), ("win_rate", "{:.1f}%"), ("cumulative_r", "{:+.1f}R")]:
+        lo, hi = boot.confidence_interval(metric, CONFIDENCE)
+        lines.append(f"  {pct}% CI {metric:<14} [{fmt.format(lo)}, {fmt.format(hi)}]")
+    lines.append(f"  P(expectancy <= 0): {boot.prob('expectancy', '<=', 0) * 100:5.1f}%")
+    for threshold in DD_THRESHOLDS:
+        lines.append(f"  P(max DD <= {threshold}%): {boot.prob('max_dd', '<=', threshold) * 100:5.1f}%")
+
+    lines.append("")
+    lines.append("Note: Size risk for the P95 drawdown, not the historical one - the historical")
+    lines.append("path is only one ordering. A CI that includes 0R means the edge is not proven.")
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / f"{timeframe}_monte_carlo_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    print("=" * 80)
+    print("MONTE CARLO ANALYSIS")
+    print("=" * 80)
+    print(f"\nSimulations: {SIMULATIONS:,} per method ({', '.join(METHODS)})")
+    print(f"Timeframes: {', '.join(TIMEFRAMES)}")
+    print(f"Output: {OUTPUT_DIR}")
+
+    start_time = time.time()
+
+    for tf in TIMEFRAMES:
+        results, n_trades = run_simulations(tf)
+        if results is not None:
+            write_report(tf, results, n_trades)
+
+    print("\n" + "=" * 80)
+    print("MONTE CARLO COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {time.time() - start_time:.1f}s")
+    print(f"Output saved in: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
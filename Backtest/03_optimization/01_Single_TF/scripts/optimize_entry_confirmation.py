@@ -33,7 +33,8 @@ Expected Results:
 Output:
 - 5 reports per HTF timeframe (W, 3D, M)
 - 15 CSV files total in results/Entry_Confirmation/Trades/
-- Summary comparison report
+- Results table summary_results.parquet (one row per HTF x entry type)
+- Summary comparison report (generated from the results table)
 
 Walk-Forward: YES (critical rule!)
 """
@@ -51,19 +52,21 @@ from multiprocessing import Pool, cpu_count
 BASE_DIR = Path(__file__).resolve().parents[4]
 sys.path.insert(0, str(BASE_DIR))
 
+from scripts.backtesting import backtest_model3
 from scripts.backtesting.backtest_model3 import (
+    ALL_TIMEFRAMES,
     load_tf_data,
     detect_htf_pivots,
     compute_sl_tp,
     price_per_pip,
     should_use_wick_diff_entry,
+    tf_path,
 )
-
-# Import Phase 2 helpers for report generation
-phase2_scripts = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "scripts"
-sys.path.insert(0, str(phase2_scripts))
-
-from report_helpers import calc_stats
+from scripts.backtesting import kernels
+from scripts.backtesting.checkpoint import CheckpointStore, files_stamp, fingerprint
+from scripts.backtesting.ledger import TradeLedger
+from scripts.backtesting.results_store import read_results, write_results
+from scripts.backtesting.stats import calc_stats
 
 # ============================================================================
 # CONFIGURATION
@@ -92,10 +95,18 @@ RISK_PER_TRADE = 0.01  # 1% per trade
 DOJI_FILTER = 5.0  # Min body % for pivots
 REFINEMENT_MAX_SIZE = 0.20  # Max 20% of HTF gap
 
+# Engine Settings
+KERNEL_BACKEND = "auto"  # "numba" (compiled), "numpy" (fallback) or "auto"
+
 # Output
 OUTPUT_DIR = BASE_DIR / "Backtest" / "03_optimization" / "01_Single_TF" / "02_Entry_Confirmation"
 TRADES_DIR = OUTPUT_DIR / "Trades"
 
+# Checkpoints: every (HTF, entry_type, pair) result is saved as it completes, keyed by run_fingerprint()
+# (settings, engine code, chart data) and cleared once all configurations are done
+RESUME = True  # True = skip finished units from a previous (aborted) run, False = start fresh
+CHECKPOINT_DIR = OUTPUT_DIR / "checkpoints" / f"{START_DATE}_{END_DATE}"  # per run config
+
 # Create directories
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 TRADES_DIR.mkdir(parents=True, exist_ok=True)
@@ -107,6 +118,7 @@ def init_worker(shared_cache):
     """Initialize worker process with shared cache"""
     global DATA_CACHE
     DATA_CACHE = shared_cache
+    kernels.set_backend(KERNEL_BACKEND)
 
 # ============================================================================
 # HELPER FUNCTIONS (copied from backtest_all.py with optimizations)
@@ -303,8 +315,8 @@ def find_entry_with_confirmation(near_level, start_time, df_h1, df_h4, direction
     Args:
         near_level: Original entry price level (refinement near or wick_diff)
         start_time: Gap touch time
-        df_h1: H1 dataframe
-        df_h4: H4 dataframe (can be None for HTF=3D)
+        df_h1: H1 dataframe or CandleArrays
+        df_h4: H4 dataframe or CandleArrays (can be None for HTF=3D)
         direction: "bullish" or "bearish"
         entry_type: "direct_touch", "1h_close_at_close", "1h_close_at_near",
                     "4h_close_at_close", "4h_close_at_near"
@@ -315,175 +327,53 @@ def find_entry_with_confirmation(near_level, start_time, df_h1, df_h4, direction
         - entry_price: Actual entry price (can differ from near_level!)
         - was_invalidated: True if refinement was invalidated (close back in gap)
     """
+    bullish = direction == "bullish"
+    h1 = kernels.as_candle_arrays(df_h1)
 
     if entry_type == "direct_touch":
         # Original logic: Entry at first touch of near_level
-        window = df_h1[df_h1["time"] >= start_time].copy()
-
-        if len(window) == 0:
-            return None, None, False
-
-        if direction == "bullish":
-            touch_mask = window["low"] <= near_level
-        else:
-            touch_mask = window["high"] >= near_level
-
-        hits = window[touch_mask]
-        if len(hits) > 0:
-            return hits.iloc[0]["time"], near_level, False
-        return None, None, False
-
-    elif entry_type == "1h_close_at_close":
-        # Entry AT close price when 1H close is beyond entry level
-        window = df_h1[df_h1["time"] >= start_time].copy()
-
-        if len(window) == 0:
-            return None, None, False
-
-        for idx, candle in window.iterrows():
-            if direction == "bullish":
-                # Check if close is above near_level (beyond, out of gap)
-                if candle["close"] > near_level:
-                    # Valid entry AT CLOSE PRICE
-                    return candle["time"], candle["close"], False
-                # Check if touched but close back in gap
-                elif candle["low"] <= near_level < candle["close"]:
-                    # Touched but didn't close beyond → wait
-                    continue
-                elif candle["close"] <= near_level and candle["low"] <= near_level:
-                    # Close moved back into gap → invalidated
-                    return None, None, True
-            else:
-                # Bearish: close must be below near_level
-                if candle["close"] < near_level:
-                    return candle["time"], candle["close"], False
-                elif candle["high"] >= near_level > candle["close"]:
-                    continue
-                elif candle["close"] >= near_level and candle["high"] >= near_level:
-                    return None, None, True
-
-        return None, None, False
-
-    elif entry_type == "1h_close_at_near":
-        # Entry when near touched AFTER 1H close confirms (2-phase)
-        window = df_h1[df_h1["time"] >= start_time].copy()
-
-        if len(window) == 0:
-            return None, None, False
-
-        # Phase 1: Find confirmation candle (close beyond near_level)
-        confirmation_time = None
-        for idx, candle in window.iterrows():
-            if direction == "bullish":
-                if candle["close"] > near_level:
-                    # Confirmed! Now wait for near touch
-                    confirmation_time = candle["time"]
-                    break
-                elif candle["close"] <= near_level and candle["low"] <= near_level:
-                    # Invalidated
-                    return None, None, True
-            else:
-                if candle["close"] < near_level:
-                    confirmation_time = candle["time"]
-                    break
-                elif candle["close"] >= near_level and candle["high"] >= near_level:
-                    return None, None, True
-
-        if confirmation_time is None:
-            # Never confirmed
-            return None, None, False
-
-        # Phase 2: Find near touch AFTER confirmation
-        window_after = df_h1[df_h1["time"] > confirmation_time].copy()
-
-        if len(window_after) == 0:
-            return None, None, False
-
-        if direction == "bullish":
-            touch_mask = window_after["low"] <= near_level
-        else:
-            touch_mask = window_after["high"] >= near_level
-
-        hits = window_after[touch_mask]
-        if len(hits) > 0:
-            # Entry at near_level (original)
-            return hits.iloc[0]["time"], near_level, False
+        idx = _first_near_touch(h1, h1.index_of(start_time, "left"), near_level, bullish)
+        if idx >= 0:
+            return h1.stamps[idx], near_level, False
         return None, None, False
 
-    elif entry_type == "4h_close_at_close":
-        # Entry AT close price when 4H close is beyond entry level
+    if entry_type.startswith("4h"):
+        # 4H confirmation needs H4 candles
         if df_h4 is None or len(df_h4) == 0:
             return None, None, False
-
-        window = df_h4[df_h4["time"] >= start_time].copy()
-
-        if len(window) == 0:
-            return None, None, False
-
-        for idx, candle in window.iterrows():
-            if direction == "bullish":
-                if candle["close"] > near_level:
-                    return candle["time"], candle["close"], False
-                elif candle["low"] <= near_level < candle["close"]:
-                    continue
-                elif candle["close"] <= near_level and candle["low"] <= near_level:
-                    return None, None, True
-            else:
-                if candle["close"] < near_level:
-                    return candle["time"], candle["close"], False
-                elif candle["high"] >= near_level > candle["close"]:
-                    continue
-                elif candle["close"] >= near_level and candle["high"] >= near_level:
-                    return None, None, True
-
+        confirm = kernels.as_candle_arrays(df_h4)
+    else:
+        confirm = h1
+
+    # Close beyond near_level confirms, close back in gap invalidates (kernel scan)
+    idx, invalidated = kernels.scan_close_confirmation(
+        confirm.high, confirm.low, confirm.close,
+        confirm.index_of(start_time, "left"), near_level, bullish
+    )
+    if invalidated:
+        return None, None, True
+    if idx < 0:
+        # Never confirmed
         return None, None, False
 
-    elif entry_type == "4h_close_at_near":
-        # Entry when near touched AFTER 4H close confirms (2-phase)
-        if df_h4 is None or len(df_h4) == 0:
-            return None, None, False
-
-        window = df_h4[df_h4["time"] >= start_time].copy()
+    if entry_type.endswith("at_close"):
+        # Valid entry AT CLOSE PRICE
+        return confirm.stamps[idx], confirm.close[idx], False
 
-        if len(window) == 0:
-            return None, None, False
-
-        # Phase 1: Find confirmation candle
-        confirmation_time = None
-        for idx, candle in window.iterrows():
-            if direction == "bullish":
-                if candle["close"] > near_level:
-                    confirmation_time = candle["time"]
-                    break
-                elif candle["close"] <= near_level and candle["low"] <= near_level:
-                    return None, None, True
-            else:
-                if candle["close"] < near_level:
-                    confirmation_time = candle["time"]
-                    break
-                elif candle["close"] >= near_level and candle["high"] >= near_level:
-                    return None, None, True
-
-        if confirmation_time is None:
-            return None, None, False
-
-        # Phase 2: Find near touch AFTER confirmation (use H1 for precision)
-        window_after = df_h1[df_h1["time"] > confirmation_time].copy()
-
-        if len(window_after) == 0:
-            return None, None, False
-
-        if direction == "bullish":
-            touch_mask = window_after["low"] <= near_level
-        else:
-            touch_mask = window_after["high"] >= near_level
+    # "at_near" Phase 2: Find near touch AFTER confirmation (use H1 for precision)
+    confirmation_time = confirm.stamps[idx]
+    touch_idx = _first_near_touch(h1, h1.index_of(confirmation_time, "right"), near_level, bullish)
+    if touch_idx >= 0:
+        # Entry at near_level (original)
+        return h1.stamps[touch_idx], near_level, False
+    return None, None, False
 
-        hits = window_after[touch_mask]
-        if len(hits) > 0:
-            return hits.iloc[0]["time"], near_level, False
-        return None, None, False
 
-    return None, None, False
+def _first_near_touch(h1, start, near_level, bullish):
+    """First H1 index >= start touching near_level (-1 if never)"""
+    if bullish:
+        return kernels.first_touch(h1.low, start, near_level, below=True)
+    return kernels.first_touch(h1.high, start, near_level, below=False)
 
 
 def check_tp_touched_between_confirmation_and_entry(df_h1, df_h4, pivot, near_level, gap_touch_time, entry_time, entry_type, tp_price):
@@ -492,8 +382,8 @@ def check_tp_touched_between_confirmation_and_entry(df_h1, df_h4, pivot, near_le
     This invalidates the setup (similar to TP check between gap touch and entry).
 
     Args:
-        df_h1: H1 dataframe
-        df_h4: H4 dataframe (can be None)
+        df_h1: H1 dataframe or CandleArrays
+        df_h4: H4 dataframe or CandleArrays (can be None)
         pivot: HTF pivot
         near_level: Near level
         gap_touch_time: Gap touch time
@@ -508,53 +398,36 @@ def check_tp_touched_between_confirmation_and_entry(df_h1, df_h4, pivot, near_le
         # Only check for "at_near" variants
         return False
 
+    h1 = kernels.as_candle_arrays(df_h1)
+
     # Find the confirmation close time
     # We need to re-run the confirmation logic to find when close happened
     if "1h" in entry_type:
-        window = df_h1[df_h1["time"] >= gap_touch_time].copy()
-        confirmation_time = None
-        for idx, candle in window.iterrows():
-            if pivot.direction == "bullish":
-                if candle["close"] > near_level:
-                    confirmation_time = candle["time"]
-                    break
-            else:
-                if candle["close"] < near_level:
-                    confirmation_time = candle["time"]
-                    break
+        confirm = h1
     elif "4h" in entry_type:
         if df_h4 is None or len(df_h4) == 0:
             return False
-        window = df_h4[df_h4["time"] >= gap_touch_time].copy()
-        confirmation_time = None
-        for idx, candle in window.iterrows():
-            if pivot.direction == "bullish":
-                if candle["close"] > near_level:
-                    confirmation_time = candle["time"]
-                    break
-            else:
-                if candle["close"] < near_level:
-                    confirmation_time = candle["time"]
-                    break
+        confirm = kernels.as_candle_arrays(df_h4)
     else:
         return False
 
-    if confirmation_time is None:
+    bullish = pivot.direction == "bullish"
+    idx = kernels.first_close_beyond(confirm.close, confirm.index_of(gap_touch_time, "left"), near_level, bullish)
+
+    if idx < 0:
         return False
 
     # Check if TP was touched between confirmation_time and entry_time
-    check_window = df_h1[(df_h1["time"] > confirmation_time) & (df_h1["time"] < entry_time)].copy()
+    start = h1.index_of(confirm.stamps[idx], "right")
+    stop = h1.index_of(entry_time, "left")
 
-    if len(check_window) == 0:
-        return False
-
-    if pivot.direction == "bullish":
-        return (check_window["high"] >= tp_price).any()
+    if bullish:
+        return kernels.any_touch(h1.high, start, stop, tp_price, below=False)
     else:
-        return (check_window["low"] <= tp_price).any()
+        return kernels.any_touch(h1.low, start, stop, tp_price, below=True)
 
 
-def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, entry_type):
+def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, entry_type, ltf_arrays=None):
     """
     Modified simulate_single_trade with entry confirmation logic.
 
@@ -567,6 +440,12 @@ def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, en
     h4_df = ltf_cache.get("H4")  # Might be None for HTF=3D
     d_df = ltf_cache["D"]
 
+    # Array views for the confirmation kernels (built once per pair by the caller)
+    if ltf_arrays is None:
+        ltf_arrays = {tf: kernels.candle_arrays(df) for tf, df in ltf_cache.items() if df is not None}
+    h1_arr = ltf_arrays["H1"]
+    h4_arr = ltf_arrays.get("H4")
+
     # 1. Gap Touch
     daily_gap_touch = find_gap_touch_on_daily_fast(d_df, pivot, pivot.valid_time)
     if daily_gap_touch is None:
@@ -593,7 +472,7 @@ def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, en
 
     if use_wick_diff and wick_diff_entry is not None:
         wd_entry_time, wd_entry_price, wd_invalidated = find_entry_with_confirmation(
-            wick_diff_entry, gap_touch_time, h1_df, h4_df, pivot.direction, entry_type
+            wick_diff_entry, gap_touch_time, h1_arr, h4_arr, pivot.direction, entry_type
         )
         if wd_entry_time:
             class WickDiffRef:
@@ -607,7 +486,7 @@ def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, en
     # Refinements
     for ref in refinements_active[:]:  # Copy list to allow removal
         ref_entry_time, ref_entry_price, ref_invalidated = find_entry_with_confirmation(
-            ref.near, gap_touch_time, h1_df, h4_df, pivot.direction, entry_type
+            ref.near, gap_touch_time, h1_arr, h4_arr, pivot.direction, entry_type
         )
 
         if ref_invalidated:
@@ -651,7 +530,7 @@ def simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, en
                 # CRITICAL: For "at_near" variants, check if TP was touched between confirmation and entry
                 # (Similar to TP check between gap touch and entry)
                 if check_tp_touched_between_confirmation_and_entry(
-                    h1_df, h4_df, pivot, touched_ref.near, gap_touch_time, entry_time, entry_type, tp_price
+                    h1_arr, h4_arr, pivot, touched_ref.near, gap_touch_time, entry_time, entry_type, tp_price
                 ):
                     # TP touched between confirmation and entry → Invalid setup
                     if not is_wick_diff:
@@ -857,18 +736,19 @@ def process_single_pair(args):
     htf_df = pair_data.get(htf_timeframe)
 
     if htf_df is None or len(htf_df) == 0:
-        return (pair, [])
+        return (pair, TradeLedger())
 
     pivots = detect_htf_pivots(htf_df, min_body_pct=DOJI_FILTER)
 
     if len(pivots) == 0:
-        return (pair, [])
+        return (pair, TradeLedger())
 
     all_tfs = ["M", "W", "3D", "D", "H4", "H1"]
     htf_idx = all_tfs.index(htf_timeframe)
     ltf_list = all_tfs[htf_idx + 1:]
 
     ltf_cache = {tf: pair_data.get(tf) for tf in ltf_list}
+    ltf_arrays = {tf: kernels.candle_arrays(df) for tf, df in ltf_cache.items() if df is not None}
 
     all_refinements = {}
     for pivot in pivots:
@@ -886,50 +766,76 @@ def process_single_pair(args):
                 refinements.extend(ref_list)
         all_refinements[pivot_id] = refinements
 
-    pair_trades = []
+    pair_trades = TradeLedger(capacity=len(pivots))
     for pivot in pivots:
         pivot_id = f"{pivot.time}"
         refinements = all_refinements.get(pivot_id, [])
-        trade = simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, entry_type)
+        trade = simulate_single_trade(pair, pivot, refinements, ltf_cache, htf_timeframe, entry_type, ltf_arrays)
         if trade:
             pair_trades.append(trade)
 
     return (pair, pair_trades)
 
 
-def run_backtest(htf_timeframe, entry_type):
-    """Run backtest for one HTF timeframe + one entry type"""
+def run_fingerprint():
+    """Checkpoint key part: strategy settings + engine code + chart data stamp (any change → recompute)"""
+    return fingerprint(
+        START_DATE, END_DATE, DOJI_FILTER, REFINEMENT_MAX_SIZE,
+        Path(__file__), Path(backtest_model3.__file__), Path(kernels.__file__),
+        files_stamp(tf_path(tf) for tf in ALL_TIMEFRAMES),
+    )
+
+
+def run_backtest(htf_timeframe, entry_type, checkpoints=None):
+    """
+    Run backtest for one HTF timeframe + one entry type
+
+    checkpoints: Optional CheckpointStore - finished pairs are loaded from disk,
+                 new pair results are saved atomically as they complete
+
+    Returns: DataFrame of all trades (sorted by entry_time, pair)
+    """
     print(f"\n{'='*80}")
     print(f"BACKTEST: {htf_timeframe} | Entry: {entry_type}")
     print(f"{'='*80}")
 
-    cache = load_all_data_for_timeframe(htf_timeframe, PAIRS, START_DATE, END_DATE)
+    run_key = run_fingerprint()
+    results = {}
+    if checkpoints is not None:
+        for pair in PAIRS:
+            if checkpoints.has((htf_timeframe, entry_type, pair, "ledger", run_key)):
+                results[pair] = checkpoints.load((htf_timeframe, entry_type, pair, "ledger", run_key))
+        if results:
+            print(f"\n[RESUME] {len(results)}/{len(PAIRS)} pairs loaded from checkpoints")
 
-    pair_args = [(pair, htf_timeframe, entry_type, START_DATE, END_DATE) for pair in PAIRS]
+    pending = [pair for pair in PAIRS if pair not in results]
 
-    num_processes = cpu_count()
-    print(f"\n[PROCESSING] Running backtest with {num_processes} CPU cores...")
-    print(f"{'='*80}")
+    if pending:
+        cache = load_all_data_for_timeframe(htf_timeframe, PAIRS, START_DATE, END_DATE)
+
+        pair_args = [(pair, htf_timeframe, entry_type, START_DATE, END_DATE) for pair in pending]
+
+        num_processes = cpu_count()
+        print(f"\n[PROCESSING] Running backtest with {num_processes} CPU cores...")
+        print(f"{'='*80}")
 
-    all_trades = []
-    completed = 0
+        completed = len(results)
 
-    with Pool(processes=num_processes, initializer=init_worker, initargs=(cache,)) as pool:
-        for pair, pair_trades in pool.imap_unordered(process_single_pair, pair_args, chunksize=1):
-            completed += 1
-            if pair_trades:
-                all_trades.extend(pair_trades)
+        with Pool(processes=num_processes, initializer=init_worker, initargs=(cache,)) as pool:
+            for pair, pair_trades in pool.imap_unordered(process_single_pair, pair_args, chunksize=1):
+                completed += 1
+                results[pair] = pair_trades
+                if checkpoints is not None:
+                    checkpoints.save((htf_timeframe, entry_type, pair, "ledger", run_key), pair_trades)
                 print(f"  [{completed:2d}/{len(PAIRS)}] {pair}: {len(pair_trades)} trades")
-            else:
-                print(f"  [{completed:2d}/{len(PAIRS)}] {pair}: 0 trades")
 
-    all_trades.sort(key=lambda t: (t["entry_time"], t["pair"]))
+    all_trades = TradeLedger.concat(results[pair] for pair in PAIRS).sorted(["entry_time", "pair"])
 
     print(f"\n{'='*80}")
     print(f"TOTAL TRADES ({htf_timeframe} | {entry_type}): {len(all_trades)}")
     print(f"{'='*80}\n")
 
-    return all_trades
+    return all_trades.to_pandas(categorical=False)
 
 
 # ============================================================================
@@ -999,8 +905,34 @@ def generate_report(htf_timeframe, entry_type, trades_df):
     print(f"  → Trades: {stats['total_trades']} | Exp: {stats['expectancy']:+.3f}R | WR: {stats['win_rate']:.1f}% | SQN: {stats['sqn']:.2f}")
 
 
+# Stats columns of the summary results table (calc_stats keys)
+SUMMARY_COLUMNS = [
+    'total_trades', 'expectancy', 'win_rate', 'sqn', 'profit_factor', 'max_dd',
+    'cumulative_r', 'avg_duration_days', 'avg_concurrent', 'max_concurrent',
+]
+
+
+def write_summary_table(all_results):
+    """Results table (one row per HTF x entry type with data) → summary_results.parquet"""
+    rows = [
+        {'htf': r['htf'], 'entry_type': r['entry_type'], **{col: r['stats'][col] for col in SUMMARY_COLUMNS}}
+        for r in all_results if r['stats'] is not None
+    ]
+    meta = {'optimizer': 'entry_confirmation', 'start_date': START_DATE, 'end_date': END_DATE, 'risk_per_trade': RISK_PER_TRADE}
+    results_file = write_results(OUTPUT_DIR, "summary", rows, meta)
+    print(f"\n✓ Results table: {results_file.name}")
+    return read_results(OUTPUT_DIR, "summary")
+
+
 def generate_comparison_report(all_results):
-    """Generate comparison report across all configurations"""
+    """Generate comparison report across all configurations (from the results table)"""
+    table = write_summary_table(all_results)
+    summary = {(row['htf'], row['entry_type']): row for row in table.to_dict('records')}
+    all_results = [
+        {'htf': r['htf'], 'entry_type': r['entry_type'], 'stats': summary.get((r['htf'], r['entry_type']))}
+        for r in all_results
+    ]
+
     lines = []
     lines.append("=" * 80)
     lines.append("ENTRY CONFIRMATION OPTIMIZATION - SUMMARY")
@@ -1126,17 +1058,20 @@ def main():
     print(f"Period: {START_DATE} to {END_DATE}")
     print(f"Risk per Trade: {RISK_PER_TRADE*100:.1f}%")
     print(f"\nTotal Configurations: {len(TIMEFRAMES) * len(ENTRY_TYPES)} = 15 backtests")
+    print(f"Resume: {'ON' if RESUME else 'OFF'} ({CHECKPOINT_DIR})")
     print("="*80)
 
+    # Finished (HTF, entry_type, pair) units survive crashes / Ctrl-C
+    checkpoints = CheckpointStore(CHECKPOINT_DIR)
+    if not RESUME:
+        checkpoints.clear()
+
     all_results = []
 
     for htf_tf in TIMEFRAMES:
         for entry_type in ENTRY_TYPES:
-            # Run backtest
-            trades = run_backtest(htf_tf, entry_type)
-
-            # Convert to DataFrame
-            trades_df = pd.DataFrame(trades)
+            # Run backtest (only pairs without checkpoint)
+            trades_df = run_backtest(htf_tf, entry_type, checkpoints)
 
             # Calculate stats
             stats = calc_stats(trades_df, STARTING_CAPITAL, RISK_PER_TRADE) if len(trades_df) > 0 else None
@@ -1145,7 +1080,7 @@ def main():
             all_results.append({
                 'htf': htf_tf,
                 'entry_type': entry_type,
-                'trades': trades,
+                'trades': trades_df,
                 'stats': stats
             })
 
@@ -1156,6 +1091,9 @@ def main():
     # Generate comparison report
     generate_comparison_report(all_results)
 
+    # All configurations complete → checkpoints are only needed to resume an aborted run
+    checkpoints.clear()
+
     total_time = time.time() - start_time
 
     print("\n" + "="*80)
@@ -0,0 +1,192 @@
+"""
+Filter Sweep - Wick Asymmetry, Duration, Time-Based
+----------------------------------------------------
+
+Tests 2-4 from BACKTEST_PROCESS.md on the baseline trades (after the gap
+filter), evaluated with packed trade bitsets (scripts/backtesting/filter_sweep.py)
+instead of re-filtering the CSV per configuration.
+
+1. Single filters vs. baseline (sequential one-variable optimization)
+2. All combinations of COMBO_FAMILIES (max. one filter per family)
+
+Every row reports the share of pairs with positive total R
+(robustness rule: > 60% of pairs profitable).
+
+Output (03_Filters/):
+- {TF}_results.parquet (all evaluated combinations, scripts/backtesting/results_store.py)
+- {TF}_filter_report.txt
+"""
+
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+
+# Repo root on path for the shared engine modules (scripts/backtesting)
+BASE_DIR = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(BASE_DIR))
+
+from scripts.backtesting.filter_sweep import FilterBank
+from scripts.backtesting.results_store import write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+# ========== CONFIGURATION ==========
+TIMEFRAMES = ["W", "3D", "M"]
+
+# Gap filter from Phase B (applied before all other filters)
+GAP_FILTER = (0, 9999)  # (min_pips, max_pips) - (0, 9999) = no gap filter
+
+# TEST 2: Wick asymmetry - wick_diff_pct >= threshold
+WICK_THRESHOLDS = [10, 20, 30, 40]
+
+# TEST 3: Duration filter - duration_days in [min, max]
+DURATION_RANGES = [(3, 30), (5, 45)]
+
+# TEST 4: Time-based - exclude one entry weekday / entry month
+WEEKDAYS = {0: "Mon", 1: "Tue", 2: "Wed", 3: "Thu", 4: "Fri", 5: "Sat", 6: "Sun"}
+MONTHS = {1: "Jan", 2: "Feb", 3: "Mar", 4: "Apr", 5: "May", 6: "Jun",
+          7: "Jul", 8: "Aug", 9: "Sep", 10: "Oct", 11: "Nov", 12: "Dec"}
+
+# Families combined in step 2 (month exclusions only as single filters)
+COMBO_FAMILIES = ["wick_pct", "duration", "weekday"]
+
+MIN_TRADES = 50             # Same threshold as Phase A/B
+MIN_PAIRS_PROFITABLE = 60   # % of pairs with positive total R
+TOP_N = 25
+
+# Paths
+TRADES_DIR = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+OUTPUT_DIR = BASE_DIR / "Backtest" / "03_optimization" / "01_Single_TF" / "03_Filters"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def build_bank(df):
+    """FilterBank with all test filters (weekday/month of entry_time)."""
+    bank = FilterBank(df)
+    bank.add_threshold("wick_pct", df['wick_diff_pct'], WICK_THRESHOLDS, op=">=")
+    bank.add_range("duration", df['duration_days'], DURATION_RANGES)
+
+    entry = pd.to_datetime(df['entry_time'])
+    weekday = entry.dt.dayofweek.to_numpy()
+    month = entry.dt.month.to_numpy()
+    for day in sorted(set(weekday)):
+        bank.add(f"no {WEEKDAYS[day]}", weekday != day, family="weekday")
+    for m in sorted(set(month)):
+        bank.add(f"no {MONTHS[m]}", month != m, family="month")
+    return bank
+
+
+def run_sweep(timeframe):
+    """
+    Single filters + combinations for one timeframe.
+
+    Returns:
+        (single DataFrame, combo DataFrame, baseline trade count) or (None, None, 0)
+    """
+    print(f"\n{'='*80}")
+    print(f"FILTER SWEEP - TIMEFRAME: {timeframe}")
+    print(f"{'='*80}\n")
+
+    if not trades_source_exists(TRADES_DIR, timeframe):
+        print(f"ERROR: {TRADES_DIR / f'{timeframe}_trades.csv'} not found!")
+        return None, None, 0
+
+    df_full, trades_source = load_trades(TRADES_DIR, timeframe)
+    print(f"Loaded {len(df_full)} baseline trades from {trades_source.name}")
+
+    gap_min, gap_max = GAP_FILTER
+    df = df_full[(df_full['gap_pips'] >= gap_min) & (df_full['gap_pips'] <= gap_max)].reset_index(drop=True)
+    print(f"Gap filter {gap_min}-{gap_max} pips: {len(df)} trades")
+    if df.empty:
+        return None, None, 0
+
+    t0 = time.perf_counter()
+    bank = build_bank(df)
+    singles = bank.evaluate(bank.combos(max_filters=1))
+    combos = bank.evaluate(bank.combos(families=COMBO_FAMILIES))
+    elapsed = time.perf_counter() - t0
+    print(f"{len(singles)} single filters + {len(combos)} combinations in {elapsed:.2f}s")
+
+    return singles, combos, len(df)
+
+
+def format_rows(table):
+    lines = []
+    lines.append(f"{'Filters':<36} {'Trades':>7} {'Filt%':>7} {'Exp(R)':>8} {'WR(%)':>7} {'SQN':>6} {'PF':>6} {'MaxDD':>7} {'Pairs+':>8}")
+    lines.append("-" * 100)
+    for _, row in table.iterrows():
+        robust = "" if row['pairs_profitable_pct'] > MIN_PAIRS_PROFITABLE else " !"
+        lines.append(
+            f"{row['filters'][:36]:<36} {row['trades']:>7} {row['filtered_pct']:>6.1f}% "
+            f"{row['expectancy']:>+7.3f}R {row['win_rate']:>6.1f}% {row['sqn']:>6.2f} {row['profit_factor']:>6.2f} "
+            f"{row['max_dd']:>+6.1f}% {row['pairs_profitable']:>3}/{row['pairs_traded']:<3}{robust}"
+        )
+    return lines
+
+
+def write_report(timeframe, singles, combos, n_trades):
+    """Single filters (vs. baseline) + top combinations"""
+    gap_min, gap_max = GAP_FILTER
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"FILTER SWEEP - {timeframe}")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"Trades after gap filter {gap_min}-{gap_max} pips: {n_trades}")
+    lines.append(f"Minimum trades: {MIN_TRADES} | Robust: > {MIN_PAIRS_PROFITABLE}% of pairs profitable (! = not robust)")
+    lines.append("")
+
+    lines.append("STEP 1: SINGLE FILTERS (one variable at a time)")
+    lines.append("")
+    lines.extend(format_rows(singles))
+    lines.append("")
+
+    valid = combos[combos['trades'] >= MIN_TRADES]
+    top = valid.sort_values(['expectancy', 'trades'], ascending=[False, False], kind="stable").head(TOP_N)
+    lines.append(f"STEP 2: TOP {len(top)} COMBINATIONS by Expectancy ({len(combos)} evaluated, {len(valid)} with >= {MIN_TRADES} trades)")
+    lines.append("")
+    lines.extend(format_rows(top))
+    lines.append("")
+    lines.append("Note: Adopt filters one at a time (sequential optimization) - combinations")
+    lines.append("only show which filters stack; every added filter is a new degree of freedom.")
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / f"{timeframe}_filter_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    print("=" * 80)
+    print("FILTER SWEEP - WICK / DURATION / TIME-BASED")
+    print("=" * 80)
+    print(f"\nTimeframes: {', '.join(TIMEFRAMES)}")
+    print(f"Output: {OUTPUT_DIR}")
+
+    start_time = time.time()
+
+    for tf in TIMEFRAMES:
+        singles, combos, n_trades = run_sweep(tf)
+        if singles is None:
+            continue
+
+        table = pd.concat([singles, combos]).drop_duplicates('filters')
+        meta = {'optimizer': 'filter_sweep', 'timeframe': tf, 'gap_filter': GAP_FILTER, 'trades': n_trades}
+        results_file = write_results(OUTPUT_DIR, tf, table, meta)
+        print(f"  [OK] Results: {results_file.name}")
+        write_report(tf, singles, combos, n_trades)
+
+    print("\n" + "=" * 80)
+    print("FILTER SWEEP COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {time.time() - start_time:.1f}s")
+    print(f"Output saved in: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,21 +11,22 @@ Grid:
 
 Output:
 - Filtered trade CSVs in A_Coarse_Ranges/Trades/
-- Summary reports in A_Coarse_Ranges/ (W, 3D, M)
+- Results tables in A_Coarse_Ranges/{TF}_results.parquet (read by Phase B)
+- Summary reports in A_Coarse_Ranges/ (W, 3D, M), generated from the tables
 - Top 3 configurations highlighted in each report
 """
 
 import sys
 from pathlib import Path
-import pandas as pd
 import numpy as np
 
-# Add Phase 2 scripts to path for report_helpers
+# Repo root on path for the shared engine modules (scripts/backtesting)
 BASE_DIR = Path(__file__).resolve().parents[4]
-phase2_scripts = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "scripts"
-sys.path.insert(0, str(phase2_scripts))
+sys.path.insert(0, str(BASE_DIR))
 
-from report_helpers import calc_stats
+from scripts.backtesting.batch_stats import batch_stats, range_masks
+from scripts.backtesting.results_store import read_results, top_results, write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_exists, trades_source_stamp
 
 # ========== CONFIGURATION ==========
 TIMEFRAMES = ["W", "3D", "M"]
@@ -78,21 +79,6 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_TRADES_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def filter_by_gap_size(df, min_gap, max_gap):
-    """
-    Filter trades by gap_pips range.
-
-    Args:
-        df: DataFrame with trades
-        min_gap: Minimum gap size in pips
-        max_gap: Maximum gap size in pips
-
-    Returns:
-        Filtered DataFrame
-    """
-    return df[(df['gap_pips'] >= min_gap) & (df['gap_pips'] <= max_gap)].copy()
-
-
 def calculate_filtered_pct(original_count, filtered_count):
     """Calculate percentage of trades filtered out."""
     if original_count == 0:
@@ -114,23 +100,26 @@ def run_optimization(timeframe):
     print(f"OPTIMIZING GAP SIZE - TIMEFRAME: {timeframe}")
     print(f"{'='*80}\n")
 
-    # Load baseline trades
-    trades_file = TRADES_DIR / f"{timeframe}_trades.csv"
-    if not trades_file.exists():
-        print(f"ERROR: {trades_file} not found!")
+    # Load baseline trades (Parquet dataset if present, else CSV)
+    if not trades_source_exists(TRADES_DIR, timeframe):
+        print(f"ERROR: {TRADES_DIR / f'{timeframe}_trades.csv'} not found!")
         return []
 
-    df_full = pd.read_csv(trades_file)
+    df_full, trades_source = load_trades(TRADES_DIR, timeframe)
     original_count = len(df_full)
-    print(f"Loaded {original_count} baseline trades from {timeframe}_trades.csv")
+    print(f"Loaded {original_count} baseline trades from {trades_source.name}")
 
     results = []
 
+    # Stats for all configurations at once (mask matrix configs x trades)
+    masks = range_masks(df_full['gap_pips'], [(min_gap, max_gap) for min_gap, max_gap, _ in TEST_CONFIGS])
+    batch = batch_stats(df_full, masks)
+
     # Test all configurations
     for idx, (min_gap, max_gap, description) in enumerate(TEST_CONFIGS, 1):
-        # Filter trades
-        df_filtered = filter_by_gap_size(df_full, min_gap, max_gap)
-        filtered_count = len(df_filtered)
+        # Filtered trades (row idx - 1 of the mask matrix)
+        stats = {key: values[idx - 1] for key, values in batch.items()}
+        filtered_count = int(stats['trades'])
         filtered_pct = calculate_filtered_pct(original_count, filtered_count)
 
         # Skip if too few trades (< 50)
@@ -138,13 +127,6 @@ def run_optimization(timeframe):
             print(f"  [{idx:2d}] {description:20s}: {filtered_count:4d} trades ({filtered_pct:5.1f}% filtered) - SKIPPED (too few trades)")
             continue
 
-        # Calculate stats
-        stats = calc_stats(df_filtered)
-
-        if stats is None:
-            print(f"  [{idx:2d}] {description:20s}: Stats calculation failed - SKIPPED")
-            continue
-
         # Store results
         result = {
             'min': min_gap,
@@ -161,7 +143,7 @@ def run_optimization(timeframe):
             'min_duration': stats['min_duration_days'],
             'max_duration': stats['max_duration_days'],
             'avg_concurrent': stats['avg_concurrent'],
-            'max_concurrent': stats['max_concurrent'],
+            'max_concurrent': int(stats['max_concurrent']),
             'cumulative_r': stats['cumulative_r'],
         }
         results.append(result)
@@ -172,23 +154,25 @@ def run_optimization(timeframe):
     return results
 
 
-def generate_summary_report(timeframe, results):
+def generate_summary_report(timeframe, table):
     """
     Generate summary report with Top 3 configurations.
 
     Args:
         timeframe: "W", "3D", or "M"
-        results: List of result dictionaries
+        table: Results table (DataFrame, one row per configuration)
     """
-    if len(results) == 0:
+    if len(table) == 0:
         print(f"No results to report for {timeframe}")
         return
 
+    results = table.to_dict('records')
+
     # Sort by expectancy (descending)
-    results_sorted = sorted(results, key=lambda x: x['expectancy'], reverse=True)
+    results_sorted = top_results(table, 'expectancy', k=len(table)).to_dict('records')
 
     # Get Top 3
-    top_3 = results_sorted[:3] if len(results_sorted) >= 3 else results_sorted
+    top_3 = results_sorted[:3]
 
     # Generate report
     lines = []
@@ -310,7 +294,10 @@ def main():
         results = run_optimization(tf)
 
         if len(results) > 0:
-            generate_summary_report(tf, results)
+            meta = {'phase': 'A', 'timeframe': tf, 'data_stamp': trades_source_stamp(TRADES_DIR, tf)}
+            results_file = write_results(OUTPUT_DIR, tf, results, meta)
+            print(f"Results table saved to: {results_file}")
+            generate_summary_report(tf, read_results(OUTPUT_DIR, tf))
         else:
             print(f"WARNING: No valid results for {tf}")
 
@@ -9,24 +9,29 @@ For each Top 3 configuration (e.g., 75-200):
 - Tests Max: ±25 pips around best (e.g., 175-225) in 10-pip steps
 - Creates wider search range to ensure we capture optimal settings
 
+Input:
+- Phase A results tables (A_Coarse_Ranges/{TF}_results.parquet),
+  falling back to the Phase A text reports
+
 Output:
 - Filtered trade CSVs in B_Fine_Steps/Trades/
-- Summary reports in B_Fine_Steps/ (W, 3D, M)
+- Results tables in B_Fine_Steps/{TF}_results.parquet
+- Summary reports in B_Fine_Steps/ (W, 3D, M), generated from the tables
 - Top 3 refined configurations highlighted in each report
 """
 
 import sys
 from pathlib import Path
-import pandas as pd
 import numpy as np
 import re
 
-# Add Phase 2 scripts to path for report_helpers
+# Repo root on path for the shared engine modules (scripts/backtesting)
 BASE_DIR = Path(__file__).resolve().parents[4]
-phase2_scripts = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "scripts"
-sys.path.insert(0, str(phase2_scripts))
+sys.path.insert(0, str(BASE_DIR))
 
-from report_helpers import calc_stats
+from scripts.backtesting.batch_stats import batch_stats, range_masks
+from scripts.backtesting.results_store import read_results, results_exist, top_results, write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_stamp
 
 # ========== CONFIGURATION ==========
 TIMEFRAMES = ["W", "3D", "M"]
@@ -45,9 +50,40 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_TRADES_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def parse_phase_a_results(timeframe):
+def load_phase_a_top3(timeframe):
+    """
+    Top 3 configurations from the Phase A results table.
+
+    Falls back to parsing the Phase A text report (runs from before the
+    results tables existed).
+
+    Args:
+        timeframe: "W", "3D", or "M"
+
+    Returns:
+        List of tuples: [(min1, max1, desc1), (min2, max2, desc2), (min3, max3, desc3)]
+    """
+    if not results_exist(PHASE_A_DIR, timeframe):
+        return parse_phase_a_report(timeframe)
+
+    table = read_results(PHASE_A_DIR, timeframe, columns=['min', 'max', 'description', 'expectancy'])
+    top = top_results(table, 'expectancy', k=3)
+    if len(top) < 3:
+        print(f"ERROR: Phase A results for {timeframe} contain only {len(top)} configurations")
+        return []
+
+    top_3 = [(int(row['min']), int(row['max']), row['description']) for _, row in top.iterrows()]
+
+    print(f"Loaded Top 3 from Phase A results for {timeframe}:")
+    for i, (min_val, max_val, desc) in enumerate(top_3, 1):
+        print(f"  Rank #{i}: {desc} ({min_val}-{max_val} pips)")
+
+    return top_3
+
+
+def parse_phase_a_report(timeframe):
     """
-    Parse Phase A report to extract Top 3 configurations.
+    Parse Phase A report to extract Top 3 configurations (legacy fallback).
 
     Args:
         timeframe: "W", "3D", or "M"
@@ -140,21 +176,6 @@ def generate_test_ranges(min_val, max_val):
     return min_values, max_values
 
 
-def filter_by_gap_size(df, min_gap, max_gap):
-    """
-    Filter trades by gap_pips range.
-
-    Args:
-        df: DataFrame with trades
-        min_gap: Minimum gap size in pips
-        max_gap: Maximum gap size in pips
-
-    Returns:
-        Filtered DataFrame
-    """
-    return df[(df['gap_pips'] >= min_gap) & (df['gap_pips'] <= max_gap)].copy()
-
-
 def calculate_filtered_pct(original_count, filtered_count):
     """Calculate percentage of trades filtered out."""
     if original_count == 0:
@@ -181,9 +202,8 @@ def run_refinement(timeframe, config_idx, min_val, max_val, description):
     print(f"TIMEFRAME: {timeframe}")
     print(f"{'='*80}\n")
 
-    # Load baseline trades
-    trades_file = TRADES_DIR / f"{timeframe}_trades.csv"
-    df_full = pd.read_csv(trades_file)
+    # Load baseline trades (Parquet dataset if present, else CSV)
+    df_full, _ = load_trades(TRADES_DIR, timeframe)
     original_count = len(df_full)
 
     # Generate test ranges
@@ -196,6 +216,10 @@ def run_refinement(timeframe, config_idx, min_val, max_val, description):
     results = []
     total_tests = 0
 
+    # Stats for all (min, max) combinations at once (mask matrix ranges x trades)
+    ranges = [(lo, hi) for lo in min_values for hi in max_values if lo < hi]
+    batch = batch_stats(df_full, range_masks(df_full['gap_pips'], ranges)) if ranges else {}
+
     # Test all combinations
     for min_gap in min_values:
         for max_gap in max_values:
@@ -205,9 +229,9 @@ def run_refinement(timeframe, config_idx, min_val, max_val, description):
 
             total_tests += 1
 
-            # Filter trades
-            df_filtered = filter_by_gap_size(df_full, min_gap, max_gap)
-            filtered_count = len(df_filtered)
+            # Filtered trades (row total_tests - 1 of the mask matrix)
+            stats = {key: values[total_tests - 1] for key, values in batch.items()}
+            filtered_count = int(stats['trades'])
             filtered_pct = calculate_filtered_pct(original_count, filtered_count)
 
             # Skip if too few trades
@@ -215,13 +239,6 @@ def run_refinement(timeframe, config_idx, min_val, max_val, description):
                 print(f"  [{total_tests:3d}] {min_gap:3d}-{max_gap:3d}: {filtered_count:4d} trades - SKIPPED (too few)")
                 continue
 
-            # Calculate stats
-            stats = calc_stats(df_filtered)
-
-            if stats is None:
-                print(f"  [{total_tests:3d}] {min_gap:3d}-{max_gap:3d}: Stats failed - SKIPPED")
-                continue
-
             # Store results
             result = {
                 'min': min_gap,
@@ -237,7 +254,7 @@ def run_refinement(timeframe, config_idx, min_val, max_val, description):
                 'min_duration': stats['min_duration_days'],
                 'max_duration': stats['max_duration_days'],
                 'avg_concurrent': stats['avg_concurrent'],
-                'max_concurrent': stats['max_concurrent'],
+                'max_concurrent': int(stats['max_concurrent']),
                 'cumulative_r': stats['cumulative_r'],
             }
             results.append(result)
@@ -248,13 +265,13 @@ def run_refinement(timeframe, config_idx, min_val, max_val, description):
     return results
 
 
-def generate_summary_report(timeframe, all_results):
+def generate_summary_report(timeframe, table):
     """
     Generate summary report combining all refinements.
 
     Args:
         timeframe: "W", "3D", or "M"
-        all_results: Dict mapping config_idx -> results list
+        table: Results table of all refinements (column config_idx = Phase A rank)
     """
     lines = []
     lines.append("=" * 80)
@@ -263,12 +280,7 @@ def generate_summary_report(timeframe, all_results):
     lines.append("=" * 80)
     lines.append("")
 
-    # Combine all results and sort
-    combined = []
-    for config_idx, results in all_results.items():
-        for res in results:
-            res['config_idx'] = config_idx
-            combined.append(res)
+    combined = table.to_dict('records')
 
     if len(combined) == 0:
         lines.append("ERROR: No valid results!")
@@ -278,10 +290,10 @@ def generate_summary_report(timeframe, all_results):
         return
 
     # Sort by expectancy
-    combined_sorted = sorted(combined, key=lambda x: x['expectancy'], reverse=True)
+    combined_sorted = top_results(table, 'expectancy', k=len(table)).to_dict('records')
 
     # Get overall Top 3
-    top_3 = combined_sorted[:3] if len(combined_sorted) >= 3 else combined_sorted
+    top_3 = combined_sorted[:3]
 
     lines.append(f"Total Configurations Tested: {len(combined)}")
     lines.append(f"Refinement Step: {FINE_STEP} pips")
@@ -311,13 +323,8 @@ def generate_summary_report(timeframe, all_results):
     lines.append("=" * 80)
     lines.append("")
 
-    for config_idx in sorted(all_results.keys()):
-        results = all_results[config_idx]
-        if len(results) == 0:
-            continue
-
-        results_sorted = sorted(results, key=lambda x: x['expectancy'], reverse=True)
-        best = results_sorted[0]
+    for config_idx in sorted(table['config_idx'].unique()):
+        best = top_results(table[table['config_idx'] == config_idx], 'expectancy', k=1).to_dict('records')[0]
 
         lines.append(f"Phase A Config #{config_idx} - Best Refined: {best['min']}-{best['max']} pips")
         lines.append(f"  Exp: {best['expectancy']:+.3f}R | WR: {best['win_rate']:5.1f}% | SQN: {best['sqn']:5.2f} | Trades: {best['trades']}")
@@ -373,21 +380,24 @@ def main():
     print("")
 
     for tf in TIMEFRAMES:
-        # Parse Phase A Top 3
-        top_3_configs = parse_phase_a_results(tf)
+        # Phase A Top 3 (results table, legacy: text report)
+        top_3_configs = load_phase_a_top3(tf)
 
         if len(top_3_configs) == 0:
             print(f"ERROR: No Phase A results for {tf}. Skipping.")
             continue
 
         # Refine each config
-        all_results = {}
+        combined = []
         for i, (min_val, max_val, desc) in enumerate(top_3_configs, 1):
             results = run_refinement(tf, i, min_val, max_val, desc)
-            all_results[i] = results
+            combined.extend({**res, 'config_idx': i} for res in results)
 
-        # Generate summary
-        generate_summary_report(tf, all_results)
+        # Results table first, summary report generated from it
+        meta = {'phase': 'B', 'timeframe': tf, 'data_stamp': trades_source_stamp(TRADES_DIR, tf), 'phase_a_top3': top_3_configs}
+        results_file = write_results(OUTPUT_DIR, tf, combined, meta)
+        print(f"\nResults table saved to: {results_file}")
+        generate_summary_report(tf, read_results(OUTPUT_DIR, tf))
 
     print("\n" + "=" * 80)
     print("PHASE B COMPLETE")
@@ -0,0 +1,211 @@
+"""
+Strategy Parameter Search - Successive Halving
+-----------------------------------------------
+
+Searches parameters that need a new backtest per value (they change pivots,
+refinements or SL placement and cannot be filtered from the trade CSVs):
+- DOJI_FILTER          (min body % for pivots / refinements)
+- REFINEMENT_MAX_SIZE  (max refinement size as fraction of the HTF gap)
+- MIN_SL_PIPS          (min SL distance from entry)
+- PIVOT_LEVEL          ("open_k2" standard vs. "close_k1")
+
+All candidates are first backtested on a cheap rung (few pairs, few years);
+only the best 1/ETA per rung is promoted to the next, more expensive one, up
+to the full 28-pair 2010-2025 run. Backtests run through
+backtest_all.run_backtest_for_timeframe (same executor / pool setup, data
+cache loaded once per rung and shared by all candidates).
+
+Output (05_Strategy_Params/):
+- {TF}_halving_results.parquet (one row per evaluation)
+- {TF}_halving_report.txt
+"""
+
+import itertools
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+# Repo root on path for the shared engine modules (scripts/backtesting)
+BASE_DIR = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(BASE_DIR))
+
+from scripts.backtesting.batch_stats import batch_stats
+from scripts.backtesting.results_store import read_results, write_results
+from scripts.backtesting.successive_halving import Rung, exhaustive_cost, search_cost, successive_halving
+
+# Phase 2 backtest engine (run_backtest_for_timeframe, data loading, executors)
+phase2_scripts = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "scripts"
+sys.path.insert(0, str(phase2_scripts))
+
+import backtest_all as ba
+
+# ========== CONFIGURATION ==========
+TIMEFRAMES = ["W", "3D", "M"]
+
+# Parameter grid (every combination is one candidate)
+PARAM_GRID = {
+    "DOJI_FILTER": [0.0, 5.0, 10.0, 15.0],
+    "REFINEMENT_MAX_SIZE": [0.10, 0.20, 0.30],
+    "MIN_SL_PIPS": [40, 60, 80],
+    "PIVOT_LEVEL": ["open_k2", "close_k1"],
+}
+
+# Rungs: cheap → full (last rung = full backtest)
+RUNGS = [
+    Rung("5 pairs 2021-2023", ["EURUSD", "GBPJPY", "AUDCAD", "USDJPY", "EURGBP"], "2021-01-01", "2023-12-31", min_trades=30),
+    Rung("12 pairs 2016-2023", ba.PAIRS[::2][:12], "2016-01-01", "2023-12-31", min_trades=100),
+    Rung("28 pairs 2010-2025", ba.PAIRS, "2010-01-01", "2025-12-31", min_trades=200),
+]
+
+SELECTION_METRIC = "expectancy"
+ETA = 3  # Keep the best third per rung
+
+# Execution (passed to backtest_all)
+EXECUTOR = ba.EXECUTOR
+WORKERS = ba.EXECUTOR_WORKERS
+
+# Paths
+OUTPUT_DIR = BASE_DIR / "Backtest" / "03_optimization" / "01_Single_TF" / "05_Strategy_Params"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def build_candidates():
+    """All combinations of PARAM_GRID as parameter dicts"""
+    names = list(PARAM_GRID)
+    return [dict(zip(names, values)) for values in itertools.product(*PARAM_GRID.values())]
+
+
+def make_evaluate(htf_timeframe):
+    """evaluate(params, rung, cache) → stats of one backtest"""
+    def evaluate(params, rung, cache):
+        trades = ba.run_backtest_for_timeframe(
+            htf_timeframe,
+            executor=EXECUTOR,
+            workers=WORKERS,
+            cache=cache,
+            params=params,
+            pairs=rung.pairs,
+            start_date=rung.start_date,
+            end_date=rung.end_date,
+        )
+        if len(trades) == 0:
+            return {'trades': 0}
+
+        stats = batch_stats(trades, np.ones(len(trades), dtype=bool), ba.STARTING_CAPITAL, ba.RISK_PER_TRADE, concurrency=False)
+        return {
+            'trades': int(stats['trades'][0]),
+            'expectancy': float(stats['expectancy'][0]),
+            'win_rate': float(stats['win_rate'][0]),
+            'sqn': float(stats['sqn'][0]),
+            'profit_factor': float(stats['profit_factor'][0]),
+            'max_dd': float(stats['max_dd'][0]),
+            'cumulative_r': float(stats['cumulative_r'][0]),
+        }
+    return evaluate
+
+
+def make_prepare(htf_timeframe):
+    """Data cache per rung (loaded once, shared by all candidates of the rung)"""
+    def prepare(rung):
+        return ba.load_all_data_for_timeframe(htf_timeframe, list(rung.pairs), rung.start_date, rung.end_date)
+    return prepare
+
+
+def print_result(row):
+    params = " | ".join(f"{name}={row[name]}" for name in PARAM_GRID)
+    score = f"{row['score']:+.3f}" if not np.isnan(row['score']) else "n/a"
+    print(f"  [RUNG {row['rung']}] #{row['candidate']:3d} {params}: {row.get('trades', 0)} trades | {SELECTION_METRIC}: {score}")
+
+
+def write_report(timeframe, n_candidates):
+    """Text report from the results table"""
+    log = read_results(OUTPUT_DIR, f"{timeframe}_halving")
+    cost = search_cost(log, RUNGS)
+    full_cost = exhaustive_cost(n_candidates, RUNGS)
+
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"STRATEGY PARAMETER SEARCH (SUCCESSIVE HALVING) - {timeframe}")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"Candidates: {n_candidates} | Selection: {SELECTION_METRIC} | Eta: {ETA}")
+    lines.append(f"Cost: {cost:,} pair-years vs. {full_cost:,} for the exhaustive grid ({cost / full_cost * 100:.1f}%)")
+    lines.append("")
+
+    for level, rung in enumerate(RUNGS):
+        rows = log[log['rung'] == level]
+        note = " - no candidate reached min trades, promoted by trade count" if len(rows) and rows['fallback'].any() else ""
+        lines.append(f"RUNG {level}: {rung.name} - {len(rows)} candidates (min {rung.min_trades} trades){note}")
+    lines.append("")
+
+    final = log[log['rung'] == log['rung'].max()].sort_values('score', ascending=False, kind="stable", na_position="last")
+    lines.append("=" * 100)
+    lines.append(f"FINAL RUNG RANKING ({RUNGS[int(log['rung'].max())].name})")
+    lines.append("=" * 100)
+    lines.append("")
+    header = " ".join(f"{name:>20}" for name in PARAM_GRID)
+    lines.append(f"{header} {'Trades':>7} {'Exp(R)':>8} {'WR(%)':>7} {'SQN':>6} {'PF':>6} {'MaxDD':>7}")
+    lines.append("-" * 100)
+    for row in final.to_dict('records'):
+        values = " ".join(f"{str(row[name]):>20}" for name in PARAM_GRID)
+        if row['trades'] == 0:
+            lines.append(f"{values} {0:>7}")
+            continue
+        lines.append(
+            f"{values} {row['trades']:>7} {row['expectancy']:>+7.3f}R {row['win_rate']:>6.1f}% "
+            f"{row['sqn']:>6.2f} {row['profit_factor']:>6.2f} {row['max_dd']:>+6.1f}%"
+        )
+
+    lines.append("")
+    lines.append("Note: Candidates eliminated on small rungs were never run on the full data -")
+    lines.append("confirm the winner with walk-forward validation before adopting it.")
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / f"{timeframe}_halving_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    candidates = build_candidates()
+
+    print("=" * 80)
+    print("STRATEGY PARAMETER SEARCH - SUCCESSIVE HALVING")
+    print("=" * 80)
+    print(f"\nCandidates: {len(candidates)} ({' x '.join(str(len(v)) for v in PARAM_GRID.values())})")
+    for level, rung in enumerate(RUNGS):
+        print(f"  Rung {level}: {rung.name}")
+    print(f"Timeframes: {', '.join(TIMEFRAMES)}")
+    print(f"Output: {OUTPUT_DIR}")
+
+    start_time = time.time()
+
+    for tf in TIMEFRAMES:
+        print(f"\n{'='*80}")
+        print(f"PARAMETER SEARCH - TIMEFRAME: {tf}")
+        print(f"{'='*80}")
+
+        log = successive_halving(
+            candidates, RUNGS, make_evaluate(tf),
+            metric=SELECTION_METRIC, eta=ETA, prepare=make_prepare(tf), on_result=print_result,
+        )
+        meta = {'timeframe': tf, 'metric': SELECTION_METRIC, 'eta': ETA, 'grid': PARAM_GRID,
+                'rungs': [(r.name, list(r.pairs), r.start_date, r.end_date, r.min_trades) for r in RUNGS]}
+        write_results(OUTPUT_DIR, f"{tf}_halving", log, meta)
+        write_report(tf, len(candidates))
+
+    print("\n" + "=" * 80)
+    print("PARAMETER SEARCH COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {time.time() - start_time:.1f}s")
+    print(f"Output saved in: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
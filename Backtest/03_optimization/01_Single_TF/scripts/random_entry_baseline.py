@@ -0,0 +1,179 @@
+"""
+Random-Entry Baseline - Null Model for the Pivot/Refinement Edge
+-----------------------------------------------------------------
+
+Random entries on the same pairs and period as the real trades, with each
+real trade's SL/TP distance and direction (scripts/backtesting/random_baseline.py).
+Every draw over all real trades is one random ledger with the same trade count
+and geometry → distribution of expectancy under the null hypothesis.
+
+The strategy has an edge only if its expectancy lies in the upper tail of
+that distribution (p-value < P_VALUE_MAX).
+
+Output (07_Random_Baseline/):
+- {TF}_results.parquet (one row per draw: closed trades, expectancy)
+- {TF}_random_baseline_report.txt
+"""
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Repo root on path for the shared engine modules (scripts/backtesting)
+BASE_DIR = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(BASE_DIR))
+
+from scripts.backtesting import kernels
+from scripts.backtesting.backtest_model3 import build_data_store
+from scripts.backtesting.random_baseline import random_baseline
+from scripts.backtesting.results_store import write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+# ========== CONFIGURATION ==========
+TIMEFRAMES = ["W", "3D", "M"]
+
+# Gap filter from Phase B (applied to the real trades before matching)
+GAP_FILTER = (0, 9999)  # (min_pips, max_pips) - (0, 9999) = no gap filter
+
+N_DRAWS = 1000   # Random entries per real trade (= number of random ledgers)
+SEED = 42        # None = new random entries every run
+
+P_VALUE_MAX = 0.05
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+# Paths
+TRADES_DIR = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+OUTPUT_DIR = BASE_DIR / "Backtest" / "03_optimization" / "01_Single_TF" / "07_Random_Baseline"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def load_h1(pairs):
+    """H1 CandleArrays per pair (H1 parquet read once)"""
+    store = build_data_store(sorted(pairs), ["H1"])
+    return {pair: kernels.candle_arrays(frames["H1"]) for pair, frames in store.items() if len(frames["H1"])}
+
+
+def load_ledgers():
+    """Baseline trades per timeframe ({tf: DataFrame}, missing timeframes skipped)"""
+    ledgers = {}
+    for tf in TIMEFRAMES:
+        if not trades_source_exists(TRADES_DIR, tf):
+            print(f"ERROR: {TRADES_DIR / f'{tf}_trades.csv'} not found!")
+            continue
+        ledgers[tf], trades_source = load_trades(TRADES_DIR, tf)
+        print(f"Loaded {len(ledgers[tf])} {tf} baseline trades from {trades_source.name}")
+    return ledgers
+
+
+def run_baseline(timeframe, df_full, h1):
+    """Null model for one timeframe → (NullModelResult, real trades) or (None, None)"""
+    print(f"\n{'='*80}")
+    print(f"RANDOM-ENTRY BASELINE - TIMEFRAME: {timeframe}")
+    print(f"{'='*80}\n")
+
+    gap_min, gap_max = GAP_FILTER
+    df = df_full[(df_full['gap_pips'] >= gap_min) & (df_full['gap_pips'] <= gap_max)]
+    df = df[df['pair'].isin(h1)].reset_index(drop=True)
+    print(f"Gap filter {gap_min}-{gap_max} pips, pairs with H1 data: {len(df)} trades")
+    if df.empty:
+        return None, None
+
+    t0 = time.perf_counter()
+    null = random_baseline(df, h1, n_draws=N_DRAWS, seed=SEED)
+    print(f"{len(null.trades):,} synthetic trades resolved in {time.perf_counter() - t0:.2f}s ({kernels.get_backend()} kernels)")
+    return null, df
+
+
+def write_report(timeframe, null, df):
+    """Results table (one row per draw) + text report"""
+    table = pd.DataFrame({'draw': np.arange(N_DRAWS), 'closed_trades': null.closed, 'expectancy': null.expectancy})
+    meta = {'timeframe': timeframe, 'draws': N_DRAWS, 'seed': SEED, 'gap_filter': GAP_FILTER,
+            'trades': len(df), 'actual_expectancy': null.actual, 'p_value': null.p_value}
+    write_results(OUTPUT_DIR, timeframe, table, meta)
+
+    synthetic = null.trades
+    closed = synthetic[synthetic['exit_type'] != "open"]
+    quantiles = np.nanquantile(null.expectancy, QUANTILES)
+    verdict = "EDGE" if null.p_value < P_VALUE_MAX else "NO PROVEN EDGE"
+
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"RANDOM-ENTRY BASELINE - {timeframe}")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"Real trades: {len(df)} (gap filter {GAP_FILTER[0]}-{GAP_FILTER[1]} pips)")
+    lines.append(f"Random ledgers: {N_DRAWS:,} | Synthetic trades: {len(synthetic):,} ({len(synthetic) - len(closed):,} still open)")
+    lines.append(f"Seed: {SEED} | Entry: close of a random H1 candle, same pair / direction / SL & TP distance")
+    lines.append("")
+    lines.append(f"  Real expectancy:     {null.actual:+.3f}R")
+    lines.append(f"  Null mean:           {np.nanmean(null.expectancy):+.3f}R")
+    for q, value in zip(QUANTILES, quantiles):
+        lines.append(f"  Null P{round(q * 100):<3}            {value:+.3f}R")
+    lines.append(f"  Real beats:          {null.percentile_of_actual():.1f}% of random ledgers")
+    lines.append(f"  p-value:             {null.p_value:.4f}")
+    lines.append(f"  Verdict:             {verdict} (requires p < {P_VALUE_MAX})")
+    lines.append("")
+
+    # Per pair: real vs. random expectancy
+    lines.append(f"{'Pair':<10} {'Trades':>7} {'Real Exp':>9} {'Random Exp':>11} {'Random WR':>10} {'Diff':>8}")
+    lines.append("-" * 100)
+    real_by_pair = df.groupby('pair')['pnl_r'].agg(['count', 'mean'])
+    random_by_pair = closed.groupby('pair', observed=True)['pnl_r'].agg(
+        expectancy='mean', win_rate=lambda r: (r > 0).mean() * 100
+    )
+    for pair, row in real_by_pair.iterrows():
+        if pair not in random_by_pair.index:
+            continue
+        rnd = random_by_pair.loc[pair]
+        lines.append(
+            f"{pair:<10} {int(row['count']):>7} {row['mean']:>+8.3f}R {rnd['expectancy']:>+10.3f}R "
+            f"{rnd['win_rate']:>9.1f}% {row['mean'] - rnd['expectancy']:>+7.3f}R"
+        )
+
+    lines.append("")
+    lines.append("Note: The random ledgers keep the real SL/TP geometry, so the difference")
+    lines.append("isolates entry timing (pivot + refinement logic), not the RR profile.")
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / f"{timeframe}_random_baseline_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    print("=" * 80)
+    print("RANDOM-ENTRY BASELINE")
+    print("=" * 80)
+    print(f"\nDraws per trade: {N_DRAWS:,}")
+    print(f"Timeframes: {', '.join(TIMEFRAMES)}")
+    print(f"Output: {OUTPUT_DIR}")
+
+    start_time = time.time()
+
+    print()
+    ledgers = load_ledgers()
+    pairs = set().union(*(set(df['pair']) for df in ledgers.values()))
+    print(f"Loading H1 data for {len(pairs)} pairs...")
+    h1 = load_h1(pairs)
+
+    for tf, df_full in ledgers.items():
+        null, df = run_baseline(tf, df_full, h1)
+        if null is not None:
+            write_report(tf, null, df)
+
+    print("\n" + "=" * 80)
+    print("RANDOM-ENTRY BASELINE COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {time.time() - start_time:.1f}s")
+    print(f"Output saved in: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
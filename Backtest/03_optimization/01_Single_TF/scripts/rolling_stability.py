@@ -0,0 +1,178 @@
+"""
+Rolling Stability - Smooth Performance / No Cliff Effects
+----------------------------------------------------------
+
+Rolling N-trade and N-month metrics (expectancy, win rate, SQN, drawdown in R)
+for every gap range of a coarse min x max grid at once
+(scripts/backtesting/rolling_metrics.py, one mask matrix per timeframe):
+- Stability per config: worst rolling window, share of negative windows,
+  spread of rolling expectancy
+- Cliff check: largest expectancy jump to a neighbouring grid cell
+  (STRATEGIE_VARIABLES.md: "Keine Cliff-Effekte")
+
+Output (08_Rolling_Stability/):
+- {TF}_results.parquet (one row per gap range: whole-period + rolling stability + cliff)
+- {TF}_rolling_stability_report.txt
+"""
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Repo root on path for the shared engine modules (scripts/backtesting)
+BASE_DIR = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(BASE_DIR))
+
+from scripts.backtesting.batch_stats import batch_stats, range_masks
+from scripts.backtesting.results_store import write_results
+from scripts.backtesting.rolling_metrics import rolling_months, rolling_trades, stability
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+
+# ========== CONFIGURATION ==========
+TIMEFRAMES = ["W", "3D", "M"]
+
+# Gap range grid (pips)
+MIN_VALUES = np.arange(0, 151, 25)
+MAX_VALUES = np.arange(200, 1001, 100)
+
+WINDOW_TRADES = 50       # Rolling N trades
+WINDOW_MONTHS = 12       # Rolling N months
+MIN_TRADES_MONTHS = 10   # Month windows with fewer trades are skipped
+MIN_TRADES = 50          # Same threshold as Phase A/B
+TOP_N = 15
+
+# Paths
+TRADES_DIR = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+OUTPUT_DIR = BASE_DIR / "Backtest" / "03_optimization" / "01_Single_TF" / "08_Rolling_Stability"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def neighbour_cliff(values):
+    """Largest |difference| to the 4 grid neighbours (min x max grid, NaN-aware)"""
+    padded = np.pad(values, 1, constant_values=np.nan)
+    centre = padded[1:-1, 1:-1]
+    diffs = [np.abs(centre - padded[1 + dy:padded.shape[0] - 1 + dy, 1 + dx:padded.shape[1] - 1 + dx])
+             for dy, dx in ((-1, 0), (1, 0), (0, -1), (0, 1))]
+    stacked = np.stack(diffs)
+    return np.where(np.isnan(stacked).all(axis=0), np.nan, np.nanmax(np.nan_to_num(stacked, nan=-np.inf), axis=0))
+
+
+def run_stability(timeframe):
+    """Whole-period + rolling stability for all grid ranges → results DataFrame or None"""
+    print(f"\n{'='*80}")
+    print(f"ROLLING STABILITY - TIMEFRAME: {timeframe}")
+    print(f"{'='*80}\n")
+
+    if not trades_source_exists(TRADES_DIR, timeframe):
+        print(f"ERROR: {TRADES_DIR / f'{timeframe}_trades.csv'} not found!")
+        return None
+
+    df, trades_source = load_trades(TRADES_DIR, timeframe)
+    print(f"Loaded {len(df)} baseline trades from {trades_source.name}")
+
+    grid_min, grid_max = np.meshgrid(MIN_VALUES, MAX_VALUES, indexing="ij")
+    bounds = np.column_stack([grid_min.ravel(), grid_max.ravel()])
+    masks = range_masks(df['gap_pips'], bounds)
+
+    t0 = time.perf_counter()
+    whole = batch_stats(df, masks, concurrency=False)
+    by_trades = stability(rolling_trades(df, masks, WINDOW_TRADES))
+    by_months = stability(rolling_months(df, masks, WINDOW_MONTHS, MIN_TRADES_MONTHS))
+    print(f"{len(bounds)} gap ranges x {len(df)} trades in {time.perf_counter() - t0:.2f}s")
+
+    table = pd.DataFrame({
+        'min_gap': bounds[:, 0],
+        'max_gap': bounds[:, 1],
+        'trades': whole['trades'],
+        'expectancy': whole['expectancy'],
+        'win_rate': whole['win_rate'],
+        'sqn': whole['sqn'],
+        'max_dd': whole['max_dd'],
+        **{f"t{WINDOW_TRADES}_{key}": value for key, value in by_trades.items()},
+        **{f"m{WINDOW_MONTHS}_{key}": value for key, value in by_months.items()},
+    })
+    expectancy = np.where(table['trades'] >= MIN_TRADES, table['expectancy'], np.nan).reshape(grid_min.shape)
+    table['expectancy_cliff'] = neighbour_cliff(expectancy).ravel()
+    return table
+
+
+def write_report(timeframe, table):
+    """Results table + text report (most stable ranges by worst month window)"""
+    meta = {'timeframe': timeframe, 'window_trades': WINDOW_TRADES, 'window_months': WINDOW_MONTHS,
+            'min_trades_months': MIN_TRADES_MONTHS, 'min_trades': MIN_TRADES}
+    write_results(OUTPUT_DIR, timeframe, table, meta)
+
+    m = f"m{WINDOW_MONTHS}"
+    t = f"t{WINDOW_TRADES}"
+    eligible = table[(table['trades'] >= MIN_TRADES) & (table[f'{m}_windows'] > 0)]
+    top = eligible.sort_values([f'{m}_min_expectancy', 'expectancy'], ascending=[False, False], kind="stable").head(TOP_N)
+
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"ROLLING STABILITY - {timeframe}")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"Gap ranges: {len(table)} ({len(eligible)} with >= {MIN_TRADES} trades)")
+    lines.append(f"Rolling windows: {WINDOW_TRADES} trades | {WINDOW_MONTHS} months (>= {MIN_TRADES_MONTHS} trades)")
+    lines.append("")
+
+    baseline = table.sort_values('trades', ascending=False).iloc[0]
+    lines.append(f"Widest range {baseline['min_gap']:.0f}-{baseline['max_gap']:.0f} pips: "
+                 f"Exp {baseline['expectancy']:+.3f}R, worst {WINDOW_MONTHS}M window {baseline[f'{m}_min_expectancy']:+.3f}R, "
+                 f"negative {WINDOW_MONTHS}M windows {baseline[f'{m}_neg_window_pct']:.0f}%")
+    lines.append("")
+
+    lines.append(f"TOP {len(top)} by worst {WINDOW_MONTHS}-month expectancy")
+    lines.append("")
+    lines.append(f"{'Gap Range':<12} {'Trades':>7} {'Exp(R)':>8} {'Worst' + str(WINDOW_MONTHS) + 'M':>9} {'Neg%':>6} "
+                 f"{'Std':>6} {'Worst' + str(WINDOW_TRADES) + 'T':>9} {'MinSQN':>7} {'DD(R)':>7} {'Cliff':>7}")
+    lines.append("-" * 100)
+    for row in top.to_dict('records'):
+        lines.append(
+            f"{row['min_gap']:>4.0f}-{row['max_gap']:<7.0f} {row['trades']:>7} {row['expectancy']:>+7.3f}R "
+            f"{row[f'{m}_min_expectancy']:>+8.3f}R {row[f'{m}_neg_window_pct']:>5.0f}% {row[f'{m}_expectancy_std']:>6.3f} "
+            f"{row[f'{t}_min_expectancy']:>+8.3f}R {row[f'{t}_min_sqn']:>7.2f} {row[f'{t}_worst_dd_r']:>+7.1f} "
+            f"{row['expectancy_cliff']:>7.3f}"
+        )
+
+    lines.append("")
+    lines.append(f"Neg% = share of negative {WINDOW_MONTHS}-month windows | DD(R) = deepest drawdown within a trade window")
+    lines.append("Cliff = largest expectancy jump (R) to a neighbouring min/max grid cell")
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / f"{timeframe}_rolling_stability_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    print("=" * 80)
+    print("ROLLING STABILITY ANALYSIS")
+    print("=" * 80)
+    print(f"\nGap grid: {len(MIN_VALUES)} x {len(MAX_VALUES)} ranges")
+    print(f"Timeframes: {', '.join(TIMEFRAMES)}")
+    print(f"Output: {OUTPUT_DIR}")
+
+    start_time = time.time()
+
+    for tf in TIMEFRAMES:
+        table = run_stability(tf)
+        if table is not None:
+            write_report(tf, table)
+
+    print("\n" + "=" * 80)
+    print("ROLLING STABILITY COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {time.time() - start_time:.1f}s")
+    print(f"Output saved in: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
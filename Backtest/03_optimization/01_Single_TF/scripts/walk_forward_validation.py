@@ -0,0 +1,214 @@
+"""
+Walk-Forward Validation - Gap Filter & Entry Confirmation
+----------------------------------------------------------
+
+Rolling 5y In-Sample / 1y Out-of-Sample windows (STRATEGIE_VARIABLES.md)
+on the existing trade ledgers (scripts/backtesting/walk_forward.py):
+pivots, refinements and trades are computed once for the full period,
+every window is a ledger slice + a parameter sweep.
+
+Studies:
+- gap_filter:         Phase A gap configurations on the Phase 2 trades
+- entry_confirmation: the 5 entry types (trades from optimize_entry_confirmation.py)
+
+Per window the best candidate (by SELECTION_METRIC, >= MIN_TRADES in-sample)
+is applied to the following OOS year; the OOS years are stitched into one
+out-of-sample track record.
+
+Output (04_Walk_Forward/):
+- {TF}_{study}_results.parquet (one row per window)
+- {TF}_{study}_report.txt
+"""
+
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Repo root on path for the shared engine modules (scripts/backtesting)
+BASE_DIR = Path(__file__).resolve().parents[4]
+sys.path.insert(0, str(BASE_DIR))
+
+from scripts.backtesting.batch_stats import range_masks
+from scripts.backtesting.results_store import read_results, write_results
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
+from scripts.backtesting.walk_forward import make_windows, run_walk_forward, walk_forward_efficiency
+
+from optimize_gap_size_A import generate_test_configs
+
+# ========== CONFIGURATION ==========
+TIMEFRAMES = ["W", "3D", "M"]
+STUDIES = ["gap_filter", "entry_confirmation"]
+ENTRY_TYPES = ["direct_touch", "1h_close_at_close", "1h_close_at_near", "4h_close_at_close", "4h_close_at_near"]
+
+# Windows
+IS_YEARS = 5
+OOS_YEARS = 1
+STEP_YEARS = 1
+
+# In-sample selection
+SELECTION_METRIC = "expectancy"
+MIN_TRADES = 50  # Same threshold as Phase A/B (per IS window)
+
+# Execution
+EXECUTOR = "thread"  # "thread", "process" or "serial" (scripts/backtesting/executors.py)
+WORKERS = None       # None = all CPU cores
+
+# Paths
+TRADES_DIR = BASE_DIR / "Backtest" / "02_technical" / "01_Single_TF" / "results" / "Trades"
+ENTRY_TRADES_DIR = BASE_DIR / "Backtest" / "03_optimization" / "01_Single_TF" / "02_Entry_Confirmation" / "Trades"
+OUTPUT_DIR = BASE_DIR / "Backtest" / "03_optimization" / "01_Single_TF" / "04_Walk_Forward"
+
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def load_gap_candidates(timeframe):
+    """Phase 2 trades + one mask per Phase A gap configuration"""
+    if not trades_source_exists(TRADES_DIR, timeframe):
+        print(f"ERROR: {TRADES_DIR / f'{timeframe}_trades.csv'} not found!")
+        return None, None, None
+
+    df, source = load_trades(TRADES_DIR, timeframe)
+    print(f"Loaded {len(df)} trades from {source.name}")
+    configs = generate_test_configs()
+    masks = range_masks(df['gap_pips'], [(lo, hi) for lo, hi, _ in configs])
+    labels = [desc for _, _, desc in configs]
+    return df, masks, labels
+
+
+def load_entry_candidates(timeframe):
+    """All entry-type ledgers of one HTF stacked + one mask per entry type"""
+    frames = []
+    for entry_type in ENTRY_TYPES:
+        csv_file = ENTRY_TRADES_DIR / f"{timeframe}_{entry_type}_trades.csv"
+        if not csv_file.exists():
+            print(f"ERROR: {csv_file} not found! Run optimize_entry_confirmation.py first.")
+            return None, None, None
+        frames.append(pd.read_csv(csv_file).assign(entry_type=entry_type))
+
+    df = pd.concat(frames, ignore_index=True)
+    print(f"Loaded {len(df)} trades ({len(ENTRY_TYPES)} entry types)")
+    masks = np.stack([df['entry_type'].to_numpy() == et for et in ENTRY_TYPES])
+    return df, masks, list(ENTRY_TYPES)
+
+
+def run_study(timeframe, study):
+    """Walk-forward of one study for one timeframe → (result, labels) or (None, None)"""
+    print(f"\n{'='*80}")
+    print(f"WALK-FORWARD - {study.upper()} - TIMEFRAME: {timeframe}")
+    print(f"{'='*80}\n")
+
+    loader = load_gap_candidates if study == "gap_filter" else load_entry_candidates
+    df, masks, labels = loader(timeframe)
+    if df is None or df.empty:
+        return None
+
+    windows = make_windows(df['entry_time'], IS_YEARS, OOS_YEARS, STEP_YEARS)
+    if not windows:
+        print(f"Not enough history for {IS_YEARS}y IS + {OOS_YEARS}y OOS")
+        return None
+
+    t0 = time.perf_counter()
+    result = run_walk_forward(
+        df, masks, labels, windows,
+        metric=SELECTION_METRIC, min_trades=MIN_TRADES, executor=EXECUTOR, workers=WORKERS,
+    )
+    print(f"{len(windows)} windows x {len(labels)} candidates in {time.perf_counter() - t0:.2f}s")
+    return result
+
+
+def write_report(timeframe, study, result):
+    """Results table (one row per window) + text report generated from it"""
+    meta = {
+        'study': study, 'timeframe': timeframe, 'is_years': IS_YEARS, 'oos_years': OOS_YEARS,
+        'step_years': STEP_YEARS, 'metric': SELECTION_METRIC, 'min_trades': MIN_TRADES,
+        'stitched': result.stitched,
+    }
+    name = f"{timeframe}_{study}"
+    write_results(OUTPUT_DIR, name, result.windows, meta)
+    table = read_results(OUTPUT_DIR, name)
+    stitched = result.stitched
+
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"WALK-FORWARD VALIDATION - {study.upper()} - {timeframe}")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"Windows: {len(table)} ({IS_YEARS}y IS / {OOS_YEARS}y OOS, step {STEP_YEARS}y)")
+    lines.append(f"Selection: best {SELECTION_METRIC} in-sample (>= {MIN_TRADES} trades)")
+    lines.append("")
+    lines.append(f"{'OOS Year':<10} {'Selected':<24} {'IS Trd':>7} {'IS Exp':>8} {'OOS Trd':>8} {'OOS Exp':>8} {'OOS WR':>7} {'OOS CumR':>9}")
+    lines.append("-" * 100)
+
+    for row in table.to_dict('records'):
+        oos_label = f"{row['oos_start']:%Y}"
+        if row['candidate'] < 0:
+            lines.append(f"{oos_label:<10} {'(no candidate)':<24}")
+            continue
+        lines.append(
+            f"{oos_label:<10} {str(row['label'])[:24]:<24} {row['is_trades']:>7} {row['is_expectancy']:>+7.3f}R "
+            f"{row['oos_trades']:>8} {row['oos_expectancy']:>+7.3f}R {row['oos_win_rate']:>6.1f}% {row['oos_cumulative_r']:>+8.1f}R"
+        )
+
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("STITCHED OUT-OF-SAMPLE PERFORMANCE")
+    lines.append("=" * 100)
+    lines.append("")
+    lines.append(f"  Trades:           {stitched['trades']}")
+    lines.append(f"  Expectancy:       {stitched['expectancy']:+.3f}R")
+    lines.append(f"  Win Rate:         {stitched['win_rate']:5.1f}%")
+    lines.append(f"  SQN:              {stitched['sqn']:5.2f}")
+    lines.append(f"  Profit Factor:    {stitched['profit_factor']:5.2f}")
+    lines.append(f"  Max DD:           {stitched['max_dd']:+6.1f}%")
+    lines.append(f"  Cumulative R:     {stitched['cumulative_r']:+.1f}R")
+    lines.append(f"  WF Efficiency:    {walk_forward_efficiency(result, SELECTION_METRIC):.2f} (avg OOS / avg IS {SELECTION_METRIC})")
+
+    selected = table.loc[table['candidate'] >= 0, 'label'].value_counts()
+    if len(selected):
+        lines.append("")
+        lines.append("Selected configurations (windows):")
+        for label, count in selected.items():
+            lines.append(f"  {label:<30} {count:>3}")
+
+    lines.append("")
+    lines.append("Note: Positive and stable OOS performance is required (STRATEGIE_VARIABLES.md);")
+    lines.append("frequent switches between configurations indicate an unstable optimum.")
+    lines.append("")
+    lines.append("=" * 100)
+    lines.append("END OF REPORT")
+    lines.append("=" * 100)
+
+    report_file = OUTPUT_DIR / f"{name}_report.txt"
+    report_file.write_text("\n".join(lines), encoding='utf-8')
+    print(f"  [OK] Report: {report_file.name}")
+
+
+def main():
+    """Main execution."""
+    print("=" * 80)
+    print("WALK-FORWARD VALIDATION")
+    print("=" * 80)
+    print(f"\nWindows: {IS_YEARS}y IS / {OOS_YEARS}y OOS (step {STEP_YEARS}y)")
+    print(f"Studies: {', '.join(STUDIES)}")
+    print(f"Timeframes: {', '.join(TIMEFRAMES)}")
+    print(f"Output: {OUTPUT_DIR}")
+
+    start_time = time.time()
+
+    for tf in TIMEFRAMES:
+        for study in STUDIES:
+            result = run_study(tf, study)
+            if result is not None:
+                write_report(tf, study, result)
+
+    print("\n" + "=" * 80)
+    print("WALK-FORWARD COMPLETE")
+    print("=" * 80)
+    print(f"\nTotal Runtime: {time.time() - start_time:.1f}s")
+    print(f"Output saved in: {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
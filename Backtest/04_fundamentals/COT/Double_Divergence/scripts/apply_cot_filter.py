@@ -11,10 +11,16 @@ Author: Claude
 Date: 2025-12-31
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import Dict, Tuple
+
+# Repo root for shared engine modules (scripts/backtesting)
+sys.path.insert(0, str(Path(__file__).resolve().parents[5]))
+from scripts.backtesting import kernels
+from scripts.backtesting.trade_store import load_trades, trades_source_exists
 from cot_double_divergence import COTDoubleDivergence
 
 
@@ -80,38 +86,11 @@ class COTTradeFilter:
         - Countdown decreases each week
         """
         df = df.copy()
-        df['Bias'] = 'neutral'
-        df['Countdown'] = 0
-
-        bias_type = ''
-        countdown = 0
-
-        for idx in df.index:
-            div = df.loc[idx, 'DoubleDivergence']
+        div = df['DoubleDivergence'].to_numpy(dtype=float)
 
-            # Skip if divergence is NaN
-            if pd.isna(div):
-                df.loc[idx, 'Bias'] = 'neutral'
-                df.loc[idx, 'Countdown'] = 0
-                continue
-
-            # Check for new signal (only when countdown = 0)
-            if countdown == 0:
-                if div >= threshold:
-                    bias_type = 'long'
-                    countdown = duration
-                elif div <= -threshold:
-                    bias_type = 'short'
-                    countdown = duration
-
-            # Apply current bias and countdown
-            if countdown > 0:
-                df.loc[idx, 'Bias'] = bias_type
-                df.loc[idx, 'Countdown'] = countdown
-                countdown -= 1
-            else:
-                df.loc[idx, 'Bias'] = 'neutral'
-                df.loc[idx, 'Countdown'] = 0
+        bias, countdown = kernels.bias_countdown(div, threshold, duration)
+        df['Bias'] = kernels.bias_labels(bias)
+        df['Countdown'] = countdown
 
         return df
 
@@ -127,27 +106,11 @@ class COTTradeFilter:
         - Neutral only at start before first signal
         """
         df = df.copy()
-        df['Bias'] = 'neutral'
-        df['Countdown'] = 0  # Not used, but keep for consistency
-
-        current_bias = 'neutral'
-
-        for idx in df.index:
-            div = df.loc[idx, 'DoubleDivergence']
-
-            # Skip if divergence is NaN
-            if pd.isna(div):
-                df.loc[idx, 'Bias'] = current_bias
-                continue
+        div = df['DoubleDivergence'].to_numpy(dtype=float)
 
-            # Check for signal change
-            if div >= threshold:
-                current_bias = 'long'
-            elif div <= -threshold:
-                current_bias = 'short'
-            # Else: Keep current bias (forward-fill)
-
-            df.loc[idx, 'Bias'] = current_bias
+        # NaN weeks keep the current bias (forward-fill)
+        df['Bias'] = kernels.bias_labels(kernels.bias_signal_to_signal(div, threshold))
+        df['Countdown'] = 0  # Not used, but keep for consistency
 
         return df
 
@@ -163,38 +126,11 @@ class COTTradeFilter:
         - Neutral when no signal or after zero crossing
         """
         df = df.copy()
-        df['Bias'] = 'neutral'
-        df['Countdown'] = 0  # Not used, but keep for consistency
+        div = df['DoubleDivergence'].to_numpy(dtype=float)
 
-        current_bias = 'neutral'
-        prev_div = None
-
-        for idx in df.index:
-            div = df.loc[idx, 'DoubleDivergence']
-
-            # Skip if divergence is NaN
-            if pd.isna(div):
-                df.loc[idx, 'Bias'] = 'neutral'
-                current_bias = 'neutral'
-                prev_div = None
-                continue
-
-            # Check for zero crossing (bias exit)
-            if prev_div is not None:
-                if current_bias == 'long' and div < 0:
-                    current_bias = 'neutral'
-                elif current_bias == 'short' and div > 0:
-                    current_bias = 'neutral'
-
-            # Check for new signal (only when neutral)
-            if current_bias == 'neutral':
-                if div >= threshold:
-                    current_bias = 'long'
-                elif div <= -threshold:
-                    current_bias = 'short'
-
-            df.loc[idx, 'Bias'] = current_bias
-            prev_div = div
+        # NaN weeks reset to neutral (no zero-crossing check across gaps)
+        df['Bias'] = kernels.bias_labels(kernels.bias_zero_exit(div, threshold))
+        df['Countdown'] = 0  # Not used, but keep for consistency
 
         return df
 
@@ -309,14 +245,12 @@ class COTTradeFilter:
             print(f"Processing Timeframe: {tf}")
             print(f"{'='*80}\n")
 
-            # Load Phase 2 trades (no longer separate pure/conservative)
-            trade_file = phase2_dir / f"{tf}_trades.csv"
-
-            if not trade_file.exists():
-                print(f"  ⚠ Warning: {trade_file} not found - skipping")
+            # Load Phase 2 trades (Parquet dataset if present, else CSV)
+            if not trades_source_exists(phase2_dir, tf):
+                print(f"  ⚠ Warning: {phase2_dir / f'{tf}_trades.csv'} not found - skipping")
                 continue
 
-            trades_original = pd.read_csv(trade_file)
+            trades_original, _ = load_trades(phase2_dir, tf)
             original_count = len(trades_original)
 
             print(f"  Original Trades (Phase 2): {original_count}")
@@ -14,11 +14,16 @@ Author: Claude
 Date: 2025-12-31
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import Dict
 
+# Repo root for shared engine modules (scripts/backtesting)
+sys.path.insert(0, str(Path(__file__).resolve().parents[5]))
+from scripts.backtesting import kernels
+
 
 class COTDoubleDivergence:
     """
@@ -188,38 +193,10 @@ class COTDoubleDivergence:
         Returns:
             DataFrame with added Bias and Countdown columns
         """
-        df['Bias'] = 'neutral'
-        df['Countdown'] = 0
-
-        bias_type = ''
-        countdown = 0
-
-        for i in range(len(df)):
-            div = df.loc[df.index[i], 'DoubleDivergence']
-
-            # Skip if divergence is NaN
-            if pd.isna(div):
-                df.loc[df.index[i], 'Bias'] = 'neutral'
-                df.loc[df.index[i], 'Countdown'] = 0
-                continue
-
-            # Check for new signal (only when countdown = 0)
-            if countdown == 0:
-                if div >= threshold:
-                    bias_type = 'long'
-                    countdown = duration
-                elif div <= -threshold:
-                    bias_type = 'short'
-                    countdown = duration
-
-            # Apply current bias and countdown
-            if countdown > 0:
-                df.loc[df.index[i], 'Bias'] = bias_type
-                df.loc[df.index[i], 'Countdown'] = countdown
-                countdown -= 1
-            else:
-                df.loc[df.index[i], 'Bias'] = 'neutral'
-                df.loc[df.index[i], 'Countdown'] = 0
+        # State machine runs as array kernel (numba if available)
+        bias, countdown = kernels.bias_countdown(df['DoubleDivergence'].to_numpy(dtype=float), threshold, duration)
+        df['Bias'] = kernels.bias_labels(bias)
+        df['Countdown'] = countdown
 
         return df
 
@@ -10,11 +10,10 @@ Date: 2025-12-31
 import sys
 from pathlib import Path
 
-# Add Phase 2 scripts to path to import calc_stats
-phase2_scripts = Path(__file__).resolve().parents[4] / "02_technical" / "01_Single_TF" / "scripts"
-sys.path.insert(0, str(phase2_scripts))
+# Repo root on path for the shared engine modules (scripts/backtesting)
+sys.path.insert(0, str(Path(__file__).resolve().parents[5]))
 
-from report_helpers import calc_stats
+from scripts.backtesting.stats import calc_stats
 
 import pandas as pd
 import numpy as np
@@ -16,11 +16,18 @@ from __future__ import annotations
 import argparse
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+try:
+    from scripts.backtesting.executors import make_executor
+    from scripts.backtesting.ledger import TradeLedger
+except ImportError:  # direkter Aufruf als Skript (python scripts/backtesting/backtest_model3.py)
+    from executors import make_executor
+    from ledger import TradeLedger
+
 
 # --------------------------------------------------------------------------- #
 # Utilities
@@ -43,10 +50,18 @@ def body_pct(row: pd.Series) -> float:
     return (body / rng) * 100.0
 
 
-def load_tf_data(timeframe: str, pair: str) -> pd.DataFrame:
-    """Lädt Parquet-Daten für ein Pair/TF (UTC Parquet)."""
+ALL_TIMEFRAMES = ["M", "W", "3D", "D", "H4", "H1"]
+
+
+def tf_path(timeframe: str) -> Path:
+    """Parquet-Datei eines TF (alle Pairs)."""
     base = Path(__file__).parent.parent.parent.parent / "Data" / "Chartdata" / "Forex" / "Parquet"
-    path = base / f"All_Pairs_{timeframe}_UTC.parquet"
+    return base / f"All_Pairs_{timeframe}_UTC.parquet"
+
+
+def _read_tf_file(timeframe: str, pair: Optional[str] = None) -> pd.DataFrame:
+    """Liest die Parquet-Datei eines TF (optional nur ein Pair) mit normalisierter Zeit-/Preisspalte."""
+    path = tf_path(timeframe)
     if not path.exists():
         raise FileNotFoundError(f"Fehlende Daten: {path}")
     df = pd.read_parquet(path)
@@ -63,7 +78,8 @@ def load_tf_data(timeframe: str, pair: str) -> pd.DataFrame:
 
     if "pair" not in df.columns:
         raise KeyError(f"'pair' Spalte fehlt in {path}")
-    df = df[df["pair"] == pair].copy()
+    if pair is not None:
+        df = df[df["pair"] == pair].copy()
 
     # Zeitspalte finden
     time_col = None
@@ -86,9 +102,37 @@ def load_tf_data(timeframe: str, pair: str) -> pd.DataFrame:
         if col in df.columns:
             df[col] = df[col].round(5)
 
+    return df
+
+
+def load_tf_data(timeframe: str, pair: str) -> pd.DataFrame:
+    """Lädt Parquet-Daten für ein Pair/TF (UTC Parquet)."""
+    df = _read_tf_file(timeframe, pair)
     return df.sort_values("time").reset_index(drop=True)
 
 
+def load_pair_data(pair: str, timeframes: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """Lädt alle TFs eines Pairs: {tf: DataFrame}."""
+    return {tf: load_tf_data(tf, pair) for tf in (timeframes or ALL_TIMEFRAMES)}
+
+
+def build_data_store(pairs: List[str], timeframes: Optional[List[str]] = None) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Lädt jede TF-Datei genau EINMAL und teilt sie nach Pairs auf.
+
+    Returns: {pair: {tf: DataFrame}} – identisch zu load_pair_data je Pair,
+    aber ohne 6 × len(pairs) Parquet-Reads.
+    """
+    store: Dict[str, Dict[str, pd.DataFrame]] = {pair: {} for pair in pairs}
+    for tf in timeframes or ALL_TIMEFRAMES:
+        df_all = _read_tf_file(tf)
+        groups = {pair: df for pair, df in df_all.groupby("pair", sort=False)}
+        for pair in pairs:
+            df = groups.get(pair, df_all.iloc[0:0])
+            store[pair][tf] = df.sort_values("time").reset_index(drop=True)
+    return store
+
+
 # --------------------------------------------------------------------------- #
 # Datenklassen
 # --------------------------------------------------------------------------- #
@@ -550,7 +594,7 @@ def should_use_wick_diff_entry(pivot: Pivot, refinements: List) -> Tuple[bool, O
 
 
 def compute_sl_tp(
-    direction: str, entry: float, pivot: Pivot, pair: str
+    direction: str, entry: float, pivot: Pivot, pair: str, min_sl_pips: float = 60.0
 ) -> Optional[Tuple[float, float, float]]:
     gap = pivot.gap_size
     fib0 = pivot.pivot
@@ -559,8 +603,8 @@ def compute_sl_tp(
     if direction == "bullish":
         tp = fib0 + gap  # Fib -1 über Pivot
         fib11 = fib1 - 0.1 * gap  # Fib 1.1 unter Extreme
-        min_sl_from_entry = entry - 60 * price_per_pip(pair)
-        # SL muss BEIDE Bedingungen erfüllen: >= 60 Pips von Entry UND unter Fib 1.1
+        min_sl_from_entry = entry - min_sl_pips * price_per_pip(pair)
+        # SL muss BEIDE Bedingungen erfüllen: >= min_sl_pips (Standard 60) von Entry UND unter Fib 1.1
         sl = min(fib11, min_sl_from_entry)
         # Falls SL zu nah am Entry (sollte nicht passieren), auf Min. 60 Pips setzen
         if sl >= entry:
@@ -568,8 +612,8 @@ def compute_sl_tp(
     else:
         tp = fib0 - gap  # Fib -1 unter Pivot
         fib11 = fib1 + 0.1 * gap  # Fib 1.1 über Extreme
-        min_sl_from_entry = entry + 60 * price_per_pip(pair)
-        # SL muss BEIDE Bedingungen erfüllen: >= 60 Pips von Entry UND über Fib 1.1
+        min_sl_from_entry = entry + min_sl_pips * price_per_pip(pair)
+        # SL muss BEIDE Bedingungen erfüllen: >= min_sl_pips (Standard 60) von Entry UND über Fib 1.1
         sl = max(fib11, min_sl_from_entry)
         # Falls SL zu nah am Entry (sollte nicht passieren), auf Min. 60 Pips setzen
         if sl <= entry:
@@ -604,68 +648,108 @@ def compute_sl_tp(
 # --------------------------------------------------------------------------- #
 
 
+ProgressCallback = Callable[[str, int, int, int], None]
+
+
 class Model3Backtester:
     def __init__(self, pairs: List[str], htf_timeframes: List[str] = None, entry_confirmation: str = "direct_touch", max_pivots_per_pair: int = None):
         self.pairs = pairs
         self.htf_timeframes = htf_timeframes or ["3D", "W", "M"]
         self.entry_confirmation = entry_confirmation  # "direct_touch" (Standard), "1h_close", "4h_close"
         self.max_pivots_per_pair = max_pivots_per_pair  # Limitiere Pivots für schnellere Validation
-        self.trades: List[Trade] = []
-
-    def run(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
-        for pair in self.pairs:
-            print(f"\n=== {pair} ===")
-
-            # Cache alle TFs (HTF + LTF)
-            print("  Lade Daten...")
-            cache = {
-                "H1": load_tf_data("H1", pair),
-                "H4": load_tf_data("H4", pair),
-                "D": load_tf_data("D", pair),
-                "3D": load_tf_data("3D", pair),
-                "W": load_tf_data("W", pair),
-                "M": load_tf_data("M", pair),
-            }
-
-            # Entry-Simulation auf H1
-            h1_df = cache["H1"]
-
-            # OPTIMIERUNG: Filtere H1-Daten sofort wenn start_date gesetzt
-            if start_date:
-                start_ts = pd.Timestamp(start_date, tz="UTC")
-                h1_df = h1_df[h1_df["time"] >= start_ts].copy()
-                print(f"  H1-Daten gefiltert: {len(h1_df)} Kerzen ab {start_date}")
-            if end_date:
-                end_ts = pd.Timestamp(end_date, tz="UTC")
-                h1_df = h1_df[h1_df["time"] <= end_ts].copy()
+        self.trades = TradeLedger()  # Zeilen: ledger[i].pnl_r usw. (Felder wie Trade.to_dict)
+
+    def run(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        executor: str = "serial",
+        workers: Optional[int] = None,
+        data_store: Optional[Dict[str, Dict[str, pd.DataFrame]]] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> pd.DataFrame:
+        """
+        Backtest über alle Pairs.
+
+        Args:
+            executor: "serial" (Default), "thread" oder "process" – Pairs laufen parallel
+            workers: Anzahl Worker (None = alle CPU-Kerne)
+            data_store: vorab geladene Daten {pair: {tf: DataFrame}} (siehe build_data_store);
+                        ohne Store lädt jeder Worker seine Pairs selbst
+            progress: Callback progress(pair, completed, total, n_trades), im Hauptprozess
+                      nach jedem fertigen Pair aufgerufen (z.B. print_progress)
+        """
+        tasks = [
+            (
+                pair,
+                self.htf_timeframes,
+                self.entry_confirmation,
+                self.max_pivots_per_pair,
+                start_date,
+                end_date,
+                data_store.get(pair) if data_store is not None else None,
+            )
+            for pair in self.pairs
+        ]
 
-            # Für jeden HTF-Timeframe Pivots finden
-            for htf_tf in self.htf_timeframes:
-                print(f"  {htf_tf} Pivots:")
-                htf_df = cache[htf_tf].copy()
+        results: Dict[str, TradeLedger] = {}
+        with make_executor(executor, workers) as pool:
+            for pair, trades in pool.imap_unordered(_run_pair_task, tasks):
+                results[pair] = trades
+                if progress is not None:
+                    progress(pair, len(results), len(tasks), len(trades))
+
+        # Reihenfolge wie sequentiell: Pair → HTF → Pivot
+        self.trades = TradeLedger.concat(results.get(pair) for pair in self.pairs)
+        return self.trades.to_pandas(categorical=False)
+
+    def run_pair(
+        self,
+        pair: str,
+        cache: Dict[str, pd.DataFrame],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> TradeLedger:
+        """Alle HTF-Pivots eines Pairs. cache: {tf: DataFrame} mit HTF + LTF (siehe load_pair_data)."""
+        trades = TradeLedger()
+
+        # Entry-Simulation auf H1
+        h1_df = cache["H1"]
+
+        # OPTIMIERUNG: Filtere H1-Daten sofort wenn start_date gesetzt
+        if start_date:
+            start_ts = pd.Timestamp(start_date, tz="UTC")
+            h1_df = h1_df[h1_df["time"] >= start_ts].copy()
+        if end_date:
+            end_ts = pd.Timestamp(end_date, tz="UTC")
+            h1_df = h1_df[h1_df["time"] <= end_ts].copy()
+
+        # Für jeden HTF-Timeframe Pivots finden
+        for htf_tf in self.htf_timeframes:
+            htf_df = cache[htf_tf].copy()
 
-                if start_date:
-                    htf_df = htf_df[htf_df["time"] >= pd.Timestamp(start_date, tz="UTC")]
-                if end_date:
-                    htf_df = htf_df[htf_df["time"] <= pd.Timestamp(end_date, tz="UTC")]
+            if start_date:
+                htf_df = htf_df[htf_df["time"] >= pd.Timestamp(start_date, tz="UTC")]
+            if end_date:
+                htf_df = htf_df[htf_df["time"] <= pd.Timestamp(end_date, tz="UTC")]
 
-                htf_pivots = detect_htf_pivots(htf_df, min_body_pct=5.0)
-                print(f"    {len(htf_pivots)} gefunden")
+            htf_pivots = detect_htf_pivots(htf_df, min_body_pct=5.0)
 
-                # Limitiere Pivot-Anzahl für Validation (zufälliges Sampling)
-                if self.max_pivots_per_pair and len(htf_pivots) > self.max_pivots_per_pair:
-                    import random
-                    htf_pivots = random.sample(htf_pivots, self.max_pivots_per_pair)
-                    print(f"    -> {len(htf_pivots)} zufaellig ausgewaehlt (Validation-Modus)")
+            # Limitiere Pivot-Anzahl für Validation (zufälliges Sampling)
+            if self.max_pivots_per_pair and len(htf_pivots) > self.max_pivots_per_pair:
+                import random
+                htf_pivots = random.sample(htf_pivots, self.max_pivots_per_pair)
 
-                for i, pivot in enumerate(htf_pivots, 1):
-                    print(f"    Prozessiere Pivot {i}/{len(htf_pivots)}...", end="\r")
-                    self._process_pivot(pair, htf_tf, pivot, cache, h1_df)
-                print()  # Neue Zeile nach Progress
+            for pivot in htf_pivots:
+                trade = self._process_pivot(pair, htf_tf, pivot, cache, h1_df)
+                if trade is not None:
+                    trades.append(trade.to_dict())
 
-        return pd.DataFrame([t.to_dict() for t in self.trades])
+        return trades
 
-    def _process_pivot(self, pair: str, htf_tf: str, pivot: Pivot, cache: Dict[str, pd.DataFrame], h1_df: pd.DataFrame):
+    def _process_pivot(
+        self, pair: str, htf_tf: str, pivot: Pivot, cache: Dict[str, pd.DataFrame], h1_df: pd.DataFrame
+    ) -> Optional[Trade]:
         # Refinements sammeln - nur auf TFs unter dem HTF-Pivot
         refinements: List[Refinement] = []
         # TF-Hierarchie: M > W > 3D > D > H4 > H1
@@ -901,10 +985,8 @@ class Model3Backtester:
 
                     # Simulate Trade ab nächster Candle
                     # h1_from_gap hat eigenen Index, also idx+1 verwenden
-                    exit_info = self._simulate_trade(h1_from_gap, idx + 1, trade)
-                    if exit_info:
-                        self.trades.append(exit_info)
-                    return  # Trade erstellt, fertig
+                    # Trade erstellt, fertig (None falls kein Exit)
+                    return self._simulate_trade(h1_from_gap, idx + 1, trade)
 
     def _simulate_trade(self, h1_after: pd.DataFrame, start_idx: int, trade: Trade) -> Optional[Trade]:
         for i in range(start_idx, len(h1_after)):
@@ -944,6 +1026,20 @@ class Model3Backtester:
         return None
 
 
+def _run_pair_task(args) -> Tuple[str, TradeLedger]:
+    """Executor-Worker: ein Pair komplett (lädt die Daten selbst, falls kein Store übergeben)."""
+    pair, htf_timeframes, entry_confirmation, max_pivots, start_date, end_date, cache = args
+    if cache is None:
+        cache = load_pair_data(pair)
+    bt = Model3Backtester([pair], htf_timeframes, entry_confirmation, max_pivots)
+    return pair, bt.run_pair(pair, cache, start_date, end_date)
+
+
+def print_progress(pair: str, completed: int, total: int, n_trades: int) -> None:
+    """Standard-Progress-Callback für Model3Backtester.run."""
+    print(f"  [{completed:2d}/{total}] {pair}: {n_trades} Trades")
+
+
 # --------------------------------------------------------------------------- #
 # CLI
 # --------------------------------------------------------------------------- #
@@ -1002,10 +1098,26 @@ def main():
     parser.add_argument("--start-date", type=str, default=None, help="YYYY-MM-DD")
     parser.add_argument("--end-date", type=str, default=None, help="YYYY-MM-DD")
     parser.add_argument("--output", type=str, default=None, help="Pfad für CSV-Export")
+    parser.add_argument(
+        "--executor",
+        type=str,
+        default="serial",
+        choices=["serial", "thread", "process"],
+        help="Pairs parallel verarbeiten: serial (default), thread, process",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Worker (default: alle CPU-Kerne)")
     args = parser.parse_args()
 
     bt = Model3Backtester(pairs=args.pairs, htf_timeframes=args.htf_timeframes, entry_confirmation=args.entry_confirmation)
-    results = bt.run(start_date=args.start_date, end_date=args.end_date)
+    data_store = build_data_store(args.pairs)
+    results = bt.run(
+        start_date=args.start_date,
+        end_date=args.end_date,
+        executor=args.executor,
+        workers=args.workers,
+        data_store=data_store,
+        progress=print_progress,
+    )
 
     print(f"\nTrades: {len(results)}")
     if len(results) > 0:
@@ -0,0 +1,171 @@
+"""
+Model 3 Batch-Statistiken
+-------------------------
+
+Kennzahlen für viele Trade-Teilmengen eines Ledgers in einem Durchgang:
+statt calc_stats(df_filtered) pro Filter-Konfiguration (Kopie, Datums-
+Parsing, Equity-Schleife, Gruppierung) wird eine Maskenmatrix
+(Konfigurationen × Trades) mit Matrix-Operationen ausgewertet.
+
+Gleiche Definitionen wie stats.calc_stats:
+- expectancy / win_rate / profit_factor / cumulative_r aus pnl_r
+- sqn    = expectancy / std(ddof=1) * sqrt(n)
+- sharpe = expectancy / std(ddof=1) * sqrt(trades_per_year)
+  (Jahre = Tage zwischen erstem und letztem Entry / 365.25, mindestens 1)
+- max_dd = minimaler Drawdown (%) der Equity-Kurve start_cap + r * start_cap * risk
+  (Trades in Ledger-Reihenfolge)
+- Dauer (Tage) und Gleichzeitigkeit (andere offene Trades beim Entry)
+
+Beispiel:
+    masks = range_masks(df["gap_pips"], [(0, 9999), (50, 300)])
+    stats = batch_stats(df, masks)
+    stats["expectancy"][1]
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400 * 10**9
+
+
+def _time_ns(values) -> np.ndarray:
+    """Zeitspalte → int64 ns UTC (naive Zeiten gelten als UTC)."""
+    if isinstance(values, np.ndarray) and values.dtype == np.int64:
+        return values
+    dt = pd.DatetimeIndex(pd.to_datetime(values)).as_unit("ns")
+    if dt.tz is not None:
+        dt = dt.tz_convert("UTC").tz_localize(None)
+    return dt.asi8
+
+
+def trade_arrays(trades) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(pnl_r, entry_ns, exit_ns) aus DataFrame oder TradeLedger."""
+    if hasattr(trades, "column"):  # TradeLedger
+        return trades.column("pnl_r").astype(np.float64), trades.column("entry_time"), trades.column("exit_time")
+    return (
+        trades["pnl_r"].to_numpy(dtype=np.float64),
+        _time_ns(trades["entry_time"]),
+        _time_ns(trades["exit_time"]),
+    )
+
+
+def range_masks(values, bounds: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """Maskenmatrix (len(bounds) × n): lo <= values <= hi je (lo, hi)."""
+    v = np.asarray(values, dtype=np.float64)
+    b = np.asarray(bounds, dtype=np.float64).reshape(-1, 2)
+    return (v[None, :] >= b[:, :1]) & (v[None, :] <= b[:, 1:])
+
+
+def concurrent_counts(entry_ns: np.ndarray, exit_ns: np.ndarray) -> np.ndarray:
+    """Andere offene Trades beim Entry (entry_j <= entry_i <= exit_j), Sweep-Line O(n log n)."""
+    nat = np.iinfo(np.int64).min
+    entry_ok = entry_ns != nat
+    open_ok = entry_ok & (exit_ns != nat) & (exit_ns >= entry_ns)
+    entries_sorted = np.sort(entry_ns[open_ok])
+    exits_sorted = np.sort(exit_ns[open_ok])
+    counts = (
+        np.searchsorted(entries_sorted, entry_ns, side="right")
+        - np.searchsorted(exits_sorted, entry_ns, side="left")
+        - open_ok
+    )
+    counts[~entry_ok] = 0
+    return counts.astype(np.int64)
+
+
+def batch_stats(
+    trades,
+    masks: np.ndarray,
+    start_cap: float = 100000,
+    risk: float = 0.01,
+    concurrency: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    Kennzahlen je Zeile der Maskenmatrix.
+
+    Args:
+        trades: DataFrame (pnl_r, entry_time, exit_time) oder TradeLedger
+        masks: bool-Matrix (Konfigurationen × Trades) bzw. 1D-Maske
+        concurrency: avg/max_concurrent berechnen (Sweep-Line je Konfiguration)
+
+    Returns:
+        {kennzahl: np.ndarray (eine Zahl je Konfiguration)} – leere Teilmengen
+        liefern trades = 0 und NaN bzw. 0 für die übrigen Kennzahlen
+    """
+    pnl, entry_ns, exit_ns = trade_arrays(trades)
+    m = np.atleast_2d(np.asarray(masks, dtype=bool))
+    mf = m.astype(np.float64)
+
+    n = m.sum(axis=1)
+    nf = n.astype(np.float64)
+    has = n > 0
+    safe_n = np.where(has, nf, 1.0)
+
+    # ---- R-Kennzahlen ---- #
+    r = np.where(m, pnl[None, :], 0.0)
+    wins = m & (pnl[None, :] > 0)
+    sum_r = r.sum(axis=1)
+    sum_wins = np.where(wins, pnl[None, :], 0.0).sum(axis=1)
+    sum_losses = np.abs(np.where(m & ~wins, pnl[None, :], 0.0).sum(axis=1))
+    win_count = wins.sum(axis=1)
+
+    expectancy = np.where(has, sum_r / safe_n, np.nan)
+    win_rate = np.where(has, win_count / safe_n * 100, 0.0)
+    profit_factor = np.divide(sum_wins, sum_losses, out=np.zeros_like(sum_wins), where=sum_losses > 0)
+
+    dev = np.where(m, pnl[None, :] - np.nan_to_num(expectancy)[:, None], 0.0)
+    var = np.divide((dev * dev).sum(axis=1), nf - 1, out=np.zeros_like(nf), where=n > 1)
+    std_r = np.sqrt(var)
+    ratio = np.divide(np.nan_to_num(expectancy), std_r, out=np.zeros_like(std_r), where=std_r > 0)
+    sqn = ratio * np.sqrt(nf)
+
+    # ---- Zeitraum ---- #
+    big, small = np.iinfo(np.int64).max, np.iinfo(np.int64).min
+    first_entry = np.where(m, entry_ns[None, :], big).min(axis=1)
+    last_entry = np.where(m, entry_ns[None, :], small).max(axis=1)
+    days = np.where(has, (last_entry - first_entry) // NS_PER_DAY, 0)
+    years = np.where(days > 0, days / 365.25, 1.0)
+    sharpe = ratio * np.sqrt(nf / years)
+
+    # ---- Equity / Drawdown (sequentiell wie calc_stats: start + Σ r·start·risk) ---- #
+    steps = r * (start_cap * risk)
+    equity = np.cumsum(np.concatenate([np.full((len(m), 1), float(start_cap)), steps], axis=1), axis=1)
+    peak = np.maximum.accumulate(equity, axis=1)
+    max_dd = ((equity - peak) / peak * 100).min(axis=1)
+
+    # ---- Dauer ---- #
+    duration_hours = (exit_ns - entry_ns) / 1e9 / 3600
+    avg_duration = np.where(has, (mf @ duration_hours) / safe_n / 24, np.nan)
+    min_duration = np.where(has, np.where(m, duration_hours[None, :], np.inf).min(axis=1) / 24, np.nan)
+    max_duration = np.where(has, np.where(m, duration_hours[None, :], -np.inf).max(axis=1) / 24, np.nan)
+
+    out = {
+        "trades": n,
+        "win_rate": win_rate,
+        "expectancy": expectancy,
+        "std_r": std_r,
+        "sqn": sqn,
+        "sharpe": sharpe,
+        "profit_factor": profit_factor,
+        "cumulative_r": sum_r,
+        "max_dd": max_dd,
+        "avg_duration_days": avg_duration,
+        "min_duration_days": min_duration,
+        "max_duration_days": max_duration,
+    }
+
+    # ---- Gleichzeitigkeit (hängt von der Teilmenge ab → je Konfiguration) ---- #
+    if concurrency:
+        avg_conc = np.zeros(len(m))
+        max_conc = np.zeros(len(m), dtype=np.int64)
+        for k in np.flatnonzero(has):
+            counts = concurrent_counts(entry_ns[m[k]], exit_ns[m[k]])
+            avg_conc[k] = counts.mean()
+            max_conc[k] = counts.max()
+        out["avg_concurrent"] = avg_conc
+        out["max_concurrent"] = max_conc
+
+    return out
@@ -0,0 +1,105 @@
+"""
+Model 3 Checkpoints
+-------------------
+
+Persistiert Teilergebnisse langer Läufe (z.B. ein (HTF, entry_type, pair)-
+Backtest oder eine Filter-Konfiguration) atomar auf Disk, damit ein Abbruch
+(Crash, Ctrl-C) nur die gerade laufenden Einheiten kostet.
+
+- Jede Einheit = eine Datei (Pickle) unter root/<key>.pkl
+- Schreiben atomar: temporäre Datei im selben Ordner → fsync → os.replace
+  (eine Checkpoint-Datei ist entweder vollständig oder nicht vorhanden)
+- Resume: has(key) / load(key) überspringt bzw. lädt fertige Einheiten
+
+Keys sind Tupel aus Strings/Zahlen, z.B. ("W", "direct_touch", "EURUSD").
+Ergebnisse, die von Settings, Code oder Daten abhängen, tragen einen
+fingerprint(...) im Key – ändert sich einer davon, passt kein alter
+Checkpoint mehr und die Einheit wird neu gerechnet.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Tuple, Union
+
+Key = Union[str, Tuple]
+
+_SEP = "__"
+_UNSAFE = re.compile(r"[^A-Za-z0-9._+-]")
+
+
+def fingerprint(*parts: Any) -> str:
+    """Kurzer Hash (12 Hex) über Settings / Stempel; Path-Teile gehen mit ihrem Dateiinhalt ein (Code-Stand)."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(Path(part).read_bytes() if isinstance(part, Path) else repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+def files_stamp(paths: Iterable[Path]) -> int:
+    """Jüngste Änderungszeit (ns) der vorhandenen Dateien, z.B. Datenstand der Chart-Parquets."""
+    return max((p.stat().st_mtime_ns for p in map(Path, paths) if p.exists()), default=0)
+
+
+def _key_name(key: Key) -> str:
+    parts = key if isinstance(key, tuple) else (key,)
+    return _SEP.join(_UNSAFE.sub("-", str(p)) for p in parts)
+
+
+class CheckpointStore:
+    """Ordner mit einer atomar geschriebenen Pickle-Datei pro Einheit."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: Key) -> Path:
+        return self.root / f"{_key_name(key)}.pkl"
+
+    def has(self, key: Key) -> bool:
+        return self.path(key).exists()
+
+    def save(self, key: Key, value: Any) -> Path:
+        """Schreibt value atomar (tmp + os.replace)."""
+        target = self.path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp_", suffix=".pkl")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return target
+
+    def load(self, key: Key) -> Any:
+        with open(self.path(key), "rb") as f:
+            _, value = pickle.load(f)
+        return value
+
+    def items(self) -> Iterator[Tuple[Key, Any]]:
+        """Alle gespeicherten (key, value)-Paare (Reihenfolge nach Dateiname)."""
+        for path in sorted(self.root.glob("*.pkl")):
+            if path.name.startswith(".tmp_"):
+                continue
+            with open(path, "rb") as f:
+                yield pickle.load(f)
+
+    def __len__(self) -> int:
+        return sum(1 for p in self.root.glob("*.pkl") if not p.name.startswith(".tmp_"))
+
+    def clear(self) -> None:
+        """Löscht alle Checkpoints (Neustart ohne Resume)."""
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,228 @@
+"""
+Model 3 Rolling-Korrelation der Pairs (D-Candles)
+-------------------------------------------------
+
+Grundlage für den Correlation-Filter (STRATEGIE_VARIABLES.md 8.4 A):
+rollierende Korrelationsmatrizen (Pairs × Pairs) der täglichen Log-Returns
+aus All_Pairs_D_UTC.parquet.
+
+- RollingCorrelation: laufende Summen (n, Σx, Σx², Σxy je Pair-Paar) über die
+  letzten window Tage – jeder neue Tag addiert seine Returns, der aus dem
+  Fenster fallende Tag wird abgezogen (kein Neuberechnen je Fenster);
+  fehlende Returns zählen paarweise nicht (pairwise complete)
+- compute_history: ganze Historie (eine Matrix je D-Candle) direkt in ein
+  memory-mapped .npy (float32) + JSON mit Pairs / Zeiten / Fenster
+- CorrelationHistory.corr(a, b, t): Korrelation "as of" t in O(1) –
+  Stunden-Raster → letzte Matrix, deren D-Candle bei t geschlossen war
+  (kein Lookahead); rows_at für ganze Ledger (portfolio_sim.py)
+
+Beispiel:
+    returns = daily_returns()
+    history = compute_history(returns, window=60, directory=OUT_DIR, name="corr_60d")
+    history = load_history(OUT_DIR, "corr_60d")      # später: memory-mapped
+    history.corr("EURUSD", "GBPUSD", pd.Timestamp("2020-03-02 14:00", tz="UTC"))
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting.backtest_model3 import _read_tf_file
+    from scripts.backtesting.batch_stats import _time_ns
+    from scripts.backtesting.results_store import _atomic_path
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from backtest_model3 import _read_tf_file
+    from batch_stats import _time_ns
+    from results_store import _atomic_path
+
+DAY_NS = 86_400 * 10**9
+HOUR_NS = 3_600 * 10**9
+
+
+def daily_returns(pairs: Optional[Sequence[str]] = None, timeframe: str = "D") -> pd.DataFrame:
+    """Log-Returns der Closes je Pair (Zeilen = Candle-Zeit UTC, Spalten = Pairs, NaN = keine Candle)."""
+    df = _read_tf_file(timeframe)
+    if pairs is not None:
+        df = df[df["pair"].isin(list(pairs))]
+    df = df.sort_values(["pair", "time"])
+    df["ret"] = np.log(df["close"]).groupby(df["pair"]).diff()
+    returns = df.pivot(index="time", columns="pair", values="ret").sort_index()
+    returns.columns = returns.columns.astype(str)
+    return returns.dropna(how="all")
+
+
+class RollingCorrelation:
+    """Laufende Summen über die letzten window Tage (ein push je Tag)."""
+
+    def __init__(self, n_pairs: int, window: int, min_periods: Optional[int] = None):
+        self.window = int(window)
+        self.min_periods = int(min_periods or window)
+        self._buffer = np.full((self.window, n_pairs), np.nan)
+        self._pos = 0
+        shape = (n_pairs, n_pairs)
+        self.n = np.zeros(shape)
+        self.sx = np.zeros(shape)    # Σ x_i über Tage mit x_i und x_j
+        self.sxx = np.zeros(shape)   # Σ x_i² (dito)
+        self.sxy = np.zeros(shape)   # Σ x_i · x_j
+
+    def _apply(self, row: np.ndarray, sign: float) -> None:
+        valid = ~np.isnan(row)
+        if not valid.any():
+            return
+        x = np.where(valid, row, 0.0)
+        m = valid.astype(np.float64)
+        self.n += sign * np.outer(m, m)
+        self.sx += sign * np.outer(x, m)
+        self.sxx += sign * np.outer(x * x, m)
+        self.sxy += sign * np.outer(x, x)
+
+    def push(self, row: np.ndarray) -> np.ndarray:
+        """Returns eines Tages (NaN = fehlt) aufnehmen, ältesten Tag entfernen → aktuelle Matrix."""
+        self._apply(self._buffer[self._pos], -1.0)
+        self._buffer[self._pos] = row
+        self._apply(self._buffer[self._pos], 1.0)
+        self._pos = (self._pos + 1) % self.window
+        return self.matrix()
+
+    def matrix(self) -> np.ndarray:
+        """Korrelationsmatrix des aktuellen Fensters (NaN bei < min_periods gemeinsamen Tagen)."""
+        n, sx = self.n, self.sx
+        var = n * self.sxx - sx * sx
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = (n * self.sxy - sx * sx.T) / np.sqrt(var * var.T)
+        corr[(n < self.min_periods) | ~(var > 0) | ~(var.T > 0)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+
+@dataclass
+class CorrelationHistory:
+    """Eine Korrelationsmatrix je D-Candle; matrix[k] gilt ab available_ns[k] (Candle-Close)."""
+
+    pairs: List[str]
+    time_ns: np.ndarray        # Candle-Open (UTC ns)
+    available_ns: np.ndarray   # Candle-Close = ab hier nutzbar
+    window: int
+    min_periods: int
+    matrix: np.ndarray         # (Tage × Pairs × Pairs) float32, ggf. memory-mapped
+    _grid_start: int = field(init=False, repr=False)
+    _grid: np.ndarray = field(init=False, repr=False)
+    _index: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._index = {pair: i for i, pair in enumerate(self.pairs)}
+        if len(self.available_ns) == 0:
+            self._grid_start, self._grid = 0, np.full(1, -1, dtype=np.int32)
+            return
+        # Stunden-Raster: Zelle g → letzte Matrix mit available_ns <= Zellbeginn
+        self._grid_start = int(self.available_ns[0]) // HOUR_NS * HOUR_NS
+        cells = np.arange(self._grid_start, int(self.available_ns[-1]) + HOUR_NS, HOUR_NS, dtype=np.int64)
+        self._grid = (np.searchsorted(self.available_ns, cells, side="right") - 1).astype(np.int32)
+
+    def rows_at(self, t_ns: np.ndarray) -> np.ndarray:
+        """Matrix-Zeile je Zeitpunkt (-1 = noch keine Matrix), vektorisiert."""
+        cell = (np.asarray(t_ns, dtype=np.int64) - self._grid_start) // HOUR_NS
+        return np.where(cell < 0, -1, self._grid[np.clip(cell, 0, len(self._grid) - 1)])
+
+    def pair_codes(self, pairs: Sequence[str]) -> np.ndarray:
+        """Index der Pairs in der Matrix (-1 = Pair ohne D-Daten)."""
+        return np.array([self._index.get(pair, -1) for pair in pairs], dtype=np.int64)
+
+    def corr(self, pair_a: str, pair_b: str, time) -> float:
+        """Korrelation von pair_a und pair_b as of time (NaN wenn unbekannt)."""
+        a, b = self._index.get(pair_a), self._index.get(pair_b)
+        row = int(self.rows_at(np.array([pd.Timestamp(time).as_unit("ns").value]))[0])
+        if a is None or b is None or row < 0:
+            return float("nan")
+        return float(self.matrix[row, a, b])
+
+    def frame(self, time) -> pd.DataFrame:
+        """Ganze Matrix as of time als DataFrame."""
+        row = int(self.rows_at(np.array([pd.Timestamp(time).as_unit("ns").value]))[0])
+        values = self.matrix[row] if row >= 0 else np.full((len(self.pairs), len(self.pairs)), np.nan)
+        return pd.DataFrame(np.asarray(values, dtype=np.float64), index=self.pairs, columns=self.pairs)
+
+
+def _meta_path(directory: Path, name: str) -> Path:
+    return Path(directory) / f"{name}.json"
+
+
+def compute_history(
+    returns: pd.DataFrame,
+    window: int = 60,
+    min_periods: Optional[int] = None,
+    directory: Optional[Path] = None,
+    name: Optional[str] = None,
+) -> CorrelationHistory:
+    """
+    Korrelations-Historie aus daily_returns – ein RollingCorrelation.push je Tag.
+
+    Args:
+        returns: daily_returns() (Zeilen = D-Candles, Spalten = Pairs)
+        window: Fenster in D-Candles
+        min_periods: Mindestzahl gemeinsamer Tage je Pair-Paar (Default: window)
+        directory, name: wenn gesetzt, landet die Historie als <name>.npy
+            (memory-mapped, atomar geschrieben) + <name>.json im Verzeichnis
+
+    Returns:
+        CorrelationHistory (matrix memory-mapped, falls gespeichert)
+    """
+    pairs = [str(p) for p in returns.columns]
+    values = returns.to_numpy(dtype=np.float64)
+    time_ns = _time_ns(returns.index.to_series())
+    shape = (len(values), len(pairs), len(pairs))
+    min_periods = int(min_periods or window)
+
+    tmp = None
+    if directory is not None:
+        name = name or f"corr_{window}d"
+        target = Path(directory) / f"{name}.npy"
+        tmp = _atomic_path(target)
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=shape)
+    else:
+        out = np.empty(shape, dtype=np.float32)
+
+    rolling = RollingCorrelation(len(pairs), window, min_periods)
+    for k in range(len(values)):
+        out[k] = rolling.push(values[k])
+
+    # Verfügbar ab Close = Open der nächsten Candle (letzte: + 1 Tag)
+    available_ns = np.append(time_ns[1:], time_ns[-1] + DAY_NS) if len(time_ns) else time_ns
+
+    if tmp is None:
+        return CorrelationHistory(pairs, time_ns, available_ns, int(window), min_periods, out)
+
+    out.flush()
+    del out
+    os.replace(tmp, target)
+    meta = {"pairs": pairs, "time_ns": time_ns.tolist(), "available_ns": available_ns.tolist(),
+            "window": int(window), "min_periods": min_periods}
+    meta_tmp = _atomic_path(_meta_path(directory, name))
+    meta_tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(meta_tmp, _meta_path(directory, name))
+    return load_history(directory, name)
+
+
+def history_exists(directory: Path, name: str) -> bool:
+    return (Path(directory) / f"{name}.npy").exists() and _meta_path(directory, name).exists()
+
+
+def load_history(directory: Path, name: str, mmap: bool = True) -> CorrelationHistory:
+    """Gespeicherte Historie laden (Matrix memory-mapped, read-only)."""
+    meta = json.loads(_meta_path(directory, name).read_text(encoding="utf-8"))
+    matrix = np.load(Path(directory) / f"{name}.npy", mmap_mode="r" if mmap else None)
+    return CorrelationHistory(
+        pairs=meta["pairs"],
+        time_ns=np.array(meta["time_ns"], dtype=np.int64),
+        available_ns=np.array(meta["available_ns"], dtype=np.int64),
+        window=int(meta["window"]),
+        min_periods=int(meta["min_periods"]),
+        matrix=matrix,
+    )
@@ -0,0 +1,173 @@
+"""
+Model 3 Executors
+-----------------
+
+Austauschbare Ausführungs-Backends für die Pair-Worker der Backtests.
+
+Modi:
+- "process": multiprocessing.Pool – Cache wird an jeden Worker gepickelt
+             (eigener Speicher pro Prozess, volle CPU-Parallelität)
+- "thread":  ThreadPoolExecutor – alle Worker teilen den Cache im selben
+             Prozess (kein Pickling, kein Kopieren); lohnt sich, sobald die
+             heißen Schleifen in Kernels laufen, die den GIL freigeben
+- "serial":  alles im aktuellen Prozess nacheinander (Debugging, kleine Läufe)
+
+Alle Executors bieten dieselbe Schnittstelle wie Pool.imap_unordered und
+werden als Context Manager benutzt:
+
+    with make_executor("thread", initializer=init_worker, initargs=(cache,)) as ex:
+        for result in ex.imap_unordered(process_single_pair, args):
+            ...
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from multiprocessing import Pool
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+EXECUTOR_MODES = ("process", "thread", "serial")
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+class BaseExecutor:
+    """Gemeinsame Basis: Initializer + Context-Manager-Protokoll."""
+
+    mode = "base"
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        initializer: Optional[Callable[..., Any]] = None,
+        initargs: Tuple = (),
+    ):
+        self.workers = workers or default_workers()
+        self.initializer = initializer
+        self.initargs = initargs
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def start(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def imap_unordered(self, fn: Callable, iterable: Iterable) -> Iterator:
+        raise NotImplementedError
+
+
+class ProcessExecutor(BaseExecutor):
+    """multiprocessing.Pool (bisheriges Verhalten der Skripte)."""
+
+    mode = "process"
+
+    def __init__(self, workers=None, initializer=None, initargs=(), chunksize: int = 1):
+        super().__init__(workers, initializer, initargs)
+        self.chunksize = chunksize
+        self._pool = None
+
+    def start(self) -> None:
+        self._pool = Pool(processes=self.workers, initializer=self.initializer, initargs=self.initargs)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def imap_unordered(self, fn, iterable):
+        return self._pool.imap_unordered(fn, iterable, chunksize=self.chunksize)
+
+
+class ThreadExecutor(BaseExecutor):
+    """
+    ThreadPoolExecutor im aktuellen Prozess.
+
+    Der Initializer läuft genau einmal im Hauptthread – globale Caches
+    (z.B. DATA_CACHE) werden dadurch von allen Threads direkt geteilt.
+    """
+
+    mode = "thread"
+
+    def __init__(self, workers=None, initializer=None, initargs=()):
+        super().__init__(workers, initializer, initargs)
+        self._pool = None
+
+    def start(self) -> None:
+        if self.initializer is not None:
+            self.initializer(*self.initargs)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def imap_unordered(self, fn, iterable):
+        # Höchstens 2x workers Tasks gleichzeitig offen (wie Pool bei langen Iterables)
+        it = iter(iterable)
+        pending = set()
+        limit = self.workers * 2
+
+        for item in it:
+            pending.add(self._pool.submit(fn, item))
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+class SerialExecutor(BaseExecutor):
+    """Sequentielle Ausführung ohne Pool (Referenz, Debugging)."""
+
+    mode = "serial"
+
+    def __init__(self, workers=None, initializer=None, initargs=()):
+        super().__init__(1, initializer, initargs)
+
+    def start(self) -> None:
+        if self.initializer is not None:
+            self.initializer(*self.initargs)
+
+    def close(self) -> None:
+        pass
+
+    def imap_unordered(self, fn, iterable):
+        for item in iterable:
+            yield fn(item)
+
+
+def make_executor(
+    mode: str = "process",
+    workers: Optional[int] = None,
+    initializer: Optional[Callable[..., Any]] = None,
+    initargs: Tuple = (),
+) -> BaseExecutor:
+    """
+    Erzeugt einen Executor für mode in {"process", "thread", "serial"}.
+
+    workers=None → alle CPU-Kerne.
+    """
+    if mode == "process":
+        return ProcessExecutor(workers, initializer, initargs)
+    if mode == "thread":
+        return ThreadExecutor(workers, initializer, initargs)
+    if mode == "serial":
+        return SerialExecutor(workers, initializer, initargs)
+    raise ValueError(f"Unbekannter Executor-Modus: {mode} (erlaubt: {', '.join(EXECUTOR_MODES)})")
@@ -0,0 +1,314 @@
+"""
+Model 3 Währungs-Exposure (Sweep-Line)
+--------------------------------------
+
+Bei 28 Crosses öffnet eine USD-Bewegung schnell mehrere korrelierte Trades
+(STRATEGIE_VARIABLES.md 8.4 B). Jeder Trade wird hier in zwei Währungs-Beine
+zerlegt (in R, 1 Trade = weight R, Default 1R):
+
+- bullish EURUSD → EUR +1R, USD -1R; bearish umgekehrt
+- Netto-Exposure je Währung = Summe der Beine offener Trades,
+  Brutto-Exposure = Summe der Beträge (Anzahl offener Beine bei 1R)
+
+Ein- und Ausstiege werden einmal pro Ledger zu einer sortierten Ereignisfolge
+(prepare_exposure); Exit vor Entry bei gleicher Zeit wie in portfolio_sim.py.
+Caps (CurrencyCaps) laufen als Zulassungsregel in einem Durchlauf über die
+Ereignisse – ein Trade wird abgelehnt, wenn er eine Währung über ihren Cap
+bringen würde. Caps greifen nur beim Entry: schließt ein gegenläufiger Trade,
+kann das Netto-Exposure danach über dem Cap liegen (peak_net zeigt das).
+Mit numba (kernels-Backend "numba") ist die Schleife kompiliert, Cap-Werte
+lassen sich so schnell sweepen.
+
+Beispiel:
+    ex = prepare_exposure(combined_df)
+    result = apply_caps(ex, CurrencyCaps(max_net=3))
+    timeline = exposure_timeline(ex, result.accepted)          # Zeit × Währung
+    table = sweep_caps(ex, [CurrencyCaps(max_net=c) for c in (2, 3, 4, 0)])
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting import kernels
+    from scripts.backtesting.portfolio_sim import NO_EXIT, PortfolioLedger, prepare_ledger
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    import kernels
+    from portfolio_sim import NO_EXIT, PortfolioLedger, prepare_ledger
+
+EPS = 1e-9  # Toleranz für Cap-Vergleiche (Summen von Gewichten)
+
+
+@dataclass(frozen=True)
+class CurrencyCaps:
+    """Exposure-Caps in R (0 = unbegrenzt); per_currency überschreibt max_net je Währung."""
+
+    max_net: float = 0.0
+    max_gross: float = 0.0
+    per_currency: Tuple[Tuple[str, float], ...] = field(default=())
+
+    def label(self) -> str:
+        parts = [f"net<={self.max_net:g}R"] if self.max_net else []
+        parts += [f"gross<={self.max_gross:g}R"] if self.max_gross else []
+        parts += [f"{ccy}<={cap:g}R" for ccy, cap in self.per_currency]
+        return ", ".join(parts) if parts else "unlimited"
+
+    def arrays(self, currencies: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(net_cap, gross_cap) je Währungs-Code."""
+        net = np.full(len(currencies), float(self.max_net))
+        index = {c: i for i, c in enumerate(currencies)}
+        for ccy, cap in self.per_currency:
+            if ccy in index:
+                net[index[ccy]] = float(cap)
+        return net, np.full(len(currencies), float(self.max_gross))
+
+
+class ExposureLedger(NamedTuple):
+    """PortfolioLedger + sortierte Ereignisfolge (Trade-Index = Position im sortierten Ledger)."""
+
+    ledger: PortfolioLedger
+    event_ns: np.ndarray
+    event_trade: np.ndarray
+    event_exit: np.ndarray   # True = Exit, False = Entry
+    weight: np.ndarray       # R je Trade
+
+
+def prepare_exposure(trades: pd.DataFrame, weight: Optional[np.ndarray] = None) -> ExposureLedger:
+    """
+    Ereignisfolge eines Ledgers (einmal pro Ledger, dann beliebig viele Caps).
+
+    Args:
+        trades: Ledger mit pair, direction, entry_time, exit_time, pnl_r
+        weight: R je Trade in Ledger-Reihenfolge (Default 1R)
+    """
+    ledger = prepare_ledger(trades)
+    n = len(ledger.entry_ns)
+    w = np.ones(n) if weight is None else np.asarray(weight, dtype=np.float64)[ledger.order]
+
+    trade = np.arange(n, dtype=np.int64)
+    closes = ledger.exit_ns != NO_EXIT
+    exit_trade = trade[closes]
+    exit_ns = ledger.exit_ns[closes]
+
+    # Sortierschlüssel (Zeit, Phase, Trade, Sub): reguläre Exits (Phase 0) vor den
+    # Entries (Phase 1); ein Exit zur Entry-Zeit folgt direkt auf den eigenen Entry
+    zero = exit_ns <= ledger.entry_ns[exit_trade]
+    times = np.concatenate([ledger.entry_ns, np.maximum(exit_ns, ledger.entry_ns[exit_trade])])
+    phase = np.concatenate([np.ones(n, dtype=np.int8), zero.astype(np.int8)])
+    trades_idx = np.concatenate([trade, exit_trade])
+    sub = np.concatenate([np.zeros(n, dtype=np.int8), np.ones(len(exit_trade), dtype=np.int8)])
+    is_exit = np.concatenate([np.zeros(n, dtype=bool), np.ones(len(exit_trade), dtype=bool)])
+
+    order = np.lexsort((sub, np.where(phase == 1, trades_idx, 0), phase, times))
+    return ExposureLedger(
+        ledger=ledger,
+        event_ns=np.ascontiguousarray(times[order]),
+        event_trade=np.ascontiguousarray(trades_idx[order]),
+        event_exit=np.ascontiguousarray(is_exit[order]),
+        weight=np.ascontiguousarray(w),
+    )
+
+
+# ---- Sweep-Line (numba-kompatibel) ---- #
+
+
+def _exposure_loop(event_trade, event_exit, base, quote, sign, weight, net_cap, gross_cap):
+    n = len(base)
+    n_ccy = len(net_cap)
+    accepted = np.zeros(n, dtype=np.bool_)
+    net = np.zeros(n_ccy, dtype=np.float64)
+    gross = np.zeros(n_ccy, dtype=np.float64)
+    peak_net = np.zeros(n_ccy, dtype=np.float64)
+    peak_gross = np.zeros(n_ccy, dtype=np.float64)
+    blocked = np.zeros(n_ccy, dtype=np.int64)
+    rejected = np.zeros(2, dtype=np.int64)  # net, gross
+
+    for e in range(len(event_trade)):
+        i = event_trade[e]
+        b = base[i]
+        q = quote[i]
+        w = weight[i]
+        leg = sign[i] * w
+
+        if event_exit[e]:
+            if accepted[i]:
+                net[b] -= leg
+                net[q] += leg
+                gross[b] -= w
+                gross[q] -= w
+                peak_net[b] = max(peak_net[b], abs(net[b]))
+                peak_net[q] = max(peak_net[q], abs(net[q]))
+            continue
+
+        new_b = net[b] + leg
+        new_q = net[q] - leg
+        over_b = net_cap[b] > 0 and abs(new_b) > net_cap[b] + EPS
+        over_q = net_cap[q] > 0 and abs(new_q) > net_cap[q] + EPS
+        if over_b or over_q:
+            rejected[0] += 1
+            if over_b:
+                blocked[b] += 1
+            if over_q:
+                blocked[q] += 1
+            continue
+        over_b = gross_cap[b] > 0 and gross[b] + w > gross_cap[b] + EPS
+        over_q = gross_cap[q] > 0 and gross[q] + w > gross_cap[q] + EPS
+        if over_b or over_q:
+            rejected[1] += 1
+            if over_b:
+                blocked[b] += 1
+            if over_q:
+                blocked[q] += 1
+            continue
+
+        accepted[i] = True
+        net[b] = new_b
+        net[q] = new_q
+        gross[b] += w
+        gross[q] += w
+        peak_net[b] = max(peak_net[b], abs(new_b))
+        peak_net[q] = max(peak_net[q], abs(new_q))
+        peak_gross[b] = max(peak_gross[b], gross[b])
+        peak_gross[q] = max(peak_gross[q], gross[q])
+
+    return accepted, rejected, blocked, peak_net, peak_gross
+
+
+_COMPILED: Dict[str, object] = {}
+
+
+def _loop():
+    """Kompilierte Schleife beim numba-Backend der Kernels, sonst Python."""
+    if kernels.get_backend() != "numba":
+        return _exposure_loop
+    if "loop" not in _COMPILED:
+        _COMPILED["loop"] = kernels.numba.njit(cache=True, nogil=True)(_exposure_loop)
+    return _COMPILED["loop"]
+
+
+# ---- Ergebnis ---- #
+
+
+@dataclass
+class ExposureResult:
+    """Ergebnis eines Cap-Durchlaufs (accepted in Original-Ledger-Reihenfolge)."""
+
+    caps: CurrencyCaps
+    accepted: np.ndarray
+    pnl_r: np.ndarray
+    rejected: Dict[str, int]
+    blocked: pd.Series      # Ablehnungen je Währung (ein Trade kann beide Beine zählen)
+    peak_net: pd.Series     # max. |Netto-Exposure| der angenommenen Trades (auch nach Exits)
+    peak_gross: pd.Series
+
+    def summary(self) -> Dict[str, float]:
+        """Kennzahlen der angenommenen Trades."""
+        pnl = self.pnl_r[self.accepted]
+        pnl = pnl[~np.isnan(pnl)]
+        return {
+            "accepted": int(self.accepted.sum()),
+            "rejected": int(sum(self.rejected.values())),
+            "expectancy": float(pnl.mean()) if len(pnl) else float("nan"),
+            "total_r": float(pnl.sum()),
+            "peak_net": float(self.peak_net.max()) if len(self.peak_net) else 0.0,
+            "peak_gross": float(self.peak_gross.max()) if len(self.peak_gross) else 0.0,
+            **{f"rejected_{key}": value for key, value in self.rejected.items()},
+        }
+
+
+def apply_caps(ex: ExposureLedger, caps: CurrencyCaps = CurrencyCaps()) -> ExposureResult:
+    """Ein Durchlauf über die Ereignisse mit Exposure-Caps als Zulassungsregel."""
+    ledger = ex.ledger
+    net_cap, gross_cap = caps.arrays(ledger.currencies)
+    accepted, rejected, blocked, peak_net, peak_gross = _loop()(
+        ex.event_trade, ex.event_exit, ledger.base, ledger.quote, ledger.sign, ex.weight, net_cap, gross_cap,
+    )
+
+    n = len(ledger.order)
+    out_accepted = np.zeros(n, dtype=bool)
+    out_accepted[ledger.order] = accepted
+    pnl_r = np.empty(n, dtype=np.float64)
+    pnl_r[ledger.order] = ledger.pnl_r
+
+    return ExposureResult(
+        caps=caps,
+        accepted=out_accepted,
+        pnl_r=pnl_r,
+        rejected={"max_net": int(rejected[0]), "max_gross": int(rejected[1])},
+        blocked=pd.Series(blocked, index=ledger.currencies, name="blocked"),
+        peak_net=pd.Series(peak_net, index=ledger.currencies, name="peak_net"),
+        peak_gross=pd.Series(peak_gross, index=ledger.currencies, name="peak_gross"),
+    )
+
+
+def sweep_caps(ex: ExposureLedger, variants: Sequence[CurrencyCaps]) -> pd.DataFrame:
+    """Eine Zeile je Cap-Variante (Caps + summary)."""
+    rows = []
+    for caps in variants:
+        result = apply_caps(ex, caps)
+        rows.append({"max_net": caps.max_net, "max_gross": caps.max_gross, "caps": caps.label(), **result.summary()})
+    return pd.DataFrame(rows)
+
+
+# ---- Zeitreihen ---- #
+
+
+def exposure_timeline(ex: ExposureLedger, accepted: Optional[np.ndarray] = None, kind: str = "net") -> pd.DataFrame:
+    """
+    Exposure je Währung nach jedem Ereignis-Zeitpunkt (vektorisiert).
+
+    Args:
+        accepted: Maske in Ledger-Reihenfolge (Default: alle Trades)
+        kind: "net" (vorzeichenbehaftet) oder "gross"
+
+    Returns:
+        DataFrame (UTC-Zeit × Währung), letzter Stand je Zeitpunkt
+    """
+    if kind not in ("net", "gross"):
+        raise ValueError(f"Unbekannte Exposure-Art: {kind}")
+    ledger = ex.ledger
+    take = np.ones(len(ledger.order), dtype=bool)
+    if accepted is not None:
+        take = np.asarray(accepted, dtype=bool)[ledger.order]
+
+    keep = take[ex.event_trade]
+    trade = ex.event_trade[keep]
+    times = ex.event_ns[keep]
+    direction = np.where(ex.event_exit[keep], -1.0, 1.0)
+
+    leg = ex.weight[trade] * (ledger.sign[trade] if kind == "net" else 1.0)
+    quote_leg = -leg if kind == "net" else leg
+    deltas = np.zeros((len(trade), len(ledger.currencies)))
+    rows = np.arange(len(trade))
+    np.add.at(deltas, (rows, ledger.base[trade]), direction * leg)
+    np.add.at(deltas, (rows, ledger.quote[trade]), direction * quote_leg)
+
+    last = np.r_[times[1:] != times[:-1], True] if len(times) else np.zeros(0, dtype=bool)
+    values = np.cumsum(deltas, axis=0)[last]
+    index = pd.DatetimeIndex(times[last].view("M8[ns]"), name="time").tz_localize("UTC")
+    return pd.DataFrame(values, index=index, columns=ledger.currencies)
+
+
+def exposure_profile(timeline: pd.DataFrame, levels: Sequence[float] = (2, 3, 4)) -> pd.DataFrame:
+    """
+    Zeitgewichtete Kennzahlen je Währung: Peak, Ø |Exposure|, Zeitanteil (%)
+    mit |Exposure| >= level (Zeitraum erstes bis letztes Ereignis).
+    """
+    if len(timeline) < 2:
+        return pd.DataFrame(index=timeline.columns)
+    ns = timeline.index.as_unit("ns").asi8
+    duration = np.diff(ns).astype(np.float64)
+    exposure = timeline.abs().to_numpy()[:-1]
+    total = duration.sum()
+
+    profile = pd.DataFrame(index=timeline.columns)
+    profile["peak"] = timeline.abs().max().to_numpy()
+    profile["mean_abs"] = (exposure * duration[:, None]).sum(axis=0) / total
+    for level in levels:
+        profile[f"time_ge_{level:g}R"] = (duration[:, None] * (exposure >= level - EPS)).sum(axis=0) / total * 100
+    return profile
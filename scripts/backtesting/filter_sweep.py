@@ -0,0 +1,198 @@
+"""
+Model 3 Filter-Sweep (Bitsets)
+------------------------------
+
+Bewertet viele Filter-Kombinationen auf einem Trade-Ledger ohne erneutes
+Filtern von DataFrames:
+
+1. Pro (Feature, Schwelle) einmal eine gepackte Bitmaske über alle Trades
+   (np.packbits, 1 Bit pro Trade) – FilterBank.add(...)
+2. Kombination = bitweises AND der Masken (Bytes statt Zeilen)
+3. Kennzahlen aller Kombinationen aus der Maskenmatrix (batch_stats) plus
+   Pair-Robustheit: Anteil der Pairs mit positiver Σ R (Regel ">60 % der
+   Pairs profitabel") über eine Matrixmultiplikation Masken × Pair-One-Hot
+
+Kombinationen sind Tupel von Filternamen; () = Baseline (alle Trades).
+
+Beispiel:
+    bank = FilterBank(df)
+    bank.add_threshold("wick_pct", wick_pct, [10, 20, 30], op=">=")
+    bank.add_range("duration", df["duration_days"], [(3, 30), (5, 45)])
+    table = bank.evaluate([(), ("wick_pct>=20",), ("wick_pct>=20", "duration 3-30")])
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting.batch_stats import batch_stats
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from batch_stats import batch_stats
+
+Combo = Tuple[str, ...]
+
+_OPS = {
+    ">=": np.greater_equal,
+    ">": np.greater,
+    "<=": np.less_equal,
+    "<": np.less,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def _fmt(value) -> str:
+    return f"{value:g}" if isinstance(value, (float, np.floating)) else str(value)
+
+
+class FilterBank:
+    """Gepackte Filter-Bitsets über einem festen Trade-Ledger (Reihenfolge = Ledger-Reihenfolge)."""
+
+    def __init__(self, trades: pd.DataFrame, pair_column: str = "pair"):
+        self.trades = trades.reset_index(drop=True)
+        self.n = len(self.trades)
+        self._bits: Dict[str, np.ndarray] = {}
+        self.families: Dict[str, List[str]] = {}
+        self._all = np.packbits(np.ones(self.n, dtype=bool), bitorder="little")
+
+        pairs = self.trades[pair_column].astype(str).to_numpy() if pair_column in self.trades else np.array([""] * self.n)
+        self.pairs, pair_codes = np.unique(pairs, return_inverse=True)
+        self._pair_onehot = np.zeros((self.n, len(self.pairs)))
+        self._pair_onehot[np.arange(self.n), pair_codes] = 1.0
+        self._pnl = self.trades["pnl_r"].to_numpy(dtype=np.float64)
+
+    # ------------------------------------------------------------------ #
+    # Filter anlegen
+    # ------------------------------------------------------------------ #
+
+    def add(self, name: str, mask, family: Optional[str] = None) -> str:
+        """Bool-Maske (True = Trade bleibt) als Bitset. family gruppiert Alternativen (für combos)."""
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (self.n,):
+            raise ValueError(f"Maske {name!r}: Länge {mask.shape} statt ({self.n},)")
+        self._bits[name] = np.packbits(mask, bitorder="little")
+        self.families.setdefault(family or name, []).append(name)
+        return name
+
+    def add_threshold(self, feature: str, values, thresholds: Iterable, op: str = ">=") -> List[str]:
+        """Ein Filter je Schwelle: values <op> t (NaN → Trade fällt raus)."""
+        v = np.asarray(values, dtype=np.float64)
+        return [self.add(f"{feature}{op}{_fmt(t)}", _OPS[op](v, t), family=feature) for t in thresholds]
+
+    def add_range(self, feature: str, values, ranges: Iterable[Tuple[float, float]]) -> List[str]:
+        """Ein Filter je (lo, hi): lo <= values <= hi."""
+        v = np.asarray(values, dtype=np.float64)
+        return [self.add(f"{feature} {_fmt(lo)}-{_fmt(hi)}", (v >= lo) & (v <= hi), family=feature) for lo, hi in ranges]
+
+    def add_exclusions(self, feature: str, values, categories: Iterable) -> List[str]:
+        """Ein Filter je Kategorie: Trades mit values == c werden ausgeschlossen (z.B. Wochentag)."""
+        v = np.asarray(values)
+        return [self.add(f"{feature}!={_fmt(c)}", v != c, family=feature) for c in categories]
+
+    # ------------------------------------------------------------------ #
+    # Kombinationen
+    # ------------------------------------------------------------------ #
+
+    def bits(self, combo: Combo) -> np.ndarray:
+        """Gepacktes Bitset einer Kombination (AND aller Filter)."""
+        out = self._all
+        for name in combo:
+            out = out & self._bits[name]
+        return out
+
+    def mask(self, combo: Combo) -> np.ndarray:
+        return np.unpackbits(self.bits(combo), count=self.n, bitorder="little").astype(bool)
+
+    def count(self, combo: Combo) -> int:
+        return int(np.unpackbits(self.bits(combo), count=self.n, bitorder="little").sum())
+
+    def combos(self, families: Optional[Sequence[str]] = None, max_filters: Optional[int] = None) -> List[Combo]:
+        """
+        Alle Kombinationen mit höchstens einem Filter je Familie (inkl. "kein Filter").
+
+        max_filters=1 → Baseline + jeder Filter einzeln (sequentielle Ein-Variablen-Optimierung)
+        """
+        families = list(families or self.families)
+        options = [range(-1, len(self.families[f])) for f in families]  # -1 = kein Filter der Familie
+        picks = [
+            choice for choice in itertools.product(*options)
+            if max_filters is None or sum(i >= 0 for i in choice) <= max_filters
+        ]
+        # Wenige Filter zuerst, innerhalb gleicher Anzahl in Familien-Reihenfolge
+        last = max((len(o) for o in options), default=0)
+        picks.sort(key=lambda choice: (sum(i >= 0 for i in choice), [i if i >= 0 else last for i in choice]))
+        return [
+            tuple(self.families[f][i] for f, i in zip(families, choice) if i >= 0)
+            for choice in picks
+        ]
+
+    # ------------------------------------------------------------------ #
+    # Auswertung
+    # ------------------------------------------------------------------ #
+
+    def evaluate(
+        self,
+        combos: Sequence[Combo],
+        start_cap: float = 100000,
+        risk: float = 0.01,
+        concurrency: bool = False,
+        chunk_size: int = 256,
+    ) -> pd.DataFrame:
+        """
+        Kennzahlen je Kombination (eine Zeile pro Kombination, Eingabe-Reihenfolge).
+
+        Spalten: filters, n_filters, trades, filtered_pct, win_rate, expectancy, sqn,
+        profit_factor, max_dd, cumulative_r, sharpe, pairs_traded, pairs_profitable,
+        pairs_profitable_pct (+ avg/max_concurrent bei concurrency=True)
+
+        chunk_size: Kombinationen je Block (die Maskenmatrix wird nur blockweise entpackt)
+        """
+        if not combos:
+            return pd.DataFrame()
+
+        parts: List[Dict[str, np.ndarray]] = []
+        for start in range(0, len(combos), chunk_size):
+            block = combos[start:start + chunk_size]
+            packed = np.stack([self.bits(c) for c in block])
+            masks = np.unpackbits(packed, axis=1, count=self.n, bitorder="little").astype(bool)
+            stats = batch_stats(self.trades, masks, start_cap=start_cap, risk=risk, concurrency=concurrency)
+
+            # Pair-Robustheit: Σ R und Trades je (Kombination, Pair)
+            mf = masks.astype(np.float64)
+            pair_r = (mf * self._pnl[None, :]) @ self._pair_onehot
+            pair_n = mf @ self._pair_onehot
+            stats["pairs_traded"] = (pair_n > 0).sum(axis=1)
+            stats["pairs_profitable"] = ((pair_r > 0) & (pair_n > 0)).sum(axis=1)
+            parts.append(stats)
+
+        stats = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+        pairs_traded = stats["pairs_traded"]
+        pairs_profitable = stats["pairs_profitable"]
+
+        table = pd.DataFrame({
+            "filters": [" & ".join(c) if c else "Baseline (no filter)" for c in combos],
+            "n_filters": [len(c) for c in combos],
+            "trades": stats["trades"],
+            "filtered_pct": (1 - stats["trades"] / max(self.n, 1)) * 100,
+            "win_rate": stats["win_rate"],
+            "expectancy": stats["expectancy"],
+            "sqn": stats["sqn"],
+            "profit_factor": stats["profit_factor"],
+            "max_dd": stats["max_dd"],
+            "cumulative_r": stats["cumulative_r"],
+            "sharpe": stats["sharpe"],
+            "pairs_traded": pairs_traded,
+            "pairs_profitable": pairs_profitable,
+            "pairs_profitable_pct": np.divide(
+                pairs_profitable * 100.0, pairs_traded, out=np.zeros(len(combos)), where=pairs_traded > 0
+            ),
+        })
+        if concurrency:
+            table["avg_concurrent"] = stats["avg_concurrent"]
+            table["max_concurrent"] = stats["max_concurrent"]
+        return table
@@ -0,0 +1,745 @@
+"""
+Model 3 Scan-Kernels
+--------------------
+
+Zustandsautomaten der Engine (Pivot-, Verfeinerungs-, Touch- und Exit-Scans,
+Close-Bestätigung, COT-Bias) als Kernels über NumPy-Kerzen-Arrays.
+
+Backends (identische Ergebnisse):
+- "numba": njit-kompilierte Schleifen (nogil, cache) – benötigt numba
+- "numpy": reine NumPy-Fallbacks (vektorisiert, wo möglich)
+- "auto":  numba falls installiert, sonst numpy (Default)
+
+Auswahl per set_backend(...) oder Umgebungsvariable MODEL3_KERNEL_BACKEND.
+Gleichheit der Backends prüft der Selbsttest (Zufalls-Kerzen, alle Kernels):
+
+    python scripts/backtesting/kernels.py
+
+Alle Scans arbeiten auf Indizes: Zeitfenster werden vorher per
+np.searchsorted auf der int64-Zeitachse (ns, UTC) bestimmt.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, Dict, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except ImportError:  # numba ist optional
+    numba = None
+
+
+# --------------------------------------------------------------------------- #
+# Kerzen-Arrays
+# --------------------------------------------------------------------------- #
+
+
+class CandleArrays(NamedTuple):
+    """Spaltenweise Sicht auf einen (pro Pair) zeitlich sortierten OHLC-DataFrame."""
+
+    time: np.ndarray  # int64, ns seit Epoch (UTC) – für searchsorted
+    stamps: pd.api.extensions.ExtensionArray  # Original-Zeitstempel (für Ausgabe)
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    body_pct: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def index_of(self, ts: pd.Timestamp, side: str = "left") -> int:
+        """Erster Index mit time >= ts (side='left') bzw. time > ts (side='right')."""
+        return int(np.searchsorted(self.time, ts_to_ns(ts), side=side))
+
+
+def ts_to_ns(ts) -> int:
+    return pd.Timestamp(ts).value
+
+
+def candle_arrays(df: pd.DataFrame) -> CandleArrays:
+    """Baut CandleArrays aus einem OHLC-DataFrame mit tz-aware 'time' Spalte."""
+    times = df["time"]
+    if getattr(times.dt, "tz", None) is not None:
+        naive = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    else:
+        naive = times
+    time_ns = naive.to_numpy(dtype="datetime64[ns]").view("int64")
+
+    o = np.ascontiguousarray(df["open"].to_numpy(dtype=np.float64))
+    h = np.ascontiguousarray(df["high"].to_numpy(dtype=np.float64))
+    lo = np.ascontiguousarray(df["low"].to_numpy(dtype=np.float64))
+    c = np.ascontiguousarray(df["close"].to_numpy(dtype=np.float64))
+
+    rng = h - lo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        body = np.abs(c - o) / rng * 100
+    body = np.where(np.isnan(body), 0.0, body)
+
+    return CandleArrays(
+        time=np.ascontiguousarray(time_ns),
+        stamps=times.array,
+        open=o,
+        high=h,
+        low=lo,
+        close=c,
+        body_pct=body,
+    )
+
+
+def as_candle_arrays(data) -> CandleArrays:
+    """Akzeptiert DataFrame oder CandleArrays."""
+    if isinstance(data, CandleArrays):
+        return data
+    return candle_arrays(data)
+
+
+# --------------------------------------------------------------------------- #
+# Schleifen-Implementierungen (numba-kompatibel)
+# --------------------------------------------------------------------------- #
+
+
+def _first_touch_loop(values, start, level, below):
+    for i in range(start, len(values)):
+        if below:
+            if values[i] <= level:
+                return i
+        else:
+            if values[i] >= level:
+                return i
+    return -1
+
+
+def _first_overlap_loop(high, low, start, lo, hi):
+    for i in range(start, len(high)):
+        if low[i] <= hi and high[i] >= lo:
+            return i
+    return -1
+
+
+def _any_touch_loop(values, start, stop, level, below):
+    for i in range(start, stop):
+        if below:
+            if values[i] <= level:
+                return True
+        else:
+            if values[i] >= level:
+                return True
+    return False
+
+
+def _scan_exit_loop(high, low, start, sl, tp, bullish):
+    # SL hat bei gleicher Kerze Vorrang (wie sl_time <= tp_time)
+    for i in range(start, len(high)):
+        if bullish:
+            if low[i] <= sl:
+                return i, 1
+            if high[i] >= tp:
+                return i, 2
+        else:
+            if high[i] >= sl:
+                return i, 1
+            if low[i] <= tp:
+                return i, 2
+    return -1, 0
+
+
+def _scan_exits_loop(high, low, starts, sl, tp, bullish):
+    # Batch-Variante von _scan_exit_loop (eine Position je Eintrag)
+    m = len(starts)
+    idx = np.full(m, -1, dtype=np.int64)
+    code = np.zeros(m, dtype=np.int8)
+    for k in range(m):
+        for i in range(starts[k], len(high)):
+            if bullish[k]:
+                if low[i] <= sl[k]:
+                    idx[k] = i
+                    code[k] = 1
+                    break
+                if high[i] >= tp[k]:
+                    idx[k] = i
+                    code[k] = 2
+                    break
+            else:
+                if high[i] >= sl[k]:
+                    idx[k] = i
+                    code[k] = 1
+                    break
+                if low[i] <= tp[k]:
+                    idx[k] = i
+                    code[k] = 2
+                    break
+    return idx, code
+
+
+def _scan_close_confirmation_loop(high, low, close, start, level, bullish):
+    for i in range(start, len(close)):
+        if bullish:
+            if close[i] > level:
+                return i, False
+            elif low[i] <= level < close[i]:
+                continue
+            elif close[i] <= level and low[i] <= level:
+                return -1, True
+        else:
+            if close[i] < level:
+                return i, False
+            elif high[i] >= level > close[i]:
+                continue
+            elif close[i] >= level and high[i] >= level:
+                return -1, True
+    return -1, False
+
+
+def _first_close_beyond_loop(close, start, level, bullish):
+    for i in range(start, len(close)):
+        if bullish:
+            if close[i] > level:
+                return i
+        else:
+            if close[i] < level:
+                return i
+    return -1
+
+
+def _untouched_after_loop(values, positions, levels, below):
+    # Suffix-Extrem einmal rückwärts, dann O(1) pro Kandidat
+    n = len(values)
+    suffix = np.empty(n + 1, dtype=np.float64)
+    if below:
+        suffix[n] = np.inf
+        for i in range(n - 1, -1, -1):
+            suffix[i] = min(values[i], suffix[i + 1])
+    else:
+        suffix[n] = -np.inf
+        for i in range(n - 1, -1, -1):
+            suffix[i] = max(values[i], suffix[i + 1])
+
+    out = np.empty(len(positions), dtype=np.bool_)
+    for k in range(len(positions)):
+        nxt = suffix[positions[k] + 1]
+        if below:
+            out[k] = not (nxt <= levels[k])
+        else:
+            out[k] = not (nxt >= levels[k])
+    return out
+
+
+def _pivot_directions_loop(open_, close, body_pct, min_body_pct):
+    n = len(close)
+    out = np.zeros(n, dtype=np.int8)
+    for i in range(1, n):
+        if body_pct[i - 1] < min_body_pct or body_pct[i] < min_body_pct:
+            continue
+        prev_red = close[i - 1] < open_[i - 1]
+        prev_green = close[i - 1] > open_[i - 1]
+        curr_green = close[i] > open_[i]
+        curr_red = close[i] < open_[i]
+        if prev_red and curr_green:
+            out[i] = 1
+        elif prev_green and curr_red:
+            out[i] = -1
+    return out
+
+
+def _bias_countdown_loop(div, threshold, duration):
+    n = len(div)
+    bias = np.zeros(n, dtype=np.int8)
+    countdown_out = np.zeros(n, dtype=np.int64)
+    bias_type = 0
+    countdown = 0
+    for i in range(n):
+        d = div[i]
+        if np.isnan(d):
+            continue
+        if countdown == 0:
+            if d >= threshold:
+                bias_type = 1
+                countdown = duration
+            elif d <= -threshold:
+                bias_type = -1
+                countdown = duration
+        if countdown > 0:
+            bias[i] = bias_type
+            countdown_out[i] = countdown
+            countdown -= 1
+    return bias, countdown_out
+
+
+def _bias_signal_to_signal_loop(div, threshold):
+    n = len(div)
+    bias = np.zeros(n, dtype=np.int8)
+    current = 0
+    for i in range(n):
+        d = div[i]
+        if not np.isnan(d):
+            if d >= threshold:
+                current = 1
+            elif d <= -threshold:
+                current = -1
+        bias[i] = current
+    return bias
+
+
+def _bias_zero_exit_loop(div, threshold):
+    n = len(div)
+    bias = np.zeros(n, dtype=np.int8)
+    current = 0
+    has_prev = False
+    for i in range(n):
+        d = div[i]
+        if np.isnan(d):
+            current = 0
+            has_prev = False
+            continue
+        if has_prev:
+            if current == 1 and d < 0:
+                current = 0
+            elif current == -1 and d > 0:
+                current = 0
+        if current == 0:
+            if d >= threshold:
+                current = 1
+            elif d <= -threshold:
+                current = -1
+        bias[i] = current
+        has_prev = True
+    return bias
+
+
+# --------------------------------------------------------------------------- #
+# Vektorisierte NumPy-Fallbacks
+# --------------------------------------------------------------------------- #
+
+
+def _first_true(mask: np.ndarray, offset: int) -> int:
+    if len(mask) == 0:
+        return -1
+    pos = int(np.argmax(mask))
+    return pos + offset if mask[pos] else -1
+
+
+def _first_touch_np(values, start, level, below):
+    seg = values[start:]
+    return _first_true(seg <= level if below else seg >= level, start)
+
+
+def _first_overlap_np(high, low, start, lo, hi):
+    return _first_true((low[start:] <= hi) & (high[start:] >= lo), start)
+
+
+def _any_touch_np(values, start, stop, level, below):
+    seg = values[start:stop]
+    if len(seg) == 0:
+        return False
+    return bool((seg <= level).any() if below else (seg >= level).any())
+
+
+def _scan_exit_np(high, low, start, sl, tp, bullish):
+    h = high[start:]
+    lo = low[start:]
+    if bullish:
+        sl_idx = _first_true(lo <= sl, start)
+        tp_idx = _first_true(h >= tp, start)
+    else:
+        sl_idx = _first_true(h >= sl, start)
+        tp_idx = _first_true(lo <= tp, start)
+    if sl_idx < 0 and tp_idx < 0:
+        return -1, 0
+    if sl_idx >= 0 and (tp_idx < 0 or sl_idx <= tp_idx):
+        return sl_idx, 1
+    return tp_idx, 2
+
+
+def _min_table(values):
+    # Sparse Table: table[k][i] = min(values[i:i + 2**k]), Index n = +inf (Ende)
+    table = [np.append(values, np.inf)]
+    width = 1
+    while width < len(values):
+        prev = table[-1]
+        nxt = prev.copy()
+        nxt[:-width] = np.minimum(prev[:-width], prev[width:])
+        table.append(nxt)
+        width *= 2
+    return table
+
+
+def _first_at_or_below(table, starts, levels):
+    # Binary Lifting: Blöcke ohne Treffer (min > level) überspringen → erster Treffer oder n
+    n = len(table[0]) - 1
+    pos = starts.copy()
+    for k in range(len(table) - 1, -1, -1):
+        skip = table[k][np.minimum(pos, n)] > levels
+        pos = np.where(skip, np.minimum(pos + (1 << k), n), pos)
+    return np.where(pos < n, pos, -1)
+
+
+def _scan_exits_np(high, low, starts, sl, tp, bullish):
+    # Alle Positionen gleichzeitig: O(log n) vektorisierte Schritte statt einer Schleife je Trade
+    low_hit = _first_at_or_below(_min_table(low), starts, np.where(bullish, sl, tp))
+    high_hit = _first_at_or_below(_min_table(-high), starts, -np.where(bullish, tp, sl))
+    sl_idx = np.where(bullish, low_hit, high_hit)
+    tp_idx = np.where(bullish, high_hit, low_hit)
+
+    sl_first = (sl_idx >= 0) & ((tp_idx < 0) | (sl_idx <= tp_idx))
+    idx = np.where(sl_first, sl_idx, tp_idx)
+    code = np.where(sl_first, 1, np.where(tp_idx >= 0, 2, 0)).astype(np.int8)
+    return idx, code
+
+
+def _scan_close_confirmation_np(high, low, close, start, level, bullish):
+    c = close[start:]
+    if bullish:
+        confirmed = c > level
+        invalid = (c <= level) & (low[start:] <= level)
+    else:
+        confirmed = c < level
+        invalid = (c >= level) & (high[start:] >= level)
+    first_ok = _first_true(confirmed, start)
+    first_bad = _first_true(invalid, start)
+    if first_bad >= 0 and (first_ok < 0 or first_bad < first_ok):
+        return -1, True
+    return first_ok, False
+
+
+def _first_close_beyond_np(close, start, level, bullish):
+    c = close[start:]
+    return _first_true(c > level if bullish else c < level, start)
+
+
+def _untouched_after_np(values, positions, levels, below):
+    if below:
+        suffix = np.minimum.accumulate(values[::-1])[::-1]
+        suffix = np.append(suffix, np.inf)
+        return ~(suffix[positions + 1] <= levels)
+    suffix = np.maximum.accumulate(values[::-1])[::-1]
+    suffix = np.append(suffix, -np.inf)
+    return ~(suffix[positions + 1] >= levels)
+
+
+def _pivot_directions_np(open_, close, body_pct, min_body_pct):
+    out = np.zeros(len(close), dtype=np.int8)
+    if len(close) < 2:
+        return out
+    body_ok = (body_pct[:-1] >= min_body_pct) & (body_pct[1:] >= min_body_pct)
+    prev_red = close[:-1] < open_[:-1]
+    prev_green = close[:-1] > open_[:-1]
+    curr_green = close[1:] > open_[1:]
+    curr_red = close[1:] < open_[1:]
+    out[1:][body_ok & prev_red & curr_green] = 1
+    out[1:][body_ok & prev_green & curr_red] = -1
+    return out
+
+
+def _bias_signal_to_signal_np(div, threshold):
+    signal = np.zeros(len(div), dtype=np.int8)
+    signal[div >= threshold] = 1
+    signal[div <= -threshold] = -1
+    idx = np.where(signal != 0, np.arange(len(div)), -1)
+    last = np.maximum.accumulate(idx) if len(idx) else idx
+    return np.where(last >= 0, signal[np.maximum(last, 0)], 0).astype(np.int8)
+
+
+# --------------------------------------------------------------------------- #
+# Backend-Auswahl
+# --------------------------------------------------------------------------- #
+
+
+_LOOPS: Dict[str, Callable] = {
+    "first_touch": _first_touch_loop,
+    "first_overlap": _first_overlap_loop,
+    "any_touch": _any_touch_loop,
+    "scan_exit": _scan_exit_loop,
+    "scan_exits": _scan_exits_loop,
+    "scan_close_confirmation": _scan_close_confirmation_loop,
+    "first_close_beyond": _first_close_beyond_loop,
+    "untouched_after": _untouched_after_loop,
+    "pivot_directions": _pivot_directions_loop,
+    "bias_countdown": _bias_countdown_loop,
+    "bias_signal_to_signal": _bias_signal_to_signal_loop,
+    "bias_zero_exit": _bias_zero_exit_loop,
+}
+
+# Zustandsautomaten ohne sinnvolle Vektorisierung laufen im numpy-Backend
+# als Python-Schleife über die Arrays (immer noch ohne pandas-Overhead).
+_NUMPY_IMPL: Dict[str, Callable] = {
+    "first_touch": _first_touch_np,
+    "first_overlap": _first_overlap_np,
+    "any_touch": _any_touch_np,
+    "scan_exit": _scan_exit_np,
+    "scan_exits": _scan_exits_np,
+    "scan_close_confirmation": _scan_close_confirmation_np,
+    "first_close_beyond": _first_close_beyond_np,
+    "untouched_after": _untouched_after_np,
+    "pivot_directions": _pivot_directions_np,
+    "bias_countdown": _bias_countdown_loop,
+    "bias_signal_to_signal": _bias_signal_to_signal_np,
+    "bias_zero_exit": _bias_zero_exit_loop,
+}
+
+_NUMBA_IMPL: Dict[str, Callable] = {}
+_ACTIVE: Dict[str, Callable] = {}
+_BACKEND = None
+
+
+def numba_available() -> bool:
+    return numba is not None
+
+
+def _compile_numba() -> Dict[str, Callable]:
+    if not _NUMBA_IMPL:
+        for name, fn in _LOOPS.items():
+            _NUMBA_IMPL[name] = numba.njit(cache=True, nogil=True)(fn)
+    return _NUMBA_IMPL
+
+
+def set_backend(name: str = "auto") -> str:
+    """
+    Aktiviert ein Kernel-Backend: "numba", "numpy" oder "auto".
+
+    Returns: Name des aktiven Backends
+    """
+    global _BACKEND
+    name = (name or "auto").lower()
+    if name == "auto":
+        name = "numba" if numba_available() else "numpy"
+    if name == "numba":
+        if not numba_available():
+            raise ImportError("Kernel-Backend 'numba' angefordert, aber numba ist nicht installiert")
+        _ACTIVE.update(_compile_numba())
+    elif name == "numpy":
+        _ACTIVE.update(_NUMPY_IMPL)
+    else:
+        raise ValueError(f"Unbekanntes Kernel-Backend: {name}")
+    _BACKEND = name
+    return name
+
+
+def get_backend() -> str:
+    return _BACKEND
+
+
+set_backend(os.environ.get("MODEL3_KERNEL_BACKEND", "auto"))
+
+
+# --------------------------------------------------------------------------- #
+# Öffentliche Kernels
+# --------------------------------------------------------------------------- #
+
+
+def first_touch(values: np.ndarray, start: int, level: float, below: bool) -> int:
+    """Erster Index >= start mit values <= level (below) bzw. values >= level, sonst -1."""
+    return int(_ACTIVE["first_touch"](values, start, level, below))
+
+
+def first_overlap(high: np.ndarray, low: np.ndarray, start: int, lo: float, hi: float) -> int:
+    """Erster Index >= start, dessen Kerze die Zone [lo, hi] berührt, sonst -1."""
+    return int(_ACTIVE["first_overlap"](high, low, start, lo, hi))
+
+
+def any_touch(values: np.ndarray, start: int, stop: int, level: float, below: bool) -> bool:
+    """True wenn level im Index-Fenster [start, stop) berührt wurde."""
+    return bool(_ACTIVE["any_touch"](values, start, stop, level, below))
+
+
+def scan_exit(
+    high: np.ndarray, low: np.ndarray, start: int, sl: float, tp: float, bullish: bool
+) -> Tuple[int, int]:
+    """
+    Sucht ab start den ersten SL- oder TP-Hit.
+
+    Returns: (index, code) mit code 1 = SL, 2 = TP, 0 = kein Exit (index -1)
+    """
+    idx, code = _ACTIVE["scan_exit"](high, low, start, sl, tp, bullish)
+    return int(idx), int(code)
+
+
+def scan_exits(
+    high: np.ndarray, low: np.ndarray, starts: np.ndarray, sl: np.ndarray, tp: np.ndarray, bullish: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    scan_exit für viele Positionen auf denselben Kerzen (z.B. synthetische
+    Trades eines Pairs). Gleiche Regeln: SL hat bei gleicher Kerze Vorrang.
+
+    Returns: (index, code) als Arrays, code 1 = SL, 2 = TP, 0 = kein Exit (index -1)
+    """
+    starts = np.ascontiguousarray(starts, dtype=np.int64)
+    sl = np.ascontiguousarray(sl, dtype=np.float64)
+    tp = np.ascontiguousarray(tp, dtype=np.float64)
+    bullish = np.ascontiguousarray(bullish, dtype=np.bool_)
+    return _ACTIVE["scan_exits"](high, low, starts, sl, tp, bullish)
+
+
+def scan_close_confirmation(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, start: int, level: float, bullish: bool
+) -> Tuple[int, bool]:
+    """
+    Close-Bestätigung ab start: erste Kerze mit Close jenseits level.
+
+    Returns: (index, invalidated) – invalidated wenn Close vorher zurück in die Gap fällt
+    """
+    idx, invalidated = _ACTIVE["scan_close_confirmation"](high, low, close, start, level, bullish)
+    return int(idx), bool(invalidated)
+
+
+def first_close_beyond(close: np.ndarray, start: int, level: float, bullish: bool) -> int:
+    """Erste Kerze ab start mit Close > level (bullish) bzw. < level (bearish)."""
+    return int(_ACTIVE["first_close_beyond"](close, start, level, bullish))
+
+
+def untouched_after(
+    values: np.ndarray, positions: np.ndarray, levels: np.ndarray, below: bool
+) -> np.ndarray:
+    """
+    "Unberührt"-Check: für jeden Kandidaten, ob levels[k] NACH positions[k]
+    (bis Fensterende) nie berührt wurde.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    levels = np.asarray(levels, dtype=np.float64)
+    return _ACTIVE["untouched_after"](values, positions, levels, below)
+
+
+def pivot_directions(arrays: CandleArrays, min_body_pct: float) -> np.ndarray:
+    """Pivot-Muster je K2-Index: 1 = bullish, -1 = bearish, 0 = kein Pivot."""
+    return _ACTIVE["pivot_directions"](arrays.open, arrays.close, arrays.body_pct, float(min_body_pct))
+
+
+def bias_countdown(div: np.ndarray, threshold: float, duration: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+    """COT-Bias mit Countdown (Bias_8W). Returns: (bias, countdown), bias in {1, -1, 0}."""
+    div = np.ascontiguousarray(div, dtype=np.float64)
+    return _ACTIVE["bias_countdown"](div, float(threshold), int(duration))
+
+
+def bias_signal_to_signal(div: np.ndarray, threshold: float) -> np.ndarray:
+    """COT-Bias Signal-zu-Signal (Bias_to_Bias). Returns: bias in {1, -1, 0}."""
+    div = np.ascontiguousarray(div, dtype=np.float64)
+    return _ACTIVE["bias_signal_to_signal"](div, float(threshold))
+
+
+def bias_zero_exit(div: np.ndarray, threshold: float) -> np.ndarray:
+    """COT-Bias mit Null-Exit (Bias_fix_0). Returns: bias in {1, -1, 0}."""
+    div = np.ascontiguousarray(div, dtype=np.float64)
+    return _ACTIVE["bias_zero_exit"](div, float(threshold))
+
+
+BIAS_LABELS = np.array(["short", "neutral", "long"], dtype=object)
+
+
+def bias_labels(codes: np.ndarray) -> np.ndarray:
+    """Bias-Codes {-1, 0, 1} → 'short' / 'neutral' / 'long'."""
+    return BIAS_LABELS[np.asarray(codes, dtype=np.int64) + 1]
+
+
+# --------------------------------------------------------------------------- #
+# Selbsttest: numba vs. numpy
+# --------------------------------------------------------------------------- #
+
+
+def _random_candles(rng: np.random.Generator, n: int) -> CandleArrays:
+    """Random-Walk-Kerzen (FX-ähnliche Schrittweite) als CandleArrays."""
+    close = 1.0 + np.cumsum(rng.normal(0.0, 0.002, n))
+    open_ = np.r_[1.0, close[:-1]]
+    wicks = np.abs(rng.normal(0.0, 0.0015, (2, n)))
+    df = pd.DataFrame({
+        "time": pd.date_range("2010-01-01", periods=n, freq="D", tz="UTC"),
+        "open": open_,
+        "high": np.maximum(open_, close) + wicks[0],
+        "low": np.minimum(open_, close) - wicks[1],
+        "close": close,
+    })
+    return candle_arrays(df)
+
+
+def _kernel_calls(arr: CandleArrays, rng: np.random.Generator, cases: int):
+    """(Kernel-Name, Argumente) mit Levels nahe am Preis, damit Treffer und Nicht-Treffer vorkommen."""
+    n = len(arr)
+    calls = []
+    for _ in range(cases):
+        start = int(rng.integers(0, n + 1))
+        stop = int(rng.integers(start, n + 1))
+        anchor = arr.close[min(start, n - 1)]
+        level = float(anchor + rng.normal(0.0, 0.01))
+        below = bool(rng.integers(2))
+        bullish = bool(rng.integers(2))
+        risk = float(abs(rng.normal(0.0, 0.01)) + 1e-4)
+        sign = 1.0 if bullish else -1.0
+        sl = level - sign * risk
+        tp = level + sign * risk * float(rng.uniform(0.5, 3.0))
+        calls += [
+            ("first_touch", (arr.low if below else arr.high, start, level, below)),
+            ("first_overlap", (arr.high, arr.low, start, min(level, sl), max(level, sl))),
+            ("any_touch", (arr.low if below else arr.high, start, stop, level, below)),
+            ("scan_exit", (arr.high, arr.low, start, sl, tp, bullish)),
+            ("scan_close_confirmation", (arr.high, arr.low, arr.close, start, level, bullish)),
+            ("first_close_beyond", (arr.close, start, level, bullish)),
+        ]
+
+    starts = rng.integers(0, n + 1, cases)
+    entry = arr.close[np.minimum(starts, n - 1)]
+    bullish = rng.integers(0, 2, cases).astype(np.bool_)
+    sign = np.where(bullish, 1.0, -1.0)
+    risk = np.abs(rng.normal(0.0, 0.01, cases)) + 1e-4
+    calls.append(("scan_exits", (arr.high, arr.low, starts, entry - sign * risk, entry + sign * risk * 2.0, bullish)))
+
+    positions = rng.integers(0, n, cases)
+    offsets = rng.normal(0.0, 0.01, cases)
+    calls.append(("untouched_after", (arr.low, positions, arr.low[positions] + offsets, True)))
+    calls.append(("untouched_after", (arr.high, positions, arr.high[positions] + offsets, False)))
+    calls.append(("pivot_directions", (arr, 5.0)))
+
+    div = rng.normal(0.0, 30.0, n)
+    div[rng.random(n) < 0.05] = np.nan
+    calls += [
+        ("bias_countdown", (div, 20.0, 8)),
+        ("bias_signal_to_signal", (div, 20.0)),
+        ("bias_zero_exit", (div, 20.0)),
+    ]
+    return calls
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, tuple):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return np.array_equal(np.asarray(a), np.asarray(b))
+
+
+def self_test(n_candles: int = 2000, cases: int = 300, seeds: Tuple[int, ...] = (0, 1, 2)) -> Dict[str, int]:
+    """
+    Ruft alle Kernels mit identischen Zufalls-Eingaben in beiden Backends auf
+    und vergleicht die Ergebnisse (Kerzen-Scans, Exits, Bestätigung, COT-Bias).
+
+    Returns: {Kernel-Name: Anzahl Abweichungen}; das vorherige Backend bleibt aktiv
+    """
+    if not numba_available():
+        raise ImportError("Selbsttest braucht numba (Vergleich numba vs. numpy)")
+    calls = []
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        calls += _kernel_calls(_random_candles(rng, n_candles), rng, cases)
+
+    previous = get_backend()
+    results = {}
+    try:
+        for backend in ("numpy", "numba"):
+            set_backend(backend)
+            results[backend] = [globals()[name](*args) for name, args in calls]
+    finally:
+        set_backend(previous)
+
+    mismatches = {name: 0 for name, _ in calls}
+    for (name, _), a, b in zip(calls, results["numpy"], results["numba"]):
+        mismatches[name] += not _same(a, b)
+    return mismatches
+
+
+if __name__ == "__main__":
+    import sys
+
+    report = self_test()
+    for name, count in report.items():
+        print(f"  [{'OK' if count == 0 else 'MISMATCH'}] {name}: {count} Abweichung(en)")
+    sys.exit(1 if any(report.values()) else 0)
@@ -0,0 +1,367 @@
+"""
+Model 3 Trade-Ledger (spaltenweise)
+-----------------------------------
+
+Sammelt Trades direkt in typisierten, vorab allokierten Spalten-Arrays statt
+als Liste von Dicts bzw. Trade-Dataclasses. Bei Sweeps mit 100k+ Kandidaten-
+Trades entstehen so keine 100k Dicts, sondern eine Handvoll NumPy-Arrays.
+
+Spaltentypen (gleiche Konventionen wie trade_store):
+- *_time                 → int64 ns seit Epoch (UTC), NaT = fehlend
+- Zähler (INT_COLUMNS)   → int64
+- Strings                → int32-Codes + Kategorienliste (Dictionary-Encoding)
+- bool                   → bool
+- sonstige Zahlen        → float64, NaN = fehlend
+
+Die Arrays wachsen durch Verdopplung der Kapazität. Export:
+- to_pandas(): Spalten-Arrays werden direkt übernommen (Strings als category)
+- to_arrow():  pyarrow.Table mit demselben Schema wie trade_store.trades_to_batch
+
+ledger[i] liefert eine TradeRow (__slots__, Attribut- und Key-Zugriff wie
+Trade bzw. Trade-Dict), ohne eine Kopie der Zeile anzulegen.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting.trade_store import CATEGORY_COLUMNS, INT_COLUMNS
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from trade_store import CATEGORY_COLUMNS, INT_COLUMNS
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow ist optional (nur für to_arrow)
+    pa = None
+
+
+NAT = np.iinfo(np.int64).min
+
+# Spalten-Arten
+FLOAT = "float"
+INT = "int"
+BOOL = "bool"
+TIME = "time"
+CAT = "cat"
+
+_DTYPES = {FLOAT: np.float64, INT: np.int64, BOOL: np.bool_, TIME: np.int64, CAT: np.int32}
+_FILL = {FLOAT: np.nan, INT: 0, BOOL: False, TIME: NAT, CAT: -1}
+
+
+def column_kind(column: str, sample=None) -> str:
+    """Spalten-Art aus Name (Konvention) bzw. Beispielwert."""
+    if column.endswith("_time"):
+        return TIME
+    if column in INT_COLUMNS:
+        return INT
+    if column in CATEGORY_COLUMNS or isinstance(sample, str):
+        return CAT
+    if isinstance(sample, (bool, np.bool_)):
+        return BOOL
+    return FLOAT
+
+
+def _time_value(value) -> int:
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+        return NAT
+    return pd.Timestamp(value).value  # naive Zeitstempel gelten als UTC
+
+
+# --------------------------------------------------------------------------- #
+# Zeilen-Sicht
+# --------------------------------------------------------------------------- #
+
+
+class TradeRow:
+    """Sicht auf eine Ledger-Zeile (keine Kopie). row.pnl_r / row["pnl_r"] / row.to_dict()."""
+
+    __slots__ = ("_ledger", "_index")
+
+    def __init__(self, ledger: "TradeLedger", index: int):
+        self._ledger = ledger
+        self._index = index
+
+    def __getattr__(self, name: str):
+        try:
+            return self._ledger.value(name, self._index)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name: str):
+        return self._ledger.value(name, self._index)
+
+    def get(self, name: str, default=None):
+        return self._ledger.value(name, self._index) if name in self._ledger.kinds else default
+
+    def keys(self) -> List[str]:
+        return self._ledger.columns
+
+    def to_dict(self) -> Dict:
+        return {col: self._ledger.value(col, self._index) for col in self._ledger.columns}
+
+    def __repr__(self) -> str:
+        return f"TradeRow({self._index}, {self.to_dict()!r})"
+
+
+# --------------------------------------------------------------------------- #
+# Ledger
+# --------------------------------------------------------------------------- #
+
+
+class TradeLedger:
+    """Wachsender, spaltenweiser Trade-Speicher. Schema aus dem ersten Trade (bzw. schema=)."""
+
+    def __init__(self, schema: Optional[Dict[str, str]] = None, capacity: int = 256):
+        self._capacity = max(int(capacity), 1)
+        self._n = 0
+        self.columns: List[str] = []
+        self.kinds: Dict[str, str] = {}
+        self._data: Dict[str, np.ndarray] = {}
+        self._categories: Dict[str, List[str]] = {}
+        self._codes: Dict[str, Dict[str, int]] = {}
+        for col, kind in (schema or {}).items():
+            self._add_column(col, kind)
+
+    # ------------------------------------------------------------------ #
+    # Schema / Speicher
+    # ------------------------------------------------------------------ #
+
+    def _add_column(self, col: str, kind: str) -> None:
+        self.columns.append(col)
+        self.kinds[col] = kind
+        self._data[col] = np.full(self._capacity, _FILL[kind], dtype=_DTYPES[kind])
+        if kind == CAT:
+            self._categories[col] = []
+            self._codes[col] = {}
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        for col, arr in self._data.items():
+            grown = np.full(capacity, _FILL[self.kinds[col]], dtype=arr.dtype)
+            grown[: self._n] = arr[: self._n]
+            self._data[col] = grown
+        self._capacity = capacity
+
+    def _to_category(self, col: str) -> None:
+        """Bisher leere Float-Spalte (nur None) wird beim ersten String zur Kategorie-Spalte."""
+        if np.any(~np.isnan(self._data[col][: self._n])):
+            raise TypeError(f"Spalte {col!r} enthält Zahlen und Strings")
+        self.kinds[col] = CAT
+        self._data[col] = np.full(self._capacity, -1, dtype=np.int32)
+        self._categories[col] = []
+        self._codes[col] = {}
+
+    def _code(self, col: str, value) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        codes = self._codes[col]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._categories[col])
+            self._categories[col].append(value)
+        return code
+
+    # ------------------------------------------------------------------ #
+    # Schreiben
+    # ------------------------------------------------------------------ #
+
+    def append(self, trade: Optional[Dict] = None, **fields) -> None:
+        """Hängt einen Trade an (Dict und/oder Keyword-Felder). Neue Spalten werden ergänzt."""
+        if trade is not None:
+            fields = {**trade, **fields} if fields else trade
+        if self._n >= self._capacity:
+            self._grow(self._n + 1)
+        i = self._n
+        for col, value in fields.items():
+            kind = self.kinds.get(col)
+            if kind is None:
+                self._add_column(col, column_kind(col, value))
+                kind = self.kinds[col]
+            elif kind == FLOAT and isinstance(value, str):
+                self._to_category(col)
+                kind = CAT
+            if kind == TIME:
+                self._data[col][i] = _time_value(value)
+            elif kind == CAT:
+                self._data[col][i] = self._code(col, value)
+            elif kind == FLOAT:
+                self._data[col][i] = np.nan if value is None else value
+            elif value is not None:
+                self._data[col][i] = value
+        self._n += 1
+
+    def extend(self, trades: Iterable[Dict]) -> None:
+        for trade in trades:
+            self.append(trade)
+
+    @classmethod
+    def from_records(cls, trades: Iterable[Dict]) -> "TradeLedger":
+        ledger = cls()
+        ledger.extend(trades)
+        return ledger
+
+    # ------------------------------------------------------------------ #
+    # Lesen
+    # ------------------------------------------------------------------ #
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __bool__(self) -> bool:
+        return self._n > 0
+
+    def __getitem__(self, index: int) -> TradeRow:
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError(index)
+        return TradeRow(self, index)
+
+    def __iter__(self) -> Iterator[TradeRow]:
+        for i in range(self._n):
+            yield TradeRow(self, i)
+
+    def column(self, col: str) -> np.ndarray:
+        """Rohes Spalten-Array (View, gefüllter Teil): Zeiten int64 ns, Strings int32-Codes."""
+        return self._data[col][: self._n]
+
+    def categories(self, col: str) -> List[str]:
+        return list(self._categories[col])
+
+    def value(self, col: str, index: int):
+        kind = self.kinds[col]
+        raw = self._data[col][index]
+        if kind == TIME:
+            return None if raw == NAT else pd.Timestamp(int(raw), tz="UTC")
+        if kind == CAT:
+            return None if raw < 0 else self._categories[col][raw]
+        return raw.item()
+
+    def records(self) -> List[Dict]:
+        """Alle Trades als Dicts (Kompatibilität; erzeugt n Dicts)."""
+        return [row.to_dict() for row in self]
+
+    # ------------------------------------------------------------------ #
+    # Umordnen / Zusammenführen
+    # ------------------------------------------------------------------ #
+
+    def take(self, indices: Sequence[int]) -> "TradeLedger":
+        """Neuer Ledger mit den Zeilen indices (Kategorien werden übernommen)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        out = TradeLedger(capacity=max(len(indices), 1))
+        for col in self.columns:
+            out._add_column(col, self.kinds[col])
+            out._data[col][: len(indices)] = self.column(col)[indices]
+            if self.kinds[col] == CAT:
+                out._categories[col] = list(self._categories[col])
+                out._codes[col] = dict(self._codes[col])
+        out._n = len(indices)
+        return out
+
+    def sort_key(self, col: str) -> np.ndarray:
+        """Sortierbare Darstellung einer Spalte (Strings: Rang der Kategorie)."""
+        if self.kinds[col] == CAT:
+            cats = self._categories[col]
+            rank = np.empty(len(cats) + 1, dtype=np.int64)
+            rank[-1] = -1  # fehlende Werte (Code -1) zuerst
+            rank[: len(cats)] = np.argsort(np.argsort(np.array(cats, dtype=object), kind="stable"), kind="stable")
+            return rank[self.column(col)]
+        return self.column(col)
+
+    def sorted(self, by: Sequence[str]) -> "TradeLedger":
+        """Stabil sortierter Ledger (wie list.sort(key=lambda t: (t[by[0]], t[by[1]], ...)))."""
+        if self._n == 0:
+            return self
+        order = np.lexsort([self.sort_key(col) for col in reversed(list(by))])
+        return self.take(order)
+
+    @classmethod
+    def concat(cls, ledgers: Iterable["TradeLedger"]) -> "TradeLedger":
+        """Hängt Ledger in gegebener Reihenfolge aneinander (Kategorien werden vereinigt)."""
+        ledgers = [l for l in ledgers if l is not None]
+        total = sum(len(l) for l in ledgers)
+        out = cls(capacity=max(total, 1))
+        for ledger in ledgers:
+            for col in ledger.columns:
+                if col not in out.kinds:
+                    out._add_column(col, ledger.kinds[col])
+        for ledger in ledgers:
+            n, start = len(ledger), out._n
+            for col in ledger.columns:
+                src = ledger.column(col)
+                if out.kinds[col] == CAT:
+                    remap = np.array([out._code(col, c) for c in ledger._categories[col]] + [-1], dtype=np.int32)
+                    out._data[col][start : start + n] = remap[src]
+                else:
+                    out._data[col][start : start + n] = src
+            out._n += n
+        return out
+
+    # ------------------------------------------------------------------ #
+    # Export
+    # ------------------------------------------------------------------ #
+
+    def to_pandas(self, categorical: bool = True) -> pd.DataFrame:
+        """
+        DataFrame mit typisierten Spalten (Zahlen ohne Kopie übernommen).
+
+        categorical: False → String-Spalten als object (wie pd.DataFrame(list_of_dicts))
+        """
+        data = {}
+        for col in self.columns:
+            arr = self.column(col)
+            kind = self.kinds[col]
+            if kind == TIME:
+                data[col] = pd.DatetimeIndex(arr.view("M8[ns]")).tz_localize("UTC")
+            elif kind == CAT:
+                cat = pd.Categorical.from_codes(arr, categories=pd.Index(self._categories[col], dtype=object))
+                data[col] = cat if categorical else np.asarray(cat, dtype=object)
+            else:
+                data[col] = arr
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self):
+        """pyarrow.Table (Schema wie trade_store.trades_to_batch)."""
+        if pa is None:
+            raise ImportError("pyarrow wird für TradeLedger.to_arrow benötigt (pip install pyarrow)")
+        arrays, fields = [], []
+        for col in self.columns:
+            arr = self.column(col)
+            kind = self.kinds[col]
+            if kind == TIME:
+                out = pa.array(arr, mask=arr == NAT).cast(pa.timestamp("ns", tz="UTC"))
+            elif kind == CAT:
+                out = pa.DictionaryArray.from_arrays(
+                    pa.array(arr, mask=arr < 0), pa.array(self._categories[col], type=pa.string())
+                )
+                if col not in CATEGORY_COLUMNS:
+                    out = out.dictionary_decode()
+            elif kind == FLOAT:
+                out = pa.array(arr, type=pa.float64())
+            else:
+                out = pa.array(arr)
+            arrays.append(out)
+            fields.append(pa.field(col, out.type))
+        return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+    # ------------------------------------------------------------------ #
+    # Pickle (Pool-Rückgabe, Checkpoints): nur der gefüllte Teil
+    # ------------------------------------------------------------------ #
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_data"] = {col: arr[: self._n].copy() for col, arr in self._data.items()}
+        state["_capacity"] = max(self._n, 1)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._n == 0:
+            self._data = {col: np.full(1, _FILL[self.kinds[col]], dtype=_DTYPES[self.kinds[col]]) for col in self.columns}
@@ -0,0 +1,191 @@
+"""
+Model 3 Monte Carlo / Bootstrap
+-------------------------------
+
+Verteilungen statt Einzelwerten: calc_stats liefert genau eine Equity-Kurve
+(Ledger-Reihenfolge) und damit genau einen Max Drawdown. Hier werden aus den
+pnl_r eines Ledgers tausende Pfade als 2D-Array (Simulationen × Trades)
+erzeugt und alle Kennzahlen spaltenweise in einem Durchgang berechnet:
+
+- "permutation": Trade-Reihenfolge zufällig gemischt (Ziehen ohne
+  Zurücklegen) → gleiche Trades, andere Reihenfolge. Summe / Expectancy sind
+  konstant, Drawdown und Streaks streuen
+- "bootstrap": n Trades mit Zurücklegen gezogen → streut zusätzlich
+  Expectancy, Win Rate und Endkapital (Konfidenzintervalle)
+
+Gleiche Definitionen wie stats.calc_stats / batch_stats:
+- Equity = start_cap + Σ r·start_cap·risk (fixes Risiko, kein Compounding)
+- max_dd = minimaler Drawdown (%) der Equity gegenüber dem laufenden Hoch
+- Verlust-Trade = pnl_r <= 0 (max_loss_streak = längste Folge davon)
+
+Speicher: Simulationen laufen in Blöcken à chunk_size Zeilen
+(chunk_size × n × 8 Byte je Zwischen-Array); chunk_size=None = alles auf
+einmal. Gleicher seed + gleiche chunk_size → identische Ergebnisse.
+
+Beispiel:
+    mc = monte_carlo(df["pnl_r"], sims=10_000, method="bootstrap", seed=42)
+    mc.quantiles("max_dd", [0.05, 0.5, 0.95])
+    mc.confidence_interval("expectancy", level=0.95)
+    mc.prob("max_dd", "<=", -20)     # Anteil Pfade mit DD von 20% oder mehr
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("permutation", "bootstrap")
+
+METRICS = ("expectancy", "win_rate", "cumulative_r", "final_equity", "max_dd", "max_dd_r", "max_loss_streak")
+
+
+# ---- Stichproben (Simulationen × Trades, Indizes in das Ledger) ---- #
+
+
+def permutation_indices(n: int, sims: int, rng: np.random.Generator) -> np.ndarray:
+    """sims zufällige Permutationen von 0..n-1 (eine je Zeile)."""
+    return rng.permuted(np.broadcast_to(np.arange(n, dtype=np.int64), (sims, n)), axis=1)
+
+
+def bootstrap_indices(n: int, sims: int, rng: np.random.Generator) -> np.ndarray:
+    """sims Bootstrap-Stichproben (n Indizes mit Zurücklegen je Zeile)."""
+    return rng.integers(0, n, size=(sims, n), dtype=np.int64)
+
+
+# ---- Kennzahlen je Pfad ---- #
+
+
+def equity_paths(paths: np.ndarray, start_cap: float = 100000, risk: float = 0.01) -> np.ndarray:
+    """Equity-Kurven (Simulationen × (Trades + 1)), erste Spalte = start_cap."""
+    paths = np.atleast_2d(paths)
+    equity = np.empty((paths.shape[0], paths.shape[1] + 1), dtype=np.float64)
+    equity[:, 0] = start_cap
+    np.cumsum(paths * (start_cap * risk), axis=1, out=equity[:, 1:])
+    equity[:, 1:] += start_cap
+    return equity
+
+
+def longest_run(flags: np.ndarray) -> np.ndarray:
+    """Längste zusammenhängende True-Folge je Zeile (vektorisiert über alle Zeilen)."""
+    flags = np.atleast_2d(flags)
+    if flags.shape[1] == 0:
+        return np.zeros(flags.shape[0], dtype=np.int64)
+    pos = np.arange(1, flags.shape[1] + 1, dtype=np.int64)
+    # Position der letzten False-Stelle bis hierher → Länge der laufenden Folge
+    last_break = np.maximum.accumulate(np.where(flags, 0, pos), axis=1)
+    return (pos - last_break).max(axis=1)
+
+
+def path_stats(paths: np.ndarray, start_cap: float = 100000, risk: float = 0.01) -> Dict[str, np.ndarray]:
+    """
+    Kennzahlen je Zeile einer pnl_r-Matrix (Simulationen × Trades).
+
+    Returns:
+        {kennzahl: np.ndarray (eine Zahl je Simulation)} für alle METRICS
+    """
+    paths = np.atleast_2d(np.asarray(paths, dtype=np.float64))
+    n = paths.shape[1]
+
+    equity = equity_paths(paths, start_cap, risk)
+    peak = np.maximum.accumulate(equity, axis=1)
+    drawdown = equity - peak
+    cumulative_r = paths.sum(axis=1)
+
+    return {
+        "expectancy": cumulative_r / n if n else np.full(len(paths), np.nan),
+        "win_rate": (paths > 0).mean(axis=1) * 100 if n else np.zeros(len(paths)),
+        "cumulative_r": cumulative_r,
+        "final_equity": equity[:, -1].copy(),
+        "max_dd": (drawdown / peak * 100).min(axis=1),
+        "max_dd_r": drawdown.min(axis=1) / (start_cap * risk),
+        "max_loss_streak": longest_run(paths <= 0),
+    }
+
+
+# ---- Ergebnis ---- #
+
+
+@dataclass
+class MonteCarloResult:
+    """Kennzahlen aller Simulationen (eine Spalte je Kennzahl) + tatsächlicher Pfad."""
+
+    method: str
+    sims: pd.DataFrame
+    actual: Dict[str, float] = field(default_factory=dict)
+
+    def quantiles(self, metric: str, q: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.Series:
+        """Quantile einer Kennzahl über alle Simulationen."""
+        return self.sims[metric].quantile(list(q))
+
+    def confidence_interval(self, metric: str, level: float = 0.95) -> Tuple[float, float]:
+        """Zweiseitiges Perzentil-Intervall (z.B. 95% → 2.5% / 97.5%)."""
+        tail = (1 - level) / 2
+        lo, hi = np.quantile(self.sims[metric].to_numpy(), [tail, 1 - tail])
+        return float(lo), float(hi)
+
+    def prob(self, metric: str, op: str, value: float) -> float:
+        """Anteil der Simulationen mit metric <op> value (op: "<", "<=", ">", ">=")."""
+        values = self.sims[metric].to_numpy()
+        hits = {"<": values < value, "<=": values <= value, ">": values > value, ">=": values >= value}[op]
+        return float(hits.mean())
+
+    def percentile_of_actual(self, metric: str) -> float:
+        """Anteil (%) der Simulationen mit Wert <= tatsächlichem Wert."""
+        return float((self.sims[metric].to_numpy() <= self.actual[metric]).mean() * 100)
+
+    def summary(self, q: Sequence[float] = (0.05, 0.5, 0.95)) -> pd.DataFrame:
+        """Tabelle: Kennzahl × (actual, mean, Quantile)."""
+        table = self.sims.quantile(list(q)).T
+        table.columns = [f"p{round(x * 100):g}" for x in q]
+        table.insert(0, "mean", self.sims.mean())
+        table.insert(0, "actual", pd.Series(self.actual))
+        return table
+
+
+def monte_carlo(
+    pnl_r,
+    sims: int = 10_000,
+    method: str = "permutation",
+    start_cap: float = 100000,
+    risk: float = 0.01,
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = 1000,
+) -> MonteCarloResult:
+    """
+    Monte-Carlo-Simulation eines Ledgers.
+
+    Args:
+        pnl_r: R-Multiples in Ledger-Reihenfolge (Series, Array oder Liste)
+        sims: Anzahl Simulationen
+        method: "permutation" (Reihenfolge mischen) oder "bootstrap" (Ziehen mit Zurücklegen)
+        seed: Seed des Zufallsgenerators (None = nicht reproduzierbar)
+        chunk_size: Simulationen je Block (Speicherlimit), None = alle auf einmal
+
+    Returns:
+        MonteCarloResult – sims mit einer Zeile je Simulation, actual = Kennzahlen
+        des Ledgers in Original-Reihenfolge
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unbekannte Methode '{method}' (erlaubt: {', '.join(METHODS)})")
+
+    pnl = np.asarray(pnl_r, dtype=np.float64)
+    pnl = pnl[~np.isnan(pnl)]
+    n = len(pnl)
+    if n == 0:
+        raise ValueError("Monte Carlo braucht mindestens einen Trade")
+
+    rng = np.random.default_rng(seed)
+    draw = permutation_indices if method == "permutation" else bootstrap_indices
+    step = sims if chunk_size is None else max(1, int(chunk_size))
+
+    parts = []
+    for lo in range(0, sims, step):
+        rows = min(step, sims - lo)
+        parts.append(path_stats(pnl[draw(n, rows, rng)], start_cap, risk))
+
+    table = pd.DataFrame({key: np.concatenate([p[key] for p in parts]) for key in METRICS})
+    actual = {key: values[0].item() for key, values in path_stats(pnl, start_cap, risk).items()}
+    return MonteCarloResult(method=method, sims=table, actual=actual)
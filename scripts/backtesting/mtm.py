@@ -0,0 +1,218 @@
+"""
+Model 3 Mark-to-Market Equity
+-----------------------------
+
+calc_stats / generate_equity_curve buchen einen Trade erst beim Exit – der
+Drawdown offener, überlappender Trades (3D-Trades laufen Tage, M-Trades
+Wochen) fehlt. Hier wird jeder offene Trade an jedem Close eines Bewertungs-
+TF (D oder H1, All_Pairs Parquet) bewertet:
+
+- unrealisiert (R) = (Close - entry_price) / (entry_price - sl_price)
+  (gilt für bullish und bearish, siehe pnl_r im Ledger)
+- offen bei Bewertungszeit g: entry_time < g < exit_time,
+  realisiert ab exit_time <= g (pnl_r × Risikobetrag)
+- Equity(g) = Start + realisiert bis g + Σ unrealisiert der offenen Trades
+
+Vektorisiert ohne Tages-Schleife: je Trade der Bereich offener Raster-Punkte
+(searchsorted), alle (Trade, Zeitpunkt)-Paare per repeat, Preise per Index in
+die Close-Matrix (Pairs × Raster, forward-filled), Summen per bincount.
+Trades ohne Preisdaten werden bis zum Exit mit 0R bewertet (unpriced).
+
+Beispiel:
+    prices = price_grid(sorted(trades["pair"].unique()), "D")
+    result = mtm_equity(trades, prices, start_cap=100000, risk=0.01)
+    result.equity, result.drawdown, result.drawdown_periods(), result.summary()
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting.backtest_model3 import _read_tf_file
+    from scripts.backtesting.batch_stats import _time_ns
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from backtest_model3 import _read_tf_file
+    from batch_stats import _time_ns
+
+CANDLE_NS = {
+    "H1": 3_600 * 10**9,
+    "H4": 4 * 3_600 * 10**9,
+    "D": 86_400 * 10**9,
+}
+
+NAT_NS = np.iinfo(np.int64).min
+
+
+class PriceGrid(NamedTuple):
+    """Closes aller Pairs auf gemeinsamem Raster (Candle-Close-Zeiten, forward-filled)."""
+
+    pairs: List[str]
+    time_ns: np.ndarray    # Close-Zeit (UTC ns) = Candle-Open + Candle-Dauer
+    close: np.ndarray      # (Pairs × Raster), NaN vor der ersten Candle eines Pairs
+    timeframe: str
+
+
+def price_grid(pairs: Optional[Sequence[str]] = None, timeframe: str = "D") -> PriceGrid:
+    """Close-Matrix aus All_Pairs_{timeframe}_UTC.parquet (eine Datei, ein Read)."""
+    if timeframe not in CANDLE_NS:
+        raise ValueError(f"Bewertungs-TF nicht unterstützt: {timeframe} (erlaubt: {', '.join(CANDLE_NS)})")
+    df = _read_tf_file(timeframe)
+    if pairs is not None:
+        df = df[df["pair"].isin(list(pairs))]
+    wide = df.pivot_table(index="time", columns="pair", values="close", aggfunc="last").sort_index().ffill()
+    return PriceGrid(
+        pairs=[str(p) for p in wide.columns],
+        time_ns=_time_ns(wide.index.to_series()) + CANDLE_NS[timeframe],
+        close=np.ascontiguousarray(wide.to_numpy(dtype=np.float64).T),
+        timeframe=timeframe,
+    )
+
+
+def _to_index(ns: np.ndarray, tz) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(ns.view("M8[ns]"))
+    return index.tz_localize(tz) if tz is not None else index
+
+
+@dataclass
+class MTMResult:
+    """Zeitindizierte Equity (UTC, je Close des Bewertungs-TF)."""
+
+    equity: pd.Series
+    realized: pd.Series
+    unrealized: pd.Series
+    open_trades: pd.Series
+    start_cap: float
+    unpriced: int           # Trades ohne Preisdaten (nur realisiert)
+
+    @property
+    def drawdown(self) -> pd.Series:
+        """Drawdown in % vom bisherigen Hoch (Start-Kapital zählt als Hoch)."""
+        values = self.equity.to_numpy()
+        peak = np.maximum.accumulate(np.concatenate([[self.start_cap], values]))[1:]
+        return pd.Series((values - peak) / peak * 100, index=self.equity.index, name="drawdown_pct")
+
+    def drawdown_periods(self) -> pd.DataFrame:
+        """
+        Eine Zeile je Drawdown-Phase (vektorisiert): Hoch, Tief, Erholung
+        (NaT = noch nicht erholt), Tiefe (%) und Dauer bis Erholung bzw. Ende.
+        """
+        values = self.equity.to_numpy()
+        times = self.equity.index
+        columns = ["peak_time", "trough_time", "recovery_time", "depth_pct", "duration"]
+        if len(values) == 0:
+            return pd.DataFrame(columns=columns)
+
+        peak = np.maximum.accumulate(np.concatenate([[self.start_cap], values]))[1:]
+        under = values < peak
+        starts = np.flatnonzero(under & ~np.r_[False, under[:-1]])
+        ends = np.flatnonzero(under & ~np.r_[under[1:], False])  # letzter Punkt unter Wasser
+        if len(starts) == 0:
+            return pd.DataFrame(columns=columns)
+
+        # Tiefster Punkt je Phase: kleinster relativer Drawdown innerhalb der Phase
+        dd = (values - peak) / peak * 100
+        pos = np.flatnonzero(under)
+        phase = np.cumsum(np.r_[False, under[:-1]] < under)[pos] - 1
+        order = np.lexsort((dd[pos], phase))
+        trough = pos[order][np.r_[0, np.flatnonzero(np.diff(phase[order])) + 1]]
+
+        ns = times.asi8
+        peak_ns = ns[np.maximum(starts - 1, 0)]   # Phase ab Start: Hoch = erster Punkt
+        recovered = ends + 1 < len(values)
+        recovery_ns = np.where(recovered, ns[np.minimum(ends + 1, len(values) - 1)], NAT_NS)
+        end_ns = np.where(recovered, recovery_ns, ns[-1])
+        return pd.DataFrame({
+            "peak_time": _to_index(peak_ns, times.tz),
+            "trough_time": times[trough],
+            "recovery_time": _to_index(recovery_ns, times.tz),
+            "depth_pct": dd[trough],
+            "duration": pd.to_timedelta(end_ns - peak_ns, unit="ns"),
+        })
+
+    def summary(self) -> Dict[str, object]:
+        """Max. Drawdown (%) und längste Drawdown-Dauer (Zeit, nicht Trades)."""
+        periods = self.drawdown_periods()
+        dd = self.drawdown
+        final = float(self.equity.iloc[-1]) if len(self.equity) else self.start_cap
+        return {
+            "final_equity": final,
+            "total_return": (final - self.start_cap) / self.start_cap * 100,
+            "max_dd": float(dd.min()) if len(dd) else 0.0,
+            "max_dd_time": dd.idxmin() if len(dd) else pd.NaT,
+            "max_dd_duration": periods["duration"].max() if len(periods) else pd.Timedelta(0),
+            "time_under_water_pct": float((dd < 0).mean() * 100) if len(dd) else 0.0,
+            "max_open_trades": int(self.open_trades.max()) if len(self.open_trades) else 0,
+            "unpriced_trades": self.unpriced,
+        }
+
+
+def mtm_equity(
+    trades: pd.DataFrame,
+    prices: PriceGrid,
+    start_cap: float = 100000,
+    risk: float = 0.01,
+    amount: Optional[np.ndarray] = None,
+) -> MTMResult:
+    """
+    Mark-to-Market-Equity eines Ledgers.
+
+    Args:
+        trades: Ledger mit pair, entry_time, exit_time, entry_price, sl_price, pnl_r
+        prices: price_grid(...) des Bewertungs-TF
+        risk: Risiko pro Trade (Anteil Startkapital), wenn amount fehlt
+        amount: Risikobetrag je Trade in Ledger-Reihenfolge (z.B. SimResult.risk_amount,
+            0 = nicht genommen) – überschreibt risk
+
+    Returns:
+        MTMResult (Equity je Close des Raster-TF)
+    """
+    grid = prices.time_ns
+    n = len(trades)
+    amount = np.full(n, risk * start_cap) if amount is None else np.asarray(amount, dtype=np.float64)
+
+    entry_ns = _time_ns(trades["entry_time"])
+    exit_ns = _time_ns(trades["exit_time"])
+    exit_ns = np.where(exit_ns == NAT_NS, np.iinfo(np.int64).max, exit_ns)
+    entry_price = trades["entry_price"].to_numpy(dtype=np.float64)
+    risk_price = entry_price - trades["sl_price"].to_numpy(dtype=np.float64)
+    pnl_r = np.nan_to_num(trades["pnl_r"].to_numpy(dtype=np.float64))
+
+    pair_index = {pair: i for i, pair in enumerate(prices.pairs)}
+    pair_code = np.array([pair_index.get(p, -1) for p in trades["pair"].astype(str)], dtype=np.int64)
+    taken = amount != 0
+
+    # Realisiert: am ersten Raster-Punkt >= exit_time
+    realized_at = np.searchsorted(grid, exit_ns, side="left")
+    closed = taken & (realized_at < len(grid))
+    realized = np.cumsum(np.bincount(realized_at[closed], weights=(pnl_r * amount)[closed], minlength=len(grid)))
+
+    # Offene Raster-Punkte je Trade: entry < g < exit
+    first = np.searchsorted(grid, entry_ns, side="right")
+    last = np.searchsorted(grid, exit_ns, side="left")
+    count = np.where(taken, np.maximum(last - first, 0), 0)
+    trade = np.repeat(np.arange(n), count)
+    point = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count) + first[trade]
+    open_trades = np.bincount(point, minlength=len(grid))
+
+    priced = pair_code[trade] >= 0
+    close = np.full(len(trade), np.nan)
+    close[priced] = prices.close[pair_code[trade[priced]], point[priced]]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        value_r = (close - entry_price[trade]) / risk_price[trade]
+    value = np.nan_to_num(value_r * amount[trade], nan=0.0, posinf=0.0, neginf=0.0)
+    unrealized = np.bincount(point, weights=value, minlength=len(grid))
+
+    index = pd.DatetimeIndex(grid.view("M8[ns]"), name="time").tz_localize("UTC")
+    return MTMResult(
+        equity=pd.Series(start_cap + realized + unrealized, index=index, name="equity"),
+        realized=pd.Series(realized, index=index, name="realized"),
+        unrealized=pd.Series(unrealized, index=index, name="unrealized"),
+        open_trades=pd.Series(open_trades, index=index, name="open_trades"),
+        start_cap=float(start_cap),
+        unpriced=int((taken & (pair_code < 0)).sum()),
+    )
@@ -0,0 +1,153 @@
+"""
+Model 3 Portfolio-Aufbau (kombinierte HTFs)
+-------------------------------------------
+
+Kombinierte Läufe (3D+W, 3D+M, W+M, 3D+W+M – STRATEGIE_VARIABLES.md 2.2)
+aus den fertigen Einzel-Ledgern (W_trades.csv, 3D_trades.csv, M_trades.csv)
+statt neuer Backtests:
+
+- "1 Trade pro Pivot": erkennen mehrere HTFs denselben Pivot, bleibt nur
+  der Trade des höchsten HTF (Priorität M > W > 3D)
+- Gleicher Pivot = gleiches Pair + gleiche Richtung + überlappende Gap
+  (Preisbereich pivot_price..extreme_price) + überlappende Lebensdauer
+  (pivot_time..exit_time)
+- HTFs werden in Prioritäts-Reihenfolge zusammengeführt: ein Trade fliegt
+  nur raus, wenn er einen bereits behaltenen Trade eines höheren HTF
+  überlappt (nie innerhalb desselben HTF – dort gilt schon 1 Trade pro Pivot)
+
+Der Überlappungs-Test läuft je (Pair, Richtung) als Intervall-Matrix
+(Kandidaten × behaltene Trades) – Zeit- und Preis-Intervalle in einem Schritt.
+
+Beispiel:
+    ledgers = {tf: load_trades(TRADES_DIR, tf)[0] for tf in ("W", "3D", "M")}
+    combined, dropped = combine_ledgers(ledgers, ("3D", "W"))
+    results = build_combinations(ledgers)   # alle COMBINATIONS
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting.batch_stats import _time_ns
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from batch_stats import _time_ns
+
+HTF_PRIORITY = ("M", "W", "3D")
+
+COMBINATIONS = {
+    "3D_W": ("3D", "W"),
+    "3D_M": ("3D", "M"),
+    "W_M": ("W", "M"),
+    "3D_W_M": ("3D", "W", "M"),
+}
+
+
+def pivot_intervals(trades: pd.DataFrame, start_col: str = "pivot_time", end_col: str = "exit_time") -> Dict[str, np.ndarray]:
+    """Zeit- (ns) und Preis-Intervall (Gap) je Trade."""
+    pivot = trades["pivot_price"].to_numpy(dtype=np.float64)
+    extreme = trades["extreme_price"].to_numpy(dtype=np.float64)
+    return {
+        "start": _time_ns(trades[start_col]),
+        "end": _time_ns(trades[end_col]),
+        "lo": np.minimum(pivot, extreme),
+        "hi": np.maximum(pivot, extreme),
+    }
+
+
+def _group_keys(trades: pd.DataFrame) -> np.ndarray:
+    return (trades["pair"].astype(str) + "|" + trades["direction"].astype(str)).to_numpy()
+
+
+def find_duplicates(
+    candidates: pd.DataFrame,
+    kept: pd.DataFrame,
+    start_col: str = "pivot_time",
+    end_col: str = "exit_time",
+) -> np.ndarray:
+    """
+    Für jeden Kandidaten: Position (in kept) des ersten überlappenden Trades, sonst -1.
+
+    Überlappung = gleiches Pair + Richtung, Gap-Bereiche und Lebensdauer
+    überschneiden sich (Grenzen inklusive).
+    """
+    match = np.full(len(candidates), -1, dtype=np.int64)
+    if len(candidates) == 0 or len(kept) == 0:
+        return match
+
+    c, k = pivot_intervals(candidates, start_col, end_col), pivot_intervals(kept, start_col, end_col)
+    kept_groups = pd.Series(np.arange(len(kept))).groupby(_group_keys(kept)).indices
+    for key, ci in pd.Series(np.arange(len(candidates))).groupby(_group_keys(candidates)).indices.items():
+        ki = kept_groups.get(key)
+        if ki is None:
+            continue
+        overlap = (
+            (c["start"][ci, None] <= k["end"][None, ki]) & (k["start"][None, ki] <= c["end"][ci, None])
+            & (c["lo"][ci, None] <= k["hi"][None, ki]) & (k["lo"][None, ki] <= c["hi"][ci, None])
+        )
+        hit = overlap.any(axis=1)
+        match[ci[hit]] = ki[overlap[hit].argmax(axis=1)]
+    return match
+
+
+def combine_ledgers(
+    ledgers: Dict[str, pd.DataFrame],
+    htfs: Optional[Sequence[str]] = None,
+    priority: Sequence[str] = HTF_PRIORITY,
+    start_col: str = "pivot_time",
+    end_col: str = "exit_time",
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Führt die Ledger mehrerer HTFs zu einem Portfolio-Ledger zusammen.
+
+    Args:
+        ledgers: {htf: Trades-DataFrame} (fehlende HTFs werden übersprungen)
+        htfs: zu kombinierende HTFs (Default: alle in ledgers)
+        priority: HTF-Reihenfolge, höchste Priorität zuerst
+
+    Returns:
+        (combined, dropped) – combined nach entry_time sortiert (htf_timeframe
+        kennzeichnet die Herkunft), dropped mit duplicate_of_htf /
+        duplicate_of_pivot_time des behaltenen Trades
+    """
+    htfs = list(htfs) if htfs is not None else list(ledgers)
+    order = [tf for tf in priority if tf in htfs] + [tf for tf in htfs if tf not in priority]
+
+    kept_parts, dropped_parts = [], []
+    kept = None
+    for tf in order:
+        df = ledgers.get(tf)
+        if df is None or df.empty:
+            continue
+        df = df.assign(htf_timeframe=tf) if "htf_timeframe" not in df.columns else df
+        match = find_duplicates(df, kept, start_col, end_col) if kept is not None else np.full(len(df), -1)
+
+        if (match >= 0).any():
+            dup = df[match >= 0].copy()
+            source = kept.iloc[match[match >= 0]]
+            dup["duplicate_of_htf"] = source["htf_timeframe"].to_numpy()
+            dup["duplicate_of_pivot_time"] = source["pivot_time"].to_numpy()
+            dropped_parts.append(dup)
+
+        kept_parts.append(df[match < 0])
+        kept = pd.concat(kept_parts, ignore_index=True)
+
+    if kept is None:
+        return pd.DataFrame(), pd.DataFrame()
+
+    combined = kept.iloc[np.argsort(_time_ns(kept["entry_time"]), kind="stable")].reset_index(drop=True)
+    dropped = pd.concat(dropped_parts, ignore_index=True) if dropped_parts else kept.iloc[0:0].copy()
+    return combined, dropped
+
+
+def build_combinations(
+    ledgers: Dict[str, pd.DataFrame],
+    combinations: Optional[Dict[str, Sequence[str]]] = None,
+    priority: Sequence[str] = HTF_PRIORITY,
+) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """combine_ledgers für jede Kombination: {name: (combined, dropped)}."""
+    combinations = combinations if combinations is not None else COMBINATIONS
+    return {name: combine_ledgers(ledgers, htfs, priority) for name, htfs in combinations.items()}
@@ -0,0 +1,375 @@
+"""
+Model 3 Portfolio-Simulation (Event-Queue)
+------------------------------------------
+
+calc_stats nimmt jeden Trade mit fixem Risiko auf das Startkapital. Für die
+Portfolio-Variablen aus Phase 4 (STRATEGIE_VARIABLES.md 8.x) läuft das
+Ledger hier als Ereignisfolge durch ein Portfolio:
+
+- Entries in Zeit-Reihenfolge, offene Positionen in einem Min-Heap nach
+  exit_time; vor jedem Entry werden alle Exits <= entry_time realisiert
+  (Exit vor Entry bei gleicher Zeit → frei gewordener Slot zählt)
+- Zulassungsregeln (Rules): max. gleichzeitige Trades, max. pro Pair,
+  max. pro Währung (Base oder Quote), max. offenes Risiko (Anteil Kapital),
+  max. Netto-Exposure je Währung in R (Long EURUSD = +1R EUR / -1R USD,
+  siehe exposure.py), max. korrelierte offene Trades (Korrelation as of
+  Entry aus correlation.py × Richtung beider Trades >= min_correlation)
+- Positionsgröße: risk × Startkapital (fix) oder × realisierte Equity beim
+  Entry (compounding); PnL = pnl_r × Risikobetrag
+
+Ergebnis: angenommene Trades (Maske in Ledger-Reihenfolge), Risikobetrag /
+PnL je Trade, Equity-Kurve (realisiert, je Exit) und Ablehnungen je Regel.
+
+Die Ereignis-Schleife arbeitet nur auf Arrays (prepare_ledger einmal pro
+Ledger); mit numba (kernels-Backend "numba") wird sie kompiliert, sonst
+läuft dieselbe Funktion als Python-Schleife.
+
+Beispiel:
+    ledger = prepare_ledger(combined_df)
+    result = simulate(ledger, Rules(max_concurrent=6, max_per_pair=1), risk=0.01, compounding=True)
+    result.summary(), result.equity
+    history = load_history(CORR_DIR, "corr_60d")
+    simulate(ledger, Rules(max_correlated=2, min_correlation=0.7), correlation=history)
+    table = sweep(ledger, [Rules(max_concurrent=n) for n in (4, 6, 8, 0)])
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting import kernels
+    from scripts.backtesting.batch_stats import _time_ns
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    import kernels
+    from batch_stats import _time_ns
+
+if TYPE_CHECKING:
+    from scripts.backtesting.correlation import CorrelationHistory
+
+NO_EXIT = np.iinfo(np.int64).max  # offene Trades (exit_time fehlt) belegen ihren Slot bis zum Ende
+
+REJECT_REASONS = ("max_concurrent", "max_per_pair", "max_per_currency", "max_open_risk", "no_capital", "max_net_exposure", "max_correlated")
+
+
+@dataclass(frozen=True)
+class Rules:
+    """Zulassungsregeln (0 = unbegrenzt)."""
+
+    max_concurrent: int = 0
+    max_per_pair: int = 0
+    max_per_currency: int = 0
+    max_open_risk: float = 0.0  # Summe offener Risikobeträge / Kapital, z.B. 0.06 = 6%
+    max_net_exposure: float = 0.0  # |Netto-Exposure| je Währung in R (1 Trade = 1R)
+    max_correlated: int = 0        # neuer Trade + korrelierte offene Trades (braucht correlation)
+    min_correlation: float = 0.7   # ab hier gilt ein offener Trade als korreliert
+
+    def label(self) -> str:
+        values = asdict(self)
+        if not self.max_correlated:
+            values.pop("min_correlation")
+        parts = [f"{name}={value:g}" for name, value in values.items() if value]
+        return ", ".join(parts) if parts else "unlimited"
+
+
+class PortfolioLedger(NamedTuple):
+    """Ledger als Arrays, nach entry_time sortiert (order = Position im Original-Ledger)."""
+
+    order: np.ndarray
+    entry_ns: np.ndarray
+    exit_ns: np.ndarray
+    pnl_r: np.ndarray
+    pair: np.ndarray       # Pair-Code
+    base: np.ndarray       # Währungs-Code Base
+    quote: np.ndarray      # Währungs-Code Quote
+    sign: np.ndarray       # +1 bullish (Base long), -1 bearish
+    pairs: List[str]
+    currencies: List[str]
+
+
+def prepare_ledger(trades: pd.DataFrame) -> PortfolioLedger:
+    """Sortiert und kodiert ein Ledger einmal für beliebig viele Simulationen."""
+    entry_ns = _time_ns(trades["entry_time"])
+    exit_ns = _time_ns(trades["exit_time"])
+    exit_ns = np.where(exit_ns == np.iinfo(np.int64).min, NO_EXIT, exit_ns)
+    order = np.argsort(entry_ns, kind="stable")
+
+    pair_codes, pairs = pd.factorize(trades["pair"].astype(str), sort=True)
+    currencies = sorted({p[:3] for p in pairs} | {p[3:6] for p in pairs})
+    ccy_index = {c: i for i, c in enumerate(currencies)}
+    base = np.array([ccy_index[p[:3]] for p in pairs], dtype=np.int64)[pair_codes]
+    quote = np.array([ccy_index[p[3:6]] for p in pairs], dtype=np.int64)[pair_codes]
+
+    return PortfolioLedger(
+        order=order,
+        entry_ns=np.ascontiguousarray(entry_ns[order]),
+        exit_ns=np.ascontiguousarray(exit_ns[order]),
+        pnl_r=np.ascontiguousarray(trades["pnl_r"].to_numpy(dtype=np.float64)[order]),
+        pair=np.ascontiguousarray(pair_codes[order].astype(np.int64)),
+        base=np.ascontiguousarray(base[order]),
+        quote=np.ascontiguousarray(quote[order]),
+        sign=np.ascontiguousarray(np.where(trades["direction"].to_numpy() == "bullish", 1.0, -1.0)[order]),
+        pairs=list(pairs),
+        currencies=currencies,
+    )
+
+
+# ---- Ereignis-Schleife (numba-kompatibel) ---- #
+
+
+def _simulate_loop(
+    entry_ns, exit_ns, pnl_r, pair, base, quote, sign, n_pairs, n_ccy,
+    start_cap, risk, compounding, max_concurrent, max_per_pair, max_per_currency, max_open_risk,
+    max_net_exposure, corr_matrix, corr_row, corr_pair, max_correlated, min_correlation,
+):
+    n = len(entry_ns)
+    accepted = np.zeros(n, dtype=np.bool_)
+    amount = np.zeros(n, dtype=np.float64)
+    rejected = np.zeros(7, dtype=np.int64)
+
+    # Min-Heap (exit_ns, Trade-Index) als Arrays
+    heap_t = np.empty(n, dtype=np.int64)
+    heap_i = np.empty(n, dtype=np.int64)
+    size = 0
+
+    pair_open = np.zeros(n_pairs, dtype=np.int64)
+    ccy_open = np.zeros(n_ccy, dtype=np.int64)
+    ccy_net = np.zeros(n_ccy, dtype=np.float64)
+    equity = start_cap
+    open_risk = 0.0
+
+    curve_t = np.empty(n, dtype=np.int64)
+    curve_v = np.empty(n, dtype=np.float64)
+    n_curve = 0
+
+    for k in range(n + 1):
+        t_now = entry_ns[k] if k < n else NO_EXIT
+
+        # Exits bis einschließlich t_now realisieren (am Ende: alle übrigen)
+        while size > 0 and heap_t[0] <= t_now:
+            j = heap_i[0]
+            t_exit = heap_t[0]
+            size -= 1
+            heap_t[0] = heap_t[size]
+            heap_i[0] = heap_i[size]
+            pos = 0
+            while True:
+                left = 2 * pos + 1
+                if left >= size:
+                    break
+                child = left
+                right = left + 1
+                if right < size and (heap_t[right] < heap_t[left] or (heap_t[right] == heap_t[left] and heap_i[right] < heap_i[left])):
+                    child = right
+                if heap_t[child] < heap_t[pos] or (heap_t[child] == heap_t[pos] and heap_i[child] < heap_i[pos]):
+                    heap_t[pos], heap_t[child] = heap_t[child], heap_t[pos]
+                    heap_i[pos], heap_i[child] = heap_i[child], heap_i[pos]
+                    pos = child
+                else:
+                    break
+
+            if t_exit != NO_EXIT:
+                equity += pnl_r[j] * amount[j]
+            open_risk -= amount[j]
+            pair_open[pair[j]] -= 1
+            ccy_open[base[j]] -= 1
+            ccy_open[quote[j]] -= 1
+            ccy_net[base[j]] -= sign[j]
+            ccy_net[quote[j]] += sign[j]
+            curve_t[n_curve] = t_exit
+            curve_v[n_curve] = equity
+            n_curve += 1
+
+        if k == n:
+            break
+
+        # Zulassung
+        if max_concurrent > 0 and size >= max_concurrent:
+            rejected[0] += 1
+            continue
+        if max_per_pair > 0 and pair_open[pair[k]] >= max_per_pair:
+            rejected[1] += 1
+            continue
+        if max_per_currency > 0 and (ccy_open[base[k]] >= max_per_currency or ccy_open[quote[k]] >= max_per_currency):
+            rejected[2] += 1
+            continue
+        if max_net_exposure > 0 and (
+            abs(ccy_net[base[k]] + sign[k]) > max_net_exposure + 1e-9
+            or abs(ccy_net[quote[k]] - sign[k]) > max_net_exposure + 1e-9
+        ):
+            rejected[5] += 1
+            continue
+        if max_correlated > 0 and corr_pair[k] >= 0 and corr_row[k] >= 0:
+            correlated = 0
+            for s in range(size):
+                j = heap_i[s]
+                if corr_pair[j] >= 0 and corr_matrix[corr_row[k], corr_pair[k], corr_pair[j]] * sign[k] * sign[j] >= min_correlation:
+                    correlated += 1
+            if correlated >= max_correlated:
+                rejected[6] += 1
+                continue
+        capital = equity if compounding else start_cap
+        if capital <= 0:
+            rejected[4] += 1
+            continue
+        size_k = risk * capital
+        if max_open_risk > 0 and open_risk + size_k > max_open_risk * capital * (1 + 1e-12):
+            rejected[3] += 1
+            continue
+
+        accepted[k] = True
+        amount[k] = size_k
+        open_risk += size_k
+        pair_open[pair[k]] += 1
+        ccy_open[base[k]] += 1
+        ccy_open[quote[k]] += 1
+        ccy_net[base[k]] += sign[k]
+        ccy_net[quote[k]] -= sign[k]
+
+        # Push + sift-up
+        heap_t[size] = exit_ns[k]
+        heap_i[size] = k
+        pos = size
+        size += 1
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if heap_t[pos] < heap_t[parent] or (heap_t[pos] == heap_t[parent] and heap_i[pos] < heap_i[parent]):
+                heap_t[pos], heap_t[parent] = heap_t[parent], heap_t[pos]
+                heap_i[pos], heap_i[parent] = heap_i[parent], heap_i[pos]
+                pos = parent
+            else:
+                break
+
+    return accepted, amount, rejected, curve_t[:n_curve], curve_v[:n_curve]
+
+
+_COMPILED: Dict[str, object] = {}
+
+
+def _loop():
+    """Kompilierte Schleife beim numba-Backend der Kernels, sonst Python."""
+    if kernels.get_backend() != "numba":
+        return _simulate_loop
+    if "loop" not in _COMPILED:
+        _COMPILED["loop"] = kernels.numba.njit(cache=True, nogil=True)(_simulate_loop)
+    return _COMPILED["loop"]
+
+
+def _correlation_inputs(ledger: PortfolioLedger, correlation) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(Matrix, Zeile as of Entry, Pair-Index) je Trade; Dummy ohne Korrelation."""
+    n = len(ledger.entry_ns)
+    if correlation is None:
+        return np.zeros((1, 1, 1), dtype=np.float32), np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64)
+    matrix = np.ascontiguousarray(np.asarray(correlation.matrix, dtype=np.float32))
+    rows = correlation.rows_at(ledger.entry_ns).astype(np.int64)
+    codes = correlation.pair_codes(ledger.pairs)[ledger.pair]
+    return matrix, rows, codes
+
+
+# ---- Ergebnis ---- #
+
+
+@dataclass
+class SimResult:
+    """Ergebnis einer Simulation (Arrays in Original-Ledger-Reihenfolge)."""
+
+    rules: Rules
+    accepted: np.ndarray
+    risk_amount: np.ndarray
+    pnl: np.ndarray
+    equity: pd.Series
+    rejected: Dict[str, int]
+    start_cap: float
+
+    def summary(self) -> Dict[str, float]:
+        """Kennzahlen der angenommenen Trades / der realisierten Equity-Kurve."""
+        values = np.concatenate([[self.start_cap], self.equity.to_numpy()])
+        peak = np.maximum.accumulate(values)
+        n = int(self.accepted.sum())
+        final = float(values[-1])
+        return {
+            "accepted": n,
+            "rejected": int(sum(self.rejected.values())),
+            "final_equity": final,
+            "total_return": (final - self.start_cap) / self.start_cap * 100,
+            "max_dd": float(((values - peak) / peak * 100).min()),
+            "profit": float(self.pnl.sum()),
+            **{f"rejected_{key}": value for key, value in self.rejected.items()},
+        }
+
+
+def simulate(
+    ledger: PortfolioLedger,
+    rules: Rules = Rules(),
+    start_cap: float = 100000,
+    risk: float = 0.01,
+    compounding: bool = False,
+    correlation: Optional[CorrelationHistory] = None,
+) -> SimResult:
+    """
+    Eine Portfolio-Simulation.
+
+    Args:
+        ledger: prepare_ledger(trades)
+        rules: Zulassungsregeln
+        risk: Risiko pro Trade (Anteil Kapital)
+        compounding: Risikobetrag aus realisierter Equity statt Startkapital
+        correlation: CorrelationHistory (correlation.py), nötig für max_correlated
+
+    Returns:
+        SimResult – equity als Series (UTC-Zeit des Exits → realisierte Equity)
+    """
+    if rules.max_correlated and correlation is None:
+        raise ValueError("max_correlated braucht eine CorrelationHistory (correlation=...)")
+    corr_matrix, corr_row, corr_pair = _correlation_inputs(ledger, correlation if rules.max_correlated else None)
+    accepted, amount, rejected, curve_t, curve_v = _loop()(
+        ledger.entry_ns, ledger.exit_ns, ledger.pnl_r, ledger.pair, ledger.base, ledger.quote, ledger.sign,
+        len(ledger.pairs), len(ledger.currencies),
+        float(start_cap), float(risk), bool(compounding),
+        int(rules.max_concurrent), int(rules.max_per_pair), int(rules.max_per_currency), float(rules.max_open_risk),
+        float(rules.max_net_exposure), corr_matrix, corr_row, corr_pair,
+        int(rules.max_correlated), float(rules.min_correlation),
+    )
+
+    # Zurück in Ledger-Reihenfolge
+    n = len(ledger.order)
+    out_accepted = np.zeros(n, dtype=bool)
+    out_amount = np.zeros(n, dtype=np.float64)
+    out_accepted[ledger.order] = accepted
+    out_amount[ledger.order] = amount
+    pnl = np.zeros(n, dtype=np.float64)
+    pnl[ledger.order] = ledger.pnl_r * amount
+
+    valid = curve_t != NO_EXIT
+    index = pd.DatetimeIndex(curve_t[valid].view("M8[ns]"), name="time").tz_localize("UTC")
+    equity = pd.Series(curve_v[valid], index=index, name="equity")
+
+    return SimResult(
+        rules=rules,
+        accepted=out_accepted,
+        risk_amount=out_amount,
+        pnl=pnl,
+        equity=equity,
+        rejected=dict(zip(REJECT_REASONS, (int(x) for x in rejected))),
+        start_cap=float(start_cap),
+    )
+
+
+def sweep(
+    ledger: PortfolioLedger,
+    variants: Sequence[Rules],
+    start_cap: float = 100000,
+    risk: float = 0.01,
+    compounding: bool = False,
+    correlation: Optional[CorrelationHistory] = None,
+) -> pd.DataFrame:
+    """Eine Zeile je Regel-Variante (Rules-Felder + summary)."""
+    rows = []
+    for rules in variants:
+        result = simulate(ledger, rules, start_cap, risk, compounding, correlation)
+        rows.append({**asdict(rules), "rules": rules.label(), "risk": risk, "compounding": compounding, **result.summary()})
+    return pd.DataFrame(rows)
@@ -0,0 +1,179 @@
+"""
+Model 3 Random-Entry-Baseline (Nullmodell)
+------------------------------------------
+
+Hat die Pivot-/Verfeinerungs-Logik einen Edge? Vergleich mit zufälligen
+Entries auf denselben Pairs im selben Zeitraum – mit der SL/TP-Geometrie
+der echten Trades:
+
+- Pro echtem Trade n_draws zufällige H1-Kerzen des Pairs (gleichverteilt
+  im Zeitraum start..end, Default: erster..letzter Entry des Ledgers)
+- Entry = Close der gezogenen Kerze, Richtung des echten Trades,
+  SL/TP im gleichen Preisabstand wie entry_price → sl_price / tp_price
+- Exit-Suche ab der Folgekerze mit denselben Regeln wie simulate_single_trade
+  (SL hat bei gleicher Kerze Vorrang), alle synthetischen Trades eines Pairs
+  in einem Kernel-Aufruf (kernels.scan_exits)
+- pnl_r = -1 (SL) bzw. TP-Abstand / SL-Abstand (TP); ohne Exit bis Datenende
+  → offen (NaN, zählt nicht)
+
+Draw k über alle echten Trades ergibt ein komplettes Zufalls-Ledger mit
+gleicher Trade-Anzahl und Geometrie → n_draws Expectancies unter der
+Nullhypothese. p_value = Anteil Zufalls-Ledger mit Expectancy >= echter.
+
+Beispiel:
+    h1 = {pair: kernels.candle_arrays(df) for pair, df in h1_frames.items()}
+    null = random_baseline(trades_df, h1, n_draws=1000, seed=42)
+    null.p_value, np.percentile(null.expectancy, [5, 50, 95])
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting import kernels
+    from scripts.backtesting.batch_stats import _time_ns
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    import kernels
+    from batch_stats import _time_ns
+
+
+@dataclass
+class NullModelResult:
+    """Synthetische Trades + Expectancy je Zufalls-Ledger (Draw)."""
+
+    trades: pd.DataFrame      # eine Zeile je synthetischem Trade
+    expectancy: np.ndarray    # Expectancy je Draw (NaN ohne geschlossene Trades)
+    closed: np.ndarray        # geschlossene Trades je Draw
+    actual: float             # Expectancy des echten Ledgers
+
+    @property
+    def p_value(self) -> float:
+        """(1 + #Draws mit Expectancy >= actual) / (1 + #Draws) – einseitig."""
+        valid = self.expectancy[~np.isnan(self.expectancy)]
+        return float((1 + (valid >= self.actual).sum()) / (1 + len(valid)))
+
+    def percentile_of_actual(self) -> float:
+        """Anteil (%) der Zufalls-Ledger mit Expectancy < actual."""
+        valid = self.expectancy[~np.isnan(self.expectancy)]
+        return float((valid < self.actual).mean() * 100) if len(valid) else float("nan")
+
+
+def trade_geometry(trades: pd.DataFrame) -> pd.DataFrame:
+    """SL/TP-Abstand (Preis) und Richtung je echtem Trade."""
+    entry = trades["entry_price"].to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        "pair": trades["pair"].to_numpy(),
+        "bullish": (trades["direction"] == "bullish").to_numpy(),
+        "sl_dist": np.abs(entry - trades["sl_price"].to_numpy(dtype=np.float64)),
+        "tp_dist": np.abs(trades["tp_price"].to_numpy(dtype=np.float64) - entry),
+    })
+
+
+def simulate_pair(
+    arrays: kernels.CandleArrays,
+    bullish: np.ndarray,
+    sl_dist: np.ndarray,
+    tp_dist: np.ndarray,
+    bars: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Synthetische Trades eines Pairs: Entry am Close von bars[k], Exit-Suche ab bars[k] + 1.
+
+    Returns:
+        {"exit_idx", "exit_code", "pnl_r"} – exit_code 0 = offen (pnl_r NaN)
+    """
+    entry = arrays.close[bars]
+    sl = np.where(bullish, entry - sl_dist, entry + sl_dist)
+    tp = np.where(bullish, entry + tp_dist, entry - tp_dist)
+    exit_idx, exit_code = kernels.scan_exits(arrays.high, arrays.low, bars + 1, sl, tp, bullish)
+
+    rr = np.divide(tp_dist, sl_dist, out=np.zeros_like(tp_dist), where=sl_dist > 0)
+    pnl_r = np.where(exit_code == 1, -1.0, np.where(exit_code == 2, rr, np.nan))
+    return {"exit_idx": exit_idx, "exit_code": exit_code, "pnl_r": pnl_r}
+
+
+def random_baseline(
+    trades: pd.DataFrame,
+    h1: Dict[str, kernels.CandleArrays],
+    n_draws: int = 1000,
+    seed: Optional[int] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> NullModelResult:
+    """
+    Random-Entry-Nullmodell für ein Trade-Ledger.
+
+    Args:
+        trades: echte Trades (pair, direction, entry_time, entry_price, sl_price, tp_price, pnl_r)
+        h1: {pair: CandleArrays} der H1-Kerzen (Pairs ohne Daten werden übersprungen)
+        n_draws: Zufalls-Entries je echtem Trade (= Anzahl Zufalls-Ledger)
+        start / end: Zeitraum der Zufalls-Entries (Default: erster / letzter Entry)
+
+    Returns:
+        NullModelResult – trades mit Spalten trade (Zeile im Ledger), draw, pair,
+        direction, entry_time, exit_time, exit_type, pnl_r
+    """
+    rng = np.random.default_rng(seed)
+    geometry = trade_geometry(trades)
+    entry_ns = _time_ns(trades["entry_time"])
+    lo_ns = pd.Timestamp(start).value if start else int(entry_ns.min())
+    hi_ns = pd.Timestamp(end).value if end else int(entry_ns.max())
+
+    pair_names = sorted(geometry["pair"].unique())
+    parts = []
+    for code, (pair, rows) in enumerate(geometry.groupby("pair", sort=True).indices.items()):
+        arrays = h1.get(pair)
+        if arrays is None or len(arrays) == 0:
+            continue
+        first = int(np.searchsorted(arrays.time, lo_ns, side="left"))
+        last = int(np.searchsorted(arrays.time, hi_ns, side="right"))
+        if last <= first:
+            continue
+
+        # Trades × Draws, zeilenweise flach (Trade-Reihenfolge, dann Draw)
+        bars = rng.integers(first, last, size=(len(rows), n_draws)).ravel()
+        g = geometry.iloc[rows]
+        bullish = np.repeat(g["bullish"].to_numpy(), n_draws)
+        sim = simulate_pair(
+            arrays, bullish,
+            np.repeat(g["sl_dist"].to_numpy(), n_draws),
+            np.repeat(g["tp_dist"].to_numpy(), n_draws),
+            bars,
+        )
+
+        closed = sim["exit_code"] > 0
+        exit_ns = np.where(closed, arrays.time[np.maximum(sim["exit_idx"], 0)], np.iinfo(np.int64).min)
+        parts.append(pd.DataFrame({
+            "trade": np.repeat(rows, n_draws),
+            "draw": np.tile(np.arange(n_draws), len(rows)),
+            # Kategorien statt Strings (Millionen Zeilen)
+            "pair": pd.Categorical.from_codes(np.full(len(bars), code), categories=pair_names),
+            "direction": pd.Categorical.from_codes(bullish.astype(np.int8), categories=["bearish", "bullish"]),
+            "entry_time": pd.to_datetime(arrays.time[bars], utc=True),
+            "exit_time": pd.to_datetime(exit_ns, utc=True),
+            "exit_type": pd.Categorical.from_codes(sim["exit_code"], categories=["open", "sl", "tp"]),
+            "pnl_r": sim["pnl_r"],
+        }))
+
+    columns = ["trade", "draw", "pair", "direction", "entry_time", "exit_time", "exit_type", "pnl_r"]
+    synthetic = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+
+    # Expectancy je Draw (nur geschlossene Trades)
+    pnl = synthetic["pnl_r"].to_numpy(dtype=np.float64)
+    done = ~np.isnan(pnl)
+    draws = synthetic["draw"].to_numpy(dtype=np.int64)[done]
+    closed = np.bincount(draws, minlength=n_draws)
+    total = np.bincount(draws, weights=pnl[done], minlength=n_draws)
+    expectancy = np.divide(total, closed, out=np.full(n_draws, np.nan), where=closed > 0)
+
+    return NullModelResult(
+        trades=synthetic,
+        expectancy=expectancy,
+        closed=closed,
+        actual=float(trades["pnl_r"].mean()),
+    )
@@ -0,0 +1,120 @@
+"""
+Model 3 Results-Store (Ergebnistabellen der Optimierer)
+-------------------------------------------------------
+
+Jeder Optimierer schreibt seine Ergebnistabelle (Konfigurations-Parameter +
+alle Kennzahlen, eine Zeile pro Konfiguration) als Parquet-Datei; der
+Text-Report wird aus dieser Tabelle erzeugt. Folgephasen lesen die Tabelle
+direkt (z.B. Phase B die Top 3 aus Phase A) statt den Report per Regex zu
+parsen.
+
+Layout:
+
+    <output_dir>/<name>_results.parquet   (pyarrow)
+    <output_dir>/<name>_results.csv       (Fallback ohne pyarrow)
+
+Metadaten (Phase, Daten-Stempel, ...) stehen als JSON in den Parquet-
+Schema-Metadaten (Schlüssel "model3") bzw. in <name>_results.json.
+Jede Datei wird atomar geschrieben (tmp + os.replace).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+try:
+    from scripts.backtesting.trade_store import pa, pq, pyarrow_available
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from trade_store import pa, pq, pyarrow_available
+
+META_KEY = b"model3"
+
+Rows = Union[pd.DataFrame, Sequence[Dict]]
+
+
+def _atomic_path(target: Path) -> Path:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    os.close(fd)
+    return Path(tmp)
+
+
+def results_path(output_dir: Path, name: str) -> Optional[Path]:
+    """Vorhandene Ergebnisdatei (Parquet bevorzugt) oder None."""
+    for suffix in (".parquet", ".csv"):
+        path = Path(output_dir) / f"{name}_results{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def results_exist(output_dir: Path, name: str) -> bool:
+    return results_path(output_dir, name) is not None
+
+
+def write_results(output_dir: Path, name: str, rows: Rows, meta: Optional[Dict] = None) -> Path:
+    """
+    Ergebnistabelle schreiben (ersetzt eine vorhandene Tabelle gleichen Namens).
+
+    Args:
+        rows: DataFrame oder Liste von Ergebnis-Dicts (eine Zeile pro Konfiguration)
+        meta: JSON-serialisierbare Zusatzinfos (Phase, Daten-Stempel, ...)
+
+    Returns:
+        Pfad der geschriebenen Datei
+    """
+    df = rows.reset_index(drop=True) if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    output_dir = Path(output_dir)
+    meta_json = json.dumps(meta or {}, default=str)
+
+    if pyarrow_available():
+        target = output_dir / f"{name}_results.parquet"
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), META_KEY: meta_json.encode()})
+        tmp = _atomic_path(target)
+        pq.write_table(table, tmp)
+        stale = output_dir / f"{name}_results.csv"
+    else:
+        target = output_dir / f"{name}_results.csv"
+        tmp = _atomic_path(target)
+        df.to_csv(tmp, index=False)
+        (output_dir / f"{name}_results.json").write_text(meta_json, encoding="utf-8")
+        stale = output_dir / f"{name}_results.parquet"
+
+    os.replace(tmp, target)
+    if stale.exists():  # sonst würde results_path die alte Datei bevorzugen
+        stale.unlink()
+    return target
+
+
+def read_results(output_dir: Path, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Ergebnistabelle laden (leerer DataFrame, falls keine vorhanden)."""
+    path = results_path(output_dir, name)
+    if path is None:
+        return pd.DataFrame(columns=columns)
+    if path.suffix == ".parquet":
+        return pq.read_table(path, columns=columns).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def read_results_meta(output_dir: Path, name: str) -> Dict:
+    """Metadaten der Ergebnistabelle ({} falls keine vorhanden)."""
+    path = results_path(output_dir, name)
+    if path is None:
+        return {}
+    if path.suffix == ".parquet":
+        raw = (pq.read_schema(path).metadata or {}).get(META_KEY)
+        return json.loads(raw) if raw else {}
+    sidecar = path.with_suffix(".json")
+    return json.loads(sidecar.read_text(encoding="utf-8")) if sidecar.exists() else {}
+
+
+def top_results(df: pd.DataFrame, metric: str = "expectancy", k: int = 3, ascending: bool = False) -> pd.DataFrame:
+    """Die k besten Zeilen nach metric (stabil: bei Gleichstand gilt die Tabellen-Reihenfolge)."""
+    return df.sort_values(metric, ascending=ascending, kind="stable").head(k)
@@ -0,0 +1,213 @@
+"""
+Model 3 Rolling-Kennzahlen (Stabilität)
+---------------------------------------
+
+calc_stats / batch_stats liefern Gesamtwerte über den ganzen Zeitraum; für
+"smooth Performance" (STRATEGIE_VARIABLES.md) zählt, wie stabil Expectancy,
+Win Rate, SQN und Drawdown über die Zeit sind. Alles hier läuft wie
+batch_stats auf einer Maskenmatrix (Konfigurationen × Trades) – alle
+Konfigurationen eines Sweeps in einem Durchgang, ohne Schleife je Konfiguration:
+
+- rolling_trades: Fenster über die letzten N Trades jeder Konfiguration.
+  Die genommenen Trades jeder Zeile werden nach vorne sortiert (stabil,
+  Ledger-Reihenfolge), danach sind alle Fenster Differenzen kumulierter
+  Summen (Σr, Σr², Gewinner)
+- rolling_months: Fenster über N Kalendermonate (Entry-Monat), Monats-
+  Summen per Matrixprodukt mit der Monats-Zuordnung, dann kumulierte Summen
+- Drawdown (R): Abstand der R-Equity zum bisherigen Hoch, im Fenster der
+  tiefste Stand (gleitendes Minimum per Sparse-Table, log N Schritte)
+- stability: Kennzahlen je Konfiguration aus den Rolling-Werten
+  (schlechtestes Fenster, Anteil negativer Fenster, Streuung)
+
+Gleiche Definitionen wie batch_stats: win_rate in %, sqn = mean / std(ddof=1) * sqrt(n).
+
+Beispiel:
+    masks = range_masks(df["gap_pips"], [(0, 9999), (50, 300)])
+    rolling = rolling_trades(df, masks, window=50)
+    monthly = rolling_months(df, masks, window=12)
+    stability(rolling)["neg_window_pct"]
+"""
+
+from __future__ import annotations
+
+import warnings
+from typing import Dict
+
+import numpy as np
+
+try:
+    from scripts.backtesting.batch_stats import trade_arrays
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from batch_stats import trade_arrays
+
+NAT_NS = np.iinfo(np.int64).min
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """Kumulierte Summe entlang der Achse 1 mit führender Null-Spalte."""
+    out = np.zeros((values.shape[0], values.shape[1] + 1))
+    np.cumsum(values, axis=1, out=out[:, 1:])
+    return out
+
+
+def _window_sum(prefix: np.ndarray, window: int) -> np.ndarray:
+    """Summe der letzten window Werte je Position (NaN bis zum ersten vollen Fenster)."""
+    out = np.full((prefix.shape[0], prefix.shape[1] - 1), np.nan)
+    if window <= out.shape[1]:
+        out[:, window - 1:] = prefix[:, window:] - prefix[:, :-window]
+    return out
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Gleitendes Minimum über die letzten window Spalten (Sparse-Table, NaN bis zum ersten vollen Fenster)."""
+    values = np.atleast_2d(values)
+    out = np.full(values.shape, np.nan)
+    n = values.shape[1]
+    if window < 1 or window > n:
+        return out
+    level, span = values, 1
+    while span * 2 <= window:
+        level = np.minimum(level[:, :-span], level[:, span:])   # level[:, i] = min(values[:, i:i + 2·span])
+        span *= 2
+    starts = np.arange(window - 1, n) - window + 1
+    out[:, window - 1:] = np.minimum(level[:, starts], level[:, starts + window - span])
+    return out
+
+
+def _underwater(equity: np.ndarray) -> np.ndarray:
+    """Abstand (R) zum bisherigen Hoch, Start bei 0R."""
+    return equity - np.maximum.accumulate(np.maximum(equity, 0.0), axis=1)
+
+
+def _metrics(n: np.ndarray, s1: np.ndarray, s2: np.ndarray, wins: np.ndarray) -> Dict[str, np.ndarray]:
+    """expectancy / win_rate / std_r / sqn aus Fenster-Summen (NaN für leere Fenster)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        expectancy = s1 / n
+        var = (s2 - s1 * s1 / n) / (n - 1)
+        std_r = np.sqrt(np.maximum(var, 0.0))
+        sqn = np.where(std_r > 0, expectancy / std_r * np.sqrt(n), np.nan)
+        win_rate = wins / n * 100
+    empty = ~(n > 0)
+    for arr in (expectancy, win_rate):
+        arr[empty] = np.nan
+    std_r[~(n > 1)] = np.nan
+    sqn[~(n > 1)] = np.nan
+    return {"expectancy": expectancy, "win_rate": win_rate, "std_r": std_r, "sqn": sqn}
+
+
+def rolling_trades(trades, masks: np.ndarray, window: int = 50) -> Dict[str, np.ndarray]:
+    """
+    Rolling-Kennzahlen über die letzten window Trades jeder Konfiguration.
+
+    Args:
+        trades: DataFrame (pnl_r, entry_time, exit_time) oder TradeLedger
+        masks: bool-Matrix (Konfigurationen × Trades) bzw. 1D-Maske
+        window: Trades je Fenster
+
+    Returns:
+        {kennzahl: (Konfigurationen × Trades)} – Spalte j = Fenster, das mit dem
+        (j+1)-ten Trade der Konfiguration endet; NaN vor dem ersten vollen
+        Fenster und hinter dem letzten Trade. entry_ns = Entry dieses Trades
+        (NAT_NS wenn leer), dd_r = tiefster Stand unter dem bisherigen Hoch im Fenster
+    """
+    pnl, entry_ns, _ = trade_arrays(trades)
+    pnl = np.nan_to_num(pnl)
+    m = np.atleast_2d(np.asarray(masks, dtype=bool))
+    count = m.sum(axis=1)
+
+    order = np.argsort(~m, axis=1, kind="stable")   # genommene Trades zuerst
+    filled = np.arange(m.shape[1])[None, :] < count[:, None]
+    r = np.where(filled, pnl[order], 0.0)
+
+    p1 = _prefix(r)
+    n = np.where(np.isnan(_window_sum(p1, window)), np.nan, float(window))
+    out = _metrics(n, _window_sum(p1, window), _window_sum(_prefix(r * r), window), _window_sum(_prefix((r > 0) * 1.0), window))
+    out["dd_r"] = rolling_min(_underwater(p1[:, 1:]), window)
+
+    for key in out:
+        out[key][~filled] = np.nan
+    out["entry_ns"] = np.where(filled, entry_ns[order], NAT_NS)
+    out["trades"] = count
+    return out
+
+
+def rolling_months(trades, masks: np.ndarray, window: int = 12, min_trades: int = 1) -> Dict[str, np.ndarray]:
+    """
+    Rolling-Kennzahlen über window Kalendermonate (Entry-Monat).
+
+    Args:
+        window: Monate je Fenster
+        min_trades: Fenster mit weniger Trades → NaN
+
+    Returns:
+        {kennzahl: (Konfigurationen × Monate)} + month (datetime64[M], gemeinsame
+        Achse vom ersten bis zum letzten Entry-Monat aller Trades); trades_window =
+        Trades im Fenster, dd_r = tiefster Monatsend-Stand unter dem bisherigen Hoch
+    """
+    pnl, entry_ns, _ = trade_arrays(trades)
+    pnl = np.nan_to_num(pnl)
+    m = np.atleast_2d(np.asarray(masks, dtype=bool))
+    valid = entry_ns != NAT_NS
+    month = entry_ns.astype("M8[ns]").astype("M8[M]")
+    if not valid.any():
+        return {"month": np.array([], dtype="M8[M]")}
+
+    first, last = month[valid].min(), month[valid].max()
+    months = np.arange(first, last + 1)
+    code = (month - first).astype(np.int64)
+
+    onehot = np.zeros((len(pnl), len(months)))
+    onehot[np.flatnonzero(valid), code[valid]] = 1.0
+    mf = (m & valid[None, :]).astype(np.float64)
+
+    n_month = mf @ onehot
+    s1_month = (mf * pnl[None, :]) @ onehot
+    s2_month = (mf * (pnl * pnl)[None, :]) @ onehot
+    wins_month = (mf * (pnl > 0)[None, :]) @ onehot
+
+    n = _window_sum(_prefix(n_month), window)
+    out = _metrics(n, _window_sum(_prefix(s1_month), window), _window_sum(_prefix(s2_month), window),
+                   _window_sum(_prefix(wins_month), window))
+    out["dd_r"] = rolling_min(_underwater(np.cumsum(s1_month, axis=1)), window)
+
+    sparse = ~(n >= min_trades)
+    for key in out:
+        out[key][sparse] = np.nan
+    out["trades_window"] = n
+    out["month"] = months
+    return out
+
+
+def stability(rolling: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Stabilität je Konfiguration aus rolling_trades / rolling_months.
+
+    Returns:
+        {kennzahl: np.ndarray (eine Zahl je Konfiguration)} – windows = Anzahl
+        voller Fenster, min_expectancy / neg_window_pct / expectancy_std,
+        min_win_rate, min_sqn, worst_dd_r (NaN ohne volles Fenster)
+    """
+    expectancy = rolling["expectancy"]
+    has = ~np.isnan(expectancy)
+    windows = has.sum(axis=1)
+    any_window = windows > 0
+
+    def _reduce(func, values):
+        out = np.full(len(values), np.nan)
+        if any_window.any():
+            with warnings.catch_warnings():  # Fenster ohne SQN (std = 0) → All-NaN-Zeilen
+                warnings.simplefilter("ignore", RuntimeWarning)
+                out[any_window] = func(values[any_window], axis=1)
+        return out
+
+    neg = np.where(any_window, (has & (expectancy < 0)).sum(axis=1) / np.maximum(windows, 1) * 100, np.nan)
+    return {
+        "windows": windows,
+        "min_expectancy": _reduce(np.nanmin, expectancy),
+        "mean_expectancy": _reduce(np.nanmean, expectancy),
+        "expectancy_std": _reduce(np.nanstd, expectancy),
+        "neg_window_pct": neg,
+        "min_win_rate": _reduce(np.nanmin, rolling["win_rate"]),
+        "min_sqn": _reduce(np.nanmin, rolling["sqn"]),
+        "worst_dd_r": _reduce(np.nanmin, rolling["dd_r"]),
+    }
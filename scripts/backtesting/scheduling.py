@@ -0,0 +1,83 @@
+"""
+Model 3 Task-Scheduling
+-----------------------
+
+Zerlegt einen Backtest in (Pair, HTF, Pivot-Bereich)-Tasks mit geschätzten
+Kosten und ordnet sie "längste zuerst" (LPT-Heuristik).
+
+Hintergrund: Mit einem Task pro Pair bleiben auf Maschinen mit mehr Kernen
+als Pairs Kerne leer, und ein schweres Pair (z.B. GBPJPY auf 3D) hält das
+Ende des Laufs auf. Pivots sind voneinander unabhängig (eigene
+Verfeinerungen, eigener Trade) – ein Pair lässt sich daher beliebig in
+Pivot-Bereiche teilen, ohne das Ergebnis zu verändern.
+
+Kostenmodell pro Pair:
+    cost = Pivot-Anzahl × Fensterlänge
+mit Fensterlänge = LTF-Kerzen pro HTF-Kerze (Kerzen, die je Pivot für
+Verfeinerungen, Touch- und Exit-Scans durchlaufen werden).
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+
+@dataclass(frozen=True)
+class WorkTask:
+    pair: str
+    htf: str
+    pivot_start: int
+    pivot_stop: int
+    cost: float
+
+    @property
+    def n_pivots(self) -> int:
+        return self.pivot_stop - self.pivot_start
+
+
+def estimate_cost(n_pivots: int, window_len: float) -> float:
+    """Geschätzte Rechenkosten für n_pivots Pivots mit gegebener Fensterlänge (Kerzen)."""
+    return float(n_pivots) * max(float(window_len), 1.0)
+
+
+def plan_tasks(
+    pair_stats: Dict[str, Tuple[int, float]],
+    htf: str,
+    workers: int,
+    tasks_per_worker: int = 4,
+    min_pivots: int = 1,
+) -> List[WorkTask]:
+    """
+    Erzeugt kostenbalancierte Tasks, sortiert nach Kosten absteigend.
+
+    Args:
+        pair_stats: {pair: (Pivot-Anzahl, Fensterlänge)}
+        htf: HTF-Timeframe
+        workers: Anzahl paralleler Worker
+        tasks_per_worker: Ziel-Anzahl Tasks je Worker (Puffer für das Ende des Laufs)
+        min_pivots: Mindestanzahl Pivots pro Task
+
+    Returns:
+        Liste von WorkTask, teuerste zuerst (Pairs ohne Pivots entfallen)
+    """
+    costs = {pair: estimate_cost(n, w) for pair, (n, w) in pair_stats.items() if n > 0}
+    if not costs:
+        return []
+
+    target = sum(costs.values()) / max(workers * tasks_per_worker, 1)
+
+    tasks: List[WorkTask] = []
+    for pair, cost in costs.items():
+        n_pivots, window_len = pair_stats[pair]
+        n_chunks = max(1, min(math.ceil(cost / target), n_pivots // max(min_pivots, 1)))
+        bounds = [round(k * n_pivots / n_chunks) for k in range(n_chunks + 1)]
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            if stop > start:
+                tasks.append(WorkTask(pair, htf, start, stop, estimate_cost(stop - start, window_len)))
+
+    # Longest processing time first; Pair/Start als stabiler Tie-Breaker
+    tasks.sort(key=lambda t: (-t.cost, t.pair, t.pivot_start))
+    return tasks
+
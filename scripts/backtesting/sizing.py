@@ -0,0 +1,90 @@
+"""
+Model 3 Positionsgrößen (Lots)
+------------------------------
+
+Lots je Trade für CSV-Export und Reports, vektorisiert über den ganzen Ledger
+statt iterrows je Trade:
+
+- Pip-Größe und Pip-Wert je Standard-Lot als Lookup-Arrays: einmal je
+  eindeutigem Pair berechnet (price_per_pip), per Pair-Code auf die Trades
+  verteilt
+- Risikobetrag je Trade:
+  "fixed"       = start_cap × risk (fixed fractional vom Startkapital, wie calc_stats)
+  "compounding" = risk × realisierte Equity beim Entry: nur Trades mit
+                  exit_time <= entry_time zählen (portfolio_sim.simulate ohne
+                  Zulassungsregeln), noch offene Trades gehen nicht ein
+- lots = Risikobetrag / Risiko in Pips / Pip-Wert je Standard-Lot,
+  Risiko in Pips = |entry_price - sl_price| / Pip-Größe (0 Lots ohne Risiko)
+
+Pip-Wert je Standard-Lot = STANDARD_LOT × Pip-Größe in der Quote-Währung
+(10 bzw. 1000 bei JPY-Pairs), keine Umrechnung in die Kontowährung.
+
+Beispiel:
+    trades_df["lots"] = position_sizes(trades_df, start_cap=100000, risk=0.01)
+    amounts = risk_amounts(trades_df, 100000, 0.01, mode="compounding")
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting.backtest_model3 import price_per_pip
+    from scripts.backtesting.portfolio_sim import Rules, prepare_ledger, simulate
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from backtest_model3 import price_per_pip
+    from portfolio_sim import Rules, prepare_ledger, simulate
+
+SIZING_MODES = ("fixed", "compounding")
+STANDARD_LOT = 100_000   # Einheiten der Basis-Währung
+
+
+def pip_lookup(pairs) -> Tuple[np.ndarray, np.ndarray]:
+    """(Pip-Größe, Pip-Wert je Standard-Lot) je Trade; NaN für Trades ohne Pair."""
+    codes, uniques = pd.factorize(pd.Series(pairs))
+    pip_size = np.array([price_per_pip(str(pair)) for pair in uniques] + [np.nan], dtype=np.float64)
+    per_trade = pip_size[codes]   # Code -1 → letzter Eintrag (NaN)
+    return per_trade, per_trade * STANDARD_LOT
+
+
+def risk_amounts(trades: pd.DataFrame, start_cap: float = 100000, risk: float = 0.01, mode: str = "fixed") -> np.ndarray:
+    """
+    Risikobetrag je Trade in Ledger-Reihenfolge (fixed bzw. compounding).
+
+    compounding braucht entry_time, exit_time, pnl_r, pair und direction: die
+    Equity beim Entry enthält nur Exits <= entry_time (wie portfolio_sim), ohne
+    PnL von Trades, die zum Entry-Zeitpunkt noch offen sind.
+    """
+    if mode not in SIZING_MODES:
+        raise ValueError(f"Sizing-Modus unbekannt: {mode} (erlaubt: {', '.join(SIZING_MODES)})")
+    if mode == "fixed" or trades.empty:
+        return np.full(len(trades), start_cap * risk)
+    ledger = prepare_ledger(trades.assign(pnl_r=trades["pnl_r"].fillna(0.0)))
+    return simulate(ledger, Rules(), start_cap=start_cap, risk=risk, compounding=True).risk_amount
+
+
+def position_sizes(trades: pd.DataFrame, start_cap: float = 100000, risk: float = 0.01, mode: str = "fixed") -> np.ndarray:
+    """
+    Lots je Trade.
+
+    Args:
+        trades: Ledger mit pair, entry_price, sl_price (compounding zusätzlich
+            entry_time, exit_time, pnl_r, direction)
+        start_cap: Startkapital
+        risk: Risiko pro Trade (Anteil)
+        mode: "fixed" oder "compounding"
+
+    Returns:
+        np.ndarray (float64), ein Wert je Trade in Ledger-Reihenfolge
+    """
+    pip_size, pip_value = pip_lookup(trades["pair"])
+    risk_price = np.abs(trades["entry_price"].to_numpy(dtype=np.float64) - trades["sl_price"].to_numpy(dtype=np.float64))
+    amount = risk_amounts(trades, start_cap, risk, mode)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        risk_pips = risk_price / pip_size
+        lots = amount / risk_pips / pip_value
+    return np.where(risk_pips > 0, lots, 0.0)
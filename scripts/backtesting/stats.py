@@ -1,203 +1,313 @@
 """
-Report Helpers - REPORT1 Format (Optimization-Focused)
---------------------------------------------------------
-
-Statistics & Report Generation for Model 3 Backtest
-Implements REPORT1 format - simpler, focused on optimization metrics
+Model 3 Statistiken (REPORT1)
+-----------------------------
+
+calc_stats / format_report für alle Phasen – ersetzt die drei identischen
+Kopien von report_helpers.py (01_test/02_W_test/01_test, 02_ALL_PAIRS,
+02_technical/01_Single_TF). Import wie die übrigen Engine-Module:
+
+    from scripts.backtesting.stats import calc_stats, format_report
+
+calc_stats rechnet spaltenweise auf numpy-Arrays (keine DataFrame-Kopie,
+keine Python-Schleife über Trades oder Gruppen):
+- Gleichzeitigkeit per Sweep-Line (searchsorted über sortierte Entry/Exit-Zeiten)
+- Drawdown-Dauer und Win/Loss-Serien als Lauflängen aus Wechselstellen
+- Pair / Monat / Jahr: Gruppen-Codes + bincount, alle Summen einer Gruppierung
+  in einem Durchgang
+
+Definitionen wie in report_helpers.py (Equity = start_cap + Σ r·start_cap·risk,
+Verlierer = pnl_r <= 0, Monat/Jahr = Entry in der Zeitzone der Spalte) mit
+einer Änderung: Win/Loss-Serien zählen jetzt auch die erste Serie des
+Ledgers (report_helpers.py ließ sie weg). Max/Avg/Median Consecutive
+Wins/Losses können daher von älteren Reports abweichen.
+Vergleich mit der früheren pandas-Version und Laufzeiten:
+Backtest/02_technical/01_Single_TF/scripts/benchmark_stats.py
+
+Beispiel:
+    stats = calc_stats(trades_df, start_cap=100000, risk=0.01)
+    print(format_report(stats, "W", {"PAIRS": pairs}))
 """
 
-import pandas as pd
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
 import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400 * 10**9
+NAT_NS = np.iinfo(np.int64).min
+
+
+# ---- Gleichzeitigkeit (Sweep-Line) ---- #
+
+def _to_ns(times) -> Tuple[np.ndarray, np.ndarray, object]:
+    """Zeitwerte → (int64 ns UTC, gültig-Maske, tz)."""
+    dt = times if isinstance(times, pd.DatetimeIndex) else pd.DatetimeIndex(pd.to_datetime(times))
+    dt = dt.as_unit("ns")
+    tz = dt.tz
+    if tz is not None:
+        dt = dt.tz_convert("UTC").tz_localize(None)
+    return dt.asi8, ~dt.isna(), tz
+
+
+def _open_intervals(entry_times, exit_times):
+    """Sortierte Entry/Exit-Zeiten vollständiger Trades (exit >= entry)."""
+    entry, entry_ok, tz = _to_ns(entry_times)
+    exit_, exit_ok, _ = _to_ns(exit_times)
+    open_ok = entry_ok & exit_ok & (exit_ >= entry)
+    return entry, entry_ok, open_ok, np.sort(entry[open_ok]), np.sort(exit_[open_ok]), tz
+
+
+def _counts_at_entry(intervals) -> np.ndarray:
+    entry, entry_ok, open_ok, entries_sorted, exits_sorted, _ = intervals
+    opened = np.searchsorted(entries_sorted, entry, side="right")  # entry_j <= entry_i
+    closed = np.searchsorted(exits_sorted, entry, side="left")     # exit_j < entry_i
+    counts = opened - closed - open_ok                             # ohne den Trade selbst
+    counts[~entry_ok] = 0
+    return counts.astype(np.int64)
+
+
+def _open_series(intervals) -> pd.Series:
+    _, _, _, entries_sorted, exits_sorted, tz = intervals
+    events = np.unique(np.concatenate([entries_sorted, exits_sorted]))
+    open_trades = np.searchsorted(entries_sorted, events, side="right") - np.searchsorted(exits_sorted, events, side="left")
+
+    index = pd.DatetimeIndex(events.view("M8[ns]"), name="time")
+    if tz is not None:
+        index = index.tz_localize("UTC").tz_convert(tz)
+    return pd.Series(open_trades.astype(np.int64), index=index, name="open_trades")
+
 
+def concurrent_counts(entry_times, exit_times) -> np.ndarray:
+    """
+    Anzahl ANDERER offener Trades beim Entry jedes Trades (Sweep-Line, O(n log n)).
 
-def calc_stats(trades_df, start_cap=100000, risk=0.01):
+    Trade j zählt für Trade i, wenn entry_j <= entry_i <= exit_j. Trades ohne
+    Entry/Exit zählen nie. Rückgabe: int64, ein Wert je Trade (Eingabe-Reihenfolge).
     """
-    Calculate comprehensive statistics from trades DataFrame (REPORT1 style)
+    return _counts_at_entry(_open_intervals(entry_times, exit_times))
+
+
+def concurrency_series(entry_times, exit_times) -> pd.Series:
+    """
+    Offene Trades über die Zeit (Stufenfunktion an jedem Entry/Exit).
+
+    Wert bei t = Anzahl Trades mit entry <= t <= exit; Index = Ereigniszeit
+    (Zeitzone der Eingabe), aufsteigend.
+    """
+    return _open_series(_open_intervals(entry_times, exit_times))
+
+
+# ---- Spalten-Helfer ---- #
+
+def _mean(values: np.ndarray, empty=0):
+    return values.mean() if len(values) > 0 else empty
+
+
+def _std(values: np.ndarray) -> float:
+    """std(ddof=1), NaN bei weniger als 2 Werten (wie pandas)."""
+    return values.std(ddof=1) if len(values) > 1 else np.nan
+
+
+def _runs(flags: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Läufe gleicher Werte: (Startindex, Länge) je Lauf."""
+    if len(flags) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, flags[1:] != flags[:-1]])
+    return starts, np.diff(np.r_[starts, len(flags)])
+
+
+def _group_sums(codes: np.ndarray, n_groups: int, pnl: np.ndarray) -> Dict[str, np.ndarray]:
+    """Summen je Gruppe (codes 0..n_groups-1, -1 = ohne Gruppe) in einem bincount-Durchgang."""
+    keep = codes >= 0
+    c = codes[keep]
+    r = pnl[keep]
+    valid = ~np.isnan(r)
+    win = r > 0
+    loss = r <= 0
+
+    def _sum(weights):
+        return np.bincount(c, weights=weights, minlength=n_groups)
+
+    return {
+        "trades": np.bincount(c, minlength=n_groups),
+        "valid": _sum(valid * 1.0),
+        "sum": _sum(np.where(valid, r, 0.0)),
+        "wins": _sum(win * 1.0),
+        "sum_wins": _sum(np.where(win, r, 0.0)),
+        "losses": _sum(loss * 1.0),
+        "sum_losses": _sum(np.where(loss, r, 0.0)),
+    }
+
+
+def _period_r(wall_ns: np.ndarray, pnl: np.ndarray, unit: str) -> np.ndarray:
+    """Σ pnl_r je Kalenderperiode ("M" / "Y") des Entry, aufsteigend; NaT-Entries fallen weg."""
+    valid = wall_ns != NAT_NS
+    period = wall_ns[valid].view("M8[ns]").astype(f"M8[{unit}]").astype(np.int64)
+    _, codes = np.unique(period, return_inverse=True)
+    return np.bincount(codes, weights=np.nan_to_num(pnl[valid]))
+
+
+def pair_breakdown(pairs, pnl: np.ndarray) -> List[Dict[str, object]]:
+    """Kennzahlen je Pair (alphabetisch), eine Zeile je Pair wie im REPORT1-Pair-Block."""
+    codes, labels = pd.factorize(pd.Series(pairs), sort=True)
+    g = _group_sums(np.asarray(codes, dtype=np.int64), len(labels), np.asarray(pnl, dtype=np.float64))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win_pct = g["wins"] / g["trades"] * 100
+        expectancy = np.where(g["valid"] > 0, g["sum"] / g["valid"], np.nan)
+        pf = np.where(g["sum_losses"] < 0, g["sum_wins"] / np.abs(g["sum_losses"]), 0.0)
+        avg_win = np.where(g["wins"] > 0, g["sum_wins"] / g["wins"], 0.0)
+        avg_loss = np.where(g["losses"] > 0, g["sum_losses"] / g["losses"], 0.0)
+    return [
+        {
+            'pair': pair,
+            'trades': int(g["trades"][k]),
+            'win_pct': win_pct[k],
+            'expectancy': expectancy[k],
+            'profit_factor': pf[k],
+            'avg_win': avg_win[k],
+            'avg_loss': avg_loss[k],
+            'total_r': g["sum"][k],
+        }
+        for k, pair in enumerate(labels)
+    ]
+
+
+# ---- calc_stats ---- #
+
+def calc_stats(trades_df: pd.DataFrame, start_cap: float = 100000, risk: float = 0.01) -> Optional[Dict[str, object]]:
+    """
+    Alle REPORT1-Kennzahlen eines Trade-DataFrames.
 
     Args:
-        trades_df: DataFrame with trade data
-        start_cap: Starting capital
-        risk: Risk per trade (as decimal, e.g. 0.01 = 1%)
+        trades_df: Trades (pnl_r, direction, pair, entry_time, exit_time),
+            Reihenfolge = Reihenfolge der Equity-Kurve
+        start_cap: Startkapital
+        risk: Risiko pro Trade (Anteil, z.B. 0.01 = 1%)
 
     Returns:
-        Dictionary with all statistics including:
-        - Basic stats (win rate, expectancy, etc.)
-        - SQN (System Quality Number)
-        - Win Rate by RR Target (cumulative)
-        - Pair Breakdown (Top 5 + Bottom 5 by Expectancy)
-        - Long/Short breakdown
-        - Drawdown & Streaks
-        - Time-based performance (monthly/yearly)
+        Dict mit Basis-Kennzahlen, SQN, Long/Short, Drawdown & Serien, Monats-/
+        Jahreswerten, Dauer & Gleichzeitigkeit (inkl. concurrency_series),
+        Sharpe/Sortino und Pair-Breakdown (Top 5 / Bottom 5 nach Expectancy);
+        None bei leerem DataFrame
     """
     if len(trades_df) == 0:
         return None
 
-    tdf = trades_df.copy()
-
     # ========== BASIC METRICS ==========
-    total_trades = len(tdf)
-    winners = tdf[tdf["pnl_r"] > 0]
-    losers = tdf[tdf["pnl_r"] <= 0]
-
-    win_count = len(winners)
-    loss_count = len(losers)
-    win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0
-
-    # Win/Loss R-multiples
-    avg_winner = winners["pnl_r"].mean() if len(winners) > 0 else 0
-    avg_loser = losers["pnl_r"].mean() if len(losers) > 0 else 0
-    max_winner = winners["pnl_r"].max() if len(winners) > 0 else 0
-    max_loser = losers["pnl_r"].min() if len(losers) > 0 else 0
-    median_r = tdf["pnl_r"].median()
-
-    # Expectancy & Performance
-    cumulative_r = tdf["pnl_r"].sum()
-    expectancy = tdf["pnl_r"].mean()
-    std_r = tdf["pnl_r"].std(ddof=1) if len(tdf) > 1 else 0
-
-    # SQN (System Quality Number)
+    pnl = trades_df["pnl_r"].to_numpy(dtype=np.float64)
+    total_trades = len(pnl)
+    r = pnl[~np.isnan(pnl)]
+    win = pnl > 0
+    loss = pnl <= 0
+    wins_r = pnl[win]
+    losses_r = pnl[loss]
+
+    win_count = len(wins_r)
+    loss_count = len(losses_r)
+    win_rate = win_count / total_trades * 100
+
+    avg_winner = _mean(wins_r)
+    avg_loser = _mean(losses_r)
+    max_winner = wins_r.max() if win_count > 0 else 0
+    max_loser = losses_r.min() if loss_count > 0 else 0
+    median_r = np.median(r) if len(r) > 0 else np.nan
+
+    cumulative_r = r.sum()
+    expectancy = _mean(r, np.nan)
+    std_r = _std(r) if total_trades > 1 else 0
     sqn = (expectancy / std_r) * np.sqrt(total_trades) if std_r > 0 else 0
 
-    # Profit Factor & Payoff Ratio
-    sum_wins = winners["pnl_r"].sum() if len(winners) > 0 else 0
-    sum_losses = abs(losers["pnl_r"].sum()) if len(losers) > 0 else 0
+    sum_wins = wins_r.sum() if win_count > 0 else 0
+    sum_losses = abs(losses_r.sum()) if loss_count > 0 else 0
     profit_factor = (sum_wins / sum_losses) if sum_losses > 0 else 0
     payoff_ratio = (avg_winner / abs(avg_loser)) if avg_loser != 0 else 0
 
     # ========== LONG/SHORT BREAKDOWN ==========
-    longs = tdf[tdf["direction"] == "bullish"]
-    shorts = tdf[tdf["direction"] == "bearish"]
-    long_count = len(longs)
-    short_count = len(shorts)
-
-    long_winners = longs[longs["pnl_r"] > 0]
-    short_winners = shorts[shorts["pnl_r"] > 0]
-
-    long_win_rate = (len(long_winners) / long_count * 100) if long_count > 0 else 0
-    short_win_rate = (len(short_winners) / short_count * 100) if short_count > 0 else 0
+    direction = trades_df["direction"].to_numpy()
+    is_long = direction == "bullish"
+    is_short = direction == "bearish"
+    long_count = int(is_long.sum())
+    short_count = int(is_short.sum())
+    long_win_rate = ((is_long & win).sum() / long_count * 100) if long_count > 0 else 0
+    short_win_rate = ((is_short & win).sum() / short_count * 100) if short_count > 0 else 0
     long_short_ratio = (long_count / short_count) if short_count > 0 else 0
 
     # ========== TIME-BASED STATS ==========
-    tdf['entry_dt'] = pd.to_datetime(tdf['entry_time'])
-    tdf['exit_dt'] = pd.to_datetime(tdf['exit_time'])
+    entry_dt = pd.DatetimeIndex(pd.to_datetime(trades_df["entry_time"])).as_unit("ns")
+    exit_dt = pd.DatetimeIndex(pd.to_datetime(trades_df["exit_time"])).as_unit("ns")
+    wall_ns = (entry_dt.tz_localize(None) if entry_dt.tz is not None else entry_dt).asi8  # Monat/Jahr in Spalten-Zeitzone
 
-    start_date = tdf['entry_dt'].min()
-    end_date = tdf['entry_dt'].max()
+    start_date = entry_dt.min()
+    end_date = entry_dt.max()
     years = (end_date - start_date).days / 365.25 if (end_date - start_date).days > 0 else 1
 
-    # Monthly stats
-    tdf['month'] = tdf['entry_dt'].dt.to_period('M')
-    monthly_r = tdf.groupby('month')['pnl_r'].sum()
-
+    monthly_r = _period_r(wall_ns, pnl, "M")
     total_months = len(monthly_r)
-    profitable_months = (monthly_r > 0).sum()
+    profitable_months = int((monthly_r > 0).sum())
     profitable_months_pct = (profitable_months / total_months * 100) if total_months > 0 else 0
+    best_month = monthly_r.max() if total_months > 0 else 0
+    worst_month = monthly_r.min() if total_months > 0 else 0
+    avg_r_per_month = monthly_r.mean() if total_months > 0 else 0
 
-    best_month = monthly_r.max() if len(monthly_r) > 0 else 0
-    worst_month = monthly_r.min() if len(monthly_r) > 0 else 0
-    avg_r_per_month = monthly_r.mean() if len(monthly_r) > 0 else 0
-
-    # Yearly stats
-    tdf['year'] = tdf['entry_dt'].dt.year
-    yearly_r = tdf.groupby('year')['pnl_r'].sum()
-
+    yearly_r = _period_r(wall_ns, pnl, "Y")
     total_years = len(yearly_r)
-    profitable_years = (yearly_r > 0).sum()
+    profitable_years = int((yearly_r > 0).sum())
     profitable_years_pct = (profitable_years / total_years * 100) if total_years > 0 else 0
-
-    best_year = yearly_r.max() if len(yearly_r) > 0 else 0
-    worst_year = yearly_r.min() if len(yearly_r) > 0 else 0
+    best_year = yearly_r.max() if total_years > 0 else 0
+    worst_year = yearly_r.min() if total_years > 0 else 0
     avg_r_per_year = cumulative_r / years if years > 0 else 0
 
     # ========== TRADE CHARACTERISTICS ==========
-    tdf['duration_hours'] = (tdf['exit_dt'] - tdf['entry_dt']).dt.total_seconds() / 3600
-    avg_duration_days = tdf['duration_hours'].mean() / 24
-    min_duration_days = tdf['duration_hours'].min() / 24
-    max_duration_days = tdf['duration_hours'].max() / 24
+    intervals = _open_intervals(entry_dt, exit_dt)
+    entry_ns, entry_ok = intervals[0], intervals[1]
+    exit_ns, exit_ok, _ = _to_ns(exit_dt)
+    duration_days = ((exit_ns - entry_ns) / NS_PER_DAY)[entry_ok & exit_ok]
+    avg_duration_days = _mean(duration_days, np.nan)
+    min_duration_days = duration_days.min() if len(duration_days) > 0 else np.nan
+    max_duration_days = duration_days.max() if len(duration_days) > 0 else np.nan
 
     trades_per_year = total_trades / years if years > 0 else 0
     trades_per_month = total_trades / total_months if total_months > 0 else 0
     trades_per_week = trades_per_year / 52 if trades_per_year > 0 else 0
 
-    # Concurrent trades (optimized)
-    concurrent_counts = []
-    for idx, trade in tdf.iterrows():
-        entry_t = trade['entry_dt']
-        exit_t = trade['exit_dt']
-
-        # Count overlapping trades
-        overlaps = (
-            (tdf['entry_dt'] <= entry_t) & (tdf['exit_dt'] >= entry_t) & (tdf.index != idx)
-        ).sum()
-        concurrent_counts.append(overlaps)
+    concurrent = _counts_at_entry(intervals)
+    avg_concurrent = concurrent.mean()
+    max_concurrent = concurrent.max()
+    open_trades = _open_series(intervals)
 
-    avg_concurrent = np.mean(concurrent_counts) if len(concurrent_counts) > 0 else 0
-    max_concurrent = max(concurrent_counts) if len(concurrent_counts) > 0 else 0
-
-    # ========== DRAWDOWN & STREAKS (VECTORIZED) ==========
-    equity = start_cap
-    equity_curve = [equity]
-
-    for pnl_r in tdf['pnl_r'].values:
-        equity += pnl_r * start_cap * risk
-        equity_curve.append(equity)
-
-    equity_array = np.array(equity_curve)
+    # ========== DRAWDOWN & STREAKS ==========
+    equity_array = np.cumsum(np.r_[float(start_cap), pnl * start_cap * risk])
     peak_array = np.maximum.accumulate(equity_array)
-    drawdown_pct = ((equity_array - peak_array) / peak_array * 100)
+    drawdown_pct = (equity_array - peak_array) / peak_array * 100
 
     max_dd = drawdown_pct.min()
-    avg_dd = drawdown_pct[drawdown_pct < 0].mean() if (drawdown_pct < 0).any() else 0
-
-    # Max DD Duration (in trades)
     in_dd = drawdown_pct < 0
-    dd_durations = []
-    curr_duration = 0
-
-    for is_dd in in_dd:
-        if is_dd:
-            curr_duration += 1
-        else:
-            if curr_duration > 0:
-                dd_durations.append(curr_duration)
-            curr_duration = 0
-    if curr_duration > 0:
-        dd_durations.append(curr_duration)
-
-    max_dd_duration_trades = max(dd_durations) if len(dd_durations) > 0 else 0
-
-    # Find max DD period details
-    if max_dd_duration_trades > 0:
-        # Find where max DD occurred
-        max_dd_idx = np.argmin(drawdown_pct)
-
-        # Calculate days for max DD period
-        dd_start_idx = max(0, max_dd_idx - max_dd_duration_trades)
-        dd_end_idx = max_dd_idx
-
-        if dd_start_idx < len(tdf) and dd_end_idx < len(tdf):
-            dd_start_date = tdf.iloc[dd_start_idx]['entry_dt']
-            dd_end_date = tdf.iloc[dd_end_idx]['entry_dt']
-            max_dd_duration_days = (dd_end_date - dd_start_date).days
-        else:
-            max_dd_duration_days = 0
-    else:
-        max_dd_duration_days = 0
+    avg_dd = drawdown_pct[in_dd].mean() if in_dd.any() else 0
 
-    # Check if recovered from max DD
-    final_dd = drawdown_pct[-1]
-    recovered = abs(final_dd) < 0.01  # Within 0.01% of peak
+    # Max DD Duration (in trades): längster Lauf unter Wasser
+    dd_starts, dd_lengths = _runs(in_dd)
+    dd_runs = dd_lengths[in_dd[dd_starts]]
+    max_dd_duration_trades = int(dd_runs.max()) if len(dd_runs) > 0 else 0
 
-    # Consecutive Wins/Losses (vectorized)
-    is_winner = (tdf['pnl_r'] > 0).astype(int)
+    # Tage vom Beginn dieses Laufs (rückwärts vom tiefsten Punkt) bis zum tiefsten Punkt
+    max_dd_duration_days = 0
+    if max_dd_duration_trades > 0:
+        dd_end_idx = int(np.argmin(drawdown_pct))
+        dd_start_idx = max(0, dd_end_idx - max_dd_duration_trades)
+        if dd_start_idx < total_trades and dd_end_idx < total_trades:
+            if entry_ok[dd_start_idx] and entry_ok[dd_end_idx]:
+                max_dd_duration_days = int((entry_ns[dd_end_idx] - entry_ns[dd_start_idx]) // NS_PER_DAY)
+            else:
+                max_dd_duration_days = np.nan
 
-    # Find streaks
-    streak_changes = np.diff(is_winner, prepend=is_winner.iloc[0])
-    streak_starts = np.where(streak_changes != 0)[0]
-    streak_lengths = np.diff(streak_starts, append=len(is_winner))
+    recovered = bool(abs(drawdown_pct[-1]) < 0.01)  # innerhalb 0.01% vom Hoch
 
-    win_streaks = streak_lengths[is_winner.iloc[streak_starts] == 1]
-    loss_streaks = streak_lengths[is_winner.iloc[streak_starts] == 0]
+    # Consecutive Wins/Losses: Läufe von pnl_r > 0 bzw. <= 0
+    streak_starts, streak_lengths = _runs(win)
+    win_streaks = streak_lengths[win[streak_starts]]
+    loss_streaks = streak_lengths[~win[streak_starts]]
 
     max_consec_wins = win_streaks.max() if len(win_streaks) > 0 else 0
     avg_consec_wins = win_streaks.mean() if len(win_streaks) > 0 else 0
@@ -208,61 +318,25 @@ def calc_stats(trades_df, start_cap=100000, risk=0.01):
     median_consec_losses = np.median(loss_streaks) if len(loss_streaks) > 0 else 0
 
     # ========== PORTFOLIO METRICS ==========
-    ending_capital = equity_curve[-1]
+    ending_capital = float(equity_array[-1])
     total_return = ((ending_capital - start_cap) / start_cap) * 100
 
-    # CAGR
     if years > 0 and ending_capital > 0:
         cagr = (((ending_capital / start_cap) ** (1 / years)) - 1) * 100
     else:
         cagr = 0
 
-    # Risk-adjusted metrics
     sharpe = (expectancy / std_r) * np.sqrt(trades_per_year) if std_r > 0 else 0
 
-    downside_returns = tdf[tdf['pnl_r'] < 0]['pnl_r']
-    downside_std = downside_returns.std(ddof=1) if len(downside_returns) > 1 else 0
+    downside_returns = pnl[pnl < 0]
+    downside_std = _std(downside_returns) if len(downside_returns) > 1 else 0
     sortino = (expectancy / downside_std) * np.sqrt(trades_per_year) if downside_std > 0 else 0
 
-
     # ========== PAIR BREAKDOWN (TOP 5 + BOTTOM 5 BY EXPECTANCY) ==========
-    pair_groups = tdf.groupby('pair')
-    pair_stats = []
-
-    for pair, group in pair_groups:
-        pair_total = len(group)
-        pair_winners = group[group['pnl_r'] > 0]
-        pair_losers = group[group['pnl_r'] <= 0]
-
-        pair_win_pct = (len(pair_winners) / pair_total * 100) if pair_total > 0 else 0
-        pair_expectancy = group['pnl_r'].mean()
-
-        pair_sum_wins = pair_winners['pnl_r'].sum() if len(pair_winners) > 0 else 0
-        pair_sum_losses = abs(pair_losers['pnl_r'].sum()) if len(pair_losers) > 0 else 0
-        pair_pf = (pair_sum_wins / pair_sum_losses) if pair_sum_losses > 0 else 0
-
-        pair_avg_win = pair_winners['pnl_r'].mean() if len(pair_winners) > 0 else 0
-        pair_avg_loss = pair_losers['pnl_r'].mean() if len(pair_losers) > 0 else 0
-        pair_total_r = group['pnl_r'].sum()
-
-        pair_stats.append({
-            'pair': pair,
-            'trades': pair_total,
-            'win_pct': pair_win_pct,
-            'expectancy': pair_expectancy,
-            'profit_factor': pair_pf,
-            'avg_win': pair_avg_win,
-            'avg_loss': pair_avg_loss,
-            'total_r': pair_total_r
-        })
-
-    # Sort by expectancy
-    pair_stats_sorted = sorted(pair_stats, key=lambda x: x['expectancy'], reverse=True)
-
-    top_5_pairs = pair_stats_sorted[:5] if len(pair_stats_sorted) >= 5 else pair_stats_sorted
+    pair_stats_sorted = sorted(pair_breakdown(trades_df["pair"], pnl), key=lambda x: x['expectancy'], reverse=True)
+    top_5_pairs = pair_stats_sorted[:5]
     bottom_5_pairs = pair_stats_sorted[-5:] if len(pair_stats_sorted) >= 5 else []
 
-    # ========== RETURN STATS DICTIONARY ==========
     return {
         # Basic stats
         'total_trades': total_trades,
@@ -339,6 +413,7 @@ def calc_stats(trades_df, start_cap=100000, risk=0.01):
         'trades_per_week': trades_per_week,
         'avg_concurrent': avg_concurrent,
         'max_concurrent': int(max_concurrent),
+        'concurrency_series': open_trades,
 
         # Risk metrics
         'sharpe': sharpe,
@@ -350,6 +425,8 @@ def calc_stats(trades_df, start_cap=100000, risk=0.01):
     }
 
 
+# ---- Text-Report ---- #
+
 def format_report(stats, htf_timeframe, config):
     """
     Format statistics into REPORT1 style text report
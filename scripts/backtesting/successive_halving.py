@@ -0,0 +1,145 @@
+"""
+Model 3 Successive Halving (Parameter-Suche mit Re-Backtests)
+-------------------------------------------------------------
+
+Für Parameter, die sich nicht aus den Trade-CSVs auswerten lassen (Doji %,
+Refinement-Max-Size, Min-SL-Pips, Pivot-Definition, ...), kostet jeder
+Gitterpunkt einen kompletten Backtest. Successive Halving bewertet alle
+Kandidaten zuerst auf einer billigen Stufe (wenige Pairs, wenige Jahre) und
+befördert nur das beste 1/eta in die nächste, teurere Stufe – bis zum
+vollen Lauf.
+
+    Stufe 0:  81 Kandidaten × (5 Pairs, 3 Jahre)
+    Stufe 1:  27 Kandidaten × (12 Pairs, 8 Jahre)
+    Stufe 2:   9 Kandidaten × (28 Pairs, 2010-2025)
+
+Die Auswertung selbst (evaluate) ist frei – typischerweise
+backtest_all.run_backtest_for_timeframe(params=..., pairs=..., ...) +
+batch_stats. Jede Stufe lädt ihre Daten einmal (prepare) und teilt sie
+zwischen allen Kandidaten.
+
+Beispiel:
+    rungs = [Rung("small", PAIRS[:5], "2020-01-01", "2022-12-31"), Rung("full", PAIRS, "2010-01-01", "2025-12-31")]
+    log = successive_halving(candidates, rungs, evaluate, metric="expectancy", eta=3)
+    log[log["rung"] == len(rungs) - 1].sort_values("score", ascending=False)
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Rung:
+    """Eine Stufe: Pair-Teilmenge + Zeitraum (min_trades = Mindest-Trades für einen gültigen Score)."""
+
+    name: str
+    pairs: Sequence[str]
+    start_date: str
+    end_date: str
+    min_trades: int = 0
+
+
+def promote_count(n: int, eta: float, min_keep: int = 1) -> int:
+    """Anzahl Kandidaten, die in die nächste Stufe kommen (ceil(n / eta), mindestens min_keep)."""
+    return min(n, max(min_keep, math.ceil(n / eta)))
+
+
+def successive_halving(
+    candidates: Sequence[Dict[str, Any]],
+    rungs: Sequence[Rung],
+    evaluate: Callable[[Dict[str, Any], Rung, Any], Dict[str, float]],
+    metric: str = "expectancy",
+    eta: float = 3,
+    min_keep: int = 1,
+    ascending: bool = False,
+    prepare: Optional[Callable[[Rung], Any]] = None,
+    on_result: Optional[Callable[[Dict], None]] = None,
+) -> pd.DataFrame:
+    """
+    Successive Halving über alle Stufen.
+
+    Args:
+        candidates: Parameter-Dicts (z.B. {"DOJI_FILTER": 5.0, "MIN_SL_PIPS": 60})
+        rungs: Stufen von billig nach voll
+        evaluate: (params, rung, prepared) → Kennzahlen-Dict (muss metric und "trades" enthalten)
+        metric: Auswahl-Kennzahl, ascending=True → kleiner ist besser
+        eta: Reduktionsfaktor pro Stufe (3 → bestes Drittel wird befördert)
+        prepare: rung → geteilte Daten der Stufe (z.B. Daten-Cache), einmal pro Stufe
+        on_result: Callback pro ausgewertetem Kandidaten (Fortschritt, Checkpoints)
+
+    Returns:
+        DataFrame (eine Zeile pro Auswertung): rung, rung_name, candidate, Parameter,
+        Kennzahlen, score (NaN bei < rung.min_trades), promoted und fallback
+        (True: keine gültigen Scores auf der Stufe, Beförderung nach Trade-Anzahl)
+    """
+    rows: List[Dict] = []
+    alive = list(range(len(candidates)))
+
+    for level, rung in enumerate(rungs):
+        prepared = prepare(rung) if prepare is not None else None
+        last = level == len(rungs) - 1
+        level_rows = []
+
+        for idx in alive:
+            stats = dict(evaluate(candidates[idx], rung, prepared))
+            valid = stats.get("trades", 0) >= rung.min_trades
+            score = float(stats[metric]) if valid and stats.get(metric) is not None else float("nan")
+            row = {"rung": level, "rung_name": rung.name, "candidate": idx, **candidates[idx], **stats, "score": score}
+            level_rows.append(row)
+            if on_result is not None:
+                on_result(row)
+
+        # Beste 1/eta (gültige Scores zuerst, Gleichstand → Kandidaten-Reihenfolge)
+        keep = len(alive) if last else promote_count(len(alive), eta, min_keep)
+        scores = np.array([r["score"] for r in level_rows], dtype=np.float64)
+        key = np.where(np.isnan(scores), np.inf, scores if ascending else -scores)
+        ranked = np.argsort(key, kind="stable")
+        promoted = {level_rows[i]["candidate"] for i in ranked[:keep] if not np.isnan(scores[i])}
+
+        # Kein Kandidat erreicht min_trades: Stufe zu klein gewählt – nicht still abbrechen,
+        # sondern die Kandidaten mit den meisten Trades befördern (Gleichstand → metric)
+        fallback = not last and not promoted and bool(level_rows)
+        if fallback:
+            trades = np.array([r.get("trades", 0) for r in level_rows], dtype=np.float64)
+            raw = np.array([np.nan if r.get(metric) is None else r[metric] for r in level_rows], dtype=np.float64)
+            raw_key = np.where(np.isnan(raw), np.inf, raw if ascending else -raw)
+            ranked = np.lexsort((raw_key, -trades))
+            promoted = {level_rows[i]["candidate"] for i in ranked[:keep]}
+            print(f"[!] Stufe {rung.name}: kein Kandidat mit >= {rung.min_trades} Trades "
+                  f"- {len(promoted)} Kandidaten nach Trade-Anzahl befördert")
+
+        for row in level_rows:
+            row["promoted"] = (not last) and row["candidate"] in promoted
+            row["fallback"] = fallback
+        rows.extend(level_rows)
+
+        if last:
+            break
+        alive = [idx for idx in alive if idx in promoted]
+        if not alive:
+            break
+
+    return pd.DataFrame(rows)
+
+
+def rung_cost(rung: Rung) -> int:
+    """Grobes Kostenmaß einer Auswertung: Pairs × Jahre."""
+    years = pd.Timestamp(rung.end_date).year - pd.Timestamp(rung.start_date).year + 1
+    return len(rung.pairs) * years
+
+
+def exhaustive_cost(n_candidates: int, rungs: Sequence[Rung]) -> int:
+    """Pair-Jahre eines vollständigen Gitters auf der letzten Stufe (Vergleichsgröße)."""
+    return n_candidates * rung_cost(rungs[-1])
+
+
+def search_cost(log: pd.DataFrame, rungs: Sequence[Rung]) -> int:
+    """Pair-Jahre aller tatsächlich gelaufenen Auswertungen."""
+    counts = log.groupby("rung").size() if len(log) else pd.Series(dtype=int)
+    return int(sum(counts.get(level, 0) * rung_cost(rung) for level, rung in enumerate(rungs)))
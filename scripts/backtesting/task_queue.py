@@ -0,0 +1,363 @@
+"""
+Model 3 Task-Queue (Multi-Node)
+-------------------------------
+
+Einfache Task-Queue über TCP (multiprocessing.managers) für Sweeps, die auf
+mehrere Rechner im lokalen Netz verteilt werden.
+
+- Koordinator: start_server(...) startet den Manager-Server mit einem TaskBoard,
+  put_tasks(...) stellt Tasks ein, wait_for_results(...) sammelt Ergebnisse
+- Worker:      run_worker(address, authkey, handler) – holt Tasks per Lease,
+  führt handler(payload) aus und meldet das Ergebnis zurück
+
+Sicherheit: Der Manager tauscht Pickles über TCP aus – wer den Port erreicht
+und den authkey kennt, kann auf Server und Workern Code ausführen. Es gibt
+daher keinen Default-Schlüssel (authkey ist Pflicht, z.B. aus
+MODEL3_QUEUE_AUTHKEY oder new_authkey()), und der Server lauscht ohne
+Angabe nur auf 127.0.0.1.
+
+Leases: Ein Task gehört einem Worker nur für lease_seconds. Stirbt der Worker,
+läuft die Lease ab und der Task wird neu vergeben. Fehlgeschlagene Tasks werden
+bis max_attempts wiederholt. Doppelte Ergebnisse (abgelaufene Lease, Worker
+doch fertig) werden ignoriert – das erste Ergebnis gilt. complete/fail geben
+nur die eigene Lease frei (worker_id), nie die eines neu zugeteilten Workers.
+
+Ende: Worker melden sich nach dem letzten Task ab (leave); der Koordinator
+wartet darauf (wait_for_workers), bevor er den Server beendet. Verliert ein
+Worker trotzdem die Verbindung (EOFError / ConnectionError), gilt die Queue
+als leer und run_worker endet ohne Fehler.
+
+Task-IDs sind beliebige picklebare, sortierbare Keys (z.B. Tupel
+(config, pair, htf)); merge_ledgers(...) fügt Teil-Ledger deterministisch in
+Key-Reihenfolge zusammen, unabhängig davon, welcher Worker wann fertig wurde.
+
+Lokal testbar: Server + mehrere Worker-Prozesse auf 127.0.0.1.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import socket
+import threading
+import time
+import traceback
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from scripts.backtesting.ledger import TradeLedger
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from ledger import TradeLedger
+
+DEFAULT_PORT = 50071
+AUTHKEY_ENV = "MODEL3_QUEUE_AUTHKEY"
+
+
+# --------------------------------------------------------------------------- #
+# TaskBoard (lebt im Server-Prozess)
+# --------------------------------------------------------------------------- #
+
+
+class TaskBoard:
+    """Thread-sichere Task-Verwaltung mit Leases. Wird über einen Manager-Proxy angesprochen."""
+
+    def __init__(self, lease_seconds: float = 3600.0, max_attempts: int = 3):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._pending: List[Hashable] = []
+        self._payloads: Dict[Hashable, Any] = {}
+        self._leases: Dict[Hashable, Tuple[str, float]] = {}
+        self._attempts: Dict[Hashable, int] = {}
+        self._results: Dict[Hashable, Any] = {}
+        self._errors: Dict[Hashable, str] = {}
+        self._workers: set = set()
+
+    def put(self, task_id: Hashable, payload: Any) -> None:
+        with self._lock:
+            if task_id in self._payloads:
+                return
+            self._payloads[task_id] = payload
+            self._pending.append(task_id)
+
+    def lease(self, worker_id: str) -> Optional[Tuple[Hashable, Any]]:
+        """Nächster offener Task (oder None). Abgelaufene Leases werden vorher zurückgestellt."""
+        with self._lock:
+            self._workers.add(worker_id)
+            self._requeue_expired()
+            if not self._pending:
+                return None
+            task_id = self._pending.pop(0)
+            self._leases[task_id] = (worker_id, time.time() + self.lease_seconds)
+            self._attempts[task_id] = self._attempts.get(task_id, 0) + 1
+            return task_id, self._payloads[task_id]
+
+    def complete(self, task_id: Hashable, result: Any, worker_id: str) -> None:
+        with self._lock:
+            self._release(task_id, worker_id)
+            if task_id in self._results:
+                return
+            self._results[task_id] = result
+            self._errors.pop(task_id, None)
+            if task_id in self._pending:
+                self._pending.remove(task_id)
+
+    def fail(self, task_id: Hashable, error: str, worker_id: str) -> None:
+        with self._lock:
+            if not self._release(task_id, worker_id):
+                return  # Lease abgelaufen und neu vergeben – der neue Versuch zählt
+            if task_id in self._results:
+                return
+            self._errors[task_id] = error
+            if self._attempts.get(task_id, 0) < self.max_attempts and task_id not in self._pending:
+                self._pending.append(task_id)
+
+    def leave(self, worker_id: str) -> None:
+        """Worker meldet sich ab (Queue leer)."""
+        with self._lock:
+            self._workers.discard(worker_id)
+
+    def active_workers(self) -> int:
+        """Worker, die schon Tasks angefragt und sich noch nicht abgemeldet haben."""
+        with self._lock:
+            return len(self._workers)
+
+    def finished(self) -> bool:
+        """True, wenn kein Task mehr offen oder vergeben ist."""
+        with self._lock:
+            self._requeue_expired()
+            return not self._pending and not self._leases
+
+    def status(self) -> Dict[str, int]:
+        with self._lock:
+            failed = sum(1 for t in self._errors if t not in self._results and t not in self._pending and t not in self._leases)
+            return {
+                "total": len(self._payloads),
+                "pending": len(self._pending),
+                "leased": len(self._leases),
+                "done": len(self._results),
+                "failed": failed,
+            }
+
+    def results(self) -> Dict[Hashable, Any]:
+        with self._lock:
+            return dict(self._results)
+
+    def errors(self) -> Dict[Hashable, str]:
+        with self._lock:
+            return {t: e for t, e in self._errors.items() if t not in self._results}
+
+    def _release(self, task_id: Hashable, worker_id: str) -> bool:
+        """Gibt die Lease frei, wenn sie worker_id gehört. False: Task ist inzwischen an einen anderen Worker vergeben."""
+        lease = self._leases.get(task_id)
+        if lease is None:
+            return True
+        if lease[0] != worker_id:
+            return False
+        del self._leases[task_id]
+        return True
+
+    def _requeue_expired(self) -> None:
+        now = time.time()
+        for task_id, (_, deadline) in list(self._leases.items()):
+            if deadline < now:
+                del self._leases[task_id]
+                if self._attempts.get(task_id, 0) < self.max_attempts:
+                    self._pending.append(task_id)
+                else:
+                    self._errors.setdefault(task_id, "lease expired")
+
+
+# --------------------------------------------------------------------------- #
+# Manager (Server / Client)
+# --------------------------------------------------------------------------- #
+
+
+_BOARD: Optional[TaskBoard] = None
+_BOARD_CONFIG: Dict[str, float] = {}
+
+
+def _get_board() -> TaskBoard:
+    global _BOARD
+    if _BOARD is None:
+        _BOARD = TaskBoard(**_BOARD_CONFIG)
+    return _BOARD
+
+
+def _init_server(config: Dict[str, float]) -> None:
+    _BOARD_CONFIG.update(config)
+
+
+class QueueManager(BaseManager):
+    pass
+
+
+QueueManager.register("board", callable=_get_board)
+
+
+def new_authkey() -> bytes:
+    """Zufälliger Schlüssel für einen Lauf (32 Hex-Zeichen)."""
+    return secrets.token_hex(16).encode()
+
+
+def env_authkey() -> Optional[bytes]:
+    """Gemeinsamer Schlüssel aus MODEL3_QUEUE_AUTHKEY (None, wenn nicht gesetzt)."""
+    key = os.environ.get(AUTHKEY_ENV, "")
+    return key.encode() if key else None
+
+
+def _require_authkey(authkey: Optional[bytes]) -> bytes:
+    if not authkey:
+        raise ValueError(f"authkey fehlt – gemeinsamen Schlüssel über {AUTHKEY_ENV} setzen (kein Default, Pickles über TCP)")
+    return bytes(authkey)
+
+
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    authkey: Optional[bytes] = None,
+    lease_seconds: float = 3600.0,
+    max_attempts: int = 3,
+) -> QueueManager:
+    """
+    Startet den Queue-Server in einem Hintergrundprozess (authkey Pflicht).
+
+    host: "127.0.0.1" nur lokal; für Worker im LAN die eigene LAN-Adresse bzw. "0.0.0.0"
+
+    Returns: gestarteter Manager (manager.board() = Proxy)
+    """
+    manager = QueueManager(address=(host, port), authkey=_require_authkey(authkey))
+    manager.start(initializer=_init_server, initargs=({"lease_seconds": lease_seconds, "max_attempts": max_attempts},))
+    return manager
+
+
+def connect(host: str, port: int = DEFAULT_PORT, authkey: Optional[bytes] = None, retries: int = 30, delay: float = 1.0):
+    """Verbindet mit einem laufenden Server (authkey Pflicht). Returns: TaskBoard-Proxy."""
+    manager = QueueManager(address=(host, port), authkey=_require_authkey(authkey))
+    for attempt in range(retries):
+        try:
+            manager.connect()
+            return manager.board()
+        except (ConnectionRefusedError, OSError):
+            if attempt == retries - 1:
+                raise
+            time.sleep(delay)
+
+
+def put_tasks(board, tasks: Iterable[Tuple[Hashable, Any]]) -> int:
+    """Stellt (task_id, payload)-Paare ein. Returns: Anzahl Tasks."""
+    n = 0
+    for task_id, payload in tasks:
+        board.put(task_id, payload)
+        n += 1
+    return n
+
+
+def wait_for_results(
+    board,
+    poll_interval: float = 2.0,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> Dict[Hashable, Any]:
+    """Blockiert bis alle Tasks fertig (oder endgültig fehlgeschlagen) sind. Returns: {task_id: result}."""
+    last = None
+    while not board.finished():
+        status = board.status()
+        if progress is not None and status != last:
+            progress(status)
+            last = status
+        time.sleep(poll_interval)
+    if progress is not None:
+        progress(board.status())
+    return board.results()
+
+
+def wait_for_workers(board, timeout: float = 30.0, poll_interval: float = 0.5) -> int:
+    """
+    Wartet nach dem letzten Ergebnis, bis sich alle Worker abgemeldet haben
+    (höchstens timeout Sekunden, z.B. abgestürzte Worker). Erst danach den
+    Server beenden – sonst brechen noch pollende Worker mit EOFError ab.
+
+    Returns: Anzahl Worker, die sich bis timeout nicht abgemeldet haben
+    """
+    deadline = time.time() + timeout
+    active = board.active_workers()
+    while active and time.time() < deadline:
+        time.sleep(poll_interval)
+        active = board.active_workers()
+    return active
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(
+    host: str,
+    handler: Callable[[Any], Any],
+    port: int = DEFAULT_PORT,
+    authkey: Optional[bytes] = None,
+    worker_id: Optional[str] = None,
+    poll_interval: float = 1.0,
+) -> int:
+    """
+    Worker-Schleife: Lease → handler(payload) → complete/fail, bis das Board fertig ist.
+    Ein beendeter Server (Verbindung weg) zählt ebenfalls als leere Queue.
+
+    Returns: Anzahl erfolgreich bearbeiteter Tasks.
+    """
+    board = connect(host, port, authkey)
+    worker_id = worker_id or default_worker_id()
+    done = 0
+
+    try:
+        while True:
+            leased = board.lease(worker_id)
+            if leased is None:
+                if board.finished():
+                    board.leave(worker_id)
+                    return done
+                time.sleep(poll_interval)  # andere Worker halten noch Leases
+                continue
+
+            task_id, payload = leased
+            try:
+                result = handler(payload)
+            except Exception:
+                board.fail(task_id, traceback.format_exc(), worker_id)
+                continue
+            board.complete(task_id, result, worker_id)
+            done += 1
+    except (EOFError, ConnectionError, BrokenPipeError):
+        return done  # Server beendet
+
+
+# --------------------------------------------------------------------------- #
+# Ergebnisse zusammenführen
+# --------------------------------------------------------------------------- #
+
+
+def merge_ledgers(
+    results: Dict[Hashable, Any],
+    sort_by: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Fügt Teil-Ledger (TradeLedger oder Listen von Trade-Dicts je Task) deterministisch zusammen.
+
+    Reihenfolge: Tasks nach Key sortiert, danach stabil nach sort_by
+    (z.B. ["entry_time", "pair"]) – identisch für jede Worker-Verteilung.
+    """
+    parts = [results[task_id] for task_id in sorted(results)]
+    if parts and all(isinstance(p, TradeLedger) for p in parts):
+        merged = TradeLedger.concat(parts)
+        if sort_by:
+            merged = merged.sorted(sort_by)
+        return merged.to_pandas(categorical=False)
+
+    rows = [trade for part in parts for trade in (part or [])]
+    df = pd.DataFrame(rows)
+    if sort_by and len(df) > 0:
+        df = df.sort_values(sort_by, kind="mergesort").reset_index(drop=True)
+    return df
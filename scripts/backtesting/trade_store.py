@@ -0,0 +1,307 @@
+"""
+Model 3 Trade-Store (partitioniertes Parquet)
+---------------------------------------------
+
+Trades werden direkt aus den Workern als Arrow-Record-Batches in ein
+partitioniertes Parquet-Dataset geschrieben, statt als Dict-Listen durch den
+Pool zurückgepickelt und am Ende als CSV geschrieben zu werden.
+
+Layout (Hive-Stil, ein Dataset pro Lauf):
+
+    <root>/htf=W/pair=EURUSD/part-00000.parquet
+    <root>/htf=W/pair=EURUSD/part-00042.parquet   (Pivot-Bereich ab 42)
+    <root>/htf=3D/pair=GBPJPY/part-00000.parquet
+
+Typisierte Spalten:
+- *_time                     → timestamp[ns, UTC]
+- pair, direction, ...       → dictionary<int32, string> (pandas: category)
+- Preise / Pips / R          → float64
+- Zähler                     → int64
+
+Jede Datei wird atomar geschrieben (tmp + os.replace); Leser laden nur die
+benötigten Partitionen (TradeStore.read / load_trades).
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow ist optional (Fallback: CSV)
+    pa = None
+    pq = None
+
+
+CATEGORY_COLUMNS = {
+    "pair",
+    "direction",
+    "htf_timeframe",
+    "entry_type",
+    "priority_refinement_tf",
+    "exit_type",
+    "exit_reason",
+    "win_loss",
+    "refinement_tf",
+}
+INT_COLUMNS = {"total_refinements"}
+
+
+def pyarrow_available() -> bool:
+    return pa is not None
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow wird für den Parquet-Trade-Store benötigt (pip install pyarrow)")
+
+
+def arrow_type(column: str, sample=None):
+    """Arrow-Typ einer Trade-Spalte (Namenskonvention, sonst nach Beispielwert)."""
+    if column.endswith("_time"):
+        return pa.timestamp("ns", tz="UTC")
+    if column in CATEGORY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    if column in INT_COLUMNS:
+        return pa.int64()
+    if isinstance(sample, str):
+        return pa.string()
+    if isinstance(sample, bool):
+        return pa.bool_()
+    return pa.float64()
+
+
+def _to_ns(values: List) -> List[Optional[int]]:
+    out = []
+    for v in values:
+        if v is None or (isinstance(v, float) and v != v) or v is pd.NaT:
+            out.append(None)
+        else:
+            ts = pd.Timestamp(v)
+            if ts.tzinfo is None:
+                ts = ts.tz_localize("UTC")
+            out.append(ts.value)
+    return out
+
+
+def trades_to_batch(trades: Sequence[Dict], columns: Optional[Sequence[str]] = None):
+    """Liste von Trade-Dicts → typisierter pyarrow.RecordBatch (Spaltenreihenfolge wie im ersten Trade)."""
+    _require_pyarrow()
+    if columns is None:
+        columns = list(trades[0].keys()) if trades else []
+
+    arrays = []
+    fields = []
+    for col in columns:
+        values = [t.get(col) for t in trades]
+        typ = arrow_type(col, next((v for v in values if v is not None), None))
+        if pa.types.is_timestamp(typ):
+            arr = pa.array(_to_ns(values), type=pa.int64()).cast(typ)
+        elif pa.types.is_dictionary(typ):
+            arr = pa.array([None if v is None else str(v) for v in values], type=pa.string()).dictionary_encode()
+            arr = arr.cast(typ)
+        elif typ == pa.float64():
+            arr = pa.array([None if v is None else float(v) for v in values], type=typ)
+        else:
+            arr = pa.array(values, type=typ)
+        arrays.append(arr)
+        fields.append(pa.field(col, typ))
+    return pa.RecordBatch.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def frame_to_table(df: pd.DataFrame):
+    """DataFrame → typisierte pyarrow.Table (gleiche Typregeln wie trades_to_batch)."""
+    _require_pyarrow()
+    fields = []
+    data = {}
+    for col in df.columns:
+        s = df[col]
+        if col.endswith("_time"):
+            s = pd.to_datetime(s, utc=True)
+        elif col in CATEGORY_COLUMNS:
+            s = s.astype("string").astype("category")
+        data[col] = s
+        sample = s.dropna().iloc[0] if s.notna().any() else None
+        fields.append(pa.field(col, arrow_type(col, sample.item() if hasattr(sample, "item") else sample)))
+    return pa.Table.from_pandas(pd.DataFrame(data), schema=pa.schema(fields), preserve_index=False)
+
+
+class TradeStore:
+    """Partitioniertes Parquet-Dataset eines Laufs (htf=<HTF>/pair=<PAIR>/part-*.parquet)."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    # ------------------------------------------------------------------ #
+    # Schreiben
+    # ------------------------------------------------------------------ #
+
+    def partition_dir(self, htf: str, pair: str) -> Path:
+        return self.root / f"htf={htf}" / f"pair={pair}"
+
+    def write(self, htf: str, pair: str, trades, part: int = 0) -> Optional[Path]:
+        """
+        Schreibt die Trades eines (HTF, Pair, Pivot-Bereich) als eigene Datei (atomar).
+
+        trades: Liste von Trade-Dicts oder TradeLedger (to_arrow). Leer → None.
+        """
+        if not trades:
+            return None
+        _require_pyarrow()
+        if hasattr(trades, "to_arrow"):
+            return self._write_table(htf, pair, trades.to_arrow(), part)
+        return self._write_table(htf, pair, pa.Table.from_batches([trades_to_batch(trades)]), part)
+
+    def write_frame(self, htf: str, pair: str, df: pd.DataFrame, part: int = 0) -> Optional[Path]:
+        if len(df) == 0:
+            return None
+        return self._write_table(htf, pair, frame_to_table(df), part)
+
+    def _write_table(self, htf: str, pair: str, table, part: int) -> Path:
+        _require_pyarrow()
+        target_dir = self.partition_dir(htf, pair)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / f"part-{part:05d}.parquet"
+        fd, tmp = tempfile.mkstemp(dir=target_dir, prefix=".tmp_", suffix=".parquet")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return target
+
+    def clear_partition(self, htf: str, pair: Optional[str] = None) -> None:
+        """Löscht eine Partition (z.B. Teilergebnisse eines abgebrochenen Pairs)."""
+        path = self.partition_dir(htf, pair) if pair else self.root / f"htf={htf}"
+        if path.exists():
+            shutil.rmtree(path)
+
+    def clear(self) -> None:
+        if self.root.exists():
+            shutil.rmtree(self.root)
+
+    # ------------------------------------------------------------------ #
+    # Lesen
+    # ------------------------------------------------------------------ #
+
+    def htfs(self) -> List[str]:
+        return sorted(p.name.split("=", 1)[1] for p in self.root.glob("htf=*") if p.is_dir())
+
+    def pairs(self, htf: str) -> List[str]:
+        return sorted(p.name.split("=", 1)[1] for p in (self.root / f"htf={htf}").glob("pair=*") if p.is_dir())
+
+    def has(self, htf: str) -> bool:
+        return (self.root / f"htf={htf}").is_dir()
+
+    def files(self, htf: str, pairs: Optional[Iterable[str]] = None) -> List[Path]:
+        """Part-Dateien in deterministischer Reihenfolge (Pair-Reihenfolge, dann Part-Nummer)."""
+        pair_list = list(pairs) if pairs is not None else self.pairs(htf)
+        out: List[Path] = []
+        for pair in pair_list:
+            out.extend(sorted(self.partition_dir(htf, pair).glob("part-*.parquet")))
+        return out
+
+    def stamp(self, htf: str) -> int:
+        """Änderungsstempel einer HTF-Partition (max. mtime der Part-Dateien, ns)."""
+        return max((f.stat().st_mtime_ns for f in self.files(htf)), default=0)
+
+    def read_table(self, htf: str, pairs: Optional[Iterable[str]] = None, columns: Optional[List[str]] = None):
+        _require_pyarrow()
+        tables = [pq.read_table(f, columns=columns) for f in self.files(htf, pairs)]
+        if not tables:
+            return None
+        return pa.concat_tables(tables)
+
+    def read(
+        self,
+        htf: str,
+        pairs: Optional[Iterable[str]] = None,
+        columns: Optional[List[str]] = None,
+        sort: bool = True,
+        categorical: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Lädt die Trades eines HTF als DataFrame.
+
+        sort: chronologisch nach (entry_time, pair), stabil – gleiche Reihenfolge wie backtest_all
+        categorical: False → Kategorie-Spalten als normale Strings (Drop-in für CSV-Leser)
+        """
+        table = self.read_table(htf, pairs, columns)
+        if table is None:
+            return pd.DataFrame()
+        df = table.to_pandas()
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].cat.remove_unused_categories() if categorical else df[col].astype(object)
+        if sort and {"entry_time", "pair"} <= set(df.columns):
+            df = df.sort_values(["entry_time", "pair"], kind="mergesort").reset_index(drop=True)
+        return df
+
+
+def naive_utc(df: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Zeitspalten → UTC ohne Zeitzone (Format der Trade-CSVs), in place.
+
+    columns=None: alle Spalten mit Zeitzone. Angegebene Spalten werden bei
+    Bedarf geparst; fehlende Spalten werden übersprungen.
+    """
+    if columns is None:
+        columns = [col for col in df.columns if isinstance(df[col].dtype, pd.DatetimeTZDtype)]
+    for col in columns:
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.to_datetime(values)
+        if values.dt.tz is not None:
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        df[col] = values
+    return df
+
+
+def dataset_dir(trades_dir: Path) -> Path:
+    """Standard-Ort des Datasets neben den CSVs (<Trades>/dataset)."""
+    return Path(trades_dir) / "dataset"
+
+
+def load_trades(trades_dir: Path, htf: str, csv_name: Optional[str] = None) -> Tuple[pd.DataFrame, Path]:
+    """
+    Lädt Phase-2-Trades eines HTF: bevorzugt das Parquet-Dataset (<trades_dir>/dataset),
+    sonst die CSV (<trades_dir>/<htf>_trades.csv). backtest_all löscht die
+    HTF-Partition bei Läufen ohne Dataset (STREAM_TRADES=False / ohne pyarrow),
+    ein vorhandenes Dataset ist also nie älter als die CSV.
+
+    Returns: (DataFrame, Quelle) – Kategorie-Spalten als Strings, Zeitspalten
+    ohne Zeitzone (UTC, wie in den CSVs von backtest_all)
+    """
+    store = TradeStore(dataset_dir(trades_dir))
+    if pyarrow_available() and store.has(htf):
+        df = naive_utc(store.read(htf, categorical=False))
+        return df, store.root / f"htf={htf}"
+    csv_path = Path(trades_dir) / (csv_name or f"{htf}_trades.csv")
+    return pd.read_csv(csv_path), csv_path
+
+
+def trades_source_exists(trades_dir: Path, htf: str, csv_name: Optional[str] = None) -> bool:
+    store = TradeStore(dataset_dir(trades_dir))
+    if pyarrow_available() and store.has(htf):
+        return True
+    return (Path(trades_dir) / (csv_name or f"{htf}_trades.csv")).exists()
+
+
+def trades_source_stamp(trades_dir: Path, htf: str, csv_name: Optional[str] = None) -> int:
+    """Änderungsstempel der Trades-Quelle (für Checkpoint-Keys)."""
+    store = TradeStore(dataset_dir(trades_dir))
+    if pyarrow_available() and store.has(htf):
+        return store.stamp(htf)
+    return (Path(trades_dir) / (csv_name or f"{htf}_trades.csv")).stat().st_mtime_ns
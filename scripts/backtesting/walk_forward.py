@@ -0,0 +1,217 @@
+"""
+Model 3 Walk-Forward-Validierung
+--------------------------------
+
+Rollierende Fenster (Standard 5 Jahre In-Sample / 1 Jahr Out-of-Sample,
+Schritt 1 Jahr) auf einem fertigen Trade-Ledger statt eines neuen
+Backtests pro Fenster:
+
+- Pivots, Verfeinerungen und Trades werden einmal für den Gesamtzeitraum
+  erzeugt (backtest_all / optimize_entry_confirmation); ein Trade gehört
+  zu dem Fenster, in das seine entry_time fällt
+- Kandidaten (Parameter-Konfigurationen) sind Zeilen einer Maskenmatrix
+  über dem Ledger, z.B. Gap-Ranges (range_masks) oder Entry-Typen
+  (Ledger mehrerer Entry-Typen zusammengehängt, Maske = entry_type == x)
+- Pro Fenster: Ledger nach entry_time sortiert → IS/OOS sind zusammen-
+  hängende Index-Bereiche (Slice); batch_stats über alle Kandidaten auf dem
+  IS-Slice, Auswahl nach metric, Bewertung des Gewinners auf dem OOS-Slice
+- Fenster laufen parallel (executors.make_executor)
+
+Gestitchte OOS-Performance: Vereinigung der OOS-Trades der jeweils im IS
+gewählten Kandidaten (OOS-Jahre überlappen nicht) → eine Maske → batch_stats.
+
+Beispiel:
+    windows = make_windows(df["entry_time"], is_years=5, oos_years=1)
+    masks = range_masks(df["gap_pips"], configs)
+    result = run_walk_forward(df, masks, labels, windows, metric="expectancy")
+    result.windows      # DataFrame, eine Zeile pro Fenster
+    result.stitched     # Kennzahlen der gestitchten OOS-Trades
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scripts.backtesting.batch_stats import _time_ns, batch_stats
+    from scripts.backtesting.executors import make_executor
+except ImportError:  # direkter Aufruf aus scripts/backtesting
+    from batch_stats import _time_ns, batch_stats
+    from executors import make_executor
+
+
+@dataclass(frozen=True)
+class Window:
+    """Ein Walk-Forward-Fenster: IS = [is_start, oos_start), OOS = [oos_start, oos_end)."""
+
+    index: int
+    is_start: pd.Timestamp
+    oos_start: pd.Timestamp
+    oos_end: pd.Timestamp
+
+
+@dataclass
+class WalkForwardResult:
+    """Ergebnis: eine Zeile pro Fenster + gestitchte OOS-Kennzahlen."""
+
+    windows: pd.DataFrame
+    stitched: Dict[str, float]
+    oos_mask: np.ndarray  # Trades (Ledger-Reihenfolge) der gestitchten OOS-Kurve
+
+
+def make_windows(
+    entry_times,
+    is_years: int = 5,
+    oos_years: int = 1,
+    step_years: int = 1,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> List[Window]:
+    """
+    Rollierende Fenster ab Jahresanfang des ersten Entries (bzw. start).
+
+    Nur Fenster mit vollständigem IS-Zeitraum; das letzte OOS-Jahr darf über
+    den letzten Entry hinausreichen (Daten bis end bzw. letzter Entry).
+    """
+    times = pd.DatetimeIndex(pd.to_datetime(entry_times)).dropna()
+    if times.tz is not None:
+        times = times.tz_convert("UTC").tz_localize(None)
+    first = pd.Timestamp(start) if start else times.min()
+    last = pd.Timestamp(end) if end else times.max()
+
+    windows = []
+    is_start = pd.Timestamp(year=first.year, month=1, day=1)
+    while True:
+        oos_start = is_start + pd.DateOffset(years=is_years)
+        oos_end = oos_start + pd.DateOffset(years=oos_years)
+        if oos_start > last:
+            break
+        windows.append(Window(len(windows), is_start, oos_start, oos_end))
+        is_start = is_start + pd.DateOffset(years=step_years)
+    return windows
+
+
+# ---- Worker (Ledger + Masken einmal pro Worker) ---- #
+
+_WF: Dict = {}
+
+
+def _init_worker(trades, masks, entry_ns, metric, min_trades, ascending, start_cap, risk):
+    _WF.update(
+        trades=trades, masks=masks, entry_ns=entry_ns, metric=metric, min_trades=min_trades,
+        ascending=ascending, start_cap=start_cap, risk=risk,
+    )
+
+
+def _slice(entry_ns: np.ndarray, lo: pd.Timestamp, hi: pd.Timestamp) -> slice:
+    """Index-Bereich der Trades mit lo <= entry_time < hi (entry_ns sortiert)."""
+    i = np.searchsorted(entry_ns, lo.value, side="left")
+    j = np.searchsorted(entry_ns, hi.value, side="left")
+    return slice(int(i), int(j))
+
+
+def _run_window(window: Window) -> Dict:
+    """IS-Sweep über alle Kandidaten → bester Kandidat → OOS-Kennzahlen."""
+    trades, masks = _WF["trades"], _WF["masks"]
+    kw = dict(start_cap=_WF["start_cap"], risk=_WF["risk"], concurrency=False)
+    entry_ns = _WF["entry_ns"]
+    is_part = _slice(entry_ns, window.is_start, window.oos_start)
+    oos_part = _slice(entry_ns, window.oos_start, window.oos_end)
+
+    row = {
+        "window": window.index,
+        "is_start": window.is_start,
+        "oos_start": window.oos_start,
+        "oos_end": window.oos_end,
+        "is_trades_total": is_part.stop - is_part.start,
+        "oos_trades_total": oos_part.stop - oos_part.start,
+        "candidate": -1,
+    }
+
+    is_stats = batch_stats(trades.iloc[is_part], masks[:, is_part], **kw)
+    score = np.where(is_stats["trades"] >= _WF["min_trades"], is_stats[_WF["metric"]], np.nan)
+    if np.all(np.isnan(score)):
+        return row
+    # Erster Kandidat bei Gleichstand (Kandidaten-Reihenfolge)
+    best = int(np.nanargmin(score) if _WF["ascending"] else np.nanargmax(score))
+
+    oos_stats = batch_stats(trades.iloc[oos_part], masks[best:best + 1, oos_part], **kw)
+    row["candidate"] = best
+    for key in ("trades", "expectancy", "win_rate", "sqn", "profit_factor", "max_dd", "cumulative_r"):
+        row[f"is_{key}"] = is_stats[key][best]
+        row[f"oos_{key}"] = oos_stats[key][0]
+    return row
+
+
+def run_walk_forward(
+    trades: pd.DataFrame,
+    masks: np.ndarray,
+    labels: Sequence[str],
+    windows: Sequence[Window],
+    metric: str = "expectancy",
+    min_trades: int = 50,
+    ascending: bool = False,
+    start_cap: float = 100000,
+    risk: float = 0.01,
+    executor: str = "thread",
+    workers: Optional[int] = None,
+) -> WalkForwardResult:
+    """
+    Walk-Forward über alle Fenster.
+
+    Args:
+        trades: Ledger als DataFrame (pnl_r, entry_time, exit_time)
+        masks: bool-Matrix (Kandidaten × Trades), Zeilen-Reihenfolge = labels
+        metric: Auswahl-Kennzahl im IS (batch_stats-Schlüssel), ascending=True → kleiner ist besser
+        min_trades: Mindest-Trades eines Kandidaten im IS-Fenster
+        executor: "thread", "process" oder "serial" (siehe executors.py)
+
+    Returns:
+        WalkForwardResult – Fenster ohne gültigen Kandidaten haben candidate = -1
+        und tragen nichts zur gestitchten OOS-Kurve bei
+    """
+    masks = np.atleast_2d(np.asarray(masks, dtype=bool))
+    if masks.shape != (len(labels), len(trades)):
+        raise ValueError(f"Masken {masks.shape} passen nicht zu {len(labels)} Kandidaten × {len(trades)} Trades")
+
+    # Einmal nach entry_time sortieren → jedes Fenster ist ein Slice
+    entry_ns = _time_ns(trades["entry_time"])
+    order = np.argsort(entry_ns, kind="stable")
+    sorted_trades = trades.iloc[order].reset_index(drop=True)
+    sorted_masks = masks[:, order]
+
+    initargs = (sorted_trades, sorted_masks, entry_ns[order], metric, min_trades, ascending, start_cap, risk)
+    with make_executor(executor, workers, initializer=_init_worker, initargs=initargs) as ex:
+        rows = sorted(ex.imap_unordered(_run_window, list(windows)), key=lambda r: r["window"])
+    _WF.clear()
+
+    table = pd.DataFrame(rows)
+    table.insert(table.columns.get_loc("candidate") + 1, "label",
+                 [labels[c] if c >= 0 else None for c in table["candidate"]])
+
+    # Gestitchte OOS-Trades (zurück in Ledger-Reihenfolge)
+    sorted_oos = np.zeros(len(trades), dtype=bool)
+    for row in rows:
+        if row["candidate"] >= 0:
+            part = _slice(entry_ns[order], row["oos_start"], row["oos_end"])
+            sorted_oos[part] |= sorted_masks[row["candidate"], part]
+    oos_mask = np.zeros(len(trades), dtype=bool)
+    oos_mask[order] = sorted_oos
+
+    full = batch_stats(sorted_trades, sorted_oos, start_cap=start_cap, risk=risk)
+    stitched = {key: values[0].item() for key, values in full.items()}
+
+    return WalkForwardResult(windows=table, stitched=stitched, oos_mask=oos_mask)
+
+
+def walk_forward_efficiency(result: WalkForwardResult, metric: str = "expectancy") -> float:
+    """Ø OOS / Ø IS der gewählten Kandidaten (NaN ohne gültige Fenster bzw. bei Ø IS <= 0)."""
+    valid = result.windows[result.windows["candidate"] >= 0]
+    if valid.empty:
+        return float("nan")
+    is_mean = valid[f"is_{metric}"].mean()
+    return float(valid[f"oos_{metric}"].mean() / is_mean) if is_mean > 0 else float("nan")